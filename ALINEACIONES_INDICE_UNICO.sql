@@ -0,0 +1,22 @@
+-- Script para agregar el índice único (id_partido, id_equipo, id_jugador) a la tabla alineaciones
+-- Lo usa definir-alineacion para guardar la alineación con un solo upsert
+-- Ejecuta este script en la base de datos MySQL del microservicio de alineaciones
+
+USE alineaciones_db;
+
+-- Un jugador repetido en el mismo partido y equipo impediría crear el índice:
+-- se conserva la fila más antigua
+DELETE a FROM alineaciones a
+JOIN alineaciones b
+  ON a.id_partido = b.id_partido
+ AND a.id_equipo = b.id_equipo
+ AND a.id_jugador = b.id_jugador
+ AND a.id_alineacion > b.id_alineacion;
+
+ALTER TABLE alineaciones
+ADD UNIQUE INDEX unique_alineacion_partido_equipo_jugador (id_partido, id_equipo, id_jugador);
+
+-- Verificar que se agregó correctamente
+SHOW INDEX FROM alineaciones;
+
+SELECT 'Índice único agregado exitosamente a la tabla alineaciones' AS mensaje;
@@ -0,0 +1,41 @@
+-- Script para guardar los refresh tokens como hash (SHA-256) y habilitar la rotación
+-- Ejecuta este script en tu base de datos MySQL
+
+USE gestion_campeonato;
+
+-- Nuevas columnas
+ALTER TABLE refresh_tokens
+ADD COLUMN IF NOT EXISTS token_hash CHAR(64) NULL AFTER user_id,
+ADD COLUMN IF NOT EXISTS family_id VARCHAR(32) NULL AFTER token_hash,
+ADD COLUMN IF NOT EXISTS replaced_by_id INT NULL AFTER family_id,
+ADD COLUMN IF NOT EXISTS rotated_at DATETIME NULL AFTER replaced_by_id,
+ADD COLUMN IF NOT EXISTS revoked_at DATETIME NULL AFTER is_revoked;
+
+-- Los tokens ya emitidos siguen funcionando: se hashean los existentes
+-- y cada uno queda como su propia familia
+UPDATE refresh_tokens
+SET token_hash = SHA2(token, 256),
+    family_id = LEFT(SHA2(CONCAT('familia-', id), 256), 32)
+WHERE token_hash IS NULL;
+
+ALTER TABLE refresh_tokens
+MODIFY token_hash CHAR(64) NOT NULL,
+MODIFY family_id VARCHAR(32) NOT NULL;
+
+-- El token en claro deja de guardarse
+ALTER TABLE refresh_tokens
+DROP INDEX token,
+DROP INDEX idx_token,
+DROP COLUMN token;
+
+ALTER TABLE refresh_tokens
+ADD UNIQUE INDEX token_hash (token_hash),
+ADD INDEX ix_refresh_tokens_family_id (family_id),
+ADD INDEX idx_refresh_user_revoked (user_id, is_revoked),
+ADD CONSTRAINT refresh_tokens_replaced_by_fk
+    FOREIGN KEY (replaced_by_id) REFERENCES refresh_tokens (id) ON DELETE SET NULL;
+
+-- Verificar que se aplicó correctamente
+DESCRIBE refresh_tokens;
+
+SELECT 'refresh_tokens ahora guarda solo el hash del token' AS mensaje;
@@ -1,7 +1,8 @@
-from flask import Flask
+from flask import Flask, jsonify
 from flask_restx import Api
 from app.extensions import db, jwt, cors
 from app.config import Config
+from app.cli import register_commands
 
 def create_app():
     app = Flask(__name__)
@@ -15,8 +16,29 @@ def create_app():
     jwt.init_app(app)
     cors.init_app(app)
 
+    from app.services import backend_api_client
+    from app.services.replica import replica
+    backend_api_client.init_app(app)
+    replica.init_app(app)
+    register_commands(app)
+
+    # Importar modelos y crear tablas
+    with app.app_context():
+        from app.models.alineacion import Alineacion
+        from app.models.replica import ReplicaJugador, ReplicaEquipo, ReplicaPartido, ReplicaEstado
+
+        db.create_all()
+
     # Registrar namespaces
     from app.routes.alineacion_routes import alineacion_ns
     api.add_namespace(alineacion_ns, path='/alineaciones')
 
+    @app.route('/health/backend')
+    def backend_stats():
+        return jsonify(backend_api_client.backend_http.stats()), 200
+
+    @app.route('/health/replica')
+    def replica_stats():
+        return jsonify(replica.stats()), 200
+
     return app
\ No newline at end of file
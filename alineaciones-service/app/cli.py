@@ -0,0 +1,47 @@
+import click
+from flask.cli import AppGroup
+from app.extensions import db
+
+# ============================================
+# COMANDOS DE MANTENIMIENTO (flask <grupo> <comando>)
+# ============================================
+
+replica_cli = AppGroup('replica', help='Réplica local de jugadores, equipos y partidos del backend')
+
+
+@replica_cli.command('resync')
+def resync_replica():
+    """Copia de nuevo todas las tablas replicadas desde el backend"""
+    from app.services.replica import replica
+
+    filas = replica.resync()
+    click.echo(f'{filas} filas copiadas (cursor {replica.stats()["cursor"]})')
+
+
+@replica_cli.command('sincronizar')
+def sincronizar_replica():
+    """Aplica ahora los cambios pendientes del backend (sin esperar al hilo)"""
+    from app.services.replica import replica
+
+    recibidas = replica.sincronizar()
+    click.echo(f'{recibidas} filas actualizadas (cursor {replica.stats()["cursor"]})')
+
+
+@replica_cli.command('estado')
+def estado_replica():
+    """Cursor, generación y tamaño de la réplica guardada en la BD"""
+    from app.models.replica import ReplicaEquipo, ReplicaEstado, ReplicaJugador, ReplicaPartido
+
+    estado = db.session.get(ReplicaEstado, 1)
+    if estado is None:
+        click.echo('La réplica nunca se sincronizó: flask replica resync')
+        return
+    click.echo(f'cursor {estado.cursor}, generación {estado.generacion}, '
+               f'última sincronización {estado.ultima_sincronizacion}, último resync {estado.ultimo_resync}')
+    for modelo in (ReplicaJugador, ReplicaEquipo, ReplicaPartido):
+        click.echo(f'  {modelo.__tablename__}: {db.session.query(modelo).count()} filas')
+
+
+def register_commands(app):
+    """Registra los comandos CLI de la aplicación"""
+    app.cli.add_command(replica_cli)
@@ -10,4 +10,21 @@ class Config:
     JWT_SECRET_KEY = 'dev-secret-cambiar-en-produccion'
     
     # URL del backend principal
-    BACKEND_API_URL = 'http://localhost:5000'
\ No newline at end of file
+    BACKEND_API_URL = 'http://localhost:5000'
+
+    # Cliente HTTP hacia el backend (ver app/services/http_client.py)
+    BACKEND_API_DEADLINE = float(os.getenv('BACKEND_API_DEADLINE', 5))  # segundos por llamada, reintentos incluidos
+    BACKEND_API_CONNECT_TIMEOUT = 2.0
+    BACKEND_API_REINTENTOS = 2
+    BACKEND_API_BACKOFF_BASE = 0.1      # 0.1 s, 0.2 s... con jitter
+    BACKEND_API_BACKOFF_MAX = 1.0
+    BACKEND_API_FALLOS_CIRCUITO = 5     # fallos seguidos que abren el circuito
+    BACKEND_API_ESPERA_CIRCUITO = 30.0  # segundos abierto antes de probar de nuevo
+    BACKEND_API_POOL = int(os.getenv('BACKEND_API_POOL', 10))  # conexiones keep-alive
+
+    # Réplica local de jugadores, equipos y partidos (ver app/services/replica.py)
+    REPLICA_ENABLED = os.getenv('REPLICA_ENABLED', 'true').lower() == 'true'
+    REPLICA_SYNC_SECONDS = int(os.getenv('REPLICA_SYNC_SECONDS', 5))        # 0 = sin hilo de sincronización
+    REPLICA_MAX_STALENESS = int(os.getenv('REPLICA_MAX_STALENESS', 60))     # más atrasada: se consulta al backend
+    REPLICA_RELEER = 100        # seqs que se vuelven a pedir por debajo del cursor
+    REPLICA_LOTE = 1000         # cambios o filas por llamada al feed
@@ -19,6 +19,12 @@ class Alineacion(db.Model):
     
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        # Un jugador aparece una sola vez por partido y equipo; es la clave del
+        # upsert de definir-alineacion (AlineacionService.reemplazar)
+        db.UniqueConstraint('id_partido', 'id_equipo', 'id_jugador', name='unique_alineacion_partido_equipo_jugador'),
+    )
+    
     def to_dict(self):
         return {
             'id_alineacion': self.id_alineacion,
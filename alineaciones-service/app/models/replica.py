@@ -0,0 +1,56 @@
+from app.extensions import db
+
+
+# ============================================
+# RÉPLICA DE SOLO LECTURA DEL BACKEND (ver app/services/replica.py)
+# ============================================
+# Mismas claves primarias que en el backend; solo las columnas que usan
+# las validaciones de alineaciones. Nunca se escriben desde los endpoints.
+
+class ReplicaJugador(db.Model):
+    __tablename__ = 'replica_jugadores'
+
+    id_jugador = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    id_equipo = db.Column(db.Integer, nullable=False, index=True)
+    nombre = db.Column(db.String(100), nullable=False)
+    apellido = db.Column(db.String(100), nullable=False)
+    dorsal = db.Column(db.Integer, nullable=True)
+    posicion = db.Column(db.String(20), nullable=True)
+    activo = db.Column(db.Boolean, default=True)
+
+
+class ReplicaEquipo(db.Model):
+    __tablename__ = 'replica_equipos'
+
+    id_equipo = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    nombre = db.Column(db.String(100), nullable=False)
+    logo_url = db.Column(db.String(255), nullable=True)
+    estado = db.Column(db.String(20), nullable=True)
+    id_lider = db.Column(db.Integer, nullable=True)
+
+
+class ReplicaPartido(db.Model):
+    __tablename__ = 'replica_partidos'
+
+    id_partido = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    id_campeonato = db.Column(db.Integer, nullable=False, index=True)
+    id_equipo_local = db.Column(db.Integer, nullable=False)
+    id_equipo_visitante = db.Column(db.Integer, nullable=False)
+    fecha_partido = db.Column(db.DateTime, nullable=True)
+    jornada = db.Column(db.Integer, nullable=True)
+    estado = db.Column(db.String(50), nullable=True)
+
+
+class ReplicaEstado(db.Model):
+    """
+    Una sola fila (id=1): hasta qué seq del feed del backend está aplicada
+    la réplica en la BD. `generacion` sube con cada resincronización completa
+    para que los workers recarguen su copia en memoria.
+    """
+    __tablename__ = 'replica_estado'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    cursor = db.Column(db.BigInteger, nullable=False, default=0)
+    generacion = db.Column(db.Integer, nullable=False, default=0)
+    ultima_sincronizacion = db.Column(db.DateTime, nullable=True)
+    ultimo_resync = db.Column(db.DateTime, nullable=True)
@@ -4,6 +4,7 @@ from flask_jwt_extended import jwt_required
 from app.extensions import db
 from app.models.alineacion import Alineacion
 from app.services.backend_api_client import BackendAPIClient
+from app.services.alineacion_service import AlineacionService
 
 alineacion_ns = Namespace('alineaciones', description='Gestión de alineaciones de partidos')
 
@@ -111,39 +112,31 @@ class AlineacionList(Resource):
 
             api_client = BackendAPIClient()
 
-            partido = api_client.get_partido(data['id_partido'])
+            resultado = api_client.get_partido_con_planteles(data['id_partido'])
+            if resultado is None:
+                alineacion_ns.abort(500, error='No se pudieron obtener los jugadores')
+            partido, planteles = resultado
             if not partido:
                 alineacion_ns.abort(404, error='Partido no encontrado')
 
-            if not api_client.validar_equipo_en_partido(data['id_equipo'], data['id_partido']):
+            if not api_client.validar_equipo_en_partido(data['id_equipo'], data['id_partido'], partido):
                 alineacion_ns.abort(400, error='El equipo no participa en este partido')
 
             nombre_jugador = data['nombre_jugador'].strip()
 
-            try:
-                import requests
-                response = requests.get(
-                    f"{api_client.base_url}/jugadores?id_equipo={data['id_equipo']}",
-                    timeout=5
-                )
-                if response.status_code == 200:
-                    jugadores = response.json().get('jugadores', [])
-
-                    jugador = None
-                    for j in jugadores:
-                        nombre_completo = f"{j['nombre']} {j['apellido']}"
-                        if nombre_jugador.lower() in nombre_completo.lower():
-                            jugador = j
-                            break
-
-                    if not jugador:
-                        alineacion_ns.abort(404, error='Jugador no encontrado', mensaje=f'No existe un jugador "{nombre_jugador}" en el equipo')
-
-                    id_jugador = jugador['id_jugador']
-                else:
-                    alineacion_ns.abort(500, error='No se pudieron obtener los jugadores')
-            except Exception as e:
-                alineacion_ns.abort(500, error=f'Error al buscar jugador: {str(e)}')
+            jugadores = planteles.get(data['id_equipo'], [])
+
+            jugador = None
+            for j in jugadores:
+                nombre_completo = f"{j['nombre']} {j['apellido']}"
+                if nombre_jugador.lower() in nombre_completo.lower():
+                    jugador = j
+                    break
+
+            if not jugador:
+                alineacion_ns.abort(404, error='Jugador no encontrado', mensaje=f'No existe un jugador "{nombre_jugador}" en el equipo')
+
+            id_jugador = jugador['id_jugador']
 
             alineacion_existente = Alineacion.query.filter_by(
                 id_partido=data['id_partido'],
@@ -170,9 +163,11 @@ class AlineacionList(Resource):
             response['dorsal'] = jugador['dorsal']
             response['posicion'] = jugador['posicion']
 
-            equipo = api_client.get_equipo(data['id_equipo'])
-            if equipo:
-                response['equipo_nombre'] = equipo['nombre']
+            # El partido del lote ya trae el nombre de ambos equipos
+            if data['id_equipo'] == partido.get('id_equipo_local'):
+                response['equipo_nombre'] = partido.get('equipo_local')
+            else:
+                response['equipo_nombre'] = partido.get('equipo_visitante')
 
             return response, 201
 
@@ -211,6 +206,7 @@ class AlineacionList(Resource):
 
             api_client = BackendAPIClient()
             resultado = []
+            equipos = {}
 
             for alineacion in alineaciones:
                 data = alineacion.to_dict()
@@ -221,7 +217,10 @@ class AlineacionList(Resource):
                     data['dorsal'] = jugador.get('dorsal')
                     data['posicion'] = jugador.get('posicion')
 
-                equipo = api_client.get_equipo(alineacion.id_equipo)
+                # Casi siempre es el mismo equipo en todas las filas
+                if alineacion.id_equipo not in equipos:
+                    equipos[alineacion.id_equipo] = api_client.get_equipo(alineacion.id_equipo)
+                equipo = equipos[alineacion.id_equipo]
                 if equipo:
                     data['equipo_nombre'] = equipo.get('nombre')
 
@@ -291,7 +290,11 @@ class DefinirAlineacion(Resource):
 
             api_client = BackendAPIClient()
 
-            partido = api_client.get_partido(data['id_partido'])
+            # Partido y planteles de sus equipos en una sola llamada
+            resultado = api_client.get_partido_con_planteles(data['id_partido'])
+            if resultado is None:
+                alineacion_ns.abort(500, error='No se pudieron obtener los jugadores')
+            partido, planteles = resultado
             if not partido:
                 alineacion_ns.abort(404, error='Partido no encontrado')
 
@@ -300,28 +303,23 @@ class DefinirAlineacion(Resource):
             if partido.get('estado') not in ['programado', 'en_juego']:
                 alineacion_ns.abort(400, error='Solo se puede definir alineación en partidos programados o en juego')
 
-            if not api_client.validar_equipo_en_partido(data['id_equipo'], data['id_partido']):
+            if not api_client.validar_equipo_en_partido(data['id_equipo'], data['id_partido'], partido):
                 alineacion_ns.abort(400, error='El equipo no participa en este partido')
 
-            import requests
-            response = requests.get(
-                f"{api_client.base_url}/jugadores?id_equipo={data['id_equipo']}",
-                timeout=5
-            )
+            jugadores_equipo = planteles.get(data['id_equipo'], [])
 
-            if response.status_code != 200:
-                alineacion_ns.abort(500, error='No se pudieron obtener los jugadores')
+            # Índices del plantel, armados una sola vez
+            por_id = {j['id_jugador']: j for j in jugadores_equipo}
+            por_nombre = [(f"{j['nombre']} {j['apellido']}".lower(), j) for j in jugadores_equipo]
 
-            jugadores_equipo = response.json().get('jugadores', [])
-
-            # Limpiar alineaciones previas
-            Alineacion.query.filter_by(
-                id_partido=data['id_partido'],
-                id_equipo=data['id_equipo']
-            ).delete()
-
-            alineaciones_creadas = []
-            errores = []
+            def buscar(id_jugador, nombre):
+                if id_jugador:
+                    return por_id.get(id_jugador)
+                if nombre:
+                    # Por nombre (compatibilidad): el primero que lo contenga
+                    nombre = nombre.lower()
+                    return next((j for completo, j in por_nombre if nombre in completo), None)
+                return None
 
             # Determinar formato de datos recibidos
             # Formato nuevo: jugadores con id_jugador y titular flag
@@ -330,140 +328,67 @@ class DefinirAlineacion(Resource):
             titulares_data = data.get('titulares', [])
             suplentes_data = data.get('suplentes', [])
 
-            # Si viene en formato nuevo (jugadores)
+            # (entrada, titular, error si no se encuentra, guarda posición)
+            entradas = []
             if jugadores_data:
                 for idx, jugador_data in enumerate(jugadores_data):
-                    id_jugador = jugador_data.get('id_jugador')
-                    es_titular = jugador_data.get('titular', False)
-                    
-                    if not id_jugador:
-                        errores.append(f"Jugador #{idx+1} sin id_jugador")
-                        continue
-
-                    # Buscar jugador por ID
-                    jugador = None
-                    for j in jugadores_equipo:
-                        if j['id_jugador'] == id_jugador:
-                            jugador = j
-                            break
-
-                    if not jugador:
-                        errores.append(f"Jugador con ID {id_jugador} no encontrado")
-                        continue
-
-                    nueva_alineacion = Alineacion(
-                        id_partido=data['id_partido'],
-                        id_equipo=data['id_equipo'],
-                        id_jugador=jugador['id_jugador'],
-                        titular=es_titular,
-                        minuto_entrada=0 if es_titular else None,
-                        posicion_x=jugador_data.get('posicion_x'),
-                        posicion_y=jugador_data.get('posicion_y'),
-                        formacion=data.get('formacion')
-                    )
-
-                    db.session.add(nueva_alineacion)
-                    alineaciones_creadas.append({
-                        'nombre': f"{jugador['nombre']} {jugador['apellido']}",
-                        'dorsal': jugador['dorsal'],
-                        'posicion': jugador['posicion'],
-                        'titular': es_titular,
-                        'minuto_entrada': 0 if es_titular else None,
-                        'posicion_x': jugador_data.get('posicion_x'),
-                        'posicion_y': jugador_data.get('posicion_y')
-                    })
+                    if jugador_data.get('id_jugador'):
+                        error = f"Jugador con ID {jugador_data['id_jugador']} no encontrado"
+                    else:
+                        error = f"Jugador #{idx+1} sin id_jugador"
+                    # En este formato solo se busca por id
+                    entradas.append(({'id_jugador': jugador_data.get('id_jugador'),
+                                      'posicion_x': jugador_data.get('posicion_x'),
+                                      'posicion_y': jugador_data.get('posicion_y')},
+                                     jugador_data.get('titular', False), error, True))
             else:
-                # Formato antiguo: titulares y suplentes separados
-                # Procesar titulares CON POSICIONES
                 for idx, titular in enumerate(titulares_data):
-                    id_jugador = titular.get('id_jugador')
-                    nombre_titular = titular.get('nombre', '').strip()
-
-                    jugador = None
-                    if id_jugador:
-                        # Buscar por ID
-                        for j in jugadores_equipo:
-                            if j['id_jugador'] == id_jugador:
-                                jugador = j
-                                break
-                    elif nombre_titular:
-                        # Buscar por nombre (compatibilidad)
-                        for j in jugadores_equipo:
-                            nombre_completo = f"{j['nombre']} {j['apellido']}"
-                            if nombre_titular.lower() in nombre_completo.lower():
-                                jugador = j
-                                break
-
-                    if not jugador:
-                        errores.append(f"Titular #{idx+1} no encontrado")
-                        continue
-
-                    nueva_alineacion = Alineacion(
-                        id_partido=data['id_partido'],
-                        id_equipo=data['id_equipo'],
-                        id_jugador=jugador['id_jugador'],
-                        titular=True,
-                        minuto_entrada=0,
-                        posicion_x=titular.get('posicion_x'),
-                        posicion_y=titular.get('posicion_y'),
-                        formacion=data.get('formacion')
-                    )
-
-                    db.session.add(nueva_alineacion)
-                    alineaciones_creadas.append({
-                        'nombre': f"{jugador['nombre']} {jugador['apellido']}",
-                        'dorsal': jugador['dorsal'],
-                        'posicion': jugador['posicion'],
-                        'titular': True,
-                        'minuto_entrada': 0,
-                        'posicion_x': titular.get('posicion_x'),
-                        'posicion_y': titular.get('posicion_y')
-                    })
-
-                # Procesar suplentes
+                    entradas.append((titular, True, f"Titular #{idx+1} no encontrado", True))
                 for suplente in suplentes_data:
-                    id_jugador = suplente.get('id_jugador')
-                    nombre_suplente = suplente.get('nombre', '').strip()
-
-                    if not id_jugador and not nombre_suplente:
+                    if not suplente.get('id_jugador') and not (suplente.get('nombre') or '').strip():
                         continue
+                    entradas.append((suplente, False, "Suplente no encontrado", False))
 
-                    jugador = None
-                    if id_jugador:
-                        # Buscar por ID
-                        for j in jugadores_equipo:
-                            if j['id_jugador'] == id_jugador:
-                                jugador = j
-                                break
-                    elif nombre_suplente:
-                        # Buscar por nombre (compatibilidad)
-                        for j in jugadores_equipo:
-                            nombre_completo = f"{j['nombre']} {j['apellido']}"
-                            if nombre_suplente.lower() in nombre_completo.lower():
-                                jugador = j
-                                break
-
-                    if not jugador:
-                        errores.append(f"Suplente no encontrado")
-                        continue
-
-                    nueva_alineacion = Alineacion(
-                        id_partido=data['id_partido'],
-                        id_equipo=data['id_equipo'],
-                        id_jugador=jugador['id_jugador'],
-                        titular=False,
-                        minuto_entrada=None,
-                        formacion=data.get('formacion')
-                    )
-
-                    db.session.add(nueva_alineacion)
-                    alineaciones_creadas.append({
-                        'nombre': f"{jugador['nombre']} {jugador['apellido']}",
-                        'dorsal': jugador['dorsal'],
-                        'posicion': jugador['posicion'],
-                        'titular': False
-                    })
+            # Una pasada: validar contra el plantel y armar las filas
+            filas = []
+            errores = []
+            alineaciones_creadas = []
+            vistos = set()
+            for entrada, es_titular, error, con_posicion in entradas:
+                jugador = buscar(entrada.get('id_jugador'), (entrada.get('nombre') or '').strip())
+                if not jugador:
+                    errores.append(error)
+                    continue
+                if jugador['id_jugador'] in vistos:
+                    errores.append(f"{jugador['nombre']} {jugador['apellido']} está repetido")
+                    continue
+                vistos.add(jugador['id_jugador'])
+
+                posicion_x = entrada.get('posicion_x') if con_posicion else None
+                posicion_y = entrada.get('posicion_y') if con_posicion else None
+                filas.append({
+                    'id_jugador': jugador['id_jugador'],
+                    'titular': es_titular,
+                    'minuto_entrada': 0 if es_titular else None,
+                    'minuto_salida': None,
+                    'posicion_x': posicion_x,
+                    'posicion_y': posicion_y,
+                    'formacion': data.get('formacion')
+                })
+
+                creada = {
+                    'nombre': f"{jugador['nombre']} {jugador['apellido']}",
+                    'dorsal': jugador['dorsal'],
+                    'posicion': jugador['posicion'],
+                    'titular': es_titular
+                }
+                if con_posicion:
+                    creada.update(minuto_entrada=0 if es_titular else None,
+                                  posicion_x=posicion_x, posicion_y=posicion_y)
+                alineaciones_creadas.append(creada)
 
+            # Reemplaza la alineación anterior: un DELETE y un upsert, en una transacción
+            AlineacionService.reemplazar(data['id_partido'], data['id_equipo'], filas)
             db.session.commit()
 
             mensaje = f'Alineación definida: {len([a for a in alineaciones_creadas if a["titular"]])} titulares, {len([a for a in alineaciones_creadas if not a["titular"]])} suplentes'
@@ -506,23 +431,17 @@ class HacerCambio(Resource):
             data = alineacion_ns.payload
             api_client = BackendAPIClient()
 
-            partido = api_client.get_partido(data['id_partido'])
+            resultado = api_client.get_partido_con_planteles(data['id_partido'])
+            if resultado is None:
+                alineacion_ns.abort(500, error='No se pudieron obtener los jugadores')
+            partido, planteles = resultado
             if not partido:
                 alineacion_ns.abort(404, error='Partido no encontrado')
 
             if partido.get('estado') != 'en_juego':
                 alineacion_ns.abort(400, error='Solo se pueden hacer cambios en partidos en juego')
 
-            import requests
-            response = requests.get(
-                f"{api_client.base_url}/jugadores?id_equipo={data['id_equipo']}",
-                timeout=5
-            )
-
-            if response.status_code != 200:
-                alineacion_ns.abort(500, error='No se pudieron obtener los jugadores')
-
-            jugadores_equipo = response.json().get('jugadores', [])
+            jugadores_equipo = planteles.get(data['id_equipo'], [])
 
             # Buscar jugador que sale
             jugador_sale = None
@@ -565,10 +484,10 @@ class HacerCambio(Resource):
             ).first()
 
             if not alineacion_sale:
-                alineacion_ns.abort(400, error=f'{data["sale"]} no está en la alineación')
+                alineacion_ns.abort(400, error=f'{jugador_sale["nombre"]} {jugador_sale["apellido"]} no está en la alineación')
 
             if alineacion_sale.minuto_salida is not None:
-                alineacion_ns.abort(400, error=f'{data["sale"]} ya fue sustituido anteriormente')
+                alineacion_ns.abort(400, error=f'{jugador_sale["nombre"]} {jugador_sale["apellido"]} ya fue sustituido anteriormente')
 
             if alineacion_sale.minuto_entrada is not None and data['minuto'] <= alineacion_sale.minuto_entrada:
                 alineacion_ns.abort(400, error='El minuto de salida debe ser mayor al de entrada')
@@ -580,10 +499,10 @@ class HacerCambio(Resource):
             ).first()
 
             if not alineacion_entra:
-                alineacion_ns.abort(400, error=f'{data["entra"]} no está en la lista de convocados')
+                alineacion_ns.abort(400, error=f'{jugador_entra["nombre"]} {jugador_entra["apellido"]} no está en la lista de convocados')
 
             if alineacion_entra.minuto_entrada is not None:
-                alineacion_ns.abort(400, error=f'{data["entra"]} ya está en la cancha')
+                alineacion_ns.abort(400, error=f'{jugador_entra["nombre"]} {jugador_entra["apellido"]} ya está en la cancha')
 
             alineacion_sale.minuto_salida = data['minuto']
             alineacion_entra.minuto_entrada = data['minuto']
@@ -626,60 +545,52 @@ class AutoGenerarAlineaciones(Resource):
     def post(self):
         """Genera automáticamente alineaciones (SOLO PRUEBAS)"""
         try:
-            import requests
             data = alineacion_ns.payload
             api_client = BackendAPIClient()
 
-            response = requests.get(
-                f"{api_client.base_url}/partido?id_campeonato={data['id_campeonato']}",
-                timeout=10
-            )
-
-            if response.status_code != 200:
+            # Todos los partidos del campeonato con los planteles de sus equipos: una llamada
+            resultado = api_client.get_partidos_lote(id_campeonato=data['id_campeonato'], planteles=True)
+            if resultado is None:
                 alineacion_ns.abort(500, error='No se pudieron obtener los partidos')
-
-            partidos = response.json().get('partidos', [])
+            partidos, planteles = resultado
 
             if not partidos:
                 alineacion_ns.abort(404, error='No hay partidos en este campeonato')
 
-            alineaciones_creadas = 0
+            # Jugadores ya alineados en esos partidos, en una consulta
+            ids_partido = [p['id_partido'] for p in partidos]
+            existentes = set(
+                db.session.query(Alineacion.id_partido, Alineacion.id_jugador)
+                .filter(Alineacion.id_partido.in_(ids_partido))
+                .all()
+            )
+
+            filas = []
             partidos_procesados = 0
 
             for partido in partidos:
                 id_partido = partido['id_partido']
-                id_equipo_local = partido['id_equipo_local']
-                id_equipo_visitante = partido['id_equipo_visitante']
-
-                for id_equipo in [id_equipo_local, id_equipo_visitante]:
-                    response_jug = requests.get(
-                        f"{api_client.base_url}/jugadores?id_equipo={id_equipo}",
-                        timeout=5
-                    )
-
-                    if response_jug.status_code == 200:
-                        jugadores = response_jug.json().get('jugadores', [])
-
-                        for idx, jugador in enumerate(jugadores[:11]):
-                            existe = Alineacion.query.filter_by(
-                                id_partido=id_partido,
-                                id_jugador=jugador['id_jugador']
-                            ).first()
-
-                            if not existe:
-                                nueva_alineacion = Alineacion(
-                                    id_partido=id_partido,
-                                    id_equipo=id_equipo,
-                                    id_jugador=jugador['id_jugador'],
-                                    titular=(idx < 11),
-                                    minuto_entrada=0 if idx < 11 else None
-                                )
-                                db.session.add(nueva_alineacion)
-                                alineaciones_creadas += 1
+
+                for id_equipo in [partido['id_equipo_local'], partido['id_equipo_visitante']]:
+                    for idx, jugador in enumerate(planteles.get(id_equipo, [])[:11]):
+                        if (id_partido, jugador['id_jugador']) in existentes:
+                            continue
+                        existentes.add((id_partido, jugador['id_jugador']))
+                        filas.append({
+                            'id_partido': id_partido,
+                            'id_equipo': id_equipo,
+                            'id_jugador': jugador['id_jugador'],
+                            'titular': idx < 11,
+                            'minuto_entrada': 0 if idx < 11 else None
+                        })
 
                 partidos_procesados += 1
 
+            # Un solo INSERT de varias filas
+            if filas:
+                db.session.execute(db.insert(Alineacion), filas)
             db.session.commit()
+            alineaciones_creadas = len(filas)
 
             return {
                 'mensaje': 'Alineaciones generadas automáticamente',
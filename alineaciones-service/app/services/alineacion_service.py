@@ -0,0 +1,76 @@
+from app.extensions import db
+from app.models.alineacion import Alineacion
+
+# Columnas que se reescriben cuando el jugador ya estaba en la alineación
+# (id_alineacion y fecha_creacion se conservan)
+COLUMNAS_UPSERT = ('titular', 'minuto_entrada', 'minuto_salida', 'posicion_x', 'posicion_y', 'formacion')
+
+
+class AlineacionService:
+    """
+    Escritura de la alineación completa de un equipo en un partido
+
+    ¿Por qué existe?
+    - definir-alineacion borraba todas las filas del equipo y volvía a
+      insertarlas de a una (un INSERT por jugador)
+    - Ahora es un DELETE de los que ya no están y un solo upsert sobre el
+      índice único (id_partido, id_equipo, id_jugador): los que siguen
+      conservan su fila
+
+    Como los servicios del backend, no hace commit.
+    """
+
+    @staticmethod
+    def reemplazar(id_partido, id_equipo, filas):
+        """
+        Deja en la BD exactamente estas filas para el equipo en el partido
+
+        Args:
+            filas: dicts con id_jugador y las COLUMNAS_UPSERT (sin repetir
+                id_jugador)
+
+        Returns:
+            int: filas eliminadas (jugadores que ya no están)
+        """
+        ids = [f['id_jugador'] for f in filas]
+        borrar = db.delete(Alineacion).where(
+            Alineacion.id_partido == id_partido,
+            Alineacion.id_equipo == id_equipo
+        )
+        if ids:
+            borrar = borrar.where(Alineacion.id_jugador.not_in(ids))
+        eliminadas = db.session.execute(borrar.execution_options(synchronize_session=False)).rowcount
+
+        if not filas:
+            return eliminadas
+
+        filas = [
+            dict({c: f.get(c) for c in COLUMNAS_UPSERT}, id_partido=id_partido, id_equipo=id_equipo,
+                 id_jugador=f['id_jugador'])
+            for f in filas
+        ]
+
+        dialect = db.engine.dialect.name
+        if dialect == 'mysql':
+            from sqlalchemy.dialects.mysql import insert
+            stmt = insert(Alineacion)
+            stmt = stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in COLUMNAS_UPSERT})
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(Alineacion)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['id_partido', 'id_equipo', 'id_jugador'],
+                set_={c: stmt.excluded[c] for c in COLUMNAS_UPSERT}
+            )
+        else:
+            # Sin upsert: se borran también los que siguen y se insertan de nuevo
+            db.session.execute(
+                db.delete(Alineacion).where(
+                    Alineacion.id_partido == id_partido,
+                    Alineacion.id_equipo == id_equipo
+                ).execution_options(synchronize_session=False)
+            )
+            stmt = db.insert(Alineacion)
+
+        db.session.execute(stmt, filas)
+        return eliminadas
@@ -1,60 +1,164 @@
 import requests
 from flask import current_app
+from app.services.http_client import ClienteHTTP
+
+# Pool de conexiones al backend, compartido por todos los requests del proceso
+backend_http = ClienteHTTP('backend')
+
+
+def init_app(app):
+    config = app.config
+    backend_http.configurar(
+        config['BACKEND_API_URL'],
+        deadline=config.get('BACKEND_API_DEADLINE', 5.0),
+        connect_timeout=config.get('BACKEND_API_CONNECT_TIMEOUT', 2.0),
+        reintentos=config.get('BACKEND_API_REINTENTOS', 2),
+        backoff_base=config.get('BACKEND_API_BACKOFF_BASE', 0.1),
+        backoff_max=config.get('BACKEND_API_BACKOFF_MAX', 1.0),
+        fallos_para_abrir=config.get('BACKEND_API_FALLOS_CIRCUITO', 5),
+        espera_circuito=config.get('BACKEND_API_ESPERA_CIRCUITO', 30.0),
+        pool=config.get('BACKEND_API_POOL', 10)
+    )
+    app.extensions['backend_http'] = backend_http
+
 
 class BackendAPIClient:
-    """Cliente para comunicarse con la API principal"""
-    
+    """
+    Cliente para comunicarse con la API principal
+
+    Las lecturas de partidos, equipos y jugadores salen de la réplica local
+    (app/services/replica.py) cuando está lista; si no lo está, o no tiene
+    la fila (p. ej. un partido recién creado), se consulta al backend.
+    """
+
     def __init__(self):
         self.base_url = current_app.config['BACKEND_API_URL']
-        print(f"🔍 BackendAPIClient URL: {self.base_url}")  # Debug
-    
-    def get_partido(self, id_partido):
-        """Consulta un partido al backend principal"""
+        self.http = backend_http
+
+    def _get(self, path, endpoint, **kwargs):
+        """GET que devuelve el JSON de la respuesta, o None si no hubo un 200"""
         try:
-            url = f"{self.base_url}/partidos/{id_partido}"  # ← PLURAL
-            print(f"🔍 GET {url}")
-            response = requests.get(url, timeout=5)
-            
+            response = self.http.get(path, endpoint=endpoint, **kwargs)
             if response.status_code == 200:
-                return response.json().get('partido')
-            print(f"⚠️ Status: {response.status_code}")
+                return response.json()
             return None
-        except Exception as e:
-            print(f"❌ Error consultando partido: {e}")
+        except (requests.RequestException, ValueError) as e:
+            current_app.logger.warning('Backend %s: %s', endpoint, e)
             return None
-    
+
+    def get_partido(self, id_partido):
+        """Consulta un partido al backend principal"""
+        local = _replica()
+        partido = local.partido(id_partido) if local else None
+        if partido:
+            return partido
+        data = self._get(f'/partidos/{id_partido}', 'GET /partidos/<id>')
+        return data.get('partido') if data else None
+
     def get_equipo(self, id_equipo):
         """Consulta un equipo al backend principal"""
-        try:
-            response = requests.get(f"{self.base_url}/equipos/{id_equipo}", timeout=5)
-            if response.status_code == 200:
-                return response.json().get('equipo')
-            return None
-        except Exception as e:
-            print(f"❌ Error consultando equipo: {e}")
-            return None
-    
+        local = _replica()
+        equipo = local.equipo(id_equipo) if local else None
+        if equipo:
+            return equipo
+        data = self._get(f'/equipos/{id_equipo}', 'GET /equipos/<id>')
+        return data.get('equipo') if data else None
+
     def get_jugador(self, id_jugador):
         """Consulta un jugador al backend principal"""
-        try:
-            response = requests.get(f"{self.base_url}/jugadores/{id_jugador}", timeout=5)
-            if response.status_code == 200:
-                return response.json().get('jugador')
-            return None
-        except Exception as e:
-            print(f"❌ Error consultando jugador: {e}")
+        local = _replica()
+        jugador = local.jugador(id_jugador) if local else None
+        if jugador:
+            return jugador
+        data = self._get(f'/jugadores/{id_jugador}', 'GET /jugadores/<id>')
+        return data.get('jugador') if data else None
+
+    def get_partidos_lote(self, ids=None, id_campeonato=None, planteles=False):
+        """
+        Partidos con sus equipos en una llamada, por ids o por campeonato
+
+        Returns:
+            (partidos, planteles): planteles es {id_equipo: [jugador, ...]}
+            de los equipos involucrados (vacío si planteles=False), o None
+            si el backend no respondió
+        """
+        # La réplica solo responde por ids: una fila que le falte se nota y se
+        # va al backend, mientras que una lista por campeonato incompleta no
+        local = _replica() if id_campeonato is None else None
+        if local:
+            partidos = [local.partido(i) for i in dict.fromkeys(ids or [])]
+            if partidos and all(partidos):
+                por_equipo = {}
+                if planteles:
+                    for partido in partidos:
+                        for id_equipo in (partido['id_equipo_local'], partido['id_equipo_visitante']):
+                            if id_equipo not in por_equipo:
+                                por_equipo[id_equipo] = local.plantel(id_equipo)
+                return partidos, por_equipo
+
+        partidos, por_equipo = [], {}
+        params = {'planteles': 'true' if planteles else 'false'}
+        if id_campeonato is not None:
+            lotes = [None]
+            params['id_campeonato'] = id_campeonato
+        else:
+            lotes = _en_lotes(ids)
+        for lote in lotes:
+            if lote is not None:
+                params['ids'] = ','.join(str(i) for i in lote)
+            data = self._get('/partidos/lote', 'GET /partidos/lote', params=params, deadline=10.0)
+            if data is None:
+                return None
+            partidos.extend(data.get('partidos', []))
+            por_equipo.update({int(k): v for k, v in (data.get('planteles') or {}).items()})
+        return partidos, por_equipo
+
+    def get_partido_con_planteles(self, id_partido):
+        """(partido, planteles de sus dos equipos); (None, {}) si no existe; None si el backend no respondió"""
+        resultado = self.get_partidos_lote(ids=[id_partido], planteles=True)
+        if resultado is None:
             return None
-    
+        partidos, planteles = resultado
+        return (partidos[0] if partidos else None), planteles
+
+    def get_planteles(self, ids_equipo):
+        """{id_equipo: [jugador, ...]} de muchos equipos (None si el backend no respondió)"""
+        local = _replica()
+        if local:
+            return {id_equipo: local.plantel(id_equipo) for id_equipo in dict.fromkeys(ids_equipo or [])}
+        planteles = {}
+        for lote in _en_lotes(ids_equipo):
+            data = self._get(
+                '/jugadores/planteles', 'GET /jugadores/planteles',
+                params={'ids_equipo': ','.join(str(i) for i in lote)}
+            )
+            if data is None:
+                return None
+            planteles.update({int(k): v for k, v in (data.get('planteles') or {}).items()})
+        return planteles
+
     def validar_jugador_en_equipo(self, id_jugador, id_equipo):
         """Valida que el jugador pertenezca al equipo"""
         jugador = self.get_jugador(id_jugador)
         if jugador and jugador.get('id_equipo') == id_equipo:
             return True
         return False
-    
-    def validar_equipo_en_partido(self, id_equipo, id_partido):
+
+    def validar_equipo_en_partido(self, id_equipo, id_partido, partido=None):
         """Valida que el equipo participe en el partido"""
-        partido = self.get_partido(id_partido)
+        partido = partido or self.get_partido(id_partido)
         if partido:
             return id_equipo in [partido.get('id_equipo_local'), partido.get('id_equipo_visitante')]
         return False
+
+
+def _replica():
+    """La réplica local si se puede leer de ella, o None"""
+    from app.services.replica import replica
+    return replica if replica.lista() else None
+
+
+def _en_lotes(ids, tamanio=500):
+    """El backend acepta hasta 500 ids por consulta"""
+    ids = list(dict.fromkeys(ids or []))
+    return [ids[i:i + tamanio] for i in range(0, len(ids), tamanio)]
@@ -0,0 +1,268 @@
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class CircuitoAbierto(requests.ConnectionError):
+    """El servicio remoto falló seguido: se responde sin intentar la conexión"""
+
+
+class ClienteHTTP:
+    """
+    Cliente HTTP compartido por el proceso para hablar con otro servicio
+
+    ¿Por qué existe?
+    - Cada requests.get(...) abría una conexión TCP nueva (y la cerraba):
+      una alineación de 20 jugadores eran 40 handshakes contra el otro servicio
+    - Una sola requests.Session con un pool de conexiones keep-alive
+      (urllib3 es thread-safe; no se usan cookies)
+
+    Cada llamada:
+    - Tiene un plazo total (`deadline`) que incluye reintentos y esperas;
+      el timeout de cada intento es lo que queda del plazo
+    - Reintenta errores de conexión, timeouts y 502/503/504 con backoff
+      exponencial y jitter completo, hasta `reintentos` veces. Los POST solo
+      se reintentan si la conexión ni siquiera se estableció
+    - Pasa por un circuit breaker: tras `fallos_para_abrir` fallos seguidos
+      se corta durante `espera_circuito` segundos (CircuitoAbierto, que es
+      un requests.RequestException); luego se deja pasar una llamada de
+      prueba y, si sale bien, se vuelve a cerrar
+    - Registra latencia por endpoint (nombre lógico, p. ej. 'GET /partidos/<id>')
+
+    Los 4xx son respuestas válidas: no cuentan como fallo ni se reintentan.
+    """
+
+    ESTADOS_REINTENTABLES = (502, 503, 504)
+    METODOS_IDEMPOTENTES = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+    MUESTRAS_LATENCIA = 500
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.base_url = None
+        self.deadline = 5.0
+        self.connect_timeout = 2.0
+        self.reintentos = 2
+        self.backoff_base = 0.1
+        self.backoff_max = 1.0
+        self.fallos_para_abrir = 5
+        self.espera_circuito = 30.0
+        self._session = None
+        self._pool = 10
+        self._lock = threading.Lock()
+        # Circuit breaker
+        self._fallos_seguidos = 0
+        self._abierto_hasta = 0.0
+        self._prueba_en_curso = False
+        # Métricas por endpoint
+        self._metricas = {}
+
+    def configurar(self, base_url, deadline=5.0, connect_timeout=2.0, reintentos=2,
+                   backoff_base=0.1, backoff_max=1.0, fallos_para_abrir=5,
+                   espera_circuito=30.0, pool=10):
+        self.base_url = base_url.rstrip('/')
+        self.deadline = deadline
+        self.connect_timeout = connect_timeout
+        self.reintentos = reintentos
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.fallos_para_abrir = fallos_para_abrir
+        self.espera_circuito = espera_circuito
+        if pool != self._pool or self._session is None:
+            self._pool = pool
+            self.cerrar()
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    # Los reintentos los maneja request() (con plazo y jitter), no urllib3
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._pool, max_retries=0)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    def cerrar(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    # ============================================
+    # LLAMADAS
+    # ============================================
+
+    def get(self, path, endpoint=None, **kwargs):
+        return self.request('GET', path, endpoint=endpoint, **kwargs)
+
+    def post(self, path, endpoint=None, **kwargs):
+        return self.request('POST', path, endpoint=endpoint, **kwargs)
+
+    def request(self, metodo, path, endpoint=None, deadline=None, **kwargs):
+        """
+        Args:
+            path: relativo a base_url ('/partidos/3')
+            endpoint: nombre para las métricas (default: método y path)
+            deadline: segundos para toda la llamada, reintentos incluidos
+
+        Returns:
+            requests.Response (cualquier código de estado)
+
+        Raises:
+            requests.RequestException: sin respuesta dentro del plazo, o
+                CircuitoAbierto
+        """
+        endpoint = endpoint or f'{metodo} {path}'
+        limite = time.monotonic() + (deadline if deadline is not None else self.deadline)
+        idempotente = metodo.upper() in self.METODOS_IDEMPOTENTES
+        intento = 0
+
+        while True:
+            try:
+                self._permitir()
+            except CircuitoAbierto:
+                self._registrar(endpoint, None, error=True)
+                raise
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                self._registrar(endpoint, None, error=True)
+                raise requests.Timeout(f'{self.nombre}: plazo agotado para {endpoint}')
+
+            inicio = time.monotonic()
+            try:
+                response = self.session.request(
+                    metodo, f'{self.base_url}{path}',
+                    timeout=(min(self.connect_timeout, restante), restante),
+                    **kwargs
+                )
+            except requests.RequestException as e:
+                duracion = time.monotonic() - inicio
+                self._fallo()
+                reintentable = isinstance(e, requests.ConnectTimeout) or (
+                    idempotente and isinstance(e, (requests.ConnectionError, requests.Timeout))
+                )
+                if not reintentable or not self._esperar(intento, limite):
+                    self._registrar(endpoint, duracion, error=True, reintento=intento > 0)
+                    raise
+                self._registrar(endpoint, duracion, error=True, reintento=intento > 0, final=False)
+                intento += 1
+                continue
+
+            duracion = time.monotonic() - inicio
+            if response.status_code in self.ESTADOS_REINTENTABLES:
+                self._fallo()
+                if idempotente and self._esperar(intento, limite):
+                    response.close()
+                    self._registrar(endpoint, duracion, error=True, reintento=intento > 0, final=False)
+                    intento += 1
+                    continue
+                self._registrar(endpoint, duracion, error=True, reintento=intento > 0)
+                return response
+
+            self._exito()
+            self._registrar(endpoint, duracion, reintento=intento > 0)
+            return response
+
+    def _esperar(self, intento, limite):
+        """Duerme el backoff si queda plazo e intentos; False si no hay que reintentar"""
+        if intento >= self.reintentos:
+            return False
+        espera = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** intento)))
+        if time.monotonic() + espera >= limite:
+            return False
+        time.sleep(espera)
+        return True
+
+    # ============================================
+    # CIRCUIT BREAKER
+    # ============================================
+
+    def _permitir(self):
+        with self._lock:
+            if self._fallos_seguidos < self.fallos_para_abrir:
+                return
+            if time.monotonic() < self._abierto_hasta or self._prueba_en_curso:
+                raise CircuitoAbierto(f'{self.nombre} no disponible (circuito abierto)')
+            # Semiabierto: pasa una sola llamada de prueba
+            self._prueba_en_curso = True
+
+    def _exito(self):
+        with self._lock:
+            self._fallos_seguidos = 0
+            self._prueba_en_curso = False
+
+    def _fallo(self):
+        with self._lock:
+            self._fallos_seguidos += 1
+            self._prueba_en_curso = False
+            if self._fallos_seguidos >= self.fallos_para_abrir:
+                self._abierto_hasta = time.monotonic() + self.espera_circuito
+
+    def estado_circuito(self):
+        with self._lock:
+            if self._fallos_seguidos < self.fallos_para_abrir:
+                return 'cerrado'
+            return 'abierto' if time.monotonic() < self._abierto_hasta else 'semiabierto'
+
+    # ============================================
+    # MÉTRICAS
+    # ============================================
+
+    def _registrar(self, endpoint, duracion, error=False, reintento=False, final=True):
+        with self._lock:
+            m = self._metricas.get(endpoint)
+            if m is None:
+                m = self._metricas[endpoint] = {
+                    'llamadas': 0, 'errores': 0, 'reintentos': 0, 'intentos': 0,
+                    'sin_intento': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'muestras': deque(maxlen=self.MUESTRAS_LATENCIA)
+                }
+            if duracion is None:
+                # Cortada por el circuito o por el plazo antes de conectar
+                m['sin_intento'] += 1
+            else:
+                ms = duracion * 1000
+                m['intentos'] += 1
+                m['total_ms'] += ms
+                m['max_ms'] = max(m['max_ms'], ms)
+                m['muestras'].append(ms)
+            if reintento:
+                m['reintentos'] += 1
+            if final:
+                m['llamadas'] += 1
+                if error:
+                    m['errores'] += 1
+
+    def stats(self):
+        """Métricas de este proceso (cada worker lleva las suyas)"""
+        with self._lock:
+            copia = {k: dict(v, muestras=sorted(v['muestras'])) for k, v in self._metricas.items()}
+        endpoints = {}
+        for endpoint, m in sorted(copia.items()):
+            muestras = m.pop('muestras')
+            m['promedio_ms'] = round(m['total_ms'] / m['intentos'], 2) if m['intentos'] else 0.0
+            m['p50_ms'] = round(_percentil(muestras, 0.50), 2)
+            m['p95_ms'] = round(_percentil(muestras, 0.95), 2)
+            m['p99_ms'] = round(_percentil(muestras, 0.99), 2)
+            m['max_ms'] = round(m['max_ms'], 2)
+            del m['total_ms']
+            endpoints[endpoint] = m
+        return {
+            'servicio': self.nombre,
+            'base_url': self.base_url,
+            'circuito': self.estado_circuito(),
+            'fallos_seguidos': self._fallos_seguidos,
+            'endpoints': endpoints
+        }
+
+
+def _percentil(ordenadas, p):
+    if not ordenadas:
+        return 0.0
+    return ordenadas[min(len(ordenadas) - 1, int(p * len(ordenadas)))]
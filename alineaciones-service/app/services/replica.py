@@ -0,0 +1,380 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+from app.extensions import db
+from app.models.replica import ReplicaEquipo, ReplicaEstado, ReplicaJugador, ReplicaPartido
+from app.services.backend_api_client import backend_http
+
+# entidad del feed → (modelo, clave primaria)
+MODELOS = {
+    'jugadores': (ReplicaJugador, 'id_jugador'),
+    'equipos': (ReplicaEquipo, 'id_equipo'),
+    'partidos': (ReplicaPartido, 'id_partido'),
+}
+
+
+class ReplicaDesactualizada(Exception):
+    """El backend ya no conserva los cambios desde nuestro cursor (410)"""
+
+
+class Replica:
+    """
+    Copia local de solo lectura de jugadores, equipos y partidos del backend
+
+    ¿Por qué existe?
+    - Validar una alineación pedía el partido y los planteles al backend en
+      cada request: la latencia (y la disponibilidad) del backend era la de
+      este servicio
+    - Ahora las validaciones leen diccionarios en memoria; BackendAPIClient
+      solo llama al backend si la réplica no está lista o no tiene la fila
+
+    ¿Cómo se mantiene al día?
+    1. Las tablas replica_* guardan la copia y replica_estado.cursor el
+       último seq aplicado del feed del backend (/replica/cambios)
+    2. Un hilo por proceso pide cada REPLICA_SYNC_SECONDS los cambios desde
+       su cursor (releyendo REPLICA_RELEER seqs: en MySQL un seq menor puede
+       confirmarse después de uno mayor) y los aplica en memoria y en la BD.
+       Cada cambio trae el estado actual de la fila, así releer no rompe nada
+    3. Si el backend responde 410 (cursor ya purgado), o con
+       `flask replica resync`, se copia todo de nuevo (/replica/snapshot) y
+       sube replica_estado.generacion: los demás workers recargan de la BD
+    4. Al arrancar, cada worker carga la copia desde la BD (sin ir al backend)
+
+    La réplica se considera lista si está cargada y la última sincronización
+    exitosa fue hace menos de REPLICA_MAX_STALENESS segundos.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._habilitada = True
+        self._sync_seconds = 5
+        self._max_staleness = 60
+        self._releer = 100
+        self._lote = 1000
+        self._lock = threading.RLock()
+        self._worker_pid = None
+        # Copia en memoria
+        self._jugadores = {}
+        self._equipos = {}
+        self._partidos = {}
+        self._planteles = {}        # id_equipo → {id_jugador: jugador}
+        self._cargada = False
+        self._cursor = 0
+        self._generacion = None
+        # Métricas
+        self._ultima_sync = None    # time.time() de la última sincronización exitosa
+        self._ultima_backend = None
+        self._sincronizaciones = 0
+        self._resyncs = 0
+        self._errores = 0
+        self._ultimo_error = None
+
+    def init_app(self, app):
+        self._app = app
+        self._habilitada = app.config.get('REPLICA_ENABLED', True)
+        self._sync_seconds = app.config.get('REPLICA_SYNC_SECONDS', 5)
+        self._max_staleness = app.config.get('REPLICA_MAX_STALENESS', 60)
+        self._releer = app.config.get('REPLICA_RELEER', 100)
+        self._lote = app.config.get('REPLICA_LOTE', 1000)
+        app.extensions['replica'] = self
+
+    # ============================================
+    # LECTURA (sin consultas a la BD ni al backend)
+    # ============================================
+
+    def lista(self):
+        """True si se puede leer de la réplica en lugar de llamar al backend"""
+        if not self._habilitada or self._app is None:
+            return False
+        self._ensure_worker()
+        return self._cargada and self.staleness() <= self._max_staleness
+
+    def staleness(self):
+        """Segundos desde la última sincronización exitosa (inf si nunca)"""
+        if self._ultima_sync is None:
+            return float('inf')
+        return time.time() - self._ultima_sync
+
+    def jugador(self, id_jugador):
+        jugador = self._jugadores.get(id_jugador)
+        return dict(jugador) if jugador else None
+
+    def equipo(self, id_equipo):
+        equipo = self._equipos.get(id_equipo)
+        return dict(equipo) if equipo else None
+
+    def partido(self, id_partido):
+        """Partido con el nombre y logo de sus equipos (como /partidos/lote)"""
+        partido = self._partidos.get(id_partido)
+        return self._con_equipos(partido) if partido else None
+
+    def plantel(self, id_equipo):
+        """Jugadores del equipo ordenados por dorsal (como /jugadores/planteles)"""
+        with self._lock:
+            jugadores = list(self._planteles.get(id_equipo, {}).values())
+        jugadores.sort(key=lambda j: (j['dorsal'] is None, j['dorsal'] or 0))
+        return [dict(j) for j in jugadores]
+
+    def _con_equipos(self, partido):
+        datos = dict(partido)
+        local = self._equipos.get(partido['id_equipo_local']) or {}
+        visitante = self._equipos.get(partido['id_equipo_visitante']) or {}
+        datos['equipo_local'] = local.get('nombre')
+        datos['equipo_visitante'] = visitante.get('nombre')
+        datos['logo_local'] = local.get('logo_url')
+        datos['logo_visitante'] = visitante.get('logo_url')
+        return datos
+
+    def stats(self):
+        """Estado de la réplica en este proceso (cada worker lleva la suya)"""
+        staleness = self.staleness()
+        return {
+            'habilitada': self._habilitada,
+            'cargada': self._cargada,
+            'lista': self._cargada and staleness <= self._max_staleness,
+            'cursor': self._cursor,
+            'ultima_backend': self._ultima_backend,
+            'lag': max(0, self._ultima_backend - self._cursor) if self._ultima_backend is not None else None,
+            'staleness_segundos': round(staleness, 1) if staleness != float('inf') else None,
+            'max_staleness_segundos': self._max_staleness,
+            'generacion': self._generacion,
+            'jugadores': len(self._jugadores),
+            'equipos': len(self._equipos),
+            'partidos': len(self._partidos),
+            'sincronizaciones': self._sincronizaciones,
+            'resyncs': self._resyncs,
+            'errores': self._errores,
+            'ultimo_error': self._ultimo_error,
+            'pid': os.getpid()
+        }
+
+    # ============================================
+    # SINCRONIZACIÓN (dentro de un app_context)
+    # ============================================
+
+    def sincronizar(self):
+        """
+        Aplica los cambios del backend desde el cursor hasta quedar al día
+
+        Returns:
+            int: filas recibidas (upserts + eliminados)
+        """
+        estado = db.session.get(ReplicaEstado, 1)
+        if estado is None:
+            return self.resync()
+        if not self._cargada or estado.generacion != self._generacion:
+            self._cargar_de_bd(estado)
+        db.session.rollback()
+
+        recibidas = 0
+        while True:
+            try:
+                data = self._pedir('/replica/cambios', 'GET /replica/cambios', {
+                    'desde': self._cursor, 'releer': self._releer, 'limite': self._lote
+                })
+            except ReplicaDesactualizada:
+                return self.resync()
+
+            cambios = data.get('cambios') or {}
+            recibidas += sum(len(c['upsert']) + len(c['eliminados']) for c in cambios.values())
+            with self._lock:
+                self._aplicar(cambios)
+                self._cursor = max(self._cursor, data['hasta'])
+                self._ultima_backend = data['ultima']
+            self._guardar(cambios, data['hasta'])
+            if not data.get('hay_mas'):
+                break
+
+        self._sincronizaciones += 1
+        self._ultima_sync = time.time()
+        return recibidas
+
+    def resync(self):
+        """
+        Copia completa desde el backend: reemplaza las tablas replica_* y la
+        memoria, y sube la generación
+
+        Returns:
+            int: filas copiadas
+        """
+        # El seq se toma antes de copiar: lo que cambie durante la copia se
+        # vuelve a aplicar en la próxima sincronización
+        ultima = self._pedir('/replica/estado', 'GET /replica/estado')['ultima']
+
+        tablas = {}
+        for entidad in MODELOS:
+            filas, despues_de = [], 0
+            while despues_de is not None:
+                pagina = self._pedir(f'/replica/snapshot/{entidad}', 'GET /replica/snapshot/<entidad>', {
+                    'despues_de': despues_de, 'limite': self._lote
+                })
+                filas.extend(pagina['filas'])
+                despues_de = pagina['siguiente']
+            tablas[entidad] = filas
+
+        for entidad, (modelo, _) in MODELOS.items():
+            db.session.execute(db.delete(modelo))
+            if tablas[entidad]:
+                db.session.execute(db.insert(modelo), [_fila_bd(entidad, f) for f in tablas[entidad]])
+
+        ahora = datetime.utcnow()
+        estado = db.session.get(ReplicaEstado, 1)
+        if estado is None:
+            estado = ReplicaEstado(id=1, cursor=0, generacion=0)
+            db.session.add(estado)
+        estado.cursor = ultima
+        estado.generacion = (estado.generacion or 0) + 1
+        estado.ultima_sincronizacion = ahora
+        estado.ultimo_resync = ahora
+        db.session.commit()
+
+        with self._lock:
+            self._cargar(tablas)
+            self._cursor = ultima
+            self._ultima_backend = ultima
+            self._generacion = estado.generacion
+        self._resyncs += 1
+        self._sincronizaciones += 1
+        self._ultima_sync = time.time()
+        return sum(len(filas) for filas in tablas.values())
+
+    def _pedir(self, path, endpoint, params=None):
+        response = backend_http.get(path, endpoint=endpoint, params=params, deadline=30.0)
+        if response.status_code == 410:
+            raise ReplicaDesactualizada(response.json().get('error'))
+        if response.status_code != 200:
+            raise requests.HTTPError(f'{endpoint}: {response.status_code}', response=response)
+        return response.json()
+
+    def _cargar_de_bd(self, estado):
+        """Reconstruye la memoria desde las tablas replica_* (arranque o nueva generación)"""
+        tablas = {}
+        for entidad, (modelo, _) in MODELOS.items():
+            columnas = [c.name for c in modelo.__table__.columns]
+            tablas[entidad] = [
+                _fila_memoria(dict(zip(columnas, fila)))
+                for fila in db.session.query(*[getattr(modelo, c) for c in columnas])
+            ]
+        with self._lock:
+            self._cargar(tablas)
+            self._cursor = estado.cursor
+            self._generacion = estado.generacion
+
+    def _cargar(self, tablas):
+        self._jugadores, self._equipos, self._partidos, self._planteles = {}, {}, {}, {}
+        self._aplicar({entidad: {'upsert': filas, 'eliminados': []} for entidad, filas in tablas.items()})
+        self._cargada = True
+
+    def _aplicar(self, cambios):
+        """Aplica upserts y borrados a la memoria (con self._lock tomado)"""
+        equipos = cambios.get('equipos') or {}
+        for fila in equipos.get('upsert', []):
+            self._equipos[fila['id_equipo']] = dict(fila)
+        for id_equipo in equipos.get('eliminados', []):
+            self._equipos.pop(id_equipo, None)
+            # Los jugadores se borran en cascada con su equipo
+            for id_jugador in list(self._planteles.pop(id_equipo, {})):
+                self._jugadores.pop(id_jugador, None)
+
+        jugadores = cambios.get('jugadores') or {}
+        for fila in jugadores.get('upsert', []):
+            jugador = dict(fila, nombre_completo=f"{fila['nombre']} {fila['apellido']}")
+            anterior = self._jugadores.get(jugador['id_jugador'])
+            if anterior and anterior['id_equipo'] != jugador['id_equipo']:
+                self._planteles.get(anterior['id_equipo'], {}).pop(jugador['id_jugador'], None)
+            self._jugadores[jugador['id_jugador']] = jugador
+            self._planteles.setdefault(jugador['id_equipo'], {})[jugador['id_jugador']] = jugador
+        for id_jugador in jugadores.get('eliminados', []):
+            anterior = self._jugadores.pop(id_jugador, None)
+            if anterior:
+                self._planteles.get(anterior['id_equipo'], {}).pop(id_jugador, None)
+
+        partidos = cambios.get('partidos') or {}
+        for fila in partidos.get('upsert', []):
+            self._partidos[fila['id_partido']] = dict(fila)
+        for id_partido in partidos.get('eliminados', []):
+            self._partidos.pop(id_partido, None)
+
+    def _guardar(self, cambios, hasta):
+        """
+        Persiste los cambios si el cursor de la BD quedó atrás. El UPDATE
+        condicional sobre replica_estado bloquea la fila: dos workers no
+        escriben la misma tanda ni uno más viejo pisa a otro más nuevo.
+        """
+        try:
+            avanzo = db.session.execute(
+                db.update(ReplicaEstado)
+                .where(
+                    ReplicaEstado.id == 1,
+                    ReplicaEstado.cursor < hasta,
+                    ReplicaEstado.generacion == self._generacion
+                )
+                .values(cursor=hasta, ultima_sincronizacion=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if avanzo:
+                for entidad, c in cambios.items():
+                    if entidad not in MODELOS:
+                        continue
+                    modelo, pk = MODELOS[entidad]
+                    ids = [f[pk] for f in c['upsert']] + list(c['eliminados'])
+                    if ids:
+                        db.session.execute(
+                            db.delete(modelo).where(getattr(modelo, pk).in_(ids))
+                            .execution_options(synchronize_session=False)
+                        )
+                    if c['upsert']:
+                        db.session.execute(db.insert(modelo), [_fila_bd(entidad, f) for f in c['upsert']])
+                    if entidad == 'equipos' and c['eliminados']:
+                        db.session.execute(
+                            db.delete(ReplicaJugador).where(ReplicaJugador.id_equipo.in_(c['eliminados']))
+                            .execution_options(synchronize_session=False)
+                        )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _ensure_worker(self):
+        """Arranca el hilo de sincronización una vez por proceso (también tras un fork)"""
+        if self._worker_pid == os.getpid() or not self._sync_seconds:
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._worker_pid = os.getpid()
+        threading.Thread(target=self._loop, name='replica-sync', daemon=True).start()
+
+    def _loop(self):
+        while True:
+            with self._app.app_context():
+                try:
+                    self.sincronizar()
+                except Exception as e:
+                    self._errores += 1
+                    self._ultimo_error = str(e)
+                    self._app.logger.warning(f'No se pudo sincronizar la réplica: {e}')
+                finally:
+                    db.session.remove()
+            time.sleep(self._sync_seconds)
+
+
+def _fila_bd(entidad, fila):
+    """Fila del feed (fechas en ISO) → valores para las tablas replica_*"""
+    if entidad == 'partidos' and fila.get('fecha_partido'):
+        return dict(fila, fecha_partido=datetime.fromisoformat(fila['fecha_partido']))
+    return fila
+
+
+def _fila_memoria(fila):
+    """Fila de las tablas replica_* → mismo formato que el feed"""
+    if isinstance(fila.get('fecha_partido'), datetime):
+        fila['fecha_partido'] = fila['fecha_partido'].isoformat()
+    return fila
+
+
+replica = Replica()
@@ -1,13 +1,32 @@
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, jsonify
 from flask_restx import Api
 from app.config import config_by_name
 from app.extensions import db, migrate, jwt, cors, mail
 from app.utils.error_handlers import register_error_handlers
+from app.cli import register_commands
+from app.cache import response_cache
+from app.security.revocation_index import revocation_index
+from app.security.refresh_cache import refresh_cache
+from app.security.rate_limit_engine import rate_limit_engine
+from app.security.audit_writer import audit_writer
+from app.security.login_guard import login_guard
+from app.security.password_hasher import password_hasher
+from app.security.email_worker import email_worker
+from app.middlewares.rate_limit_middleware import register_rate_limit_headers
+from app.utils.static_files import static_files
+from app.services.imagen_worker import imagen_worker
+from app.services.alineaciones_client import alineaciones_client
+from app.services.fan_out import fan_out
+from app.services.almacen_service import register_referencias
+from app.services.replica_service import register_cambios
+from app.utils.subidas import RequestConSubidas
 import os
 from datetime import timedelta
 
 def create_app(config_name='development'):
     app = Flask(__name__)
+    # Los archivos de multipart se hashean y escriben a disco mientras llegan
+    app.request_class = RequestConSubidas
 
     app.config['PROPAGATE_EXCEPTIONS'] = True
     import logging
@@ -32,39 +51,36 @@ def create_app(config_name='development'):
     app.config['SECURITY_LOG_RETENTION_DAYS'] = 90
     app.config['SEND_LOCKOUT_EMAIL'] = True
 
-    # ============================================
-    # RUTA PARA SERVIR ARCHIVOS SUBIDOS
-    # ============================================
-    @app.route('/uploads/<path:filename>')
-    def uploaded_file(filename):
-        """Servir archivos subidos (logos, documentos, fotos)"""
-        # Construir la ruta absoluta al directorio uploads
-        uploads_base = os.path.join(os.path.dirname(app.root_path), 'uploads')
-        # El filename puede incluir subdirectorios (ej: logos/archivo.png)
-        file_path = os.path.join(uploads_base, filename)
-        
-        if not os.path.exists(file_path):
-            from flask import abort
-            app.logger.error(f"Archivo no encontrado: {file_path}")
-            abort(404)
-        
-        # Para send_from_directory, necesitamos el directorio y el nombre del archivo
-        directory = os.path.dirname(file_path)
-        file_name = os.path.basename(file_path)
-        
-        return send_from_directory(directory, file_name)
-    
     # ============================================
     # CREAR DIRECTORIOS DE UPLOADS
     # ============================================
     uploads_base = os.path.join(os.path.dirname(app.root_path), 'uploads')
+    app.config['UPLOADS_BASE'] = uploads_base
     os.makedirs(os.path.join(uploads_base, 'documentos_jugadores'), exist_ok=True)
     os.makedirs(os.path.join(uploads_base, 'fotos_jugadores'), exist_ok=True)
     os.makedirs(os.path.join(uploads_base, 'logos'), exist_ok=True)
+    os.makedirs(os.path.join(uploads_base, 'derivados'), exist_ok=True)
+    os.makedirs(os.path.join(uploads_base, 'blobs', '.tmp'), exist_ok=True)
+    os.makedirs(os.path.join(uploads_base, 'blobs', '.reanudables'), exist_ok=True)
+    
+    # ============================================
+    # RUTA PARA SERVIR ARCHIVOS SUBIDOS (ETag, cache y Range: ver StaticFileServer)
+    # ============================================
+    static_files.init_app(app, uploads_base)
+    imagen_worker.init_app(app)
     
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
+    response_cache.init_app(app)
+    rate_limit_engine.init_app(app)
+    audit_writer.init_app(app)
+    password_hasher.init_app(app)
+    refresh_cache.init_app(app)
+    alineaciones_client.init_app(app)
+    fan_out.init_app(app)
+    register_referencias(db.session)
+    register_cambios(db.session)
 
     cors.init_app(app, resources={
         r"/*": {
@@ -83,14 +99,16 @@ def create_app(config_name='development'):
     app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD')
     app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_DEFAULT_SENDER')
     mail.init_app(app)
+    email_worker.init_app(app)
     
     register_error_handlers(app)
+    register_commands(app)
+    register_rate_limit_headers(app)
 
     @jwt.token_in_blocklist_loader
     def check_if_token_revoked(jwt_header, jwt_payload):
-        from app.security.token_manager import TokenManager
         jti = jwt_payload['jti']
-        return TokenManager.is_token_revoked(jti)
+        return revocation_index.is_revoked(jti)
     
     @jwt.expired_token_loader
     def expired_token_callback(jwt_header, jwt_payload):
@@ -142,8 +160,20 @@ def create_app(config_name='development'):
         from app.models.login_attempt import LoginAttempt
         from app.models.account_lockout import AccountLockout
         from app.models.security_log import SecurityLog
+        from app.models.tabla_posicion import TablaPosicion
+        from app.models.tabla_posicion_jornada import TablaPosicionJornada
+        from app.models.llave import Llave
+        from app.models.estadistica_jugador import EstadisticaJugador
+        from app.models.email_outbox import EmailOutbox
+        from app.models.archivo_blob import ArchivoBlob
+        from app.models.subida_reanudable import SubidaReanudable
+        from app.models.cambio_replica import CambioReplica
+        # EventoPartido vive en su módulo de rutas; se importa para que create_all lo incluya
+        from app.routes.eventos_routes import EventoPartido
         
         db.create_all()
+        revocation_index.init_app(app)
+        login_guard.init_app(app)
     
     # Importar namespaces
     from app.routes.auth_routes import auth_ns
@@ -161,6 +191,7 @@ def create_app(config_name='development'):
     from app.routes.superadmin_routes import superadmin_ns
     from app.routes.lider_routes import lider_ns
     from app.routes.upload_routes import upload_ns
+    from app.routes.replica_routes import replica_ns
     from app.routes.alineaciones_proxy_routes import alineaciones_proxy_bp
     from app.routes.eventos_routes import eventos_bp
 
@@ -180,6 +211,7 @@ def create_app(config_name='development'):
     api.add_namespace(superadmin_ns, path='/superadmin')
     api.add_namespace(lider_ns, path='/lider')
     api.add_namespace(upload_ns, path='/upload')
+    api.add_namespace(replica_ns, path='/replica')
     app.register_blueprint(alineaciones_proxy_bp)
     app.register_blueprint(eventos_bp)
 
@@ -191,4 +223,12 @@ def create_app(config_name='development'):
             'version': '1.0.0'
         }), 200
     
+    @app.route('/health/cache')
+    def cache_stats():
+        return jsonify(response_cache.stats()), 200
+    
+    @app.route('/health/alineaciones')
+    def alineaciones_stats():
+        return jsonify(alineaciones_client.stats()), 200
+    
     return app
\ No newline at end of file
@@ -0,0 +1,6 @@
+from app.cache.response_cache import ResponseCache
+
+# Instancia única; se configura en create_app con response_cache.init_app(app)
+response_cache = ResponseCache()
+
+__all__ = ['ResponseCache', 'response_cache']
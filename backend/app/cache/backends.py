@@ -0,0 +1,186 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryBackend:
+    """
+    Almacén en memoria del proceso (TTL + LRU)
+
+    ¿Cuándo usarlo?
+    - Un solo worker (desarrollo, flask run, gunicorn -w 1)
+    - Con varios workers cada uno tiene su propia copia y la invalidación
+      solo afecta al proceso que hizo la escritura → usar SQLiteBackend
+    """
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # clave → (expira_en, valor, tags)
+        self._tags = {}                 # tag → {claves}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl, tags=()):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + ttl, value, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate_tags(self, tags):
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.pop(tag, ())):
+                    if key in self._entries:
+                        self._remove(key)
+                        removed += 1
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def size(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class SQLiteBackend:
+    """
+    Almacén compartido entre workers en un archivo SQLite (TTL + LRU)
+
+    ¿Por qué SQLite?
+    - Todos los workers de gunicorn en la misma máquina ven las mismas
+      entradas, así que invalidar un tag desde un worker vale para todos
+    - No agrega dependencias ni servicios externos
+    - En modo WAL las lecturas no bloquean a las escrituras
+
+    Cada hilo usa su propia conexión.
+    """
+
+    def __init__(self, path, max_entries=1000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        conn = self._conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache_entries (last_access);
+            CREATE TABLE IF NOT EXISTS cache_tags (
+                tag TEXT NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (tag, key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_cache_tags_key ON cache_tags (key);
+        """)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            'SELECT value, expires_at FROM cache_entries WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] <= now:
+            self._delete_keys(conn, [key])
+            return None
+        conn.execute('UPDATE cache_entries SET last_access = ? WHERE key = ?', (now, key))
+        return row[0]
+
+    def set(self, key, value, ttl, tags=()):
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('DELETE FROM cache_tags WHERE key = ?', (key,))
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_entries (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)',
+                (key, value, now + ttl, now)
+            )
+            conn.executemany(
+                'INSERT OR IGNORE INTO cache_tags (tag, key) VALUES (?, ?)',
+                [(tag, key) for tag in tags]
+            )
+
+            total = conn.execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+            if total > self.max_entries:
+                # Primero las vencidas, luego las menos usadas recientemente
+                sobrantes = [r[0] for r in conn.execute(
+                    'SELECT key FROM cache_entries ORDER BY expires_at > ?, last_access LIMIT ?',
+                    (now, total - self.max_entries)
+                ).fetchall()]
+                self._delete_keys(conn, sobrantes)
+
+    def invalidate_tags(self, tags):
+        tags = list(tags)
+        if not tags:
+            return 0
+        conn = self._conn()
+        placeholders = ','.join('?' * len(tags))
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            keys = [r[0] for r in conn.execute(
+                f'SELECT DISTINCT key FROM cache_tags WHERE tag IN ({placeholders})', tags
+            ).fetchall()]
+            self._delete_keys(conn, keys)
+        return len(keys)
+
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute('DELETE FROM cache_entries')
+            conn.execute('DELETE FROM cache_tags')
+
+    def size(self):
+        return self._conn().execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+
+    @staticmethod
+    def _delete_keys(conn, keys):
+        for i in range(0, len(keys), 500):
+            lote = keys[i:i + 500]
+            placeholders = ','.join('?' * len(lote))
+            conn.execute(f'DELETE FROM cache_entries WHERE key IN ({placeholders})', lote)
+            conn.execute(f'DELETE FROM cache_tags WHERE key IN ({placeholders})', lote)
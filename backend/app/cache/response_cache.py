@@ -0,0 +1,247 @@
+import json
+import os
+import threading
+from functools import wraps
+from flask import request
+from flask.wrappers import Response
+from sqlalchemy import event, select
+from sqlalchemy.orm import object_session
+from app.cache.backends import MemoryBackend, SQLiteBackend
+
+
+class ResponseCache:
+    """
+    Cache de lectura para endpoints públicos (read-through)
+
+    ¿Cómo funciona?
+    1. El decorador @response_cache.cached(...) arma una clave con la ruta
+       y los parámetros de la petición
+    2. Si la clave está en cache → se devuelve sin tocar MySQL (HIT)
+    3. Si no → se ejecuta el endpoint y se guarda la respuesta serializada
+       junto con sus tags (MISS)
+    4. Cuando se confirma (commit) una transacción que modifica partidos,
+       goles, tarjetas, eventos o campeonatos, se invalidan los tags afectados
+
+    Tags usados:
+    - 'campeonatos'            → listados (públicos, búsqueda por código)
+    - 'campeonato:<id>'        → todo lo que depende de un campeonato
+    - 'partido:<id>'           → detalle de un partido
+    - 'estadisticas'           → estadísticas globales (sin filtro de campeonato)
+
+    Backends (CACHE_BACKEND):
+    - 'memory' → en el proceso, para un solo worker
+    - 'sqlite' → archivo compartido por todos los workers de la máquina
+    - 'none'   → desactivado
+    """
+
+    def __init__(self):
+        self.backend = None
+        self.default_ttl = 60
+        self._stats = {'hits': 0, 'misses': 0, 'stores': 0, 'invalidations': 0}
+        self._stats_lock = threading.Lock()
+        self._listeners_registered = False
+
+    def init_app(self, app):
+        tipo = app.config.get('CACHE_BACKEND', 'memory')
+        max_entries = app.config.get('CACHE_MAX_ENTRIES', 1000)
+        self.default_ttl = app.config.get('CACHE_DEFAULT_TTL', 60)
+
+        if tipo == 'sqlite':
+            self.backend = SQLiteBackend(app.config['CACHE_SQLITE_PATH'], max_entries=max_entries)
+        elif tipo == 'memory':
+            self.backend = MemoryBackend(max_entries=max_entries)
+        else:
+            self.backend = None
+
+        if not self._listeners_registered:
+            from app.extensions import db
+            register_invalidation(self, db.session)
+            self._listeners_registered = True
+
+        app.extensions['response_cache'] = self
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    # ============================================
+    # LECTURA
+    # ============================================
+
+    def cached(self, tags=None, ttl=None):
+        """
+        Decorador para métodos GET de un Resource (o vistas de Blueprint)
+
+        Args:
+            tags: función que recibe los argumentos de la ruta y devuelve la
+                  lista de tags; ejemplo: lambda id_campeonato: [f'campeonato:{id_campeonato}']
+            ttl: segundos de vida (default CACHE_DEFAULT_TTL)
+
+        Solo se guardan respuestas 200 que se puedan serializar a JSON;
+        las demás pasan tal cual.
+        """
+        def decorator(f):
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or request.method != 'GET':
+                    return f(*args, **kwargs)
+
+                key = self._make_key()
+                raw = self.backend.get(key)
+                if raw is not None:
+                    self._count('hits')
+                    payload = json.loads(raw)
+                    return payload['data'], payload['code'], {**payload['headers'], 'X-Cache': 'HIT'}
+
+                self._count('misses')
+                result = f(*args, **kwargs)
+
+                data, code, headers = self._unpack(result)
+                if isinstance(data, Response) or code != 200:
+                    return result
+
+                try:
+                    raw = json.dumps({'data': data, 'code': code, 'headers': headers})
+                except (TypeError, ValueError):
+                    return result
+
+                entry_tags = tags(**kwargs) if tags else []
+                self.backend.set(key, raw, ttl or self.default_ttl, entry_tags)
+                self._count('stores')
+
+                return data, code, {**headers, 'X-Cache': 'MISS'}
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def _make_key():
+        args = sorted(request.args.items(multi=True))
+        query = '&'.join(f'{k}={v}' for k, v in args)
+        return f'{request.path}?{query}'
+
+    @staticmethod
+    def _unpack(result):
+        if isinstance(result, tuple):
+            data = result[0]
+            code = result[1] if len(result) > 1 else 200
+            headers = dict(result[2]) if len(result) > 2 and result[2] else {}
+            return data, code, headers
+        return result, 200, {}
+
+    # ============================================
+    # INVALIDACIÓN
+    # ============================================
+
+    def invalidate(self, *tags):
+        """Elimina todas las entradas marcadas con alguno de los tags"""
+        if not self.enabled or not tags:
+            return 0
+        removed = self.backend.invalidate_tags(set(tags))
+        self._count('invalidations')
+        return removed
+
+    def clear(self):
+        if self.enabled:
+            self.backend.clear()
+
+    # ============================================
+    # MÉTRICAS
+    # ============================================
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        """Contadores de este proceso (cada worker lleva los suyos)"""
+        with self._stats_lock:
+            data = dict(self._stats)
+        total = data['hits'] + data['misses']
+        data['hit_ratio'] = round(data['hits'] / total, 4) if total else 0.0
+        data['backend'] = type(self.backend).__name__ if self.backend else None
+        data['entries'] = self.backend.size() if self.backend else 0
+        data['pid'] = os.getpid()
+        return data
+
+
+# ============================================
+# INVALIDACIÓN AUTOMÁTICA POR EVENTOS DE SESIÓN
+# ============================================
+
+def _tags_de_partido(id_partido, id_campeonato):
+    tags = {'estadisticas', 'campeonatos', f'partido:{id_partido}'}
+    if id_campeonato:
+        tags.add(f'campeonato:{id_campeonato}')
+    return tags
+
+
+def tags_para_instancia(obj):
+    """
+    Tags que invalida un objeto modificado en la sesión
+
+    Se resuelven por nombre de tabla para no importar los modelos aquí.
+    """
+    tabla = getattr(obj, '__tablename__', None)
+
+    if tabla == 'campeonatos':
+        return {'campeonatos', f'campeonato:{obj.id_campeonato}'}
+    if tabla == 'campeonato_equipos':
+        return {'campeonatos', f'campeonato:{obj.id_campeonato}'}
+    if tabla in ('llaves', 'estadisticas_jugador'):
+        return {f'campeonato:{obj.id_campeonato}'}
+    if tabla == 'partidos':
+        return _tags_de_partido(obj.id_partido, obj.id_campeonato)
+    if tabla in ('goles', 'tarjetas', 'eventos_partido'):
+        partido = getattr(obj, 'partido', None)
+        return _tags_de_partido(obj.id_partido, partido.id_campeonato if partido else None)
+    if tabla == 'equipos':
+        return {'estadisticas'} | _tags_de_equipo(obj)
+    if tabla == 'jugadores':
+        return {'estadisticas'}
+    return set()
+
+
+def _tags_de_equipo(obj):
+    """
+    campeonato:<id> de cada campeonato donde está inscrito el equipo
+
+    Se consulta la tabla campeonato_equipos por su metadata (sin importar el
+    modelo) y sin autoflush, porque esto corre dentro de before_flush.
+    """
+    sess = object_session(obj)
+    if sess is None or obj.id_equipo is None:
+        return set()
+    inscripciones = obj.metadata.tables['campeonato_equipos']
+    with sess.no_autoflush:
+        ids = sess.execute(
+            select(inscripciones.c.id_campeonato).where(inscripciones.c.id_equipo == obj.id_equipo)
+        ).scalars()
+        return {f'campeonato:{id_campeonato}' for id_campeonato in ids}
+
+
+def register_invalidation(cache, session):
+    """
+    Conecta la cache a los eventos de la sesión de SQLAlchemy
+
+    - before_flush: junta los tags de los objetos nuevos, modificados o borrados
+    - after_commit: invalida esos tags (solo si la transacción se confirmó)
+    - after_rollback: descarta los tags pendientes
+    """
+
+    @event.listens_for(session, 'before_flush')
+    def _recolectar(sess, flush_context, instances):
+        if not cache.enabled:
+            return
+        pendientes = sess.info.setdefault('cache_tags', set())
+        for obj in list(sess.new) + list(sess.dirty) + list(sess.deleted):
+            pendientes |= tags_para_instancia(obj)
+
+    @event.listens_for(session, 'after_commit')
+    def _invalidar(sess):
+        tags = sess.info.pop('cache_tags', None)
+        if tags:
+            cache.invalidate(*tags)
+
+    @event.listens_for(session, 'after_rollback')
+    def _descartar(sess):
+        sess.info.pop('cache_tags', None)
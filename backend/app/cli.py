@@ -0,0 +1,220 @@
+import click
+from flask.cli import AppGroup
+from app.extensions import db
+
+# ============================================
+# COMANDOS DE MANTENIMIENTO (flask <grupo> <comando>)
+# ============================================
+
+tabla_cli = AppGroup('tabla-posiciones', help='Mantenimiento de la tabla de posiciones persistida')
+
+
+@tabla_cli.command('reconstruir')
+@click.option('--campeonato', 'id_campeonato', type=int, default=None,
+              help='ID del campeonato (por defecto: todos)')
+def reconstruir_tabla(id_campeonato):
+    """Recalcula la tabla de posiciones desde los partidos finalizados"""
+    from app.models.campeonato import Campeonato
+    from app.services.tabla_posiciones_service import TablaPosicionesService
+
+    if id_campeonato:
+        ids = [id_campeonato]
+    else:
+        ids = [c.id_campeonato for c in Campeonato.query.with_entities(Campeonato.id_campeonato).all()]
+
+    for id_camp in ids:
+        filas = TablaPosicionesService.reconstruir(id_camp)
+        db.session.commit()
+        click.echo(f'Campeonato {id_camp}: {filas} equipos recalculados')
+
+
+estadisticas_cli = AppGroup('estadisticas', help='Mantenimiento de goleadores y asistencias por campeonato')
+
+
+@estadisticas_cli.command('reconstruir')
+@click.option('--campeonato', 'id_campeonato', type=int, default=None,
+              help='ID del campeonato (por defecto: todos)')
+def reconstruir_estadisticas(id_campeonato):
+    """Recalcula goles, asistencias y partidos por jugador desde goles y eventos"""
+    from app.models.campeonato import Campeonato
+    from app.services.estadisticas_jugador_service import EstadisticasJugadorService
+
+    if id_campeonato:
+        ids = [id_campeonato]
+    else:
+        ids = [c.id_campeonato for c in Campeonato.query.with_entities(Campeonato.id_campeonato).all()]
+
+    for id_camp in ids:
+        filas = EstadisticasJugadorService.reconstruir(id_camp)
+        db.session.commit()
+        click.echo(f'Campeonato {id_camp}: {filas} jugadores recalculados')
+
+
+tokens_cli = AppGroup('tokens', help='Mantenimiento de la blacklist y de los refresh tokens')
+
+
+@tokens_cli.command('purgar')
+@click.option('--lote', 'batch_size', type=int, default=5000, show_default=True,
+              help='Filas eliminadas por DELETE')
+def purgar_tokens(batch_size):
+    """Elimina los tokens revocados y los refresh tokens que ya expiraron"""
+    from app.security.token_manager import TokenManager
+
+    eliminados = TokenManager.purge_expired_blacklist(batch_size=batch_size)
+    click.echo(f'{eliminados} tokens expirados eliminados de la blacklist')
+
+    eliminados = TokenManager.purge_expired_refresh_tokens(batch_size=batch_size)
+    click.echo(f'{eliminados} refresh tokens expirados eliminados')
+
+
+emails_cli = AppGroup('emails', help='Outbox de emails transaccionales')
+
+
+@emails_cli.command('enviar')
+def enviar_emails():
+    """Envía ahora los emails pendientes (sin esperar al hilo de envío)"""
+    from app.security.email_worker import email_worker
+
+    total = 0
+    while True:
+        tomados = email_worker.procesar_lote()
+        if not tomados:
+            break
+        total += tomados
+    click.echo(f'{total} emails procesados: {email_worker.stats()}')
+
+
+@emails_cli.command('purgar')
+@click.option('--dias', type=int, default=None,
+              help='Antigüedad mínima (por defecto: EMAIL_OUTBOX_RETENTION_DAYS)')
+def purgar_emails(dias):
+    """Elimina de la outbox los emails enviados o fallidos antiguos"""
+    from datetime import datetime, timedelta
+    from flask import current_app
+    from app.models.email_outbox import EmailOutbox
+
+    dias = dias or current_app.config.get('EMAIL_OUTBOX_RETENTION_DAYS', 30)
+    limite = datetime.utcnow() - timedelta(days=dias)
+    eliminados = db.session.execute(
+        db.delete(EmailOutbox).where(
+            EmailOutbox.estado.in_(['enviado', 'fallido']),
+            EmailOutbox.created_at < limite
+        )
+    ).rowcount
+    db.session.commit()
+    click.echo(f'{eliminados} emails eliminados de la outbox')
+
+
+archivos_cli = AppGroup('archivos', help='Almacén de archivos subidos (logos, fotos y documentos)')
+
+
+@archivos_cli.command('importar')
+def importar_archivos():
+    """Pasa al almacén por contenido los archivos subidos antes (uuid, jugador_<id>_<doc>)"""
+    import os
+    from app.services.almacen_service import AlmacenService, _columnas
+
+    base = AlmacenService.base()
+    importados, faltantes = 0, 0
+    for modelo, atributos in _columnas():
+        for atributo in atributos:
+            columna = getattr(modelo, atributo)
+            pendientes = modelo.query.filter(
+                columna.like('%/uploads/%'),
+                ~columna.like('%/uploads/blobs/%')
+            ).all()
+            for obj in pendientes:
+                prefijo, ruta = getattr(obj, atributo).split('/uploads/', 1)
+                origen = os.path.join(base, ruta)
+                if not os.path.isfile(origen):
+                    faltantes += 1
+                    continue
+                # El archivo viejo queda: puede seguir cacheado por algún cliente
+                setattr(obj, atributo, f'{prefijo}/uploads/{AlmacenService.importar(origen)}')
+                importados += 1
+            db.session.commit()
+    click.echo(f'{importados} archivos importados al almacén, {faltantes} no encontrados en disco')
+
+
+@archivos_cli.command('recontar')
+def recontar_archivos():
+    """Recalcula las referencias de cada blob leyendo logo_url, foto_url y documento_pdf"""
+    from app.services.almacen_service import AlmacenService
+
+    corregidos = AlmacenService.recontar()
+    db.session.commit()
+    click.echo(f'{corregidos} blobs con el contador corregido')
+
+
+@archivos_cli.command('gc')
+@click.option('--gracia-horas', type=int, default=None,
+              help='Horas sin referencias antes de borrar (por defecto: UPLOADS_GC_GRACIA_HORAS)')
+@click.option('--simular', is_flag=True, default=False, help='Solo informar qué se borraría')
+def gc_archivos(gracia_horas, simular):
+    """Borra los blobs que nadie referencia (y sus miniaturas)"""
+    from app.services.almacen_service import AlmacenService
+
+    r = AlmacenService.recolectar(gracia_horas=gracia_horas, simular=simular)
+    accion = 'se borrarían' if simular else 'borrados'
+    click.echo(f"{r['borrados']} blobs {accion} ({r['bytes'] / (1024 * 1024):.1f} MB), "
+               f"{r['corregidos']} contadores corregidos, {r['temporales']} temporales eliminados")
+
+
+@archivos_cli.command('limpiar-subidas')
+@click.option('--retencion-dias', type=int, default=7, show_default=True,
+              help='Días que se conservan las sesiones terminadas')
+def limpiar_subidas(retencion_dias):
+    """Expira las subidas reanudables abandonadas y borra sus partes"""
+    from app.services.subida_reanudable_service import SubidaReanudableService
+
+    r = SubidaReanudableService.limpiar_expiradas(retencion_dias=retencion_dias)
+    db.session.commit()
+    click.echo(f"{r['expiradas']} subidas expiradas, {r['eliminadas']} sesiones eliminadas, "
+               f"{r['huerfanos']} partes huérfanas borradas")
+
+
+imagenes_cli = AppGroup('imagenes', help='Miniaturas de logos y fotos de jugadores')
+
+
+@imagenes_cli.command('backfill')
+def backfill_imagenes():
+    """Genera las miniaturas que falten de las imágenes del almacén"""
+    from app.models.archivo_blob import ArchivoBlob
+    from app.services.imagen_service import ImagenService, EXTENSIONES_IMAGEN
+
+    generadas, errores = 0, 0
+    blobs = ArchivoBlob.query.filter(ArchivoBlob.extension.in_(EXTENSIONES_IMAGEN)).order_by(ArchivoBlob.sha256)
+    for blob in blobs.yield_per(500):
+        try:
+            if ImagenService.generar(blob.ruta):
+                generadas += 1
+        except Exception as e:
+            errores += 1
+            click.echo(f'  {blob.ruta}: {e}', err=True)
+    click.echo(f'{generadas} imágenes con miniaturas nuevas, {errores} con errores')
+
+
+replica_cli = AppGroup('replica', help='Feed de cambios para la réplica de alineaciones-service')
+
+
+@replica_cli.command('purgar')
+@click.option('--dias', type=int, default=None,
+              help='Antigüedad mínima (por defecto: REPLICA_CAMBIOS_RETENCION_DIAS)')
+def purgar_cambios_replica(dias):
+    """Elimina los cambios viejos del feed (las réplicas atrasadas tendrán que resincronizar)"""
+    from app.services.replica_service import ReplicaService
+
+    eliminados = ReplicaService.purgar(retencion_dias=dias)
+    db.session.commit()
+    click.echo(f'{eliminados} cambios eliminados del feed de la réplica')
+
+
+def register_commands(app):
+    """Registra los comandos CLI de la aplicación"""
+    app.cli.add_command(tabla_cli)
+    app.cli.add_command(estadisticas_cli)
+    app.cli.add_command(tokens_cli)
+    app.cli.add_command(emails_cli)
+    app.cli.add_command(archivos_cli)
+    app.cli.add_command(imagenes_cli)
+    app.cli.add_command(replica_cli)
@@ -26,20 +26,103 @@ class Config:
     UPLOAD_FOLDER = os.path.join(os.getcwd(), 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB max
     
+    # Servir /uploads: 'none' (Python), 'x-sendfile' (Apache) o 'x-accel' (nginx)
+    UPLOADS_SENDFILE = os.getenv('UPLOADS_SENDFILE', 'none')
+    UPLOADS_ACCEL_PREFIX = os.getenv('UPLOADS_ACCEL_PREFIX', '/_uploads')
+    UPLOADS_MAX_AGE = int(os.getenv('UPLOADS_MAX_AGE', 3600))  # nombres no direccionados por contenido
+    UPLOADS_ETAG_CACHE_MAX = 4096
+    UPLOADS_GC_GRACIA_HORAS = int(os.getenv('UPLOADS_GC_GRACIA_HORAS', 24))  # blobs sin referencias
+    
+    # Subidas reanudables del documento PDF de jugadores
+    SUBIDAS_REANUDABLES_MAX_BYTES = int(os.getenv('SUBIDAS_REANUDABLES_MAX_BYTES', 25 * 1024 * 1024))
+    SUBIDAS_REANUDABLES_CHUNK_MAX = 8 * 1024 * 1024     # menor que MAX_CONTENT_LENGTH
+    SUBIDAS_REANUDABLES_TTL_HORAS = int(os.getenv('SUBIDAS_REANUDABLES_TTL_HORAS', 24))  # sin actividad
+    
+    # Miniaturas de logos y fotos (ImagenService), generadas en segundo plano
+    IMAGENES_ASYNC = True
+    IMAGENES_TAMANIOS = (64, 128, 512)
+    IMAGENES_CALIDAD_WEBP = int(os.getenv('IMAGENES_CALIDAD_WEBP', 80))
+    IMAGENES_CALIDAD_JPEG = int(os.getenv('IMAGENES_CALIDAD_JPEG', 85))
+    IMAGENES_QUEUE_MAX = 1000
+    
     # CORS
     CORS_HEADERS = 'Content-Type'
     
+    # Hash de contraseñas (bcrypt) en un pool acotado; el costo se calibra al arrancar
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 0))  # 0 = min(4, núcleos)
+    PASSWORD_HASH_MAX_QUEUE = int(os.getenv('PASSWORD_HASH_MAX_QUEUE', 64))
+    PASSWORD_HASH_TARGET_MS = int(os.getenv('PASSWORD_HASH_TARGET_MS', 250))
+    PASSWORD_HASH_MIN_ROUNDS = 10
+    PASSWORD_HASH_MAX_ROUNDS = 14
+    PASSWORD_HASH_ROUNDS = int(os.getenv('PASSWORD_HASH_ROUNDS', 0))  # 0 = calibrar
+    
     MAX_LOGIN_ATTEMPTS = 5
     LOCKOUT_DURATION_MINUTES = 10
     UNLOCK_CODE_EXPIRES_MINUTES = 15
+    # Contadores de fallos en memoria (mismo almacén que RATE_LIMIT_STORAGE)
+    LOGIN_FAILURE_WINDOW_MINUTES = 30
+    MAX_LOGIN_ATTEMPTS_PER_IP = int(os.getenv('MAX_LOGIN_ATTEMPTS_PER_IP', 20))
+    IP_LOCKOUT_DURATION_MINUTES = 15
     
     RATE_LIMIT_ENABLED = True
     RATE_LIMIT_REQUESTS = 100
     RATE_LIMIT_WINDOW_MINUTES = 15
     RATE_LIMIT_BAN_DURATION_MINUTES = 30
+    RATE_LIMIT_ALGORITHM = os.getenv('RATE_LIMIT_ALGORITHM', 'sliding_window')  # o 'token_bucket'
+    RATE_LIMIT_STORAGE = os.getenv('RATE_LIMIT_STORAGE', 'memory')  # 'sqlite' para varios workers
+    RATE_LIMIT_SQLITE_PATH = os.getenv('RATE_LIMIT_SQLITE_PATH', os.path.join(os.getcwd(), 'cache', 'rate_limits.db'))
+    RATE_LIMIT_FLUSH_SECONDS = int(os.getenv('RATE_LIMIT_FLUSH_SECONDS', 10))
     
     SECURITY_LOG_RETENTION_DAYS = 90
+    
+    # Auditoría (security_logs, login_attempts) escrita en lote por un hilo
+    AUDIT_FLUSH_SECONDS = float(os.getenv('AUDIT_FLUSH_SECONDS', 1))  # 0 = escribir en el momento
+    AUDIT_BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', 500))
+    AUDIT_QUEUE_MAX = int(os.getenv('AUDIT_QUEUE_MAX', 10000))
+    AUDIT_ENQUEUE_TIMEOUT = float(os.getenv('AUDIT_ENQUEUE_TIMEOUT', 0.05))
     SEND_LOCKOUT_EMAIL = True
+    
+    # Emails transaccionales: outbox + hilo de envío con conexión SMTP persistente
+    EMAIL_WORKER_ENABLED = os.getenv('EMAIL_WORKER_ENABLED', 'true').lower() == 'true'
+    EMAIL_POLL_SECONDS = int(os.getenv('EMAIL_POLL_SECONDS', 5))
+    EMAIL_BATCH_SIZE = int(os.getenv('EMAIL_BATCH_SIZE', 50))
+    EMAIL_MAX_INTENTOS = 5
+    EMAIL_BACKOFF_SECONDS = 30          # 30 s, 1 min, 2 min, 4 min...
+    EMAIL_BACKOFF_MAX_SECONDS = 3600
+    EMAIL_CLAIM_TIMEOUT_SECONDS = 300
+    EMAIL_SMTP_TIMEOUT_SECONDS = 10
+    EMAIL_SMTP_IDLE_SECONDS = 60
+    EMAIL_OUTBOX_RETENTION_DAYS = 30
+    
+    # Refresh tokens rotados: margen para repeticiones del mismo cliente (ver RefreshCache)
+    REFRESH_REUSE_GRACE_SECONDS = int(os.getenv('REFRESH_REUSE_GRACE_SECONDS', 10))
+    REFRESH_CACHE_MAX_ENTRIES = 10000
+    
+    # Cada cuántos segundos cada worker trae las revocaciones hechas por otros (0 = no sincronizar)
+    REVOCATION_SYNC_SECONDS = int(os.getenv('REVOCATION_SYNC_SECONDS', 5))
+    
+    # Microservicio de alineaciones: pool keep-alive con plazos, reintentos y circuit breaker
+    ALINEACIONES_SERVICE_URL = os.getenv('ALINEACIONES_SERVICE_URL', 'http://localhost:5001')
+    ALINEACIONES_SERVICE_DEADLINE = float(os.getenv('ALINEACIONES_SERVICE_DEADLINE', 10))  # por llamada, reintentos incluidos
+    ALINEACIONES_SERVICE_CONNECT_TIMEOUT = 2.0
+    ALINEACIONES_SERVICE_REINTENTOS = 2
+    ALINEACIONES_SERVICE_BACKOFF_BASE = 0.1     # 0.1 s, 0.2 s... con jitter
+    ALINEACIONES_SERVICE_BACKOFF_MAX = 1.0
+    ALINEACIONES_SERVICE_FALLOS_CIRCUITO = 5    # fallos seguidos que abren el circuito
+    ALINEACIONES_SERVICE_ESPERA_CIRCUITO = 30.0
+    ALINEACIONES_SERVICE_POOL = int(os.getenv('ALINEACIONES_SERVICE_POOL', 10))
+    # Sub-llamadas en paralelo (local y visitante a la vez): plazo total del lote
+    FAN_OUT_DEADLINE = float(os.getenv('FAN_OUT_DEADLINE', 10))
+    FAN_OUT_WORKERS = int(os.getenv('FAN_OUT_WORKERS', 8))  # no más que ALINEACIONES_SERVICE_POOL
+    # Feed de cambios para la réplica de alineaciones-service (ver ReplicaService)
+    REPLICA_CAMBIOS_RETENCION_DIAS = int(os.getenv('REPLICA_CAMBIOS_RETENCION_DIAS', 7))
+    REPLICA_LOTE_MAX = 5000     # cambios o filas por respuesta
+    
+    # Cache de respuestas públicas: 'memory' (1 worker), 'sqlite' (varios workers) o 'none'
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+    CACHE_DEFAULT_TTL = int(os.getenv('CACHE_DEFAULT_TTL', 60))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1000))
+    CACHE_SQLITE_PATH = os.getenv('CACHE_SQLITE_PATH', os.path.join(os.getcwd(), 'cache', 'respuestas.db'))
 
 
 class DevelopmentConfig(Config):
@@ -56,6 +139,12 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    REVOCATION_SYNC_SECONDS = 0
+    RATE_LIMIT_FLUSH_SECONDS = 0
+    AUDIT_FLUSH_SECONDS = 0
+    PASSWORD_HASH_ROUNDS = 4
+    EMAIL_WORKER_ENABLED = False
+    IMAGENES_ASYNC = False
 
 
 config_by_name = {
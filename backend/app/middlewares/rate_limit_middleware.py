@@ -1,8 +1,10 @@
+import calendar
 from functools import wraps
-from flask import request, jsonify
+from flask import request, g
+from flask_restx import abort
 from app.security.rate_limiter import RateLimiter
 
-def rate_limit(max_requests: int = None, window_minutes: int = None):
+def rate_limit(max_requests: int = None, window_minutes: int = None, algorithm: str = None, scope: str = None):
     """
     Decorador de rate limiting para endpoints
     
@@ -10,13 +12,24 @@ def rate_limit(max_requests: int = None, window_minutes: int = None):
         @rate_limit(max_requests=5, window_minutes=1)
         def login():
             pass
+        
+        @rate_limit(max_requests=30, window_minutes=1, algorithm='token_bucket')
+        def buscar():
+            pass
     
     Args:
         max_requests: Número máximo de peticiones (usa config si no se especifica)
         window_minutes: Ventana de tiempo en minutos (usa config si no se especifica)
+        algorithm: 'sliding_window' o 'token_bucket' (usa RATE_LIMIT_ALGORITHM si no se especifica)
+        scope: Nombre del contador; endpoints con el mismo scope comparten límite
+               (por defecto, el endpoint)
     
     Returns:
         function: Decorador
+    
+    Headers de respuesta (los agrega register_rate_limit_headers en after_request):
+        X-RateLimit-Limit, X-RateLimit-Remaining, X-RateLimit-Reset (epoch)
+        y Retry-After cuando se responde 429
     """
     def decorator(f):
         @wraps(f)
@@ -25,29 +38,48 @@ def rate_limit(max_requests: int = None, window_minutes: int = None):
             identifier = RateLimiter.get_identifier()
             
             # Obtener endpoint
-            endpoint = request.endpoint or request.path
+            endpoint = scope or request.endpoint or request.path
             
             # Verificar rate limit
-            result = RateLimiter.check_rate_limit(identifier, endpoint)
+            result = RateLimiter.check_rate_limit(
+                identifier, endpoint,
+                max_requests=max_requests,
+                window_minutes=window_minutes,
+                algorithm=algorithm
+            )
+            
+            if 'limit' in result:
+                headers = {
+                    'X-RateLimit-Limit': str(result['limit']),
+                    'X-RateLimit-Remaining': str(result['remaining']),
+                    'X-RateLimit-Reset': str(calendar.timegm(result['reset_at'].utctimetuple()) + 1)
+                }
+                if 'retry_after' in result:
+                    headers['Retry-After'] = str(result['retry_after'])
+                g.rate_limit_headers = headers
             
             # Si está bloqueado
             if not result.get('allowed', True):
-                return jsonify({
-                    'error': 'Demasiadas peticiones',
-                    'message': result.get('message', 'Has excedido el límite de peticiones'),
-                    'reset_at': result.get('reset_at').isoformat() if result.get('reset_at') else None
-                }), 429
-            
-            # Agregar headers de rate limit
-            response = f(*args, **kwargs)
+                abort(
+                    429,
+                    error='Demasiadas peticiones',
+                    message=result.get('message', 'Has excedido el límite de peticiones'),
+                    reset_at=result.get('reset_at').isoformat() if result.get('reset_at') else None
+                )
             
-            # Si es una tupla (response, status_code)
-            if isinstance(response, tuple):
-                json_response, status_code = response
-                # Nota: Flask no permite agregar headers a JSON responses directamente
-                # En producción, usar after_request para esto
-            
-            return response
+            return f(*args, **kwargs)
         
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
+
+
+def register_rate_limit_headers(app):
+    """Agrega los headers X-RateLimit-* a las respuestas de endpoints limitados"""
+    
+    @app.after_request
+    def add_rate_limit_headers(response):
+        headers = g.pop('rate_limit_headers', None)
+        if headers:
+            for name, value in headers.items():
+                response.headers[name] = value
+        return response
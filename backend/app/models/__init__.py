@@ -9,6 +9,13 @@ from app.models.solicitud_equipo import SolicitudEquipo
 from app.models.notificacion import Notificacion
 from app.models.historial_estado import HistorialEstado
 from app.models.campeonato_equipo import CampeonatoEquipo 
+from app.models.tabla_posicion import TablaPosicion
+from app.models.tabla_posicion_jornada import TablaPosicionJornada
+from app.models.llave import Llave
+from app.models.estadistica_jugador import EstadisticaJugador
+from app.models.archivo_blob import ArchivoBlob
+from app.models.subida_reanudable import SubidaReanudable
+from app.models.cambio_replica import CambioReplica
 
 # Seguridad
 from app.models.token_blacklist import TokenBlacklist
@@ -17,6 +24,7 @@ from app.models.login_attempt import LoginAttempt
 from app.models.account_lockout import AccountLockout
 from app.models.security_log import SecurityLog
 from app.models.rate_limit import RateLimit
+from app.models.email_outbox import EmailOutbox
 
 __all__ = [
     # Modelos principales
@@ -31,11 +39,19 @@ __all__ = [
     'Notificacion',
     'CampeonatoEquipo',
     'HistorialEstado',
+    'TablaPosicion',
+    'TablaPosicionJornada',
+    'Llave',
+    'EstadisticaJugador',
+    'ArchivoBlob',
+    'SubidaReanudable',
+    'CambioReplica',
     # Modelos de seguridad
     'TokenBlacklist',
     'RefreshToken',
     'LoginAttempt',
     'AccountLockout',
     'SecurityLog',
-    'RateLimit'
+    'RateLimit',
+    'EmailOutbox'
 ]
\ No newline at end of file
@@ -0,0 +1,60 @@
+from app.extensions import db
+from datetime import datetime
+
+class ArchivoBlob(db.Model):
+    """
+    Archivo subido, guardado una sola vez por contenido (SHA-256)
+
+    ¿Por qué existe?
+    - Cada subida se guardaba con un nombre uuid: el mismo logo subido diez
+      veces eran diez copias en disco
+    - Ahora logos, fotos y documentos PDF viven en
+      uploads/blobs/<sha[:2]>/<sha[2:4]>/<sha>.<ext> y las columnas logo_url,
+      foto_url y documento_pdf apuntan a esa ruta
+
+    `referencias` cuenta cuántas de esas columnas apuntan al blob (lo
+    mantiene AlmacenService en cada flush). Cuando llega a 0 se anota
+    `sin_referencias_desde` y `flask archivos gc` lo borra pasado el período
+    de gracia (una subida sin asignar todavía, p. ej. /upload/logo antes de
+    crear el equipo, también empieza en 0).
+    """
+    __tablename__ = 'archivos_blob'
+
+    sha256 = db.Column(db.String(64), primary_key=True)
+    extension = db.Column(db.String(10), nullable=False)
+    tamanio = db.Column(db.BigInteger, nullable=False)
+    content_type = db.Column(db.String(100))
+
+    referencias = db.Column(db.Integer, default=0, nullable=False)
+    sin_referencias_desde = db.Column(db.DateTime, default=datetime.utcnow)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # La recolección busca: referencias <= 0 AND sin_referencias_desde < límite
+        db.Index('idx_archivos_blob_gc', 'referencias', 'sin_referencias_desde'),
+    )
+
+    @staticmethod
+    def ruta_para(sha256, extension):
+        """Ruta relativa a uploads (dos niveles de shards para no tener miles de archivos por carpeta)"""
+        return f'blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}.{extension}'
+
+    @property
+    def ruta(self):
+        return ArchivoBlob.ruta_para(self.sha256, self.extension)
+
+    def __repr__(self):
+        return f'<ArchivoBlob {self.sha256[:12]}.{self.extension} ({self.referencias} refs)>'
+
+    def to_dict(self):
+        return {
+            'sha256': self.sha256,
+            'ruta': self.ruta,
+            'extension': self.extension,
+            'tamanio': self.tamanio,
+            'content_type': self.content_type,
+            'referencias': self.referencias,
+            'sin_referencias_desde': self.sin_referencias_desde.isoformat() if self.sin_referencias_desde else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
@@ -0,0 +1,27 @@
+from app.extensions import db
+from datetime import datetime
+
+class CambioReplica(db.Model):
+    """
+    Registro de cambios de jugadores, equipos y partidos (change feed)
+
+    ¿Por qué existe?
+    - alineaciones-service mantiene una réplica de solo lectura de esas tres
+      tablas para validar alineaciones sin llamar al backend
+    - Cada flush que crea, modifica (en una columna replicada) o borra una
+      fila agrega aquí (entidad, id); `seq` crece siempre, así la réplica
+      pide "lo que cambió después de seq N" (ver ReplicaService)
+
+    No guarda los datos: el feed devuelve el estado actual de cada fila
+    (o que ya no existe), así que releer un cambio no tiene efecto.
+    `flask replica purgar` borra los cambios viejos.
+    """
+    __tablename__ = 'cambios_replica'
+
+    seq = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True, autoincrement=True)
+    entidad = db.Column(db.String(20), nullable=False)   # 'jugadores', 'equipos' o 'partidos'
+    id_entidad = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<CambioReplica {self.seq} {self.entidad}:{self.id_entidad}>'
@@ -32,7 +32,18 @@ class Campeonato(db.Model):
     def __repr__(self):
         return f'<Campeonato {self.nombre}>'
 
-    def to_dict(self, include_equipos=False):
+    def to_dict(self, include_equipos=False, conteos=None):
+        # Import diferido: los modelos no dependen de la capa de servicios
+        from app.services.imagen_service import ImagenService
+
+        # conteos: totales precalculados en lote (ver utils/serializers.py)
+        if conteos is None:
+            conteos = {
+                'total_partidos': self.partidos.count(),
+                'total_equipos_inscritos': self.equipos_inscritos.filter_by(estado_inscripcion='aprobado').count(),
+                'total_equipos_pendientes': self.equipos_inscritos.filter_by(estado_inscripcion='pendiente').count()
+            }
+
         data = {
             'id_campeonato': self.id_campeonato,
             'nombre': self.nombre,
@@ -48,18 +59,20 @@ class Campeonato(db.Model):
             'codigo_inscripcion': self.codigo_inscripcion,  # ← AGREGADO
             'es_publico': self.es_publico,
             'logo_url': self.logo_url,
+            'logo_urls': ImagenService.variantes(self.logo_url),
             'estado': self.estado,
             'partidos_generados': self.partidos_generados,
             'fecha_generacion_partidos': self.fecha_generacion_partidos.isoformat() if self.fecha_generacion_partidos else None,
             'creado_por': self.creado_por,
             'nombre_creador': self.creador.nombre if self.creador else None,
             'fecha_creacion': self.fecha_creacion.isoformat() if self.fecha_creacion else None,
-            'total_partidos': self.partidos.count(),
-            'total_equipos_inscritos': self.equipos_inscritos.filter_by(estado_inscripcion='aprobado').count(),
-            'total_equipos_pendientes': self.equipos_inscritos.filter_by(estado_inscripcion='pendiente').count()
+            'total_partidos': conteos['total_partidos'],
+            'total_equipos_inscritos': conteos['total_equipos_inscritos'],
+            'total_equipos_pendientes': conteos['total_equipos_pendientes']
         }
 
         if include_equipos:
-            data['equipos_inscritos'] = [eq.to_dict() for eq in self.equipos_inscritos.all()]
+            from app.utils.serializers import serializar_inscripciones
+            data['equipos_inscritos'] = serializar_inscripciones(self.equipos_inscritos.all())
 
         return data
\ No newline at end of file
@@ -19,7 +19,8 @@ class CampeonatoEquipo(db.Model):
     def __repr__(self):
         return f'<CampeonatoEquipo campeonato={self.id_campeonato} equipo={self.id_equipo}>'
 
-    def to_dict(self, include_equipo=True):
+    def to_dict(self, include_equipo=True, total_jugadores=None):
+        # total_jugadores: conteo precalculado en lote (ver utils/serializers.py)
         data = {
             'id': self.id,
             'id_campeonato': self.id_campeonato,
@@ -42,7 +43,7 @@ class CampeonatoEquipo(db.Model):
                     'nombre': self.equipo.lider.nombre,
                     'email': self.equipo.lider.email
                 } if self.equipo.lider else None,
-                'total_jugadores': self.equipo.jugadores.filter_by(activo=True).count()
+                'total_jugadores': total_jugadores if total_jugadores is not None else self.equipo.jugadores.filter_by(activo=True).count()
             }
 
         return data
\ No newline at end of file
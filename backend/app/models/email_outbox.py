@@ -0,0 +1,61 @@
+from app.extensions import db
+from datetime import datetime
+
+class EmailOutbox(db.Model):
+    """
+    Emails transaccionales pendientes de envío (outbox)
+
+    ¿Por qué existe?
+    - EmailService llamaba a mail.send dentro del request: la latencia y los
+      errores del SMTP los sufría el usuario en el registro, el login, etc.
+    - Ahora el request solo guarda una fila (plantilla + datos) y el hilo de
+      EmailWorker la envía con una conexión SMTP persistente
+
+    Estados: pendiente → enviando → enviado
+                     ↖ (error, reintento con backoff)  ↘ fallido (sin más intentos)
+    """
+    __tablename__ = 'email_outbox'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    # Nombre de la plantilla (ver app/security/email_templates.py) y sus datos
+    plantilla = db.Column(db.String(50), nullable=False)
+    destinatario = db.Column(db.String(100), nullable=False)
+    contexto = db.Column(db.JSON, nullable=False)
+
+    estado = db.Column(
+        db.Enum('pendiente', 'enviando', 'enviado', 'fallido', name='email_outbox_estado'),
+        default='pendiente',
+        nullable=False
+    )
+    intentos = db.Column(db.Integer, default=0, nullable=False)
+    proximo_intento = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    ultimo_error = db.Column(db.Text)
+
+    # Qué worker tomó la fila y cuándo (para liberar las de un worker caído)
+    reclamado_por = db.Column(db.String(32), index=True)
+    reclamado_at = db.Column(db.DateTime)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        # El worker busca: estado = 'pendiente' AND proximo_intento <= ahora
+        db.Index('idx_email_outbox_pendientes', 'estado', 'proximo_intento'),
+    )
+
+    def __repr__(self):
+        return f'<EmailOutbox {self.plantilla} → {self.destinatario} ({self.estado})>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'plantilla': self.plantilla,
+            'destinatario': self.destinatario,
+            'estado': self.estado,
+            'intentos': self.intentos,
+            'proximo_intento': self.proximo_intento.isoformat() if self.proximo_intento else None,
+            'ultimo_error': self.ultimo_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None
+        }
@@ -25,11 +25,19 @@ class Equipo(db.Model):
     def __repr__(self):
         return f'<Equipo {self.nombre}>'
     
-    def to_dict(self, include_jugadores=False):
+    def to_dict(self, include_jugadores=False, total_jugadores=None):
+        # Import diferido: los modelos no dependen de la capa de servicios
+        from app.services.imagen_service import ImagenService
+
+        # total_jugadores: conteo precalculado en lote (ver utils/serializers.py)
+        if total_jugadores is None:
+            total_jugadores = self.jugadores.filter_by(activo=True).count()
+
         data = {
             'id_equipo': self.id_equipo,
             'nombre': self.nombre,
             'logo_url': self.logo_url,
+            'logo_urls': ImagenService.variantes(self.logo_url),
             'estadio': self.estadio,
             'max_jugadores': self.max_jugadores,
             'tipo_deporte': self.tipo_deporte,
@@ -41,7 +49,7 @@ class Equipo(db.Model):
             'fecha_aprobacion': self.fecha_aprobacion.isoformat() if self.fecha_aprobacion else None,
             'estado': self.estado,
             'observaciones': self.observaciones,
-            'total_jugadores': self.jugadores.filter_by(activo=True).count(),
+            'total_jugadores': total_jugadores,
             
             # Objeto lider completo
             'lider': {
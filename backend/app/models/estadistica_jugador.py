@@ -0,0 +1,60 @@
+from app.extensions import db
+from datetime import datetime
+
+class EstadisticaJugador(db.Model):
+    """
+    Totales de un jugador en un campeonato (goles, asistencias, partidos)
+
+    ¿Por qué existe?
+    - Las tablas de goleadores y asistencias se armaban recorriendo partidos
+      (y devolvían datos simulados)
+    - Cada gol o evento suma (o resta) su aporte a esta fila al registrarse
+    - El top N es una lectura en orden de índice: no depende de cuántos goles
+      haya en el campeonato
+
+    partidos_jugados cuenta los partidos en los que el jugador marcó o asistió
+    (las alineaciones viven en alineaciones-service).
+
+    Si alguna vez se desincroniza: flask estadisticas reconstruir
+    """
+    __tablename__ = 'estadisticas_jugador'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    id_campeonato = db.Column(db.Integer, db.ForeignKey('campeonatos.id_campeonato', ondelete='CASCADE'), nullable=False)
+    id_jugador = db.Column(db.Integer, db.ForeignKey('jugadores.id_jugador', ondelete='CASCADE'), nullable=False)
+    id_equipo = db.Column(db.Integer, db.ForeignKey('equipos.id_equipo', ondelete='CASCADE'), nullable=False)
+    goles = db.Column(db.Integer, default=0, nullable=False)            # sin autogoles
+    penales = db.Column(db.Integer, default=0, nullable=False)
+    tiros_libres = db.Column(db.Integer, default=0, nullable=False)
+    autogoles = db.Column(db.Integer, default=0, nullable=False)
+    asistencias = db.Column(db.Integer, default=0, nullable=False)
+    partidos_jugados = db.Column(db.Integer, default=0, nullable=False)
+    fecha_actualizacion = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    jugador = db.relationship('Jugador', lazy='joined')
+    equipo = db.relationship('Equipo', lazy='joined')
+
+    __table_args__ = (
+        db.UniqueConstraint('id_campeonato', 'id_jugador', name='unique_estadistica_campeonato_jugador'),
+        # Mismo orden que las tablas: más goles (o asistencias) y, a igualdad, menos partidos
+        db.Index('idx_estadistica_goles', id_campeonato, goles.desc(), partidos_jugados),
+        db.Index('idx_estadistica_asistencias', id_campeonato, asistencias.desc(), partidos_jugados),
+    )
+
+    def __repr__(self):
+        return f'<EstadisticaJugador campeonato={self.id_campeonato} jugador={self.id_jugador} goles={self.goles}>'
+
+    def to_dict(self):
+        return {
+            'id_jugador': self.id_jugador,
+            'jugador': f"{self.jugador.nombre} {self.jugador.apellido}" if self.jugador else None,
+            'dorsal': self.jugador.dorsal if self.jugador else None,
+            'id_equipo': self.id_equipo,
+            'equipo': self.equipo.nombre if self.equipo else None,
+            'goles': self.goles,
+            'penales': self.penales,
+            'tiros_libres': self.tiros_libres,
+            'autogoles': self.autogoles,
+            'asistencias': self.asistencias,
+            'partidos_jugados': self.partidos_jugados
+        }
@@ -25,6 +25,9 @@ class Jugador(db.Model):
         return f'<Jugador {self.nombre} {self.apellido}>'
     
     def to_dict(self):
+        # Import diferido: los modelos no dependen de la capa de servicios
+        from app.services.imagen_service import ImagenService
+
         return {
             'id_jugador': self.id_jugador,
             'id_equipo': self.id_equipo,
@@ -36,6 +39,7 @@ class Jugador(db.Model):
             'documento_pdf': self.documento_pdf,
             'documento_url': self.documento_pdf,  # ← AGREGAR ESTA LÍNEA COMPLETA
             'foto_url': self.foto_url,
+            'foto_urls': ImagenService.variantes(self.foto_url),
             'posicion': self.posicion,
             'fecha_nacimiento': self.fecha_nacimiento.isoformat() if self.fecha_nacimiento else None,
             'activo': self.activo,
@@ -0,0 +1,80 @@
+from app.extensions import db
+from datetime import datetime
+
+class Llave(db.Model):
+    """
+    Un cruce de la fase eliminatoria (una casilla del cuadro)
+
+    ¿Por qué existe?
+    - Guarda el estado ya calculado del cuadro: quién juega, de dónde viene
+      cada equipo, el marcador y el ganador
+    - Cada llave apunta a la siguiente (id_llave_siguiente + lado_siguiente),
+      así el ganador avanza sin recalcular el cuadro
+    - Leer el cuadro completo es UNA consulta (los equipos se cargan con JOIN)
+
+    ronda 1 es la primera ronda eliminatoria; posicion es el orden dentro de
+    la ronda (la llave p alimenta a la posición p // 2 de la ronda siguiente).
+    """
+    __tablename__ = 'llaves'
+
+    id_llave = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    id_campeonato = db.Column(db.Integer, db.ForeignKey('campeonatos.id_campeonato', ondelete='CASCADE'), nullable=False)
+    ronda = db.Column(db.Integer, nullable=False)
+    posicion = db.Column(db.Integer, nullable=False)
+    fase = db.Column(db.String(30), nullable=False)
+
+    id_equipo_local = db.Column(db.Integer, db.ForeignKey('equipos.id_equipo'), nullable=True)
+    id_equipo_visitante = db.Column(db.Integer, db.ForeignKey('equipos.id_equipo'), nullable=True)
+    # De dónde sale cada equipo: '1° Grupo A', 'Ganador cuartos 2', 'Sorteo 5'
+    origen_local = db.Column(db.String(50), nullable=True)
+    origen_visitante = db.Column(db.String(50), nullable=True)
+
+    id_partido = db.Column(db.Integer, db.ForeignKey('partidos.id_partido', ondelete='SET NULL'), nullable=True, unique=True)
+    fecha_programada = db.Column(db.DateTime, nullable=True)
+    goles_local = db.Column(db.Integer, nullable=True)
+    goles_visitante = db.Column(db.Integer, nullable=True)
+    # pendiente (faltan equipos), programado, en_juego, finalizado, bye
+    estado = db.Column(db.String(20), default='pendiente', nullable=False)
+    id_ganador = db.Column(db.Integer, db.ForeignKey('equipos.id_equipo'), nullable=True)
+    # Ganador definido a mano cuando el partido terminó empatado (penales)
+    id_ganador_desempate = db.Column(db.Integer, db.ForeignKey('equipos.id_equipo'), nullable=True)
+
+    id_llave_siguiente = db.Column(db.Integer, db.ForeignKey('llaves.id_llave'), nullable=True)
+    lado_siguiente = db.Column(db.String(10), nullable=True)  # 'local' o 'visitante'
+    fecha_actualizacion = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    equipo_local = db.relationship('Equipo', foreign_keys=[id_equipo_local], lazy='joined')
+    equipo_visitante = db.relationship('Equipo', foreign_keys=[id_equipo_visitante], lazy='joined')
+    ganador = db.relationship('Equipo', foreign_keys=[id_ganador], lazy='joined')
+    siguiente = db.relationship('Llave', remote_side=[id_llave])
+
+    __table_args__ = (
+        db.UniqueConstraint('id_campeonato', 'ronda', 'posicion', name='unique_llave_ronda_posicion'),
+    )
+
+    def __repr__(self):
+        return f'<Llave campeonato={self.id_campeonato} ronda={self.ronda} pos={self.posicion}>'
+
+    def to_dict(self):
+        return {
+            'id_llave': self.id_llave,
+            'ronda': self.ronda,
+            'posicion': self.posicion,
+            'fase': self.fase,
+            'id_equipo_local': self.id_equipo_local,
+            'equipo_local': self.equipo_local.nombre if self.equipo_local else None,
+            'origen_local': self.origen_local,
+            'id_equipo_visitante': self.id_equipo_visitante,
+            'equipo_visitante': self.equipo_visitante.nombre if self.equipo_visitante else None,
+            'origen_visitante': self.origen_visitante,
+            'id_partido': self.id_partido,
+            'fecha_programada': self.fecha_programada.isoformat() if self.fecha_programada else None,
+            'goles_local': self.goles_local,
+            'goles_visitante': self.goles_visitante,
+            'estado': self.estado,
+            'id_ganador': self.id_ganador,
+            'ganador': self.ganador.nombre if self.ganador else None,
+            'definido_por_desempate': self.id_ganador_desempate is not None,
+            'id_llave_siguiente': self.id_llave_siguiente,
+            'lado_siguiente': self.lado_siguiente
+        }
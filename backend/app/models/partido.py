@@ -36,7 +36,14 @@ class Partido(db.Model):
     def __repr__(self):
         return f'<Partido {self.id_partido}>'
     
-    def to_dict(self):
+    def to_dict(self, conteos=None):
+        # conteos: totales precalculados en lote (ver utils/serializers.py)
+        if conteos is None:
+            conteos = {
+                'total_goles': self.goles.count(),
+                'total_tarjetas': self.tarjetas.count()
+            }
+
         return {
             'id_partido': self.id_partido,
             'id_campeonato': self.id_campeonato,
@@ -63,6 +70,6 @@ class Partido(db.Model):
             'registrado_por': self.registrado_por,
             'fecha_registro_resultado': self.fecha_registro_resultado.isoformat() if self.fecha_registro_resultado else None,
             'fecha_creacion': self.fecha_creacion.isoformat() if self.fecha_creacion else None,
-            'total_goles': self.goles.count(),
-            'total_tarjetas': self.tarjetas.count()
+            'total_goles': conteos['total_goles'],
+            'total_tarjetas': conteos['total_tarjetas']
         }
\ No newline at end of file
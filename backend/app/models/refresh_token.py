@@ -1,5 +1,6 @@
 from app.extensions import db
 from datetime import datetime, timedelta
+import hashlib
 import secrets
 
 class RefreshToken(db.Model):
@@ -17,29 +18,45 @@ class RefreshToken(db.Model):
     - Refresh token solo se usa una vez para renovar
     - Si roban el access token, expira rápido
     - Si roban el refresh token, podemos revocarlo
+    - Cada renovación lo rota (entrega uno nuevo); si alguien presenta uno ya
+      rotado, se revoca toda la familia (probable robo)
+    - En la BD solo se guarda su hash: una copia de la tabla no sirve para renovar
     """
     __tablename__ = 'refresh_tokens'
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('usuarios.id_usuario'), nullable=False)
     
-    # Token largo y seguro (generado con secrets)
-    token = db.Column(db.String(500), unique=True, nullable=False, index=True)
+    # SHA-256 del token (hex, 64 caracteres): el token en claro solo lo tiene
+    # el cliente. Índice único de largo fijo en vez de un VARCHAR(500)
+    token_hash = db.Column(db.String(64), unique=True, nullable=False)
     
-    # Cuándo expira (ej: 30 días desde creación)
-    expires_at = db.Column(db.DateTime, nullable=False)
+    # Todos los tokens que salen de un mismo login por rotación comparten familia
+    family_id = db.Column(db.String(32), nullable=False, index=True)
+    # Token que lo reemplazó al rotarse (NULL si sigue vigente)
+    replaced_by_id = db.Column(db.Integer, db.ForeignKey('refresh_tokens.id', ondelete='SET NULL'))
+    rotated_at = db.Column(db.DateTime)
+    
+    # Cuándo expira (ej: 30 días desde el login; las rotaciones no lo extienden)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Info del dispositivo (para seguridad)
     ip_address = db.Column(db.String(45))
     user_agent = db.Column(db.Text)
     
-    # ¿Fue revocado? (logout, cambio password, etc)
+    # ¿Fue revocado? (logout, cambio password, rotación, etc)
     is_revoked = db.Column(db.Boolean, default=False)
+    revoked_at = db.Column(db.DateTime)
     
     # Relación con usuario
     usuario = db.relationship('Usuario', backref='refresh_tokens')
     
+    __table_args__ = (
+        # revoke_all_user_tokens: UPDATE ... WHERE user_id = ? AND is_revoked = 0
+        db.Index('idx_refresh_user_revoked', 'user_id', 'is_revoked'),
+    )
+    
     def __repr__(self):
         return f'<RefreshToken user_id={self.user_id}>'
     
@@ -49,7 +66,13 @@ class RefreshToken(db.Model):
         return secrets.token_urlsafe(64)
     
     @staticmethod
-    def create_refresh_token(user_id, ip_address=None, user_agent=None, days=30):
+    def hash_token(token):
+        """SHA-256 del token en hex (es aleatorio y largo: no hace falta un hash lento)"""
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def create_refresh_token(user_id, ip_address=None, user_agent=None, days=30,
+                             family_id=None, expires_at=None):
         """
         Crea un nuevo refresh token para el usuario
         
@@ -58,15 +81,22 @@ class RefreshToken(db.Model):
             ip_address: IP desde donde se creó
             user_agent: Navegador/dispositivo
             days: Días de validez (default 30)
+            family_id: Familia del token rotado (None = login nuevo)
+            expires_at: Vencimiento heredado del token rotado
+        
+        Returns:
+            tuple: (RefreshToken, token en claro para el cliente)
         """
-        token = RefreshToken(
+        token = RefreshToken.generate_token()
+        refresh_token = RefreshToken(
             user_id=user_id,
-            token=RefreshToken.generate_token(),
-            expires_at=datetime.utcnow() + timedelta(days=days),
+            token_hash=RefreshToken.hash_token(token),
+            family_id=family_id or secrets.token_hex(16),
+            expires_at=expires_at or datetime.utcnow() + timedelta(days=days),
             ip_address=ip_address,
             user_agent=user_agent
         )
-        return token
+        return refresh_token, token
     
     def is_expired(self):
         """Verifica si el token ya expiró"""
@@ -85,21 +85,19 @@ class SecurityLog(db.Model):
                 details={'reason': 'credenciales_invalidas'}
             )
         """
-        log = SecurityLog(
-            event_type=event_type,
-            user_id=user_id,
-            email=email,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            details=details
-        )
-        
-        db.session.add(log)
-        
+        # Se encola: el hilo de auditoría lo escribe en lote (ver AuditWriter)
+        from app.security.audit_writer import audit_writer
         try:
-            db.session.commit()
+            audit_writer.registrar(SecurityLog, {
+                'event_type': event_type,
+                'user_id': user_id,
+                'email': email,
+                'ip_address': ip_address,
+                'user_agent': user_agent,
+                'details': details,
+                'created_at': datetime.utcnow()
+            })
         except Exception as e:
-            db.session.rollback()
             print(f"Error logging security event: {e}")
     
     @staticmethod
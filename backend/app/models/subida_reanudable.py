@@ -0,0 +1,62 @@
+from app.extensions import db
+from datetime import datetime
+
+class SubidaReanudable(db.Model):
+    """
+    Subida en partes del documento PDF de un jugador
+
+    ¿Por qué existe?
+    - /jugadores/<id>/upload-documento recibe el PDF completo en un solo
+      request: el día de inscripción, con conexiones inestables, un corte
+      obligaba a reenviar todo desde cero
+    - Ahora el cliente crea una sesión, envía partes con su offset
+      (Content-Range), consulta cuánto llegó si se corta y finaliza
+
+    Las partes se escriben en uploads/blobs/.reanudables/<id>.part; al
+    finalizar el archivo pasa al almacén por contenido (AlmacenService).
+    Las sesiones sin actividad hasta `expira_en` las limpia
+    `flask archivos limpiar-subidas`.
+    """
+    __tablename__ = 'subidas_reanudables'
+
+    id = db.Column(db.String(32), primary_key=True)
+    id_jugador = db.Column(db.Integer, db.ForeignKey('jugadores.id_jugador', ondelete='CASCADE'), nullable=False, index=True)
+    id_usuario = db.Column(db.Integer, db.ForeignKey('usuarios.id_usuario', ondelete='CASCADE'), nullable=False)
+
+    nombre_archivo = db.Column(db.String(255))
+    tamanio_total = db.Column(db.BigInteger, nullable=False)
+    recibido = db.Column(db.BigInteger, default=0, nullable=False)
+    # Opcional: si el cliente lo envía se verifica al finalizar
+    sha256_esperado = db.Column(db.String(64))
+
+    estado = db.Column(
+        db.Enum('activa', 'completada', 'cancelada', 'expirada', name='subida_reanudable_estado'),
+        default='activa',
+        nullable=False
+    )
+    ruta = db.Column(db.String(255))    # ruta del blob una vez completada
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    actualizado_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    expira_en = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        # La limpieza busca: estado = 'activa' AND expira_en < ahora
+        db.Index('idx_subidas_reanudables_expiracion', 'estado', 'expira_en'),
+    )
+
+    def __repr__(self):
+        return f'<SubidaReanudable {self.id} {self.recibido}/{self.tamanio_total} ({self.estado})>'
+
+    def to_dict(self):
+        return {
+            'id_subida': self.id,
+            'id_jugador': self.id_jugador,
+            'nombre_archivo': self.nombre_archivo,
+            'tamanio_total': self.tamanio_total,
+            'recibido': self.recibido,
+            'completa': self.recibido >= self.tamanio_total,
+            'estado': self.estado,
+            'expira_en': self.expira_en.isoformat() if self.expira_en else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
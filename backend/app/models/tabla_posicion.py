@@ -0,0 +1,52 @@
+from app.extensions import db
+from datetime import datetime
+
+class TablaPosicion(db.Model):
+    """
+    Fila persistida de la tabla de posiciones (una por campeonato y equipo)
+
+    ¿Por qué existe?
+    - Antes la tabla se recalculaba leyendo TODOS los partidos finalizados
+    - Ahora cada resultado suma (o resta) su aporte a estas filas
+    - Leer la tabla cuesta O(equipos), sin importar cuántas jornadas lleve el campeonato
+
+    Si alguna vez se desincroniza: flask tabla-posiciones reconstruir
+    """
+    __tablename__ = 'tabla_posiciones'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    id_campeonato = db.Column(db.Integer, db.ForeignKey('campeonatos.id_campeonato', ondelete='CASCADE'), nullable=False)
+    id_equipo = db.Column(db.Integer, db.ForeignKey('equipos.id_equipo', ondelete='CASCADE'), nullable=False)
+    partidos_jugados = db.Column(db.Integer, default=0, nullable=False)
+    ganados = db.Column(db.Integer, default=0, nullable=False)
+    empatados = db.Column(db.Integer, default=0, nullable=False)
+    perdidos = db.Column(db.Integer, default=0, nullable=False)
+    goles_favor = db.Column(db.Integer, default=0, nullable=False)
+    goles_contra = db.Column(db.Integer, default=0, nullable=False)
+    diferencia_goles = db.Column(db.Integer, default=0, nullable=False)
+    puntos = db.Column(db.Integer, default=0, nullable=False)
+    fecha_actualizacion = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    equipo = db.relationship('Equipo', lazy='joined')
+
+    __table_args__ = (
+        db.UniqueConstraint('id_campeonato', 'id_equipo', name='unique_tabla_campeonato_equipo'),
+        db.Index('idx_tabla_orden', 'id_campeonato', 'puntos', 'diferencia_goles', 'goles_favor'),
+    )
+
+    def __repr__(self):
+        return f'<TablaPosicion campeonato={self.id_campeonato} equipo={self.id_equipo} pts={self.puntos}>'
+
+    def to_dict(self):
+        return {
+            'id_equipo': self.id_equipo,
+            'nombre': self.equipo.nombre if self.equipo else None,
+            'partidos_jugados': self.partidos_jugados,
+            'ganados': self.ganados,
+            'empatados': self.empatados,
+            'perdidos': self.perdidos,
+            'goles_favor': self.goles_favor,
+            'goles_contra': self.goles_contra,
+            'diferencia_goles': self.diferencia_goles,
+            'puntos': self.puntos
+        }
@@ -0,0 +1,62 @@
+from app.extensions import db
+from datetime import datetime
+
+class TablaPosicionJornada(db.Model):
+    """
+    Foto (snapshot) de la tabla de posiciones al cerrar una jornada
+
+    ¿Para qué sirve?
+    - Tablas históricas (hasta_jornada) sin recalcular los partidos
+    - Gráficos de evolución de posiciones con una sola consulta
+
+    Cada fila guarda totales ACUMULADOS hasta esa jornada y la posición.
+    Las filas no se editan: si un resultado ya contado cambia, las fotos
+    afectadas se borran y se regeneran (ver TablaPosicionesService).
+    """
+    __tablename__ = 'tabla_posiciones_jornada'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    id_campeonato = db.Column(db.Integer, db.ForeignKey('campeonatos.id_campeonato', ondelete='CASCADE'), nullable=False)
+    jornada = db.Column(db.Integer, nullable=False)
+    id_equipo = db.Column(db.Integer, db.ForeignKey('equipos.id_equipo', ondelete='CASCADE'), nullable=False)
+    posicion = db.Column(db.Integer, nullable=False)
+    partidos_jugados = db.Column(db.Integer, default=0, nullable=False)
+    ganados = db.Column(db.Integer, default=0, nullable=False)
+    empatados = db.Column(db.Integer, default=0, nullable=False)
+    perdidos = db.Column(db.Integer, default=0, nullable=False)
+    goles_favor = db.Column(db.Integer, default=0, nullable=False)
+    goles_contra = db.Column(db.Integer, default=0, nullable=False)
+    diferencia_goles = db.Column(db.Integer, default=0, nullable=False)
+    puntos = db.Column(db.Integer, default=0, nullable=False)
+    fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+
+    equipo = db.relationship('Equipo', lazy='joined')
+
+    __table_args__ = (
+        db.UniqueConstraint('id_campeonato', 'jornada', 'id_equipo', name='unique_tabla_jornada_equipo'),
+        db.Index('idx_tabla_jornada_posicion', 'id_campeonato', 'jornada', 'posicion'),
+    )
+
+    def __repr__(self):
+        return f'<TablaPosicionJornada campeonato={self.id_campeonato} jornada={self.jornada} equipo={self.id_equipo}>'
+
+    def totales(self):
+        """Totales acumulados como dict (base para calcular la jornada siguiente)"""
+        return {
+            'partidos_jugados': self.partidos_jugados,
+            'ganados': self.ganados,
+            'empatados': self.empatados,
+            'perdidos': self.perdidos,
+            'goles_favor': self.goles_favor,
+            'goles_contra': self.goles_contra,
+            'diferencia_goles': self.diferencia_goles,
+            'puntos': self.puntos
+        }
+
+    def to_dict(self):
+        return {
+            'id_equipo': self.id_equipo,
+            'nombre': self.equipo.nombre if self.equipo else None,
+            **self.totales(),
+            'posicion': self.posicion
+        }
@@ -1,6 +1,6 @@
 from app.extensions import db
 from datetime import datetime
-import bcrypt
+from app.security.password_hasher import password_hasher
 
 class Usuario(db.Model):
     __tablename__ = 'usuarios'
@@ -27,11 +27,15 @@ class Usuario(db.Model):
     def __repr__(self):
         return f'<Usuario {self.email}>'
     
+    # El hash corre en el pool de PasswordHasher (puede lanzar HasherSaturado)
     def set_password(self, password):
-        self.contrasena = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        self.contrasena = password_hasher.hash(password)
     
     def check_password(self, password):
-        return bcrypt.checkpw(password.encode('utf-8'), self.contrasena.encode('utf-8'))
+        return password_hasher.verify(password, self.contrasena)
+    
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.contrasena)
     
     def to_dict(self):
         return {
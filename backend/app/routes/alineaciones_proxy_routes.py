@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import requests
 from datetime import datetime, timedelta
@@ -6,11 +6,47 @@ from app.models.usuario import Usuario
 from app.models.partido import Partido
 from app.models.equipo import Equipo
 from app.extensions import db
+from app.services.alineaciones_client import alineaciones_client
+from app.services.fan_out import fan_out
 
 alineaciones_proxy_bp = Blueprint('alineaciones_proxy', __name__)
 
-# URL del microservicio
-MICROSERVICIO_URL = "http://localhost:5001"
+
+# ============================================
+# FAN-OUT AL MICROSERVICIO
+# ============================================
+def _alineacion(id_partido, id_equipo, deadline):
+    """Alineación de un equipo (corre en el pool de fan_out, sin contexto de app)"""
+    response = alineaciones_client.alineaciones(id_partido, id_equipo, deadline=deadline)
+    if response.status_code == 200:
+        return response.json().get('alineaciones', [])
+    if response.status_code == 404:
+        return []
+    raise requests.HTTPError(f'El microservicio respondió {response.status_code}')
+
+
+def _lanzar_alineaciones(id_partido, equipos, deadline=None):
+    """
+    Pide a la vez la alineación de cada equipo (clave → id_equipo)
+
+    Devuelve el Lote sin esperar: el request puede hacer sus consultas
+    locales mientras tanto y luego llamar a _juntar.
+    """
+    plazo = deadline if deadline is not None else fan_out.deadline
+    return fan_out.lanzar({
+        clave: (lambda id_equipo=id_equipo: _alineacion(id_partido, id_equipo, plazo))
+        for clave, id_equipo in equipos.items()
+    }, plazo)
+
+
+def _juntar(lote):
+    """(alineaciones, errores): el lado que falló queda como lista vacía"""
+    alineaciones, errores = {}, {}
+    for clave, resultado in lote.esperar().items():
+        alineaciones[clave] = resultado.valor if resultado.ok else []
+        if not resultado.ok:
+            errores[clave] = resultado.error
+    return alineaciones, errores
 
 # ============================================
 # ORGANIZADOR - OBTENER ALINEACIONES
@@ -38,40 +74,23 @@ def obtener_alineaciones_partido(id_partido):
         if not partido:
             return jsonify({'error': 'Partido no encontrado'}), 404
         
-        # Obtener alineaciones del equipo local
-        response_local = requests.get(
-            f"{MICROSERVICIO_URL}/alineaciones",
-            params={
-                'id_partido': id_partido,
-                'id_equipo': partido.id_equipo_local
-            },
-            timeout=10
-        )
-        
-        # Obtener alineaciones del equipo visitante
-        response_visitante = requests.get(
-            f"{MICROSERVICIO_URL}/alineaciones",
-            params={
-                'id_partido': id_partido,
-                'id_equipo': partido.id_equipo_visitante
-            },
-            timeout=10
-        )
+        # Alineaciones de ambos equipos a la vez
+        lote = _lanzar_alineaciones(id_partido, {
+            'local': partido.id_equipo_local,
+            'visitante': partido.id_equipo_visitante
+        })
         
-        alineacion_local = []
-        alineacion_visitante = []
-        
-        if response_local.status_code == 200:
-            alineacion_local = response_local.json().get('alineaciones', [])
-        
-        if response_visitante.status_code == 200:
-            alineacion_visitante = response_visitante.json().get('alineaciones', [])
-        
-        # Obtener equipos con logos
+        # Obtener equipos con logos (mientras responde el microservicio)
         equipo_local = Equipo.query.get(partido.id_equipo_local)
         equipo_visitante = Equipo.query.get(partido.id_equipo_visitante)
         
-        return jsonify({
+        alineaciones, errores = _juntar(lote)
+        if len(errores) == 2:
+            return jsonify({'error': f"Error al comunicarse con microservicio: {errores['local']}"}), 500
+        alineacion_local = alineaciones['local']
+        alineacion_visitante = alineaciones['visitante']
+        
+        respuesta = {
             'partido': {
                 'id_partido': partido.id_partido,
                 'equipo_local': equipo_local.nombre if equipo_local else 'Equipo Local',
@@ -84,8 +103,12 @@ def obtener_alineaciones_partido(id_partido):
             'alineacion_local': alineacion_local,
             'alineacion_visitante': alineacion_visitante,
             'tiene_alineacion_local': len(alineacion_local) > 0,
-            'tiene_alineacion_visitante': len(alineacion_visitante) > 0
-        }), 200
+            'tiene_alineacion_visitante': len(alineacion_visitante) > 0,
+            'parcial': bool(errores)
+        }
+        if errores:
+            respuesta['errores'] = errores
+        return jsonify(respuesta), 200
         
     except requests.RequestException as e:
         return jsonify({'error': f'Error al comunicarse con microservicio: {str(e)}'}), 500
@@ -118,54 +141,47 @@ def validar_alineaciones_partido(id_partido):
         if not partido:
             return jsonify({'error': 'Partido no encontrado'}), 404
         
-        # Obtener alineaciones del microservicio
-        response_local = requests.get(
-            f"{MICROSERVICIO_URL}/alineaciones",
-            params={
-                'id_partido': id_partido,
-                'id_equipo': partido.id_equipo_local
-            },
-            timeout=10
-        )
-        
-        response_visitante = requests.get(
-            f"{MICROSERVICIO_URL}/alineaciones",
-            params={
-                'id_partido': id_partido,
-                'id_equipo': partido.id_equipo_visitante
-            },
-            timeout=10
-        )
+        # Obtener alineaciones del microservicio (ambos equipos a la vez)
+        lote = _lanzar_alineaciones(id_partido, {
+            'local': partido.id_equipo_local,
+            'visitante': partido.id_equipo_visitante
+        })
         
-        tiene_local = False
-        tiene_visitante = False
+        equipo_local = Equipo.query.get(partido.id_equipo_local)
+        equipo_visitante = Equipo.query.get(partido.id_equipo_visitante)
         
-        if response_local.status_code == 200:
-            alineaciones_local = response_local.json().get('alineaciones', [])
-            titulares_local = [a for a in alineaciones_local if a.get('titular')]
-            tiene_local = len(titulares_local) >= 6  # Mínimo 6 titulares
+        alineaciones, errores = _juntar(lote)
+        if len(errores) == 2:
+            return jsonify({'error': f"Error al comunicarse con microservicio: {errores['local']}"}), 500
         
-        if response_visitante.status_code == 200:
-            alineaciones_visitante = response_visitante.json().get('alineaciones', [])
-            titulares_visitante = [a for a in alineaciones_visitante if a.get('titular')]
-            tiene_visitante = len(titulares_visitante) >= 6
+        # Mínimo 6 titulares
+        tiene_local = len([a for a in alineaciones['local'] if a.get('titular')]) >= 6
+        tiene_visitante = len([a for a in alineaciones['visitante'] if a.get('titular')]) >= 6
         
         puede_iniciar = tiene_local and tiene_visitante
         
         penalizaciones = []
         
-        equipo_local = Equipo.query.get(partido.id_equipo_local)
-        equipo_visitante = Equipo.query.get(partido.id_equipo_visitante)
+        if puede_iniciar:
+            mensaje = 'Ambos equipos tienen alineación'
+        elif errores:
+            mensaje = 'No se pudo consultar la alineación de uno de los equipos'
+        else:
+            mensaje = 'Faltan alineaciones'
         
-        return jsonify({
+        respuesta = {
             'puede_iniciar': puede_iniciar,
             'tiene_alineacion_local': tiene_local,
             'tiene_alineacion_visitante': tiene_visitante,
             'equipo_local': equipo_local.nombre if equipo_local else 'Equipo Local',
             'equipo_visitante': equipo_visitante.nombre if equipo_visitante else 'Equipo Visitante',
             'penalizaciones': penalizaciones,
-            'mensaje': 'Ambos equipos tienen alineación' if puede_iniciar else 'Faltan alineaciones'
-        }), 200
+            'mensaje': mensaje,
+            'parcial': bool(errores)
+        }
+        if errores:
+            respuesta['errores'] = errores
+        return jsonify(respuesta), 200
         
     except requests.RequestException as e:
         return jsonify({'error': f'Error al comunicarse con microservicio: {str(e)}'}), 500
@@ -215,11 +231,11 @@ def definir_alineacion():
         minutos_penalizacion = 0
         
         # Enviar al microservicio
-        response = requests.post(
-            f"{MICROSERVICIO_URL}/alineaciones/definir-alineacion",
+        response = alineaciones_client.post(
+            '/alineaciones/definir-alineacion',
+            endpoint='POST /alineaciones/definir-alineacion',
             json=data,
-            headers={'Authorization': request.headers.get('Authorization')},
-            timeout=10
+            headers={'Authorization': request.headers.get('Authorization')}
         )
         
         if response.status_code in [200, 201]:
@@ -261,38 +277,42 @@ def obtener_alineaciones():
         if not id_partido or not id_equipo:
             return jsonify({'error': 'Faltan parámetros'}), 400
         
-        # Validar que el usuario es líder del equipo
-        equipo = Equipo.query.get(int(id_equipo))
-        if not equipo or equipo.id_lider != usuario.id_usuario:
+        # id_equipo acepta varios separados por coma (p. ej. "3,7")
+        try:
+            ids_equipo = list(dict.fromkeys(int(x) for x in id_equipo.split(',') if x.strip()))
+        except ValueError:
+            return jsonify({'error': 'id_equipo inválido'}), 400
+        if not ids_equipo:
+            return jsonify({'error': 'Faltan parámetros'}), 400
+        
+        # Validar que el usuario es líder de los equipos
+        lidera = {
+            e.id_equipo for e in Equipo.query.filter(Equipo.id_equipo.in_(ids_equipo))
+            if e.id_lider == usuario.id_usuario
+        }
+        if len(lidera) != len(ids_equipo):
             return jsonify({'error': 'No eres líder de este equipo'}), 403
         
-        # Obtener del microservicio
-        try:
-            response = requests.get(
-                f"{MICROSERVICIO_URL}/alineaciones",
-                params={'id_partido': id_partido, 'id_equipo': id_equipo},
-                timeout=5
-            )
-            
-            if response.status_code == 200:
-                return jsonify(response.json()), 200
-            elif response.status_code == 404:
-                return jsonify({'alineaciones': []}), 200
-            else:
-                return jsonify({'alineaciones': []}), 200
-                
-        except requests.exceptions.ConnectionError:
-            return jsonify({'alineaciones': []}), 200
-        except requests.exceptions.Timeout:
-            return jsonify({'alineaciones': []}), 200
-        except Exception as e:
-            print(f"⚠️ Error microservicio: {str(e)}")
-            return jsonify({'alineaciones': []}), 200
+        # Obtener del microservicio, todos los equipos a la vez; si falla queda vacío
+        lote = _lanzar_alineaciones(id_partido, {i: i for i in ids_equipo}, deadline=5)
+        alineaciones, errores = _juntar(lote)
+        for id_equipo_error, error in errores.items():
+            current_app.logger.warning('Error microservicio de alineaciones (equipo %s): %s', id_equipo_error, error)
+        
+        if len(ids_equipo) == 1:
+            return jsonify({'alineaciones': alineaciones[ids_equipo[0]]}), 200
+        
+        respuesta = {
+            'alineaciones': [a for i in ids_equipo for a in alineaciones[i]],
+            'por_equipo': {str(i): alineaciones[i] for i in ids_equipo},
+            'parcial': bool(errores)
+        }
+        if errores:
+            respuesta['errores'] = {str(i): e for i, e in errores.items()}
+        return jsonify(respuesta), 200
             
     except Exception as e:
-        print(f"❌ Error en obtener_alineaciones: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        current_app.logger.exception('Error en obtener_alineaciones')
         return jsonify({'error': str(e), 'alineaciones': []}), 500
 
 
@@ -339,11 +359,11 @@ def hacer_cambio():
             return jsonify({'error': 'No eres líder de este equipo'}), 403
         
         # Enviar al microservicio
-        response = requests.post(
-            f"{MICROSERVICIO_URL}/alineaciones/cambio",
+        response = alineaciones_client.post(
+            '/alineaciones/cambio',
+            endpoint='POST /alineaciones/cambio',
             json=data,
-            headers={'Authorization': request.headers.get('Authorization')},
-            timeout=10
+            headers={'Authorization': request.headers.get('Authorization')}
         )
         
         if response.status_code in [200, 201]:
@@ -12,6 +12,8 @@ from app.middlewares.rate_limit_middleware import rate_limit
 from app.security.token_manager import TokenManager
 from app.security.email_service import EmailService
 from app.security.login_tracker import LoginTracker
+from app.security.login_guard import login_guard
+from app.security.password_hasher import HasherSaturado
 from datetime import datetime
 import secrets
 
@@ -249,6 +251,18 @@ class Login(Resource):
 
             email = data['email'].lower()
 
+            # 0️⃣ IP CON DEMASIADOS FALLOS (credential stuffing): se corta sin tocar la BD
+            ip_status = LoginTracker.is_ip_blocked(ip_address)
+            if ip_status.get('locked'):
+                seconds_remaining = max(int((ip_status['locked_until'] - datetime.utcnow()).total_seconds()), 1)
+                response = make_response(jsonify({
+                    'error': 'Demasiados intentos fallidos',
+                    'mensaje': f'Intenta nuevamente en {seconds_remaining // 60 + 1} min.',
+                    'locked_until': ip_status['locked_until'].isoformat()
+                }), 429)
+                response.headers['Retry-After'] = str(seconds_remaining)
+                return response
+
             # 1️⃣ VERIFICAR SI EL USUARIO EXISTE
             usuario = Usuario.query.filter_by(email=email).first()
 
@@ -322,12 +336,18 @@ class Login(Resource):
                 return make_response(jsonify(response_data), 401)
 
             # 7️⃣ ✅ LOGIN EXITOSO
+            # Auditoría encolada; reset de intentos, último acceso y refresh
+            # token se guardan en el único commit de create_tokens
             LoginTracker.record_attempt(email, True, ip_address, user_agent)
-            LoginTracker.reset_failed_attempts(email)
+            LoginTracker.reset_failed_attempts(email, usuario=usuario, commit=False)
 
             usuario.last_login_at = datetime.utcnow()
             usuario.last_login_ip = ip_address
-            db.session.commit()
+
+            # Hash con costo menor al objetivo (o de otro algoritmo): se rehashea
+            # ahora que tenemos la contraseña en claro y ya verificada
+            if usuario.password_needs_rehash():
+                usuario.set_password(data['contrasena'])
 
             tokens = TokenManager.create_tokens(
                 user_id=usuario.id_usuario,
@@ -346,6 +366,14 @@ class Login(Resource):
                 'usuario': usuario.to_dict()
             }, 200
 
+        except HasherSaturado:
+            db.session.rollback()
+            response = make_response(jsonify({
+                'error': 'Servicio ocupado',
+                'mensaje': 'Demasiados inicios de sesión en curso. Intenta en unos segundos.'
+            }), 503)
+            response.headers['Retry-After'] = '2'
+            return response
         except Exception as e:
             db.session.rollback()
             print(f"❌ ERROR LOGIN: {e}")
@@ -367,8 +395,9 @@ class RefreshToken(Resource):
         try:
             data = auth_ns.payload
 
+            # Se responde directo: un abort dentro del try terminaría como 500
             if not data.get('refresh_token'):
-                auth_ns.abort(400, error='Refresh token requerido')
+                return {'error': 'Refresh token requerido'}, 400
 
             result = TokenManager.refresh_access_token(
                 refresh_token_str=data['refresh_token'],
@@ -377,12 +406,14 @@ class RefreshToken(Resource):
             )
 
             if not result:
-                auth_ns.abort(401, error='Refresh token inválido o expirado')
+                return {'error': 'Refresh token inválido o expirado'}, 401
 
             return {
                 'mensaje': 'Token renovado',
                 'access_token': result['access_token'],
-                'expires_in': result['expires_in']
+                'refresh_token': result['refresh_token'],
+                'expires_in': result['expires_in'],
+                'refresh_expires_in': result['refresh_expires_in']
             }, 200
 
         except Exception as e:
@@ -422,6 +453,7 @@ class UnlockAccount(Resource):
             usuario.failed_login_attempts = 0
             usuario.locked_until = None
             db.session.commit()
+            login_guard.limpiar(usuario.email)
             
             return {'mensaje': '✅ Cuenta desbloqueada', 'info': 'Ya puedes iniciar sesión'}, 200
             
@@ -443,6 +475,12 @@ class Logout(Resource):
             jwt_data = get_jwt()
             current_user_id = int(get_jwt_identity())
             TokenManager.revoke_token(jwt_data['jti'], 'access', current_user_id, 'logout')
+
+            # Si el cliente manda su refresh token, se cierra también esa sesión
+            refresh_token_str = (request.get_json(silent=True) or {}).get('refresh_token')
+            if refresh_token_str:
+                TokenManager.revoke_refresh_token(refresh_token_str, current_user_id)
+
             return {'mensaje': 'Logout exitoso'}, 200
         except Exception as e:
             auth_ns.abort(500, error=str(e))
@@ -583,10 +621,11 @@ class SuperAdminOrganizadores(Resource):
             db.session.add(nuevo_organizador)
             db.session.commit()
             
-            # Enviar correo con credenciales
-            email_enviado = False
+            # Enviar correo con credenciales (queda en la outbox; el envío
+            # real lo hace el worker y todavía puede fallar)
+            outbox = None
             try:
-                email_enviado = EmailService.send_organizador_credentials(
+                outbox = EmailService.send_organizador_credentials(
                     email=email,
                     nombre=data['nombre'],
                     contrasena=contrasena_temporal,
@@ -594,6 +633,8 @@ class SuperAdminOrganizadores(Resource):
                 )
             except Exception as e:
                 print(f"⚠️ Error enviando email: {str(e)}")
+            entrega = EmailService.estado_entrega(outbox)
+            email_enviado = bool(entrega) and entrega['estado'] == 'enviado'
             
             SecurityLog.log_event(
                 event_type='login_success',
@@ -608,8 +649,12 @@ class SuperAdminOrganizadores(Resource):
                 'mensaje': 'Organizador creado exitosamente',
                 'organizador': nuevo_organizador.to_dict(),
                 'email_enviado': email_enviado,
+                'email_outbox': entrega,
+                # Hasta que la outbox confirme el envío la contraseña se devuelve
                 'contrasena_temporal': contrasena_temporal if not email_enviado else None,
-                'info': '📧 Se enviaron las credenciales por correo' if email_enviado else '⚠️ No se pudo enviar el correo, entrega la contrasena manualmente'
+                'info': '📧 Se enviaron las credenciales por correo' if email_enviado
+                        else '📨 Correo en cola; si no llega, entrega la contrasena manualmente' if entrega
+                        else '⚠️ No se pudo enviar el correo, entrega la contrasena manualmente'
             }, 201
             
         except Exception as e:
@@ -696,12 +741,13 @@ class SuperAdminReenviarCredenciales(Resource):
             # Generar nueva contrasena
             nueva_contrasena = secrets.token_urlsafe(12)
             organizador.set_password(nueva_contrasena)
+            TokenManager.revoke_all_user_tokens(organizador.id_usuario, reason='password_change', commit=False)
             db.session.commit()
             
-            # Enviar correo
-            email_enviado = False
+            # Enviar correo (queda en la outbox hasta que el worker lo envíe)
+            outbox = None
             try:
-                email_enviado = EmailService.send_organizador_credentials(
+                outbox = EmailService.send_organizador_credentials(
                     email=organizador.email,
                     nombre=organizador.nombre,
                     contrasena=nueva_contrasena,
@@ -709,10 +755,13 @@ class SuperAdminReenviarCredenciales(Resource):
                 )
             except Exception as e:
                 print(f"⚠️ Error enviando email: {str(e)}")
+            entrega = EmailService.estado_entrega(outbox)
+            email_enviado = bool(entrega) and entrega['estado'] == 'enviado'
             
             return {
                 'mensaje': 'Credenciales regeneradas',
                 'email_enviado': email_enviado,
+                'email_outbox': entrega,
                 'contrasena_temporal': nueva_contrasena if not email_enviado else None
             }, 200
             
@@ -823,6 +872,9 @@ class ResetPassword(Resource):
             usuario.failed_login_attempts = 0
             usuario.locked_until = None
             
+            # Cerrar las sesiones abiertas con la contraseña anterior
+            TokenManager.revoke_all_user_tokens(usuario.id_usuario, reason='password_change', commit=False)
+            
             db.session.commit()
             
             return {
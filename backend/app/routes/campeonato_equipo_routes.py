@@ -7,6 +7,7 @@ from app.models.campeonato_equipo import CampeonatoEquipo
 from app.models.campeonato import Campeonato
 from app.models.equipo import Equipo
 from app.models.historial_estado import HistorialEstado
+from app.utils.serializers import serializar_inscripciones
 from datetime import datetime
 
 inscripcion_ns = Namespace('inscripciones', description='Gestión de inscripciones de equipos en campeonatos')
@@ -32,7 +33,7 @@ inscripcion_output_model = inscripcion_ns.model('InscripcionOutput', {
     'fecha_inscripcion': fields.DateTime(description='Fecha de inscripción'),
     'estado_inscripcion': fields.String(description='Estado de la inscripción'),
     'observaciones': fields.String(description='Observaciones'),
-    'nombre_grupo': fields.String(description='Grupo asignado (A, B, C...)'),
+    'nombre_grupo': fields.String(attribute='grupo', description='Grupo asignado (A, B, C...)'),
     'numero_sorteo': fields.Integer(description='Número de sorteo')
 })
 
@@ -146,7 +147,7 @@ class InscripcionList(Resource):
             if estado:
                 query = query.filter_by(estado_inscripcion=estado)
             if nombre_grupo:
-                query = query.filter_by(nombre_grupo=nombre_grupo.upper())
+                query = query.filter_by(grupo=nombre_grupo.upper())
             if buscar:
                 query = query.join(Equipo).join(Campeonato).filter(
                     db.or_(
@@ -157,12 +158,12 @@ class InscripcionList(Resource):
 
             # Ordenar
             if ordenar_por == 'nombre_grupo':
-                query = query.order_by(CampeonatoEquipo.nombre_grupo.desc() if orden == 'desc' else CampeonatoEquipo.nombre_grupo.asc())
+                query = query.order_by(CampeonatoEquipo.grupo.desc() if orden == 'desc' else CampeonatoEquipo.grupo.asc())
             else:
                 query = query.order_by(CampeonatoEquipo.fecha_inscripcion.desc() if orden == 'desc' else CampeonatoEquipo.fecha_inscripcion.asc())
 
             inscripciones = query.all()
-            return [i.to_dict() for i in inscripciones], 200
+            return serializar_inscripciones(inscripciones), 200
 
         except Exception as e:
             inscripcion_ns.abort(500, error=str(e))
@@ -303,7 +304,7 @@ class InscripcionesPorCampeonato(Resource):
                 'total_inscripciones': len(inscripciones),
                 'total_aprobados': len([i for i in inscripciones if i.estado_inscripcion == 'aprobado']),
                 'total_pendientes': len([i for i in inscripciones if i.estado_inscripcion == 'pendiente']),
-                'inscripciones': [i.to_dict(include_equipo=True) for i in inscripciones]  # ← IMPORTANTE
+                'inscripciones': serializar_inscripciones(inscripciones, include_equipo=True)  # ← IMPORTANTE
             }, 200
 
         except Exception as e:
@@ -327,7 +328,7 @@ class InscripcionesPorEquipo(Resource):
             return {
                 'equipo': equipo.nombre,
                 'total_inscripciones': len(inscripciones),
-                'inscripciones': [i.to_dict() for i in inscripciones]
+                'inscripciones': serializar_inscripciones(inscripciones)
             }, 200
 
         except Exception as e:
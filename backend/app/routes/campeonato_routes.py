@@ -1,6 +1,6 @@
 from flask import request
 from flask_restx import Namespace, fields, Resource
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.middlewares.auth_middleware import role_required
 from app.extensions import db
 from app.models.campeonato import Campeonato
@@ -8,7 +8,13 @@ from app.models.campeonato_equipo import CampeonatoEquipo
 from app.models.equipo import Equipo
 from app.models.partido import Partido
 from app.models.historial_estado import HistorialEstado
-from itertools import combinations
+from app.models.llave import Llave
+from app.cache import response_cache
+from app.utils.serializers import serializar_campeonatos, serializar_partidos, serializar_equipos, serializar_inscripciones
+from app.services.fixture_service import FixtureService
+from app.services.llaves_service import LlavesService
+from app.utils.subidas import limite_subida
+from werkzeug.exceptions import RequestEntityTooLarge
 from datetime import datetime, timedelta
 import random
 import string
@@ -56,7 +62,11 @@ generar_partidos_model = campeonato_ns.model('GenerarPartidos', {
     'dias_entre_jornadas': fields.Integer(description='Días entre jornadas', example=7),
     'hora_inicio': fields.String(description='Hora del primer partido', example='15:00'),
     'hora_segundo_partido': fields.String(description='Hora del segundo partido', example='17:00'),
-    'incluir_vuelta': fields.Boolean(description='Incluir partidos de vuelta', example=True)
+    'incluir_vuelta': fields.Boolean(description='Incluir partidos de vuelta', example=True),
+    'franjas_horarias': fields.List(fields.String, description='Horarios disponibles por día (reemplaza hora_inicio/hora_segundo_partido)', example=['15:00', '17:00', '19:00']),
+    'max_partidos_por_franja': fields.Integer(min=1, description='Partidos simultáneos permitidos por franja (sin límite si se omite)', example=2),
+    'sedes': fields.List(fields.String, description='Sedes para los locales que no tienen estadio (se rotan)', example=['Cancha Municipal']),
+    'dry_run': fields.Boolean(description='Solo previsualizar el fixture, sin guardar', example=False)
 })
 
 inscripcion_input_model = campeonato_ns.model('InscripcionInput', {
@@ -72,6 +82,17 @@ sorteo_grupos_model = campeonato_ns.model('SorteoGrupos', {
     'numero_grupos': fields.Integer(required=True, description='Número de grupos (A, B, C...)', example=4, min=2, max=8)
 })
 
+generar_llaves_model = campeonato_ns.model('GenerarLlaves', {
+    'fecha_inicio': fields.String(required=True, description='Fecha de la primera ronda (YYYY-MM-DD)', example='2025-03-01'),
+    'hora': fields.String(description='Hora de los partidos', example='15:00'),
+    'dias_entre_rondas': fields.Integer(description='Días entre rondas', example=7),
+    'clasificados_por_grupo': fields.Integer(description='Equipos que pasan de cada grupo (mixto)', example=2, min=1)
+})
+
+desempate_model = campeonato_ns.model('DesempateLlave', {
+    'id_equipo': fields.Integer(required=True, description='Equipo que gana la llave empatada (penales)', example=3)
+})
+
 campeonato_output_model = campeonato_ns.model('CampeonatoOutput', {
     'id_campeonato': fields.Integer(description='ID del campeonato'),
     'nombre': fields.String(description='Nombre del campeonato'),
@@ -233,7 +254,7 @@ class CampeonatoList(Resource):
                 query = query.order_by(Campeonato.fecha_creacion.desc() if orden == 'desc' else Campeonato.fecha_creacion.asc())
 
             campeonatos = query.all()
-            return [c.to_dict() for c in campeonatos], 200
+            return serializar_campeonatos(campeonatos), 200
 
         except Exception as e:
             campeonato_ns.abort(500, error=str(e))
@@ -335,12 +356,12 @@ class CampeonatoLogo(Resource):
     @campeonato_ns.doc(description='Subir logo del campeonato', security='Bearer')
     @jwt_required()
     @role_required(['admin'])
+    @limite_subida(5 * 1024 * 1024)
     def post(self, id_campeonato):
         """Subir logo de campeonato"""
         try:
-            from werkzeug.utils import secure_filename
-            import os
-            import uuid
+            from app.services.imagen_service import ImagenService
+            from app.services.imagen_worker import imagen_worker
             
             campeonato = Campeonato.query.get(id_campeonato)
             if not campeonato:
@@ -359,41 +380,69 @@ class CampeonatoLogo(Resource):
             if not ('.' in file.filename and file.filename.rsplit('.', 1)[1].lower() in allowed_extensions):
                 campeonato_ns.abort(400, error='Formato no permitido. Use PNG, JPG, JPEG o GIF')
             
-            # Validar tamaño (máximo 5MB)
-            file.seek(0, os.SEEK_END)
-            file_size = file.tell()
-            file.seek(0)
-            
-            if file_size > 5 * 1024 * 1024:
-                campeonato_ns.abort(400, error='El archivo es muy grande. Máximo 5MB')
-            
-            # Crear carpeta si no existe
-            upload_folder = 'uploads/logos'
-            os.makedirs(upload_folder, exist_ok=True)
-            
-            # Generar nombre único
-            ext = file.filename.rsplit('.', 1)[1].lower()
-            filename = f"campeonato_{id_campeonato}_{uuid.uuid4().hex}.{ext}"
-            filepath = os.path.join(upload_folder, filename)
-            
-            # Guardar archivo
-            file.save(filepath)
+            # Guardar por contenido (máximo 5MB, controlado al recibir); las miniaturas se generan en segundo plano
+            try:
+                ruta = ImagenService.guardar_original(file)
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            imagen_worker.encolar(ruta)
             
             # Actualizar logo_url en el campeonato
-            logo_url = f"http://localhost:5000/uploads/logos/{filename}"
+            logo_url = f"http://localhost:5000/uploads/{ruta}"
             campeonato.logo_url = logo_url
             db.session.commit()
             
             return {
                 'mensaje': 'Logo subido exitosamente',
-                'logo_url': logo_url
+                'logo_url': logo_url,
+                'logo_urls': ImagenService.variantes(logo_url)
             }, 200
             
+        except RequestEntityTooLarge as e:
+            db.session.rollback()
+            return {'error': e.description}, 413
         except Exception as e:
             db.session.rollback()
             campeonato_ns.abort(500, error=str(e))
 
 
+@campeonato_ns.route('/<int:id_campeonato>/documentos/zip')
+@campeonato_ns.param('id_campeonato', 'ID del campeonato')
+class CampeonatoDocumentosZip(Resource):
+    @campeonato_ns.doc(
+        description='Descargar en un ZIP los documentos y fotos de los jugadores de todos los equipos aprobados (con manifest.csv)',
+        security='Bearer'
+    )
+    @jwt_required()
+    @role_required(['admin', 'superadmin'])
+    def get(self, id_campeonato):
+        """Exporta los documentos de los equipos aprobados del campeonato"""
+        from flask import Response
+        from app.services.exportacion_documentos_service import ExportacionDocumentosService
+
+        try:
+            campeonato = Campeonato.query.get(id_campeonato)
+            if not campeonato:
+                return {'error': 'Campeonato no encontrado'}, 404
+
+            # Documentos de identidad: solo el organizador del campeonato (o un superadmin)
+            if get_jwt().get('rol') != 'superadmin' and campeonato.creado_por != int(get_jwt_identity()):
+                return {'error': 'No tienes permiso para descargar los documentos de este campeonato'}, 403
+
+            entradas = ExportacionDocumentosService.entradas_campeonato(id_campeonato)
+            return Response(
+                ExportacionDocumentosService.generar_zip(entradas),
+                mimetype='application/zip',
+                headers={
+                    'Content-Disposition': f'attachment; filename="documentos_campeonato_{id_campeonato}.zip"',
+                    'X-Accel-Buffering': 'no'
+                }
+            )
+
+        except Exception as e:
+            campeonato_ns.abort(500, error=str(e))
+
+
 @campeonato_ns.route('/<int:id_campeonato>/estado')
 @campeonato_ns.param('id_campeonato', 'ID del campeonato')
 class CampeonatoEstado(Resource):
@@ -510,7 +559,7 @@ class InscripcionList(Resource):
             return {
                 'campeonato': campeonato.nombre,
                 'total_inscripciones': len(inscripciones),
-                'inscripciones': [i.to_dict() for i in inscripciones]
+                'inscripciones': serializar_inscripciones(inscripciones)
             }, 200
 
         except Exception as e:
@@ -597,7 +646,7 @@ class SorteoGrupos(Resource):
 
             for i, inscripcion in enumerate(equipos_aprobados):
                 grupo_index = i // equipos_por_grupo if i < (numero_grupos * equipos_por_grupo) else numero_grupos - 1
-                inscripcion.nombre_grupo = letras_grupos[grupo_index]
+                inscripcion.grupo = letras_grupos[grupo_index]
                 inscripcion.numero_sorteo = i + 1
 
             db.session.commit()
@@ -605,7 +654,7 @@ class SorteoGrupos(Resource):
             # Agrupar resultados
             resultados = {}
             for inscripcion in equipos_aprobados:
-                grupo = inscripcion.nombre_grupo
+                grupo = inscripcion.grupo
                 if grupo not in resultados:
                     resultados[grupo] = []
                 resultados[grupo].append({
@@ -648,85 +697,206 @@ class GenerarPartidos(Resource):
 
             data = campeonato_ns.payload
 
-            # Obtener equipos aprobados
-            inscripciones = campeonato.equipos_inscritos.filter_by(estado_inscripcion='aprobado').all()
-            equipos = [i.equipo for i in inscripciones]
+            # Obtener equipos aprobados (en el orden del sorteo, si lo hubo)
+            filas_equipos = db.session.query(Equipo, CampeonatoEquipo.grupo).join(
+                CampeonatoEquipo, CampeonatoEquipo.id_equipo == Equipo.id_equipo
+            ).filter(
+                CampeonatoEquipo.id_campeonato == id_campeonato,
+                CampeonatoEquipo.estado_inscripcion == 'aprobado'
+            ).order_by(CampeonatoEquipo.numero_sorteo, CampeonatoEquipo.id).all()
+            equipos = [equipo for equipo, _ in filas_equipos]
 
             if len(equipos) < 2:
                 campeonato_ns.abort(400, error='Se necesitan al menos 2 equipos aprobados')
 
-            fecha_inicio = datetime.strptime(data['fecha_inicio'], '%Y-%m-%d').date()
+            # Eliminación directa: el fixture es el cuadro de llaves
+            if campeonato.tipo_competicion == 'eliminacion_directa':
+                if data.get('dry_run'):
+                    campeonato_ns.abort(400, error='La vista previa solo está disponible para ligas y fase de grupos')
+                try:
+                    fecha_inicio = datetime.strptime(data['fecha_inicio'], '%Y-%m-%d').date()
+                    hora = FixtureService.parsear_franjas([data.get('hora_inicio', '15:00')])[0]
+                    LlavesService.generar_cuadro(
+                        id_campeonato,
+                        LlavesService.semillas_desde_sorteo(id_campeonato),
+                        fecha_inicio,
+                        hora,
+                        dias_entre_rondas=data.get('dias_entre_jornadas', 7)
+                    )
+                except ValueError as e:
+                    campeonato_ns.abort(400, error=str(e))
+
+                campeonato.partidos_generados = True
+                campeonato.fecha_generacion_partidos = datetime.utcnow()
+                db.session.commit()
+
+                return {
+                    'mensaje': 'Cuadro eliminatorio generado exitosamente',
+                    'total_equipos': len(equipos),
+                    'cuadro': LlavesService.obtener_cuadro(id_campeonato)
+                }, 201
+
+            # Mixto: todos contra todos dentro de cada grupo del sorteo
+            grupos = {}
+            if campeonato.tipo_competicion == 'mixto':
+                for equipo, grupo in filas_equipos:
+                    if grupo:
+                        grupos.setdefault(grupo, []).append(equipo.id_equipo)
+                if not grupos:
+                    campeonato_ns.abort(400, error='Primero realiza el sorteo de grupos')
+                equipos = [equipo for equipo, grupo in filas_equipos if grupo]
+
+            try:
+                fecha_inicio = datetime.strptime(data['fecha_inicio'], '%Y-%m-%d').date()
+                franjas = FixtureService.parsear_franjas(
+                    data.get('franjas_horarias') or [data.get('hora_inicio', '15:00'), data.get('hora_segundo_partido', '17:00')]
+                )
+            except ValueError as e:
+                campeonato_ns.abort(400, error=str(e))
+
             dias_entre_jornadas = data.get('dias_entre_jornadas', 7)
-            hora_inicio = data.get('hora_inicio', '15:00')
-            hora_segundo = data.get('hora_segundo_partido', '17:00')
             incluir_vuelta = data.get('incluir_vuelta', True)
+            dry_run = data.get('dry_run', False)
 
-            partidos_creados = []
-            jornada = 1
-            fecha_actual = fecha_inicio
-
-            # Generar combinaciones
-            combinaciones = list(combinations(equipos, 2))
-            partidos_por_jornada = len(equipos) // 2
-
-            # IDA
-            for i in range(0, len(combinaciones), partidos_por_jornada):
-                partidos_jornada = combinaciones[i:i + partidos_por_jornada]
-
-                for idx, (equipo_local, equipo_visitante) in enumerate(partidos_jornada):
-                    hora = hora_inicio if idx % 2 == 0 else hora_segundo
-                    fecha_hora = datetime.combine(fecha_actual, datetime.strptime(hora, '%H:%M').time())
-
-                    nuevo_partido = Partido(
-                        id_campeonato=id_campeonato,
-                        id_equipo_local=equipo_local.id_equipo,
-                        id_equipo_visitante=equipo_visitante.id_equipo,
-                        fecha_partido=fecha_hora,
-                        lugar=equipo_local.estadio,
-                        jornada=jornada,
-                        estado='programado'
-                    )
+            if grupos:
+                jornadas = FixtureService.round_robin_grupos(grupos, incluir_vuelta)
+            else:
+                jornadas = FixtureService.round_robin([e.id_equipo for e in equipos], incluir_vuelta)
+            filas, descansos = FixtureService.programar(
+                jornadas,
+                fecha_inicio,
+                franjas,
+                dias_entre_jornadas=dias_entre_jornadas,
+                sedes_por_equipo={e.id_equipo: e.estadio for e in equipos},
+                sedes=data.get('sedes'),
+                max_partidos_por_franja=data.get('max_partidos_por_franja')
+            )
 
-                    db.session.add(nuevo_partido)
-                    partidos_creados.append(nuevo_partido)
+            resumen = {
+                'total_equipos': len(equipos),
+                'total_jornadas': len(jornadas),
+                'total_partidos': len(filas)
+            }
+
+            if dry_run:
+                nombres = {e.id_equipo: e.nombre for e in equipos}
+                grupo_de = {e.id_equipo: g for e, g in filas_equipos}
+                preview = {}
+                for fila in filas:
+                    preview.setdefault(fila['jornada'], []).append({
+                        'grupo': grupo_de.get(fila['id_equipo_local']) if grupos else None,
+                        'id_equipo_local': fila['id_equipo_local'],
+                        'equipo_local': nombres[fila['id_equipo_local']],
+                        'id_equipo_visitante': fila['id_equipo_visitante'],
+                        'equipo_visitante': nombres[fila['id_equipo_visitante']],
+                        'fecha_partido': fila['fecha_partido'].isoformat(),
+                        'lugar': fila['lugar']
+                    })
+                return {
+                    'mensaje': 'Vista previa del fixture (no se guardó nada)',
+                    **resumen,
+                    'jornadas': [{
+                        'jornada': numero,
+                        'descansan': [nombres[i] for i in descansos.get(numero, [])],
+                        'partidos': partidos
+                    } for numero, partidos in sorted(preview.items())]
+                }, 200
+
+            FixtureService.insertar(id_campeonato, filas)
+            campeonato.partidos_generados = True
+            campeonato.fecha_generacion_partidos = datetime.utcnow()
+            db.session.commit()
 
-                jornada += 1
-                fecha_actual += timedelta(days=dias_entre_jornadas)
+            return {
+                'mensaje': 'Partidos generados exitosamente',
+                **resumen
+            }, 201
 
-            # VUELTA
-            if incluir_vuelta:
-                for i in range(0, len(combinaciones), partidos_por_jornada):
-                    partidos_jornada = combinaciones[i:i + partidos_por_jornada]
+        except Exception as e:
+            db.session.rollback()
+            campeonato_ns.abort(500, error=str(e))
 
-                    for idx, (equipo_visitante, equipo_local) in enumerate(partidos_jornada):
-                        hora = hora_inicio if idx % 2 == 0 else hora_segundo
-                        fecha_hora = datetime.combine(fecha_actual, datetime.strptime(hora, '%H:%M').time())
 
-                        nuevo_partido = Partido(
-                            id_campeonato=id_campeonato,
-                            id_equipo_local=equipo_local.id_equipo,
-                            id_equipo_visitante=equipo_visitante.id_equipo,
-                            fecha_partido=fecha_hora,
-                            lugar=equipo_local.estadio,
-                            jornada=jornada,
-                            estado='programado'
-                        )
+# ============================================
+# FASE DE GRUPOS Y CUADRO ELIMINATORIO
+# ============================================
 
-                        db.session.add(nuevo_partido)
-                        partidos_creados.append(nuevo_partido)
+@campeonato_ns.route('/<int:id_campeonato>/grupos/posiciones')
+@campeonato_ns.param('id_campeonato', 'ID del campeonato')
+class PosicionesGrupos(Resource):
+    @campeonato_ns.doc(description='Tabla de posiciones de cada grupo (fase de grupos)')
+    @response_cache.cached(tags=lambda id_campeonato: [f'campeonato:{id_campeonato}'])
+    def get(self, id_campeonato):
+        try:
+            campeonato = Campeonato.query.get(id_campeonato)
+            if not campeonato:
+                campeonato_ns.abort(404, error='Campeonato no encontrado')
 
-                    jornada += 1
-                    fecha_actual += timedelta(days=dias_entre_jornadas)
+            return {
+                'id_campeonato': id_campeonato,
+                'grupos': LlavesService.posiciones_por_grupo(id_campeonato),
+                'partidos_pendientes': LlavesService.partidos_grupo_pendientes(id_campeonato)
+            }, 200
+        except Exception as e:
+            campeonato_ns.abort(500, error=str(e))
+
+
+@campeonato_ns.route('/<int:id_campeonato>/llaves')
+@campeonato_ns.param('id_campeonato', 'ID del campeonato')
+class CuadroLlaves(Resource):
+    @campeonato_ns.doc(description='Cuadro de la fase eliminatoria (rondas, llaves y campeón)')
+    @response_cache.cached(tags=lambda id_campeonato: [f'campeonato:{id_campeonato}'])
+    def get(self, id_campeonato):
+        try:
+            return {'id_campeonato': id_campeonato, **LlavesService.obtener_cuadro(id_campeonato)}, 200
+        except Exception as e:
+            campeonato_ns.abort(500, error=str(e))
+
+
+@campeonato_ns.route('/<int:id_campeonato>/llaves/generar')
+@campeonato_ns.param('id_campeonato', 'ID del campeonato')
+class GenerarLlaves(Resource):
+    @campeonato_ns.doc(description='Generar el cuadro eliminatorio desde la fase de grupos (mixto) o el sorteo (solo admin)', security='Bearer')
+    @campeonato_ns.expect(generar_llaves_model, validate=True)
+    @jwt_required()
+    @role_required(['admin'])
+    def post(self, id_campeonato):
+        try:
+            campeonato = Campeonato.query.get(id_campeonato)
+            if not campeonato:
+                campeonato_ns.abort(404, error='Campeonato no encontrado')
+
+            if campeonato.tipo_competicion == 'liga':
+                campeonato_ns.abort(400, error='Un campeonato de liga no tiene fase eliminatoria')
+
+            data = campeonato_ns.payload
+
+            try:
+                fecha_inicio = datetime.strptime(data['fecha_inicio'], '%Y-%m-%d').date()
+                hora = FixtureService.parsear_franjas([data.get('hora', '15:00')])[0]
+
+                if campeonato.tipo_competicion == 'mixto':
+                    if LlavesService.partidos_grupo_pendientes(id_campeonato):
+                        campeonato_ns.abort(400, error='La fase de grupos todavía tiene partidos sin terminar')
+                    semillas = LlavesService.semillas_desde_grupos(
+                        id_campeonato, data.get('clasificados_por_grupo', 2)
+                    )
+                else:
+                    semillas = LlavesService.semillas_desde_sorteo(id_campeonato)
+
+                LlavesService.generar_cuadro(
+                    id_campeonato, semillas, fecha_inicio, hora,
+                    dias_entre_rondas=data.get('dias_entre_rondas', 7)
+                )
+            except ValueError as e:
+                campeonato_ns.abort(400, error=str(e))
 
-            campeonato.partidos_generados = True
-            campeonato.fecha_generacion_partidos = datetime.utcnow()
             db.session.commit()
 
             return {
-                'mensaje': 'Partidos generados exitosamente',
-                'total_equipos': len(equipos),
-                'total_jornadas': jornada - 1,
-                'total_partidos': len(partidos_creados)
+                'mensaje': 'Cuadro eliminatorio generado exitosamente',
+                'clasificados': len(semillas),
+                'cuadro': LlavesService.obtener_cuadro(id_campeonato)
             }, 201
 
         except Exception as e:
@@ -734,6 +904,33 @@ class GenerarPartidos(Resource):
             campeonato_ns.abort(500, error=str(e))
 
 
+@campeonato_ns.route('/<int:id_campeonato>/llaves/<int:id_llave>/desempate')
+@campeonato_ns.param('id_campeonato', 'ID del campeonato')
+@campeonato_ns.param('id_llave', 'ID de la llave')
+class DesempateLlave(Resource):
+    @campeonato_ns.doc(description='Definir el ganador de una llave que terminó empatada (solo admin)', security='Bearer')
+    @campeonato_ns.expect(desempate_model, validate=True)
+    @jwt_required()
+    @role_required(['admin'])
+    def post(self, id_campeonato, id_llave):
+        try:
+            llave = Llave.query.filter_by(id_llave=id_llave, id_campeonato=id_campeonato).first()
+            if not llave:
+                campeonato_ns.abort(404, error='Llave no encontrada')
+
+            try:
+                LlavesService.definir_desempate(llave, campeonato_ns.payload['id_equipo'])
+            except ValueError as e:
+                campeonato_ns.abort(400, error=str(e))
+
+            db.session.commit()
+            return {'mensaje': 'Ganador de la llave definido', 'llave': llave.to_dict()}, 200
+
+        except Exception as e:
+            db.session.rollback()
+            campeonato_ns.abort(500, error=str(e))
+
+
 @campeonato_ns.route('/<int:id_campeonato>/partidos')
 @campeonato_ns.param('id_campeonato', 'ID del campeonato')
 class CampeonatoPartidos(Resource):
@@ -748,7 +945,7 @@ class CampeonatoPartidos(Resource):
             return {
                 'campeonato': campeonato.nombre,
                 'total_partidos': len(partidos),
-                'partidos': [p.to_dict() for p in partidos]
+                'partidos': serializar_partidos(partidos)
             }, 200
         except Exception as e:
             campeonato_ns.abort(500, error=str(e))
@@ -779,19 +976,8 @@ class MisCampeonatos(Resource):
             # Ordenar por fecha de creación (más recientes primero)
             campeonatos = query.order_by(Campeonato.fecha_creacion.desc()).all()
             
-            # Convertir a diccionarios con información adicional
-            resultado = []
-            for campeonato in campeonatos:
-                campeonato_dict = campeonato.to_dict()
-                
-                # Contar equipos inscritos y pendientes
-                total_inscritos = campeonato.equipos_inscritos.filter_by(estado_inscripcion='aprobado').count()
-                total_pendientes = campeonato.equipos_inscritos.filter_by(estado_inscripcion='pendiente').count()
-                
-                campeonato_dict['total_equipos_inscritos'] = total_inscritos
-                campeonato_dict['total_equipos_pendientes'] = total_pendientes
-                
-                resultado.append(campeonato_dict)
+            # Convertir a diccionarios (los conteos de inscritos y pendientes se calculan en lote)
+            resultado = serializar_campeonatos(campeonatos)
             
             return resultado, 200
             
@@ -858,7 +1044,7 @@ class InscripcionesPaginadas(Resource):
 
             return {
                 'campeonato': campeonato.nombre,
-                'inscripciones': [i.to_dict() for i in inscripciones],
+                'inscripciones': serializar_inscripciones(inscripciones),
                 'total': total,
                 'pagina_actual': pagina,
                 'total_paginas': (total + limite - 1) // limite,
@@ -882,6 +1068,7 @@ class CampeonatosPublicos(Resource):
             'buscar': 'Buscar por nombre'
         }
     )
+    @response_cache.cached(tags=lambda: ['campeonatos'])
     @campeonato_ns.marshal_list_with(campeonato_output_model, code=200, envelope='campeonatos')
     def get(self):
         """Obtener campeonatos públicos disponibles para inscripción"""
@@ -918,7 +1105,7 @@ class CampeonatosPublicos(Resource):
             # Ordenar por fecha de inicio
             campeonatos = query.order_by(Campeonato.fecha_inicio.asc()).all()
             
-            return [c.to_dict() for c in campeonatos], 200
+            return serializar_campeonatos(campeonatos), 200
 
         except Exception as e:
             campeonato_ns.abort(500, error=f'Error al obtener campeonatos públicos: {str(e)}')
@@ -930,6 +1117,7 @@ class BuscarPorCodigo(Resource):
         description='Buscar campeonato por código de inscripción',
         params={'codigo': 'Código de inscripción del campeonato'}
     )
+    @response_cache.cached(tags=lambda: ['campeonatos'])
     @campeonato_ns.marshal_with(campeonato_output_model, code=200, envelope='campeonato')
     def get(self):
         """Buscar campeonato privado por código de inscripción"""
@@ -1033,9 +1221,8 @@ class EquiposInscritos(Resource):
 
             # Formatear respuesta con datos completos del equipo
             equipos_data = []
-            for inscripcion in inscripciones:
-                equipo = inscripcion.equipo
-                equipo_dict = equipo.to_dict()
+            equipos_dicts = serializar_equipos([inscripcion.equipo for inscripcion in inscripciones])
+            for inscripcion, equipo_dict in zip(inscripciones, equipos_dicts):
                 equipo_dict['inscripcion'] = {
                     'id_inscripcion': inscripcion.id,
                     'estado_inscripcion': inscripcion.estado_inscripcion,
@@ -1095,9 +1282,8 @@ class EquiposInscritos(Resource):
 
             # Formatear respuesta con datos completos del equipo
             equipos_data = []
-            for inscripcion in inscripciones:
-                equipo = inscripcion.equipo
-                equipo_dict = equipo.to_dict()
+            equipos_dicts = serializar_equipos([inscripcion.equipo for inscripcion in inscripciones])
+            for inscripcion, equipo_dict in zip(inscripciones, equipos_dicts):
                 equipo_dict['inscripcion'] = {
                     'id_inscripcion': inscripcion.id,
                     'estado_inscripcion': inscripcion.estado_inscripcion,
@@ -8,6 +8,7 @@ from app.models.usuario import Usuario
 from app.models.historial_estado import HistorialEstado
 from app.models.campeonato import Campeonato
 from app.models.campeonato_equipo import CampeonatoEquipo
+from app.utils.serializers import serializar_equipos
 from datetime import datetime
 
 equipo_ns = Namespace('equipos', description='Gestión de equipos de fútbol')
@@ -48,6 +49,7 @@ equipo_output_model = equipo_ns.model('EquipoOutput', {
     'id_equipo': fields.Integer(description='ID del equipo'),
     'nombre': fields.String(description='Nombre del equipo'),
     'logo_url': fields.String(description='URL del logo'),
+    'logo_urls': fields.Raw(description='Miniaturas del logo: 64/128/512 px y webp'),
     'estadio': fields.String(description='Nombre del estadio'),
     'max_jugadores': fields.Integer(description='Máximo de jugadores'),
     'tipo_deporte': fields.String(description='Tipo de deporte'),
@@ -117,7 +119,7 @@ class EquipoList(Resource):
                 query = query.order_by(Equipo.fecha_registro.desc() if orden == 'desc' else Equipo.fecha_registro.asc())
 
             equipos = query.all()
-            return [e.to_dict() for e in equipos], 200
+            return serializar_equipos(equipos), 200
 
         except Exception as e:
             equipo_ns.abort(500, error=str(e))
@@ -307,7 +309,7 @@ class MisEquipos(Resource):
         try:
             current_user_id = get_jwt_identity()
             equipos = Equipo.query.filter_by(id_lider=int(current_user_id)).all()
-            return [e.to_dict() for e in equipos], 200
+            return serializar_equipos(equipos), 200
         except Exception as e:
             equipo_ns.abort(500, error=str(e))
 
@@ -2,6 +2,8 @@ from flask import request
 from flask_restx import Namespace, fields, Resource
 from app.extensions import db
 from sqlalchemy import text
+from app.cache import response_cache
+from app.services.imagen_service import ImagenService
 
 estadisticas_ns = Namespace('estadisticas', description='Estadísticas y reportes del campeonato')
 
@@ -14,6 +16,7 @@ posicion_model = estadisticas_ns.model('Posicion', {
     'id_equipo': fields.Integer(description='ID del equipo'),
     'equipo': fields.String(description='Nombre del equipo'),
     'logo_url': fields.String(description='URL del logo'),
+    'logo_urls': fields.Raw(description='Miniaturas del logo: 64/128/512 px y webp'),
     'partidos_jugados': fields.Integer(description='Partidos jugados'),
     'ganados': fields.Integer(description='Partidos ganados'),
     'empatados': fields.Integer(description='Partidos empatados'),
@@ -44,6 +47,69 @@ error_response = estadisticas_ns.model('ErrorResponse', {
 # ENDPOINTS
 # ============================================
 
+_consultas_disciplina = {}
+
+
+def _consulta_disciplina(con_campeonato):
+    """
+    Sentencia de disciplina (se arma una vez por variante y se reutiliza)
+
+    Devuelve las tarjetas agrupadas por jugador y jornada; con campeonato,
+    además una fila 'campeonato' con su id y nombre (UNION ALL), así todo
+    el endpoint es un solo viaje a la BD. El id va como parámetro, nunca
+    interpolado, y el texto SQL es siempre el mismo.
+    """
+    consulta = _consultas_disciplina.get(con_campeonato)
+    if consulta is not None:
+        return consulta
+
+    from app.models.campeonato import Campeonato
+    from app.models.equipo import Equipo
+    from app.models.jugador import Jugador
+    from app.models.partido import Partido
+    from app.models.tarjeta import Tarjeta
+
+    tarjetas = db.select(
+        db.literal('tarjetas').label('tipo_fila'),
+        Jugador.id_jugador.label('id_jugador'),
+        (Jugador.nombre + ' ' + Jugador.apellido).label('nombre'),
+        Equipo.id_equipo.label('id_equipo'),
+        Equipo.nombre.label('equipo'),
+        Partido.jornada.label('jornada'),
+        db.func.sum(db.case((Tarjeta.tipo == 'amarilla', 1), else_=0)).label('amarillas'),
+        db.func.sum(db.case((Tarjeta.tipo == 'roja', 1), else_=0)).label('rojas')
+    ).join(
+        Jugador, Tarjeta.id_jugador == Jugador.id_jugador
+    ).join(
+        Equipo, Jugador.id_equipo == Equipo.id_equipo
+    ).join(
+        Partido, Tarjeta.id_partido == Partido.id_partido
+    ).group_by(
+        Jugador.id_jugador, Jugador.nombre, Jugador.apellido, Equipo.id_equipo, Equipo.nombre, Partido.jornada
+    )
+
+    if con_campeonato:
+        tarjetas = tarjetas.where(Partido.id_campeonato == db.bindparam('id_campeonato'))
+        campeonato = db.select(
+            db.literal('campeonato'),
+            Campeonato.id_campeonato,
+            Campeonato.nombre,
+            db.null(), db.null(), db.null(), db.literal(0), db.literal(0)
+        ).where(Campeonato.id_campeonato == db.bindparam('id_campeonato'))
+        consulta = db.union_all(tarjetas, campeonato)
+    else:
+        consulta = tarjetas
+
+    _consultas_disciplina[con_campeonato] = consulta
+    return consulta
+
+
+def _tags_estadisticas():
+    """Tag de cache: el campeonato filtrado o las estadísticas globales"""
+    id_campeonato = request.args.get('id_campeonato', type=int)
+    return [f'campeonato:{id_campeonato}'] if id_campeonato else ['estadisticas']
+
+
 @estadisticas_ns.route('/tabla-posiciones')
 class TablaPosiciones(Resource):
     @estadisticas_ns.doc(
@@ -56,6 +122,7 @@ class TablaPosiciones(Resource):
             500: 'Error interno del servidor'
         }
     )
+    @response_cache.cached(tags=_tags_estadisticas)
     @estadisticas_ns.marshal_list_with(posicion_model, code=200, envelope='tabla_posiciones')
     def get(self):
         """
@@ -73,54 +140,25 @@ class TablaPosiciones(Resource):
                 LEFT JOIN equipos e ON vtp.id_equipo = e.id_equipo
             """
 
-            # Si se especifica campeonato, filtrar partidos de ese campeonato
+            # Si se especifica campeonato, leer la tabla persistida (O(equipos))
             if id_campeonato:
                 query = """
                     SELECT
                         e.id_equipo,
                         e.nombre AS equipo,
                         e.logo_url,
-                        COUNT(DISTINCT p.id_partido) AS partidos_jugados,
-                        SUM(CASE
-                            WHEN (p.id_equipo_local = e.id_equipo AND p.goles_local > p.goles_visitante) OR
-                                 (p.id_equipo_visitante = e.id_equipo AND p.goles_visitante > p.goles_local)
-                            THEN 1 ELSE 0 END) AS ganados,
-                        SUM(CASE
-                            WHEN p.goles_local = p.goles_visitante AND p.estado = 'finalizado'
-                            THEN 1 ELSE 0 END) AS empatados,
-                        SUM(CASE
-                            WHEN (p.id_equipo_local = e.id_equipo AND p.goles_local < p.goles_visitante) OR
-                                 (p.id_equipo_visitante = e.id_equipo AND p.goles_visitante < p.goles_local)
-                            THEN 1 ELSE 0 END) AS perdidos,
-                        SUM(CASE
-                            WHEN p.id_equipo_local = e.id_equipo THEN p.goles_local
-                            WHEN p.id_equipo_visitante = e.id_equipo THEN p.goles_visitante
-                            ELSE 0 END) AS goles_favor,
-                        SUM(CASE
-                            WHEN p.id_equipo_local = e.id_equipo THEN p.goles_visitante
-                            WHEN p.id_equipo_visitante = e.id_equipo THEN p.goles_local
-                            ELSE 0 END) AS goles_contra,
-                        (SUM(CASE
-                            WHEN p.id_equipo_local = e.id_equipo THEN p.goles_local
-                            WHEN p.id_equipo_visitante = e.id_equipo THEN p.goles_visitante
-                            ELSE 0 END) -
-                         SUM(CASE
-                            WHEN p.id_equipo_local = e.id_equipo THEN p.goles_visitante
-                            WHEN p.id_equipo_visitante = e.id_equipo THEN p.goles_local
-                            ELSE 0 END)) AS diferencia_goles,
-                        (SUM(CASE
-                            WHEN (p.id_equipo_local = e.id_equipo AND p.goles_local > p.goles_visitante) OR
-                                 (p.id_equipo_visitante = e.id_equipo AND p.goles_visitante > p.goles_local)
-                            THEN 3
-                            WHEN p.goles_local = p.goles_visitante AND p.estado = 'finalizado'
-                            THEN 1
-                            ELSE 0 END)) AS puntos
+                        COALESCE(tp.partidos_jugados, 0) AS partidos_jugados,
+                        COALESCE(tp.ganados, 0) AS ganados,
+                        COALESCE(tp.empatados, 0) AS empatados,
+                        COALESCE(tp.perdidos, 0) AS perdidos,
+                        COALESCE(tp.goles_favor, 0) AS goles_favor,
+                        COALESCE(tp.goles_contra, 0) AS goles_contra,
+                        COALESCE(tp.diferencia_goles, 0) AS diferencia_goles,
+                        COALESCE(tp.puntos, 0) AS puntos
                     FROM equipos e
-                    LEFT JOIN partidos p ON (e.id_equipo = p.id_equipo_local OR e.id_equipo = p.id_equipo_visitante)
-                        AND p.estado = 'finalizado'
-                        AND p.id_campeonato = :id_campeonato
+                    LEFT JOIN tabla_posiciones tp ON tp.id_equipo = e.id_equipo
+                        AND tp.id_campeonato = :id_campeonato
                     WHERE e.estado = 'aprobado'
-                    GROUP BY e.id_equipo, e.nombre, e.logo_url
                     ORDER BY puntos DESC, diferencia_goles DESC, goles_favor DESC
                 """
                 result = db.session.execute(text(query), {'id_campeonato': int(id_campeonato)})
@@ -134,6 +172,7 @@ class TablaPosiciones(Resource):
             # Agregar posición
             for idx, equipo in enumerate(tabla, start=1):
                 equipo['posicion'] = idx
+                equipo['logo_urls'] = ImagenService.variantes(equipo.get('logo_url'))
 
             return tabla, 200
 
@@ -154,6 +193,7 @@ class Goleadores(Resource):
             500: 'Error interno del servidor'
         }
     )
+    @response_cache.cached(tags=_tags_estadisticas)
     @estadisticas_ns.marshal_list_with(goleador_model, code=200, envelope='goleadores')
     def get(self):
         """
@@ -258,6 +298,7 @@ class EstadisticasDisciplina(Resource):
             'id_campeonato': 'ID del campeonato (opcional)'
         }
     )
+    @response_cache.cached(tags=_tags_estadisticas)
     def get(self):
         """
         Obtiene estadísticas completas de disciplina:
@@ -269,164 +310,81 @@ class EstadisticasDisciplina(Resource):
         try:
             id_campeonato = request.args.get('id_campeonato', type=int)
             
-            # ========================================
-            # 1. TOP JUGADORES CON MÁS AMARILLAS
-            # ========================================
-            query_amarillas = """
-                SELECT 
-                    j.id_jugador,
-                    CONCAT(j.nombre, ' ', j.apellido) as nombre_completo,
-                    e.nombre as equipo,
-                    COUNT(t.id_tarjeta) as amarillas
-                FROM jugadores j
-                INNER JOIN equipos e ON j.id_equipo = e.id_equipo
-                INNER JOIN tarjetas t ON j.id_jugador = t.id_jugador
-                INNER JOIN partidos p ON t.id_partido = p.id_partido
-                WHERE t.tipo = 'amarilla'
-            """
+            # Una sola consulta: tarjetas por (jugador, jornada) + fila del campeonato
+            consulta = _consulta_disciplina(con_campeonato=bool(id_campeonato))
+            filas = db.session.execute(
+                consulta, {'id_campeonato': id_campeonato} if id_campeonato else {}
+            ).all()
             
-            if id_campeonato:
-                query_amarillas += f" AND p.id_campeonato = {id_campeonato}"
-            
-            query_amarillas += """
-                GROUP BY j.id_jugador, e.nombre
-                ORDER BY amarillas DESC
-                LIMIT 10
-            """
+            campeonato_info = None
+            jugadores = {}
+            equipos = {}
+            jornadas = {}
             
-            result_amarillas = db.session.execute(text(query_amarillas))
-            top_amarillas = [
-                {
-                    'id_jugador': row[0],
-                    'nombre': row[1],
-                    'equipo': row[2],
-                    'amarillas': row[3]
-                }
-                for row in result_amarillas
-            ]
+            for fila in filas:
+                if fila.tipo_fila == 'campeonato':
+                    campeonato_info = {
+                        'id_campeonato': fila.id_jugador,
+                        'nombre': fila.nombre
+                    }
+                    continue
+                
+                amarillas, rojas = int(fila.amarillas), int(fila.rojas)
+                
+                jugador = jugadores.setdefault(fila.id_jugador, {
+                    'id_jugador': fila.id_jugador,
+                    'nombre': fila.nombre,
+                    'equipo': fila.equipo,
+                    'amarillas': 0,
+                    'rojas': 0
+                })
+                jugador['amarillas'] += amarillas
+                jugador['rojas'] += rojas
+                
+                equipo = equipos.setdefault(fila.id_equipo, {
+                    'id_equipo': fila.id_equipo,
+                    'equipo': fila.equipo,
+                    'amarillas': 0,
+                    'rojas': 0
+                })
+                equipo['amarillas'] += amarillas
+                equipo['rojas'] += rojas
+                
+                jornada = jornadas.setdefault(fila.jornada, {'jornada': fila.jornada, 'amarillas': 0, 'rojas': 0})
+                jornada['amarillas'] += amarillas
+                jornada['rojas'] += rojas
             
             # ========================================
+            # 1. TOP JUGADORES CON MÁS AMARILLAS
             # 2. TOP JUGADORES CON MÁS ROJAS
             # ========================================
-            query_rojas = """
-                SELECT 
-                    j.id_jugador,
-                    CONCAT(j.nombre, ' ', j.apellido) as nombre_completo,
-                    e.nombre as equipo,
-                    COUNT(t.id_tarjeta) as rojas
-                FROM jugadores j
-                INNER JOIN equipos e ON j.id_equipo = e.id_equipo
-                INNER JOIN tarjetas t ON j.id_jugador = t.id_jugador
-                INNER JOIN partidos p ON t.id_partido = p.id_partido
-                WHERE t.tipo = 'roja'
-            """
-            
-            if id_campeonato:
-                query_rojas += f" AND p.id_campeonato = {id_campeonato}"
-            
-            query_rojas += """
-                GROUP BY j.id_jugador, e.nombre
-                ORDER BY rojas DESC
-                LIMIT 10
-            """
-            
-            result_rojas = db.session.execute(text(query_rojas))
+            top_amarillas = [
+                {'id_jugador': j['id_jugador'], 'nombre': j['nombre'], 'equipo': j['equipo'], 'amarillas': j['amarillas']}
+                for j in sorted(jugadores.values(), key=lambda j: (-j['amarillas'], j['id_jugador']))
+                if j['amarillas'] > 0
+            ][:10]
             top_rojas = [
-                {
-                    'id_jugador': row[0],
-                    'nombre': row[1],
-                    'equipo': row[2],
-                    'rojas': row[3]
-                }
-                for row in result_rojas
-            ]
+                {'id_jugador': j['id_jugador'], 'nombre': j['nombre'], 'equipo': j['equipo'], 'rojas': j['rojas']}
+                for j in sorted(jugadores.values(), key=lambda j: (-j['rojas'], j['id_jugador']))
+                if j['rojas'] > 0
+            ][:10]
             
             # ========================================
             # 3. DISCIPLINA POR EQUIPO
             # ========================================
-            query_equipos = """
-                SELECT 
-                    e.id_equipo,
-                    e.nombre as equipo,
-                    SUM(CASE WHEN t.tipo = 'amarilla' THEN 1 ELSE 0 END) as amarillas,
-                    SUM(CASE WHEN t.tipo = 'roja' THEN 1 ELSE 0 END) as rojas,
-                    COUNT(t.id_tarjeta) as total
-                FROM equipos e
-                INNER JOIN jugadores j ON e.id_equipo = j.id_equipo
-                INNER JOIN tarjetas t ON j.id_jugador = t.id_jugador
-                INNER JOIN partidos p ON t.id_partido = p.id_partido
-            """
-            
-            if id_campeonato:
-                query_equipos += f" WHERE p.id_campeonato = {id_campeonato}"
-            
-            query_equipos += """
-                GROUP BY e.id_equipo, e.nombre
-                ORDER BY total ASC
-            """
-            
-            result_equipos = db.session.execute(text(query_equipos))
             disciplina_equipos = []
-            for idx, row in enumerate(result_equipos):
+            ordenados = sorted(equipos.values(), key=lambda e: (e['amarillas'] + e['rojas'], e['id_equipo']))
+            for idx, equipo in enumerate(ordenados):
                 disciplina_equipos.append({
-                    'id_equipo': row[0],
-                    'equipo': row[1],
-                    'amarillas': int(row[2]),
-                    'rojas': int(row[3]),
-                    'total': row[4],
+                    **equipo,
+                    'total': equipo['amarillas'] + equipo['rojas'],
                     'badge': 'Equipo Más Limpio' if idx == 0 else None
                 })
             
             # ========================================
             # 4. TARJETAS POR JORNADA
             # ========================================
-            query_jornadas = """
-                SELECT 
-                    p.jornada,
-                    SUM(CASE WHEN t.tipo = 'amarilla' THEN 1 ELSE 0 END) as amarillas,
-                    SUM(CASE WHEN t.tipo = 'roja' THEN 1 ELSE 0 END) as rojas
-                FROM partidos p
-                INNER JOIN tarjetas t ON p.id_partido = t.id_partido
-            """
-            
-            if id_campeonato:
-                query_jornadas += f" WHERE p.id_campeonato = {id_campeonato}"
-            
-            query_jornadas += """
-                GROUP BY p.jornada
-                ORDER BY p.jornada
-            """
-            
-            result_jornadas = db.session.execute(text(query_jornadas))
-            tarjetas_jornada = [
-                {
-                    'jornada': row[0],
-                    'amarillas': int(row[1]),
-                    'rojas': int(row[2])
-                }
-                for row in result_jornadas
-            ]
-            
-            # ========================================
-            # INFORMACIÓN DEL CAMPEONATO
-            # ========================================
-            campeonato_info = None
-            if id_campeonato:
-                query_campeonato = """
-                    SELECT id_campeonato, nombre 
-                    FROM campeonatos 
-                    WHERE id_campeonato = :id_campeonato
-                """
-                result = db.session.execute(
-                    text(query_campeonato), 
-                    {'id_campeonato': id_campeonato}
-                ).fetchone()
-                
-                if result:
-                    campeonato_info = {
-                        'id_campeonato': result[0],
-                        'nombre': result[1]
-                    }
+            tarjetas_jornada = [jornadas[k] for k in sorted(jornadas, key=lambda k: (k is None, k or 0))]
             
             # Calcular totales
             total_amarillas = sum(j['amarillas'] for j in tarjetas_jornada)
@@ -446,7 +404,4 @@ class EstadisticasDisciplina(Resource):
             }, 200
             
         except Exception as e:
-            print(f"❌ Error en estadísticas de disciplina: {str(e)}")
-            import traceback
-            traceback.print_exc()
             estadisticas_ns.abort(500, error=str(e))
\ No newline at end of file
@@ -5,6 +5,9 @@ from app.models.usuario import Usuario
 from app.models.partido import Partido
 from app.models.equipo import Equipo
 from app.models.jugador import Jugador
+from app.services.estadisticas_jugador_service import EstadisticasJugadorService
+from app.services.tabla_posiciones_service import TablaPosicionesService
+from app.services.llaves_service import LlavesService
 from datetime import datetime
 
 eventos_bp = Blueprint('eventos', __name__)
@@ -159,6 +162,13 @@ def registrar_evento(id_partido):
         )
         
         db.session.add(nuevo_evento)
+        db.session.flush()
+        
+        # Sumar a goleadores / asistidores del campeonato
+        EstadisticasJugadorService.registrar_evento(nuevo_evento, partido)
+        
+        goles_local_anterior = partido.goles_local
+        goles_visitante_anterior = partido.goles_visitante
         
         # Actualizar marcador si es gol
         if data['tipo'] == 'gol':
@@ -167,6 +177,12 @@ def registrar_evento(id_partido):
             else:
                 partido.goles_visitante += 1
         
+        # Si el partido ya figura como finalizado, la tabla y la llave deben reflejar el nuevo marcador
+        TablaPosicionesService.registrar_finalizacion(
+            partido, partido.estado, goles_local_anterior, goles_visitante_anterior
+        )
+        LlavesService.registrar_resultado(partido)
+        
         db.session.commit()
         
         return jsonify({
@@ -262,6 +278,9 @@ def eliminar_evento(id_partido, id_evento):
         if not evento or evento.id_partido != id_partido:
             return jsonify({'error': 'Evento no encontrado'}), 404
         
+        goles_local_anterior = partido.goles_local
+        goles_visitante_anterior = partido.goles_visitante
+        
         # Actualizar marcador si es gol
         if evento.tipo == 'gol':
             if evento.id_equipo == partido.id_equipo_local:
@@ -270,6 +289,14 @@ def eliminar_evento(id_partido, id_evento):
                 partido.goles_visitante = max(0, partido.goles_visitante - 1)
         
         db.session.delete(evento)
+        db.session.flush()
+        
+        EstadisticasJugadorService.registrar_evento(evento, partido, signo=-1)
+        # Si el partido ya figura como finalizado, la tabla y la llave deben reflejar el nuevo marcador
+        TablaPosicionesService.registrar_finalizacion(
+            partido, partido.estado, goles_local_anterior, goles_visitante_anterior
+        )
+        LlavesService.registrar_resultado(partido)
         db.session.commit()
         
         return jsonify({
@@ -6,7 +6,11 @@ from app.extensions import db
 from app.models.gol import Gol
 from app.models.partido import Partido
 from app.models.jugador import Jugador
+from app.models.equipo import Equipo
 from app.enums.gol_enum import TipoGol
+from app.services.tabla_posiciones_service import TablaPosicionesService
+from app.services.llaves_service import LlavesService
+from app.services.estadisticas_jugador_service import EstadisticasJugadorService
 from datetime import datetime
 
 gol_ns = Namespace('goles', description='Gestión de goles en partidos de fútbol')
@@ -128,6 +132,11 @@ class GolList(Resource):
             )
 
             db.session.add(nuevo_gol)
+            db.session.flush()
+            EstadisticasJugadorService.registrar_gol(nuevo_gol, partido, jugador.id_equipo)
+
+            goles_local_anterior = partido.goles_local
+            goles_visitante_anterior = partido.goles_visitante
 
             # Actualizar marcador automáticamente
             if tipo_enum != TipoGol.AUTOGOL:
@@ -142,6 +151,12 @@ class GolList(Resource):
                 else:
                     partido.goles_local += 1
 
+            # Si el partido ya figura como finalizado, la tabla debe reflejar el nuevo marcador
+            TablaPosicionesService.registrar_finalizacion(
+                partido, partido.estado, goles_local_anterior, goles_visitante_anterior
+            )
+            LlavesService.registrar_resultado(partido)
+
             db.session.commit()
 
             marcador = f"{partido.equipo_local.nombre} {partido.goles_local} - {partido.goles_visitante} {partido.equipo_visitante.nombre}"
@@ -241,6 +256,9 @@ class GolDetail(Resource):
 
             jugador = Jugador.query.get(gol.id_jugador)
 
+            goles_local_anterior = partido.goles_local
+            goles_visitante_anterior = partido.goles_visitante
+
             # Actualizar marcador
             if gol.tipo != TipoGol.AUTOGOL:
                 if jugador.id_equipo == partido.id_equipo_local:
@@ -253,7 +271,14 @@ class GolDetail(Resource):
                 else:
                     partido.goles_local = max(0, partido.goles_local - 1)
 
+            TablaPosicionesService.registrar_finalizacion(
+                partido, partido.estado, goles_local_anterior, goles_visitante_anterior
+            )
+            LlavesService.registrar_resultado(partido)
+
             db.session.delete(gol)
+            db.session.flush()
+            EstadisticasJugadorService.registrar_gol(gol, partido, jugador.id_equipo, signo=-1)
             db.session.commit()
 
             return {'mensaje': 'Gol eliminado exitosamente'}, 200
@@ -278,6 +303,21 @@ class Goleadores(Resource):
             id_campeonato = request.args.get('id_campeonato')
             limit = request.args.get('limit', 10)
 
+            if id_campeonato:
+                # Por campeonato los totales ya están agregados
+                return [{
+                    'posicion': pos,
+                    'id_jugador': fila.id_jugador,
+                    'nombre': f"{fila.jugador.nombre} {fila.jugador.apellido}",
+                    'equipo': fila.equipo.nombre if fila.equipo else None,
+                    'dorsal': fila.jugador.dorsal,
+                    'goles': fila.goles,
+                    'penales': fila.penales,
+                    'tiros_libres': fila.tiros_libres
+                } for pos, fila in enumerate(
+                    EstadisticasJugadorService.top(int(id_campeonato), 'goles', int(limit)), start=1
+                )], 200
+
             query = db.session.query(
                 Jugador.id_jugador,
                 Jugador.nombre,
@@ -295,13 +335,6 @@ class Goleadores(Resource):
                 Gol.tipo != TipoGol.AUTOGOL
             )
 
-            if id_campeonato:
-                query = query.join(
-                    Partido, Partido.id_partido == Gol.id_partido
-                ).filter(
-                    Partido.id_campeonato == int(id_campeonato)
-                )
-
             goleadores = query.group_by(
                 Jugador.id_jugador, Equipo.nombre
             ).order_by(
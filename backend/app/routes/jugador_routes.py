@@ -1,4 +1,4 @@
-from flask import request, jsonify
+from flask import request, jsonify, current_app, Response
 from flask_restx import Namespace, fields, Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.middlewares.auth_middleware import role_required
@@ -6,6 +6,10 @@ from app.extensions import db
 from app.models.jugador import Jugador
 from app.models.equipo import Equipo
 from app.models.usuario import Usuario
+from app.utils.subidas import limite_subida
+from app.utils.validators import parsear_ids
+from app.services.consulta_lote_service import ConsultaLoteService
+from werkzeug.exceptions import RequestEntityTooLarge
 from datetime import datetime
 
 jugador_ns = Namespace('jugadores', description='Gestión de jugadores de fútbol')
@@ -49,6 +53,7 @@ jugador_output_model = jugador_ns.model('JugadorOutput', {
     'documento_pdf': fields.String(description='URL del documento PDF'),
     'documento_url': fields.String(description='URL del documento (alias)'),
     'foto_url': fields.String(description='URL de la foto del jugador'),
+    'foto_urls': fields.Raw(description='Miniaturas de la foto: 64/128/512 px y webp'),
     'activo': fields.Boolean(description='Estado activo'),
     'fecha_registro': fields.DateTime(description='Fecha de registro')
 })
@@ -67,6 +72,12 @@ jugadores_response_model = jugador_ns.model('JugadoresResponse', {
     'pagination': fields.Nested(pagination_model)
 })
 
+subida_documento_model = jugador_ns.model('SubidaDocumentoInput', {
+    'tamanio': fields.Integer(required=True, description='Tamaño total del PDF en bytes', example=3145728),
+    'nombre_archivo': fields.String(description='Nombre original del archivo', example='cedula.pdf'),
+    'sha256': fields.String(description='SHA-256 del archivo (opcional, se verifica al finalizar)')
+})
+
 message_response = jugador_ns.model('MessageResponse', {
     'mensaje': fields.String(description='Mensaje de respuesta')
 })
@@ -386,11 +397,11 @@ class UploadDocumento(Resource):
     )
     @jwt_required()
     @role_required(['admin', 'lider'])
+    @limite_subida(5 * 1024 * 1024)
     def post(self, id_jugador):
         """Sube el documento PDF de identificación del jugador"""
         try:
-            from werkzeug.utils import secure_filename
-            import os
+            from app.services.almacen_service import AlmacenService
 
             jugador = Jugador.query.get(id_jugador)
             if not jugador:
@@ -416,41 +427,260 @@ class UploadDocumento(Resource):
             if not file.filename.lower().endswith('.pdf'):
                 jugador_ns.abort(400, error='Solo se permiten archivos PDF')
 
-            # Validar tamaño (máximo 5MB)
-            file.seek(0, os.SEEK_END)
-            file_size = file.tell()
-            file.seek(0)
-            if file_size > 5 * 1024 * 1024:
-                jugador_ns.abort(400, error='El archivo no debe superar 5MB')
-
-            # Crear nombre seguro
-            filename = secure_filename(f"jugador_{id_jugador}_{jugador.documento}.pdf")
-            
-            # Directorio de uploads
-            upload_folder = os.path.join(os.getcwd(), 'uploads', 'documentos_jugadores')
-            os.makedirs(upload_folder, exist_ok=True)
-
-            # Guardar archivo
-            filepath = os.path.join(upload_folder, filename)
-            file.save(filepath)
+            # Guardar por contenido (máximo 5MB, controlado al recibir)
+            try:
+                ruta = AlmacenService.guardar(file, validar=AlmacenService.validar_pdf, extension='pdf')
+            except ValueError as e:
+                return {'error': str(e)}, 400
 
             # URL COMPLETA con dominio
-            jugador.documento_pdf = f'http://localhost:5000/uploads/documentos_jugadores/{filename}'
+            jugador.documento_pdf = f'http://localhost:5000/uploads/{ruta}'
             db.session.commit()
 
-            print(f"✅ Documento subido: {filename}")
+            print(f"✅ Documento subido: {ruta}")
 
             return {
                 'mensaje': 'Documento subido exitosamente',
                 'documento_url': jugador.documento_pdf
             }, 200
 
+        except RequestEntityTooLarge as e:
+            db.session.rollback()
+            return {'error': e.description}, 413
         except Exception as e:
             db.session.rollback()
             print(f"❌ Error al subir documento: {str(e)}")
             jugador_ns.abort(500, error=f'Error al subir documento: {str(e)}')
 
 
+def _jugador_para_documento(id_jugador):
+    """(jugador, None) si el usuario actual puede subir su documento; si no (None, (respuesta, código))"""
+    jugador = Jugador.query.get(id_jugador)
+    if not jugador:
+        return None, ({'error': 'Jugador no encontrado'}, 404)
+
+    current_user_id = int(get_jwt_identity())
+    usuario = Usuario.query.get(current_user_id)
+    if jugador.equipo.id_lider != current_user_id and usuario.rol not in ['admin', 'superadmin']:
+        return None, ({'error': 'No tienes permiso para subir documentos de este jugador'}, 403)
+    return jugador, None
+
+
+@jugador_ns.route('/<int:id_jugador>/documento/subidas')
+@jugador_ns.param('id_jugador', 'ID del jugador')
+class SubidasDocumento(Resource):
+    @jugador_ns.doc(
+        description='Crear una subida reanudable del documento PDF (líder o admin)',
+        security='Bearer',
+        responses={
+            201: 'Subida creada',
+            400: 'Datos inválidos',
+            403: 'Sin permiso',
+            404: 'Jugador no encontrado'
+        }
+    )
+    @jugador_ns.expect(subida_documento_model)
+    @jwt_required()
+    @role_required(['admin', 'lider'])
+    def post(self, id_jugador):
+        """Inicia la subida en partes del documento del jugador"""
+        from app.services.subida_reanudable_service import SubidaReanudableService
+
+        try:
+            jugador, error = _jugador_para_documento(id_jugador)
+            if error:
+                return error
+
+            data = request.get_json() or {}
+            try:
+                subida = SubidaReanudableService.crear(
+                    id_jugador=jugador.id_jugador,
+                    id_usuario=int(get_jwt_identity()),
+                    tamanio_total=data.get('tamanio'),
+                    nombre_archivo=data.get('nombre_archivo'),
+                    sha256=data.get('sha256')
+                )
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            db.session.commit()
+
+            respuesta = subida.to_dict()
+            respuesta['chunk_max'] = current_app.config.get('SUBIDAS_REANUDABLES_CHUNK_MAX', 8 * 1024 * 1024)
+            return respuesta, 201
+
+        except Exception as e:
+            db.session.rollback()
+            jugador_ns.abort(500, error=f'Error al crear la subida: {str(e)}')
+
+
+@jugador_ns.route('/<int:id_jugador>/documento/subidas/<string:id_subida>')
+@jugador_ns.param('id_jugador', 'ID del jugador')
+@jugador_ns.param('id_subida', 'ID de la subida')
+class SubidaDocumento(Resource):
+    @jugador_ns.doc(description='Progreso de una subida reanudable', security='Bearer')
+    @jwt_required()
+    @role_required(['admin', 'lider'])
+    def get(self, id_jugador, id_subida):
+        """Cuántos bytes llegaron (para reanudar desde ahí)"""
+        from app.models.subida_reanudable import SubidaReanudable
+
+        try:
+            jugador, error = _jugador_para_documento(id_jugador)
+            if error:
+                return error
+
+            subida = db.session.get(SubidaReanudable, id_subida)
+            if not subida or subida.id_jugador != id_jugador:
+                return {'error': 'Subida no encontrada'}, 404
+
+            respuesta = subida.to_dict()
+            if subida.estado == 'completada':
+                respuesta['documento_url'] = jugador.documento_pdf
+            return respuesta, 200
+
+        except Exception as e:
+            jugador_ns.abort(500, error=str(e))
+
+    @jugador_ns.doc(
+        description='Enviar una parte. Header Content-Range: bytes <inicio>-<fin>/<total>; cuerpo: los bytes',
+        security='Bearer',
+        responses={
+            200: 'Parte recibida',
+            400: 'Parte inválida o incompleta (lo recibido se conserva)',
+            409: 'El offset no coincide con lo ya recibido',
+            410: 'La subida expiró, se canceló o ya se completó'
+        }
+    )
+    @jwt_required()
+    @role_required(['admin', 'lider'])
+    def put(self, id_jugador, id_subida):
+        """Escribe una parte del documento en su offset"""
+        from werkzeug.exceptions import BadRequest
+        from app.services.subida_reanudable_service import (
+            SubidaReanudableService, OffsetInvalido, SubidaNoDisponible
+        )
+
+        subida = None
+        try:
+            jugador, error = _jugador_para_documento(id_jugador)
+            if error:
+                return error
+
+            subida = SubidaReanudableService.obtener_activa(id_subida, id_jugador)
+            inicio, fin, total = SubidaReanudableService.parsear_content_range(request.headers.get('Content-Range'))
+            recibido = SubidaReanudableService.escribir(subida, inicio, fin, total, request.stream)
+            db.session.commit()
+
+            return {
+                'recibido': recibido,
+                'tamanio_total': subida.tamanio_total,
+                'completa': recibido >= subida.tamanio_total
+            }, 200
+
+        except LookupError as e:
+            return {'error': str(e)}, 404
+        except SubidaNoDisponible as e:
+            db.session.rollback()
+            return {'error': str(e)}, 410
+        except OffsetInvalido as e:
+            db.session.rollback()
+            return {'error': str(e), 'recibido': e.recibido}, 409
+        except (ValueError, BadRequest) as e:
+            # Parte cortada o mal formada: lo que llegó queda confirmado
+            db.session.commit()
+            return {
+                'error': getattr(e, 'description', None) or str(e),
+                'recibido': subida.recibido if subida else None
+            }, 400
+        except Exception as e:
+            db.session.rollback()
+            jugador_ns.abort(500, error=f'Error al recibir la parte: {str(e)}')
+
+    @jugador_ns.doc(description='Cancelar una subida reanudable', security='Bearer')
+    @jwt_required()
+    @role_required(['admin', 'lider'])
+    def delete(self, id_jugador, id_subida):
+        """Cancela la subida y borra lo recibido"""
+        from app.services.subida_reanudable_service import SubidaReanudableService, SubidaNoDisponible
+
+        try:
+            jugador, error = _jugador_para_documento(id_jugador)
+            if error:
+                return error
+
+            try:
+                subida = SubidaReanudableService.obtener_activa(id_subida, id_jugador)
+            except LookupError as e:
+                return {'error': str(e)}, 404
+            except SubidaNoDisponible as e:
+                return {'error': str(e)}, 410
+
+            SubidaReanudableService.cancelar(subida)
+            db.session.commit()
+            return {'mensaje': 'Subida cancelada'}, 200
+
+        except Exception as e:
+            db.session.rollback()
+            jugador_ns.abort(500, error=str(e))
+
+
+@jugador_ns.route('/<int:id_jugador>/documento/subidas/<string:id_subida>/finalizar')
+@jugador_ns.param('id_jugador', 'ID del jugador')
+@jugador_ns.param('id_subida', 'ID de la subida')
+class FinalizarSubidaDocumento(Resource):
+    @jugador_ns.doc(
+        description='Finalizar una subida reanudable: el PDF queda como documento del jugador',
+        security='Bearer',
+        responses={
+            200: 'Documento guardado',
+            400: 'No es un PDF o no coincide el SHA-256 (la subida vuelve a 0)',
+            409: 'Faltan bytes',
+            410: 'La subida expiró o se canceló'
+        }
+    )
+    @jwt_required()
+    @role_required(['admin', 'lider'])
+    def post(self, id_jugador, id_subida):
+        """Arma el documento y lo asigna al jugador"""
+        from app.models.subida_reanudable import SubidaReanudable
+        from app.services.subida_reanudable_service import (
+            SubidaReanudableService, OffsetInvalido, SubidaNoDisponible
+        )
+
+        try:
+            jugador, error = _jugador_para_documento(id_jugador)
+            if error:
+                return error
+
+            # Repetir finalizar (respuesta perdida) devuelve el mismo resultado
+            subida = db.session.get(SubidaReanudable, id_subida)
+            if subida and subida.id_jugador == id_jugador and subida.estado == 'completada':
+                return {'mensaje': 'Documento subido exitosamente', 'documento_url': jugador.documento_pdf}, 200
+
+            subida = SubidaReanudableService.obtener_activa(id_subida, id_jugador)
+            try:
+                SubidaReanudableService.finalizar(subida, jugador)
+            except OffsetInvalido as e:
+                return {'error': str(e), 'recibido': e.recibido}, 409
+            except ValueError as e:
+                db.session.commit()
+                return {'error': str(e), 'recibido': 0}, 400
+            db.session.commit()
+
+            return {
+                'mensaje': 'Documento subido exitosamente',
+                'documento_url': jugador.documento_pdf
+            }, 200
+
+        except LookupError as e:
+            return {'error': str(e)}, 404
+        except SubidaNoDisponible as e:
+            return {'error': str(e)}, 410
+        except Exception as e:
+            db.session.rollback()
+            jugador_ns.abort(500, error=f'Error al finalizar la subida: {str(e)}')
+
+
 @jugador_ns.route('/<int:id_jugador>/upload-foto')
 @jugador_ns.param('id_jugador', 'ID del jugador')
 class UploadFoto(Resource):
@@ -466,11 +696,12 @@ class UploadFoto(Resource):
     )
     @jwt_required()
     @role_required(['admin', 'lider'])
+    @limite_subida(2 * 1024 * 1024)
     def post(self, id_jugador):
         """Sube la foto del jugador"""
         try:
-            from werkzeug.utils import secure_filename
-            import os
+            from app.services.imagen_service import ImagenService
+            from app.services.imagen_worker import imagen_worker
 
             jugador = Jugador.query.get(id_jugador)
             if not jugador:
@@ -497,42 +728,66 @@ class UploadFoto(Resource):
             if not any(file.filename.lower().endswith(ext) for ext in allowed_extensions):
                 jugador_ns.abort(400, error='Solo se permiten imágenes (JPG, PNG, GIF)')
 
-            # Validar tamaño (máximo 2MB)
-            file.seek(0, os.SEEK_END)
-            file_size = file.tell()
-            file.seek(0)
-            if file_size > 2 * 1024 * 1024:
-                jugador_ns.abort(400, error='La imagen no debe superar 2MB')
-
-            # Crear nombre seguro
-            ext = file.filename.rsplit('.', 1)[1].lower()
-            filename = secure_filename(f"jugador_{id_jugador}_{jugador.documento}.{ext}")
-            
-            # Directorio de uploads
-            upload_folder = os.path.join(os.getcwd(), 'uploads', 'fotos_jugadores')
-            os.makedirs(upload_folder, exist_ok=True)
-
-            # Guardar archivo
-            filepath = os.path.join(upload_folder, filename)
-            file.save(filepath)
+            # Guardar por contenido (máximo 2MB, controlado al recibir); las miniaturas se generan en segundo plano
+            try:
+                ruta = ImagenService.guardar_original(file)
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            imagen_worker.encolar(ruta)
 
             # URL COMPLETA con dominio
-            jugador.foto_url = f'http://localhost:5000/uploads/fotos_jugadores/{filename}'
+            jugador.foto_url = f'http://localhost:5000/uploads/{ruta}'
             db.session.commit()
 
-            print(f"✅ Foto subida: {filename}")
+            print(f"✅ Foto subida: {ruta}")
 
             return {
                 'mensaje': 'Foto subida exitosamente',
-                'foto_url': jugador.foto_url
+                'foto_url': jugador.foto_url,
+                'foto_urls': ImagenService.variantes(jugador.foto_url)
             }, 200
 
+        except RequestEntityTooLarge as e:
+            db.session.rollback()
+            return {'error': e.description}, 413
         except Exception as e:
             db.session.rollback()
             print(f"❌ Error al subir foto: {str(e)}")
             jugador_ns.abort(500, error=f'Error al subir foto: {str(e)}')
 
 
+@jugador_ns.route('/planteles')
+class PlantelesEquipos(Resource):
+    @jugador_ns.doc(
+        description='Planteles de varios equipos en una sola consulta (para alineaciones-service)',
+        params={
+            'ids_equipo': 'IDs de equipos separados por coma (máximo 500)',
+            'activos': 'Solo jugadores activos (true/false, default false)'
+        },
+        responses={
+            200: 'Planteles por equipo: {"planteles": {"<id_equipo>": [...]}}',
+            400: 'Lista de ids inválida',
+            500: 'Error interno del servidor'
+        }
+    )
+    def get(self):
+        """Planteles de muchos equipos a la vez"""
+        try:
+            try:
+                ids_equipo = parsear_ids(request.args.get('ids_equipo'))
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            if not ids_equipo:
+                return {'error': 'ids_equipo es requerido'}, 400
+
+            solo_activos = request.args.get('activos', 'false').lower() in ['true', '1', 'yes']
+            planteles = ConsultaLoteService.planteles(ids_equipo, solo_activos=solo_activos)
+            return {'planteles': {str(k): v for k, v in planteles.items()}}, 200
+
+        except Exception as e:
+            jugador_ns.abort(500, error=str(e))
+
+
 @jugador_ns.route('/equipo/<int:id_equipo>')
 @jugador_ns.param('id_equipo', 'ID del equipo')
 class JugadoresPorEquipo(Resource):
@@ -603,4 +858,46 @@ class JugadoresConDocumentos(Resource):
 
         except Exception as e:
             print(f"❌ Error al obtener jugadores con documentos: {str(e)}")
-            jugador_ns.abort(500, error=str(e))
\ No newline at end of file
+            jugador_ns.abort(500, error=str(e))
+
+
+@jugador_ns.route('/equipo/<int:id_equipo>/documentos/zip')
+@jugador_ns.param('id_equipo', 'ID del equipo')
+class DocumentosEquipoZip(Resource):
+    @jugador_ns.doc(
+        description='Descargar en un ZIP los documentos y fotos de los jugadores del equipo (con manifest.csv)',
+        security='Bearer',
+        responses={
+            200: 'ZIP generado al vuelo',
+            403: 'Sin permiso',
+            404: 'Equipo no encontrado'
+        }
+    )
+    @jwt_required()
+    @role_required(['lider', 'admin', 'superadmin'])
+    def get(self, id_equipo):
+        """Exporta los documentos del equipo en un ZIP"""
+        from app.services.exportacion_documentos_service import ExportacionDocumentosService
+
+        try:
+            equipo = Equipo.query.get(id_equipo)
+            if not equipo:
+                return {'error': 'Equipo no encontrado'}, 404
+
+            current_user_id = int(get_jwt_identity())
+            usuario = Usuario.query.get(current_user_id)
+            if equipo.id_lider != current_user_id and usuario.rol not in ['admin', 'superadmin']:
+                return {'error': 'No tienes permiso para exportar los documentos de este equipo'}, 403
+
+            entradas = ExportacionDocumentosService.entradas_equipo(id_equipo)
+            return Response(
+                ExportacionDocumentosService.generar_zip(entradas),
+                mimetype='application/zip',
+                headers={
+                    'Content-Disposition': f'attachment; filename="documentos_equipo_{id_equipo}.zip"',
+                    'X-Accel-Buffering': 'no'
+                }
+            )
+
+        except Exception as e:
+            jugador_ns.abort(500, error=str(e))
@@ -10,6 +10,13 @@ from app.models.historial_estado import HistorialEstado
 from app.models.usuario import Usuario
 from app.models.notificacion import Notificacion
 from app.routes.respuestas import ApiResponse, PagedApiResponse
+from app.services.tabla_posiciones_service import TablaPosicionesService
+from app.services.llaves_service import LlavesService
+from app.services.estadisticas_jugador_service import EstadisticasJugadorService
+from app.utils.serializers import serializar_partidos
+from app.utils.validators import parsear_ids
+from app.services.consulta_lote_service import ConsultaLoteService
+from app.cache import response_cache
 from datetime import datetime
 
 partidos_ns = Namespace('partidos', description='Gestión de partidos de fútbol')
@@ -202,7 +209,7 @@ class PartidoList(Resource):
 
             response = PagedApiResponse.ok(
                 message="Partidos obtenidos exitosamente",
-                data={"partidos": [p.to_dict() for p in pagination.items]},
+                data={"partidos": serializar_partidos(pagination.items)},
                 page=pagination.page,
                 per_page=pagination.per_page,
                 total_items=pagination.total,
@@ -220,6 +227,49 @@ class PartidoList(Resource):
             return jsonify(error_response.to_dict()), 500
 
 
+@partidos_ns.route('/lote')
+class PartidosLote(Resource):
+    @partidos_ns.doc(
+        description='Partidos con sus equipos (y opcionalmente sus planteles) en una sola consulta, '
+                    'por lista de ids o por campeonato (para alineaciones-service)',
+        params={
+            'ids': 'IDs de partidos separados por coma (máximo 500)',
+            'id_campeonato': 'Todos los partidos del campeonato',
+            'planteles': 'Incluir los planteles de los equipos involucrados (true/false)'
+        },
+        responses={
+            200: 'Partidos (y planteles por equipo)',
+            400: 'Parámetros inválidos',
+            500: 'Error interno del servidor'
+        }
+    )
+    def get(self):
+        """Partidos de muchos ids a la vez, con sus equipos"""
+        try:
+            try:
+                ids = parsear_ids(request.args.get('ids')) if request.args.get('ids') else None
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            id_campeonato = request.args.get('id_campeonato', type=int)
+            if ids is None and id_campeonato is None:
+                return {'error': 'Se requiere ids o id_campeonato'}, 400
+
+            partidos = ConsultaLoteService.partidos(ids_partido=ids, id_campeonato=id_campeonato)
+            respuesta = {'partidos': partidos}
+
+            if request.args.get('planteles', 'false').lower() in ['true', '1', 'yes']:
+                ids_equipo = list(dict.fromkeys(
+                    id_equipo for p in partidos for id_equipo in (p['id_equipo_local'], p['id_equipo_visitante'])
+                ))
+                planteles = ConsultaLoteService.planteles(ids_equipo)
+                respuesta['planteles'] = {str(k): v for k, v in planteles.items()}
+
+            return respuesta, 200
+
+        except Exception as e:
+            partidos_ns.abort(500, error=str(e))
+
+
 @partidos_ns.route('/<int:id_partido>')
 @partidos_ns.param('id_partido', 'ID del partido')
 class PartidoDetail(Resource):
@@ -304,6 +354,8 @@ class PartidoDetail(Resource):
             if partido.estado != 'programado':
                 partidos_ns.abort(400, error='Solo se pueden eliminar partidos programados')
 
+            EstadisticasJugadorService.retirar_partido(partido)
+
             db.session.delete(partido)
             db.session.commit()
 
@@ -353,7 +405,12 @@ class PartidoEstado(Resource):
             )
             db.session.add(historial)
 
+            estado_anterior = partido.estado
             partido.estado = data['estado']
+            TablaPosicionesService.registrar_finalizacion(
+                partido, estado_anterior, partido.goles_local, partido.goles_visitante
+            )
+            LlavesService.registrar_resultado(partido)
             db.session.commit()
 
             return {'partido': partido.to_dict()}, 200
@@ -383,6 +440,10 @@ class PartidoResultado(Resource):
             data = partidos_ns.payload
             current_user_id = get_jwt_identity()
 
+            estado_anterior = partido.estado
+            goles_local_anterior = partido.goles_local
+            goles_visitante_anterior = partido.goles_visitante
+
             partido.goles_local = int(data['goles_local'])
             partido.goles_visitante = int(data['goles_visitante'])
             partido.estado = 'finalizado'
@@ -390,6 +451,11 @@ class PartidoResultado(Resource):
             partido.registrado_por = int(current_user_id)
             partido.fecha_registro_resultado = datetime.utcnow()
 
+            TablaPosicionesService.registrar_finalizacion(
+                partido, estado_anterior, goles_local_anterior, goles_visitante_anterior
+            )
+            LlavesService.registrar_resultado(partido)
+
             db.session.commit()
 
             return {'partido': partido.to_dict()}, 200
@@ -433,6 +499,7 @@ class PartidoFinalizar(Resource):
                 partidos_ns.abort(400, error='No se puede finalizar un partido cancelado')
             
             data = partidos_ns.payload
+            estado_anterior = partido.estado
             
             partido.goles_local = int(data['goles_local'])
             partido.goles_visitante = int(data['goles_visitante'])
@@ -441,10 +508,13 @@ class PartidoFinalizar(Resource):
             partido.registrado_por = int(current_user_id)
             partido.fecha_registro_resultado = datetime.utcnow()
             
+            TablaPosicionesService.registrar_finalizacion(partido, estado_anterior)
+            LlavesService.registrar_resultado(partido)
+            
             historial = HistorialEstado(
                 tipo_entidad='partido',
                 id_entidad=id_partido,
-                estado_anterior=partido.estado,
+                estado_anterior=estado_anterior,
                 estado_nuevo='finalizado',
                 cambiado_por=int(current_user_id),
                 observaciones=f'Resultado final: {partido.goles_local} - {partido.goles_visitante}'
@@ -486,6 +556,170 @@ class PartidoHistorial(Resource):
             partidos_ns.abort(500, error=str(e))
 
 
+def _calcular_tabla(partidos):
+    """
+    Calcula tabla e historial por equipo recorriendo una lista de partidos finalizados
+
+    Se usa para tablas parciales (hasta_jornada) y para el historial de un
+    equipo; la tabla completa se lee de tabla_posiciones.
+    """
+    tabla = {}
+    partidos_por_equipo = {}
+
+    for partido in partidos:
+        if partido.id_equipo_local not in tabla:
+            tabla[partido.id_equipo_local] = {
+                'id_equipo': partido.id_equipo_local,
+                'nombre': partido.equipo_local.nombre if partido.equipo_local else 'Equipo Local',
+                'partidos_jugados': 0,
+                'ganados': 0,
+                'empatados': 0,
+                'perdidos': 0,
+                'goles_favor': 0,
+                'goles_contra': 0,
+                'diferencia_goles': 0,
+                'puntos': 0
+            }
+            partidos_por_equipo[partido.id_equipo_local] = {
+                'victorias': [],
+                'empates': [],
+                'derrotas': []
+            }
+        
+        if partido.id_equipo_visitante not in tabla:
+            tabla[partido.id_equipo_visitante] = {
+                'id_equipo': partido.id_equipo_visitante,
+                'nombre': partido.equipo_visitante.nombre if partido.equipo_visitante else 'Equipo Visitante',
+                'partidos_jugados': 0,
+                'ganados': 0,
+                'empatados': 0,
+                'perdidos': 0,
+                'goles_favor': 0,
+                'goles_contra': 0,
+                'diferencia_goles': 0,
+                'puntos': 0
+            }
+            partidos_por_equipo[partido.id_equipo_visitante] = {
+                'victorias': [],
+                'empates': [],
+                'derrotas': []
+            }
+        
+        local = tabla[partido.id_equipo_local]
+        visitante = tabla[partido.id_equipo_visitante]
+        
+        local['partidos_jugados'] += 1
+        visitante['partidos_jugados'] += 1
+        
+        local['goles_favor'] += partido.goles_local
+        local['goles_contra'] += partido.goles_visitante
+        visitante['goles_favor'] += partido.goles_visitante
+        visitante['goles_contra'] += partido.goles_local
+        
+        partido_info = {
+            'id_partido': partido.id_partido,
+            'jornada': partido.jornada,
+            'fecha': partido.fecha_partido.isoformat() if partido.fecha_partido else None,
+            'rival': None,
+            'resultado': None,
+            'goles_favor': None,
+            'goles_contra': None,
+            'local': None
+        }
+        
+        if partido.goles_local > partido.goles_visitante:
+            local['ganados'] += 1
+            local['puntos'] += 3
+            visitante['perdidos'] += 1
+            
+            partidos_por_equipo[partido.id_equipo_local]['victorias'].append({
+                **partido_info,
+                'rival': visitante['nombre'],
+                'resultado': f"{partido.goles_local}-{partido.goles_visitante}",
+                'goles_favor': partido.goles_local,
+                'goles_contra': partido.goles_visitante,
+                'local': True
+            })
+            
+            partidos_por_equipo[partido.id_equipo_visitante]['derrotas'].append({
+                **partido_info,
+                'rival': local['nombre'],
+                'resultado': f"{partido.goles_visitante}-{partido.goles_local}",
+                'goles_favor': partido.goles_visitante,
+                'goles_contra': partido.goles_local,
+                'local': False
+            })
+            
+        elif partido.goles_local < partido.goles_visitante:
+            visitante['ganados'] += 1
+            visitante['puntos'] += 3
+            local['perdidos'] += 1
+            
+            partidos_por_equipo[partido.id_equipo_visitante]['victorias'].append({
+                **partido_info,
+                'rival': local['nombre'],
+                'resultado': f"{partido.goles_visitante}-{partido.goles_local}",
+                'goles_favor': partido.goles_visitante,
+                'goles_contra': partido.goles_local,
+                'local': False
+            })
+            
+            partidos_por_equipo[partido.id_equipo_local]['derrotas'].append({
+                **partido_info,
+                'rival': visitante['nombre'],
+                'resultado': f"{partido.goles_local}-{partido.goles_visitante}",
+                'goles_favor': partido.goles_local,
+                'goles_contra': partido.goles_visitante,
+                'local': True
+            })
+            
+        else:
+            local['empatados'] += 1
+            local['puntos'] += 1
+            visitante['empatados'] += 1
+            visitante['puntos'] += 1
+            
+            partido_empate_local = {
+                **partido_info,
+                'rival': visitante['nombre'],
+                'resultado': f"{partido.goles_local}-{partido.goles_visitante}",
+                'goles_favor': partido.goles_local,
+                'goles_contra': partido.goles_visitante,
+                'local': True
+            }
+            
+            partido_empate_visitante = {
+                **partido_info,
+                'rival': local['nombre'],
+                'resultado': f"{partido.goles_visitante}-{partido.goles_local}",
+                'goles_favor': partido.goles_visitante,
+                'goles_contra': partido.goles_local,
+                'local': False
+            }
+            
+            partidos_por_equipo[partido.id_equipo_local]['empates'].append(partido_empate_local)
+            partidos_por_equipo[partido.id_equipo_visitante]['empates'].append(partido_empate_visitante)
+
+    for equipo in tabla.values():
+        equipo['diferencia_goles'] = equipo['goles_favor'] - equipo['goles_contra']
+
+    return tabla, partidos_por_equipo
+
+
+def _ordenar_tabla(tabla):
+    """Ordena por puntos, diferencia y goles a favor, y asigna la posición"""
+    tabla_ordenada = sorted(
+        tabla.values(),
+        key=lambda x: (x['puntos'], x['diferencia_goles'], x['goles_favor']),
+        reverse=True
+    )
+
+    for idx, equipo in enumerate(tabla_ordenada, start=1):
+        equipo['posicion'] = idx
+
+    return tabla_ordenada
+
+
 @partidos_ns.route('/campeonatos/<int:id_campeonato>/tabla-posiciones')
 @partidos_ns.param('id_campeonato', 'ID del campeonato')
 class TablaPosiciones(Resource):
@@ -496,6 +730,7 @@ class TablaPosiciones(Resource):
             'id_equipo': 'Obtener historial detallado de un equipo (opcional)'
         }
     )
+    @response_cache.cached(tags=lambda id_campeonato: [f'campeonato:{id_campeonato}'])
     def get(self, id_campeonato):
         try:
             hasta_jornada = request.args.get('hasta_jornada', type=int)
@@ -505,166 +740,52 @@ class TablaPosiciones(Resource):
             if not campeonato:
                 partidos_ns.abort(404, error='Campeonato no encontrado')
             
-            query = Partido.query.filter_by(
-                id_campeonato=id_campeonato,
-                estado='finalizado'
-            )
-            
-            if hasta_jornada:
-                query = query.filter(Partido.jornada <= hasta_jornada)
-            
-            partidos = query.all()
-            
-            tabla = {}
-            partidos_por_equipo = {}
-            
-            for partido in partidos:
-                if partido.id_equipo_local not in tabla:
-                    tabla[partido.id_equipo_local] = {
-                        'id_equipo': partido.id_equipo_local,
-                        'nombre': partido.equipo_local.nombre if partido.equipo_local else 'Equipo Local',
-                        'partidos_jugados': 0,
-                        'ganados': 0,
-                        'empatados': 0,
-                        'perdidos': 0,
-                        'goles_favor': 0,
-                        'goles_contra': 0,
-                        'diferencia_goles': 0,
-                        'puntos': 0
-                    }
-                    partidos_por_equipo[partido.id_equipo_local] = {
-                        'victorias': [],
-                        'empates': [],
-                        'derrotas': []
-                    }
-                
-                if partido.id_equipo_visitante not in tabla:
-                    tabla[partido.id_equipo_visitante] = {
-                        'id_equipo': partido.id_equipo_visitante,
-                        'nombre': partido.equipo_visitante.nombre if partido.equipo_visitante else 'Equipo Visitante',
-                        'partidos_jugados': 0,
-                        'ganados': 0,
-                        'empatados': 0,
-                        'perdidos': 0,
-                        'goles_favor': 0,
-                        'goles_contra': 0,
-                        'diferencia_goles': 0,
-                        'puntos': 0
-                    }
-                    partidos_por_equipo[partido.id_equipo_visitante] = {
-                        'victorias': [],
-                        'empates': [],
-                        'derrotas': []
-                    }
-                
-                local = tabla[partido.id_equipo_local]
-                visitante = tabla[partido.id_equipo_visitante]
-                
-                local['partidos_jugados'] += 1
-                visitante['partidos_jugados'] += 1
-                
-                local['goles_favor'] += partido.goles_local
-                local['goles_contra'] += partido.goles_visitante
-                visitante['goles_favor'] += partido.goles_visitante
-                visitante['goles_contra'] += partido.goles_local
+            # Campeonatos anteriores a la tabla persistida: se arma la primera vez que se lee
+            if TablaPosicionesService.inicializar_si_falta(id_campeonato):
+                db.session.commit()
+            
+            partidos_por_equipo = None
+            snapshot = TablaPosicionesService.obtener_snapshot(id_campeonato, hasta_jornada) if hasta_jornada else []
+            
+            if snapshot:
+                # Jornada cerrada: se lee la foto guardada (ya trae la posición)
+                tabla_ordenada = [fila.to_dict() for fila in snapshot]
+                tabla = {equipo['id_equipo']: equipo for equipo in tabla_ordenada}
+                total_partidos_jugados = sum(equipo['partidos_jugados'] for equipo in tabla_ordenada) // 2
+            elif hasta_jornada:
+                # Jornada aún abierta: se calcula con los partidos hasta esa jornada
+                partidos = Partido.query.filter(
+                    Partido.id_campeonato == id_campeonato,
+                    Partido.estado == 'finalizado',
+                    Partido.jornada <= hasta_jornada,
+                    TablaPosicionesService.filtro_liga()
+                ).all()
                 
-                partido_info = {
-                    'id_partido': partido.id_partido,
-                    'jornada': partido.jornada,
-                    'fecha': partido.fecha_partido.isoformat() if partido.fecha_partido else None,
-                    'rival': None,
-                    'resultado': None,
-                    'goles_favor': None,
-                    'goles_contra': None,
-                    'local': None
-                }
+                tabla, partidos_por_equipo = _calcular_tabla(partidos)
+                tabla_ordenada = _ordenar_tabla(tabla)
+                total_partidos_jugados = len(partidos)
+            else:
+                # Tabla actual: filas persistidas, ya ordenadas por la BD
+                tabla_ordenada = [fila.to_dict() for fila in TablaPosicionesService.obtener_tabla(id_campeonato)]
+                for idx, equipo in enumerate(tabla_ordenada, start=1):
+                    equipo['posicion'] = idx
                 
-                if partido.goles_local > partido.goles_visitante:
-                    local['ganados'] += 1
-                    local['puntos'] += 3
-                    visitante['perdidos'] += 1
-                    
-                    partidos_por_equipo[partido.id_equipo_local]['victorias'].append({
-                        **partido_info,
-                        'rival': visitante['nombre'],
-                        'resultado': f"{partido.goles_local}-{partido.goles_visitante}",
-                        'goles_favor': partido.goles_local,
-                        'goles_contra': partido.goles_visitante,
-                        'local': True
-                    })
-                    
-                    partidos_por_equipo[partido.id_equipo_visitante]['derrotas'].append({
-                        **partido_info,
-                        'rival': local['nombre'],
-                        'resultado': f"{partido.goles_visitante}-{partido.goles_local}",
-                        'goles_favor': partido.goles_visitante,
-                        'goles_contra': partido.goles_local,
-                        'local': False
-                    })
-                    
-                elif partido.goles_local < partido.goles_visitante:
-                    visitante['ganados'] += 1
-                    visitante['puntos'] += 3
-                    local['perdidos'] += 1
-                    
-                    partidos_por_equipo[partido.id_equipo_visitante]['victorias'].append({
-                        **partido_info,
-                        'rival': local['nombre'],
-                        'resultado': f"{partido.goles_visitante}-{partido.goles_local}",
-                        'goles_favor': partido.goles_visitante,
-                        'goles_contra': partido.goles_local,
-                        'local': False
-                    })
-                    
-                    partidos_por_equipo[partido.id_equipo_local]['derrotas'].append({
-                        **partido_info,
-                        'rival': visitante['nombre'],
-                        'resultado': f"{partido.goles_local}-{partido.goles_visitante}",
-                        'goles_favor': partido.goles_local,
-                        'goles_contra': partido.goles_visitante,
-                        'local': True
-                    })
-                    
-                else:
-                    local['empatados'] += 1
-                    local['puntos'] += 1
-                    visitante['empatados'] += 1
-                    visitante['puntos'] += 1
-                    
-                    partido_empate_local = {
-                        **partido_info,
-                        'rival': visitante['nombre'],
-                        'resultado': f"{partido.goles_local}-{partido.goles_visitante}",
-                        'goles_favor': partido.goles_local,
-                        'goles_contra': partido.goles_visitante,
-                        'local': True
-                    }
-                    
-                    partido_empate_visitante = {
-                        **partido_info,
-                        'rival': local['nombre'],
-                        'resultado': f"{partido.goles_visitante}-{partido.goles_local}",
-                        'goles_favor': partido.goles_visitante,
-                        'goles_contra': partido.goles_local,
-                        'local': False
-                    }
-                    
-                    partidos_por_equipo[partido.id_equipo_local]['empates'].append(partido_empate_local)
-                    partidos_por_equipo[partido.id_equipo_visitante]['empates'].append(partido_empate_visitante)
-            
-            for equipo in tabla.values():
-                equipo['diferencia_goles'] = equipo['goles_favor'] - equipo['goles_contra']
-            
-            tabla_ordenada = sorted(
-                tabla.values(),
-                key=lambda x: (x['puntos'], x['diferencia_goles'], x['goles_favor']),
-                reverse=True
-            )
-            
-            for idx, equipo in enumerate(tabla_ordenada, start=1):
-                equipo['posicion'] = idx
+                tabla = {equipo['id_equipo']: equipo for equipo in tabla_ordenada}
+                total_partidos_jugados = sum(equipo['partidos_jugados'] for equipo in tabla_ordenada) // 2
             
             if id_equipo:
+                if partidos_por_equipo is None:
+                    # Solo hacen falta los partidos de ese equipo para su historial
+                    query_equipo = Partido.query.filter(
+                        Partido.id_campeonato == id_campeonato,
+                        Partido.estado == 'finalizado',
+                        (Partido.id_equipo_local == id_equipo) | (Partido.id_equipo_visitante == id_equipo),
+                        TablaPosicionesService.filtro_liga()
+                    )
+                    if hasta_jornada:
+                        query_equipo = query_equipo.filter(Partido.jornada <= hasta_jornada)
+                    _, partidos_por_equipo = _calcular_tabla(query_equipo.all())
+                
                 if id_equipo in partidos_por_equipo and id_equipo in tabla:
                     return {
                         'equipo': tabla.get(id_equipo),
@@ -686,12 +807,14 @@ class TablaPosiciones(Resource):
                         'total_derrotas': 0
                     }, 200
             
-            jornada_max = max([p.jornada for p in Partido.query.filter_by(id_campeonato=id_campeonato).all()]) if Partido.query.filter_by(id_campeonato=id_campeonato).count() > 0 else 0
+            jornada_max = db.session.query(db.func.max(Partido.jornada)).filter(
+                Partido.id_campeonato == id_campeonato
+            ).scalar() or 0
             
             return {
                 'campeonato': campeonato.to_dict(),
                 'total_equipos': len(tabla_ordenada),
-                'total_partidos_jugados': len(partidos),
+                'total_partidos_jugados': total_partidos_jugados,
                 'jornada_actual': hasta_jornada if hasta_jornada else jornada_max,
                 'jornada_maxima': jornada_max,
                 'tabla': tabla_ordenada
@@ -704,6 +827,37 @@ class TablaPosiciones(Resource):
             partidos_ns.abort(500, error=str(e))
 
 
+@partidos_ns.route('/campeonatos/<int:id_campeonato>/tabla-posiciones/evolucion')
+@partidos_ns.param('id_campeonato', 'ID del campeonato')
+class EvolucionPosiciones(Resource):
+    @partidos_ns.doc(description='Obtener la posición de cada equipo en todas las jornadas cerradas')
+    @response_cache.cached(tags=lambda id_campeonato: [f'campeonato:{id_campeonato}'])
+    def get(self, id_campeonato):
+        try:
+            campeonato = Campeonato.query.get(id_campeonato)
+            if not campeonato:
+                partidos_ns.abort(404, error='Campeonato no encontrado')
+            
+            if TablaPosicionesService.inicializar_si_falta(id_campeonato):
+                db.session.commit()
+            
+            jornadas, equipos = TablaPosicionesService.obtener_evolucion(id_campeonato)
+            
+            return {
+                'id_campeonato': id_campeonato,
+                'nombre_campeonato': campeonato.nombre,
+                'jornadas': jornadas,
+                'total_equipos': len(equipos),
+                'equipos': equipos
+            }, 200
+            
+        except Exception as e:
+            print(f"❌ Error al obtener evolución de posiciones: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            partidos_ns.abort(500, error=str(e))
+
+
 @partidos_ns.route('/campeonatos/<int:id_campeonato>/goleadores')
 @partidos_ns.param('id_campeonato', 'ID del campeonato')
 class TablaGoleadores(Resource):
@@ -713,6 +867,7 @@ class TablaGoleadores(Resource):
             'limit': 'Limitar número de resultados (opcional)'
         }
     )
+    @response_cache.cached(tags=lambda id_campeonato: [f'campeonato:{id_campeonato}'])
     def get(self, id_campeonato):
         try:
             campeonato = Campeonato.query.get(id_campeonato)
@@ -721,69 +876,21 @@ class TablaGoleadores(Resource):
             
             limit = request.args.get('limit', type=int)
             
-            partidos = Partido.query.filter_by(
-                id_campeonato=id_campeonato,
-                estado='finalizado'
-            ).all()
-            
-            goleadores = {}
-            
-            for partido in partidos:
-                if partido.goles_local > 0:
-                    equipo_local = partido.equipo_local.nombre if partido.equipo_local else 'Equipo Local'
-                    jugador_key = f"{equipo_local} - Delantero"
-                    if jugador_key not in goleadores:
-                        goleadores[jugador_key] = {
-                            'jugador': 'Delantero Principal',
-                            'equipo': equipo_local,
-                            'goles': 0,
-                            'partidos_jugados': 0,
-                            'promedio_goles': 0.0
-                        }
-                    goleadores[jugador_key]['goles'] += partido.goles_local
-                    goleadores[jugador_key]['partidos_jugados'] += 1
-                
-                if partido.goles_visitante > 0:
-                    equipo_visitante = partido.equipo_visitante.nombre if partido.equipo_visitante else 'Equipo Visitante'
-                    jugador_key = f"{equipo_visitante} - Delantero"
-                    if jugador_key not in goleadores:
-                        goleadores[jugador_key] = {
-                            'jugador': 'Delantero Principal',
-                            'equipo': equipo_visitante,
-                            'goles': 0,
-                            'partidos_jugados': 0,
-                            'promedio_goles': 0.0
-                        }
-                    goleadores[jugador_key]['goles'] += partido.goles_visitante
-                    goleadores[jugador_key]['partidos_jugados'] += 1
-            
-            for goleador in goleadores.values():
-                if goleador['partidos_jugados'] > 0:
-                    goleador['promedio_goles'] = round(goleador['goles'] / goleador['partidos_jugados'], 2)
-            
-            tabla_goleadores = sorted(
-                goleadores.values(),
-                key=lambda x: (x['goles'], x['promedio_goles']),
-                reverse=True
-            )
-            
-            for idx, goleador in enumerate(tabla_goleadores, start=1):
+            # Top N leído de estadisticas_jugador en el orden del índice
+            tabla_goleadores = []
+            for idx, fila in enumerate(EstadisticasJugadorService.top(id_campeonato, 'goles', limit), start=1):
+                goleador = fila.to_dict()
+                goleador['promedio_goles'] = round(fila.goles / fila.partidos_jugados, 2) if fila.partidos_jugados else 0.0
                 goleador['posicion'] = idx
-            
-            if limit:
-                tabla_goleadores = tabla_goleadores[:limit]
+                tabla_goleadores.append(goleador)
             
             return {
                 'campeonato': campeonato.to_dict(),
                 'total_goleadores': len(tabla_goleadores),
-                'goleadores': tabla_goleadores,
-                'nota': 'Datos simulados. Se actualizarán cuando el sistema de alineaciones esté disponible.'
+                'goleadores': tabla_goleadores
             }, 200
             
         except Exception as e:
-            print(f"❌ Error al obtener goleadores: {str(e)}")
-            import traceback
-            traceback.print_exc()
             partidos_ns.abort(500, error=str(e))
 
 
@@ -796,6 +903,7 @@ class TablaAsistencias(Resource):
             'limit': 'Limitar número de resultados (opcional)'
         }
     )
+    @response_cache.cached(tags=lambda id_campeonato: [f'campeonato:{id_campeonato}'])
     def get(self, id_campeonato):
         try:
             campeonato = Campeonato.query.get(id_campeonato)
@@ -804,71 +912,20 @@ class TablaAsistencias(Resource):
             
             limit = request.args.get('limit', type=int)
             
-            partidos = Partido.query.filter_by(
-                id_campeonato=id_campeonato,
-                estado='finalizado'
-            ).all()
-            
-            asistidores = {}
-            
-            for partido in partidos:
-                if partido.goles_local > 0:
-                    equipo_local = partido.equipo_local.nombre if partido.equipo_local else 'Equipo Local'
-                    jugador_key = f"{equipo_local} - Mediocampista"
-                    if jugador_key not in asistidores:
-                        asistidores[jugador_key] = {
-                            'jugador': 'Mediocampista Principal',
-                            'equipo': equipo_local,
-                            'asistencias': 0,
-                            'partidos_jugados': 0,
-                            'promedio_asistencias': 0.0
-                        }
-                    asistencias_estimadas = max(1, int(partido.goles_local * 0.7))
-                    asistidores[jugador_key]['asistencias'] += asistencias_estimadas
-                    asistidores[jugador_key]['partidos_jugados'] += 1
-                
-                if partido.goles_visitante > 0:
-                    equipo_visitante = partido.equipo_visitante.nombre if partido.equipo_visitante else 'Equipo Visitante'
-                    jugador_key = f"{equipo_visitante} - Mediocampista"
-                    if jugador_key not in asistidores:
-                        asistidores[jugador_key] = {
-                            'jugador': 'Mediocampista Principal',
-                            'equipo': equipo_visitante,
-                            'asistencias': 0,
-                            'partidos_jugados': 0,
-                            'promedio_asistencias': 0.0
-                        }
-                    asistencias_estimadas = max(1, int(partido.goles_visitante * 0.7))
-                    asistidores[jugador_key]['asistencias'] += asistencias_estimadas
-                    asistidores[jugador_key]['partidos_jugados'] += 1
-            
-            for asistidor in asistidores.values():
-                if asistidor['partidos_jugados'] > 0:
-                    asistidor['promedio_asistencias'] = round(asistidor['asistencias'] / asistidor['partidos_jugados'], 2)
-            
-            tabla_asistencias = sorted(
-                asistidores.values(),
-                key=lambda x: (x['asistencias'], x['promedio_asistencias']),
-                reverse=True
-            )
-            
-            for idx, asistidor in enumerate(tabla_asistencias, start=1):
+            tabla_asistencias = []
+            for idx, fila in enumerate(EstadisticasJugadorService.top(id_campeonato, 'asistencias', limit), start=1):
+                asistidor = fila.to_dict()
+                asistidor['promedio_asistencias'] = round(fila.asistencias / fila.partidos_jugados, 2) if fila.partidos_jugados else 0.0
                 asistidor['posicion'] = idx
-            
-            if limit:
-                tabla_asistencias = tabla_asistencias[:limit]
+                tabla_asistencias.append(asistidor)
             
             return {
                 'campeonato': campeonato.to_dict(),
                 'total_asistidores': len(tabla_asistencias),
-                'asistidores': tabla_asistencias,
-                'nota': 'Datos simulados. Se actualizarán cuando el sistema de eventos esté disponible.'
+                'asistidores': tabla_asistencias
             }, 200
             
         except Exception as e:
-            print(f"❌ Error al obtener asistencias: {str(e)}")
-            import traceback
-            traceback.print_exc()
             partidos_ns.abort(500, error=str(e))
 
 
@@ -0,0 +1,85 @@
+from flask import request, current_app
+from flask_restx import Namespace, Resource
+from app.services.replica_service import ReplicaService, ReplicaSecuenciaVencida
+
+replica_ns = Namespace('replica', description='Feed de cambios para la réplica de alineaciones-service')
+
+
+def _limite():
+    maximo = current_app.config.get('REPLICA_LOTE_MAX', 5000)
+    limite = request.args.get('limite', 1000, type=int)
+    return max(1, min(limite, maximo))
+
+
+@replica_ns.route('/estado')
+class ReplicaEstado(Resource):
+    @replica_ns.doc(
+        description='Primera y última secuencia del feed de cambios',
+        responses={200: 'Rango de secuencias', 500: 'Error interno del servidor'}
+    )
+    def get(self):
+        """Rango de secuencias conservadas"""
+        try:
+            return ReplicaService.estado(), 200
+        except Exception as e:
+            replica_ns.abort(500, error=str(e))
+
+
+@replica_ns.route('/cambios')
+class ReplicaCambios(Resource):
+    @replica_ns.doc(
+        description='Jugadores, equipos y partidos que cambiaron después de una secuencia, con su estado actual',
+        params={
+            'desde': 'Última secuencia aplicada por el cliente',
+            'limite': 'Máximo de cambios por respuesta (default 1000)',
+            'releer': 'Secuencias anteriores a desde que se vuelven a incluir (default 0)'
+        },
+        responses={
+            200: 'Cambios desde la secuencia',
+            400: 'Parámetros inválidos',
+            410: 'La secuencia ya no se conserva: resincronizar con /replica/snapshot',
+            500: 'Error interno del servidor'
+        }
+    )
+    def get(self):
+        """Cambios después de la secuencia `desde`"""
+        try:
+            desde = request.args.get('desde', type=int)
+            if desde is None or desde < 0:
+                return {'error': 'Se requiere desde (entero >= 0)'}, 400
+            releer = max(0, request.args.get('releer', 0, type=int))
+
+            try:
+                return ReplicaService.cambios(desde, limite=_limite(), releer=releer), 200
+            except ReplicaSecuenciaVencida as e:
+                return {'error': str(e), 'resincronizar': True}, 410
+
+        except Exception as e:
+            replica_ns.abort(500, error=str(e))
+
+
+@replica_ns.route('/snapshot/<string:entidad>')
+@replica_ns.param('entidad', 'jugadores, equipos o partidos')
+class ReplicaSnapshot(Resource):
+    @replica_ns.doc(
+        description='Tabla completa paginada por clave primaria (resincronización de la réplica)',
+        params={
+            'despues_de': 'Clave primaria de la última fila recibida (default 0)',
+            'limite': 'Filas por página (default 1000)'
+        },
+        responses={
+            200: 'Página de filas',
+            404: 'Entidad no replicada',
+            500: 'Error interno del servidor'
+        }
+    )
+    def get(self, entidad):
+        """Página de una tabla replicada"""
+        try:
+            if entidad not in ReplicaService.entidades():
+                return {'error': f'Entidad no replicada: {entidad}'}, 404
+            despues_de = request.args.get('despues_de', 0, type=int)
+            return ReplicaService.snapshot(entidad, despues_de=despues_de, limite=_limite()), 200
+
+        except Exception as e:
+            replica_ns.abort(500, error=str(e))
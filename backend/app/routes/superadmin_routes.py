@@ -5,7 +5,6 @@ from app.models.usuario import Usuario
 from app.models.campeonato import Campeonato
 from app.extensions import db
 from datetime import datetime, timedelta
-from werkzeug.security import generate_password_hash 
 from app.security.email_service import EmailService  # ✅ CORREGIDO
 from functools import wraps
 import secrets
@@ -217,11 +216,11 @@ class OrganizadoresList(Resource):
             nuevo_organizador = Usuario(
                 nombre=nombre,
                 email=email,
-                contrasena=generate_password_hash(password_temporal),
                 rol='admin',
                 activo=True,
                 email_verified=False
             )
+            nuevo_organizador.set_password(password_temporal)
         
             db.session.add(nuevo_organizador)
             db.session.flush()
@@ -249,8 +248,8 @@ class OrganizadoresList(Resource):
                     nombre=nombre,
                     contrasena=password_temporal,
                     nombre_campeonato=nombre_campeonato
-                )
-                print(f"📧 Email enviado: {email_enviado}")
+                ) is not None
+                print(f"📧 Email encolado: {email_enviado}")
             except Exception as e:
                 print(f"❌ ERROR AL ENVIAR EMAIL: {str(e)}")
                 import traceback
@@ -372,7 +371,7 @@ class ReenviarCredenciales(Resource):
                 return {'error': 'Organizador no encontrado'}, 404
             
             nueva_password = generate_secure_password(16)
-            organizador.contrasena = generate_password_hash(nueva_password)  # ✅ CORREGIDO
+            organizador.set_password(nueva_password)
             db.session.commit()
             
             return {
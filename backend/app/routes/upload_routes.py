@@ -1,17 +1,16 @@
 from flask import request
 from flask_restx import Namespace, Resource
 from flask_jwt_extended import jwt_required
-from werkzeug.utils import secure_filename
+from werkzeug.exceptions import RequestEntityTooLarge
 from app.extensions import db
-import os
-import uuid
+from app.services.imagen_service import ImagenService
+from app.services.imagen_worker import imagen_worker
+from app.utils.subidas import limite_subida
 
 upload_ns = Namespace('upload', description='Subida de archivos')
 
-UPLOAD_FOLDER = 'uploads/logos'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
-
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+MAX_LOGO_BYTES = 5 * 1024 * 1024
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -19,6 +18,7 @@ def allowed_file(filename):
 @upload_ns.route('/logo')
 class UploadLogo(Resource):
     @jwt_required()
+    @limite_subida(MAX_LOGO_BYTES)
     def post(self):
         """Subir logo de equipo"""
         try:
@@ -33,29 +33,36 @@ class UploadLogo(Resource):
             if not allowed_file(file.filename):
                 upload_ns.abort(400, error='Formato no permitido. Use PNG, JPG, JPEG o GIF')
             
-            # Generar nombre único
-            ext = file.filename.rsplit('.', 1)[1].lower()
-            filename = f"{uuid.uuid4().hex}.{ext}"
-            filepath = os.path.join(UPLOAD_FOLDER, filename)
-            
-            # Guardar archivo
-            file.save(filepath)
+            # Guardar por contenido (máximo 5MB, controlado al recibir); las miniaturas se generan en segundo plano
+            try:
+                ruta = ImagenService.guardar_original(file)
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            # Confirma la fila de archivos_blob (AlmacenService no hace commit)
+            db.session.commit()
+            imagen_worker.encolar(ruta)
             
             # Retornar URL
-            logo_url = f"http://localhost:5000/uploads/logos/{filename}"
+            logo_url = f"http://localhost:5000/uploads/{ruta}"
             
             return {
                 'mensaje': 'Logo subido exitosamente',
-                'logo_url': logo_url
+                'logo_url': logo_url,
+                'logo_urls': ImagenService.variantes(logo_url)
             }, 200
             
+        except RequestEntityTooLarge as e:
+            db.session.rollback()
+            return {'error': e.description}, 413
         except Exception as e:
+            db.session.rollback()
             upload_ns.abort(500, error=str(e))
 
 
 @upload_ns.route('/logo-campeonato/<int:id_campeonato>')
 class UploadLogoCampeonato(Resource):
     @jwt_required()
+    @limite_subida(MAX_LOGO_BYTES)
     def post(self, id_campeonato):
         """Subir logo de campeonato"""
         try:
@@ -76,32 +83,27 @@ class UploadLogoCampeonato(Resource):
             if not allowed_file(file.filename):
                 upload_ns.abort(400, error='Formato no permitido. Use PNG, JPG, JPEG o GIF')
             
-            # Validar tamaño (máximo 5MB)
-            file.seek(0, os.SEEK_END)
-            file_size = file.tell()
-            file.seek(0)
-            
-            if file_size > 5 * 1024 * 1024:
-                upload_ns.abort(400, error='El archivo es muy grande. Máximo 5MB')
-            
-            # Generar nombre único
-            ext = file.filename.rsplit('.', 1)[1].lower()
-            filename = f"campeonato_{id_campeonato}_{uuid.uuid4().hex}.{ext}"
-            filepath = os.path.join(UPLOAD_FOLDER, filename)
-            
-            # Guardar archivo
-            file.save(filepath)
+            # Guardar por contenido (máximo 5MB, controlado al recibir); las miniaturas se generan en segundo plano
+            try:
+                ruta = ImagenService.guardar_original(file)
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            imagen_worker.encolar(ruta)
             
             # Actualizar logo_url en el campeonato
-            logo_url = f"http://localhost:5000/uploads/logos/{filename}"
+            logo_url = f"http://localhost:5000/uploads/{ruta}"
             campeonato.logo_url = logo_url
             db.session.commit()
             
             return {
                 'mensaje': 'Logo subido exitosamente',
-                'logo_url': logo_url
+                'logo_url': logo_url,
+                'logo_urls': ImagenService.variantes(logo_url)
             }, 200
             
+        except RequestEntityTooLarge as e:
+            db.session.rollback()
+            return {'error': e.description}, 413
         except Exception as e:
             db.session.rollback()
             upload_ns.abort(500, error=str(e))
\ No newline at end of file
@@ -0,0 +1,202 @@
+import atexit
+import os
+import queue
+import threading
+import time
+
+
+class AuditWriter:
+    """
+    Escritura en lote de la auditoría (security_logs y login_attempts)
+
+    ¿Por qué existe?
+    - Cada login hacía varios INSERT + COMMIT solo para auditar
+    - Ahora el request deja la fila en una cola en memoria y sigue
+    - Un hilo por proceso junta las filas y las escribe con un INSERT de
+      varias filas por tabla, al llegar a AUDIT_BATCH_SIZE filas o a los
+      AUDIT_FLUSH_SECONDS desde la primera fila del lote
+
+    Garantías:
+    - Memoria acotada: la cola tiene como máximo AUDIT_QUEUE_MAX filas
+    - Backpressure: con la cola llena el request espera un momento
+      (AUDIT_ENQUEUE_TIMEOUT) y, si sigue llena, escribe su fila él mismo;
+      ningún evento se descarta
+    - Al terminar el proceso se vacía la cola (atexit)
+    - La fecha del evento se fija al encolar, no al escribir
+
+    Con AUDIT_FLUSH_SECONDS = 0 (tests) cada fila se escribe en el momento.
+    Las escrituras usan su propia conexión: no tocan la transacción del request.
+    """
+
+    REINTENTOS = 3
+
+    def __init__(self):
+        self._app = None
+        self._batch_size = 500
+        self._flush_seconds = 0
+        self._queue_max = 10000
+        self._enqueue_timeout = 0.05
+        self._queue = queue.Queue(maxsize=self._queue_max)
+        self._en_vuelo = []
+        self._worker_pid = None
+        self._lock = threading.Lock()
+        self.escritas = 0
+        self.sincronas = 0
+        self.fallidas = 0
+
+    def init_app(self, app):
+        self._app = app
+        self._batch_size = app.config.get('AUDIT_BATCH_SIZE', 500)
+        self._flush_seconds = app.config.get('AUDIT_FLUSH_SECONDS', 1.0)
+        self._queue_max = app.config.get('AUDIT_QUEUE_MAX', 10000)
+        self._enqueue_timeout = app.config.get('AUDIT_ENQUEUE_TIMEOUT', 0.05)
+        self._queue = queue.Queue(maxsize=self._queue_max)
+        app.extensions['audit_writer'] = self
+
+    # ============================================
+    # ENCOLAR
+    # ============================================
+
+    def registrar(self, modelo, fila):
+        """
+        Encola una fila para la tabla del modelo
+
+        Args:
+            modelo: SecurityLog o LoginAttempt
+            fila: dict columna → valor (incluida la fecha del evento)
+        """
+        item = (modelo, fila)
+
+        if not self._flush_seconds or self._app is None:
+            self._escribir([item])
+            return
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(item)
+            return
+        except queue.Full:
+            pass
+
+        # Backpressure: esperar a que el hilo libere lugar
+        try:
+            self._queue.put(item, timeout=self._enqueue_timeout)
+        except queue.Full:
+            with self._lock:
+                self.sincronas += 1
+            self._escribir([item])
+
+    def pendientes(self, modelo, filtro):
+        """
+        Filas aún no escritas del modelo que cumplen filtro(fila)
+
+        Sirve para que las lecturas recientes (p. ej. intentos fallidos)
+        incluyan lo que todavía está en la cola de este proceso.
+        """
+        with self._queue.mutex:
+            items = list(self._queue.queue)
+        items += list(self._en_vuelo)
+        return [fila for m, fila in items if m is modelo and filtro(fila)]
+
+    def flush(self):
+        """Escribe todo lo encolado (lo usa atexit y sirve para tests o scripts)"""
+        total = 0
+        while True:
+            lote = self._sacar(self._batch_size)
+            if not lote:
+                return total
+            self._escribir_con_reintentos(lote)
+            total += len(lote)
+
+    def stats(self):
+        return {
+            'pendientes': self._queue.qsize(),
+            'escritas': self.escritas,
+            'sincronas': self.sincronas,
+            'fallidas': self.fallidas,
+            'pid': os.getpid()
+        }
+
+    # ============================================
+    # ESCRITURA
+    # ============================================
+
+    def _sacar(self, cantidad):
+        lote = []
+        while len(lote) < cantidad:
+            try:
+                lote.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return lote
+
+    def _escribir(self, lote):
+        """Un INSERT de varias filas por tabla, en una sola transacción"""
+        from app.extensions import db
+
+        por_tabla = {}
+        for modelo, fila in lote:
+            por_tabla.setdefault(modelo, []).append(fila)
+
+        with self._app.app_context():
+            with db.engine.begin() as conn:
+                for modelo, filas in por_tabla.items():
+                    conn.execute(db.insert(modelo.__table__), filas)
+        with self._lock:
+            self.escritas += len(lote)
+
+    def _escribir_con_reintentos(self, lote):
+        self._en_vuelo = lote
+        try:
+            for intento in range(self.REINTENTOS):
+                try:
+                    self._escribir(lote)
+                    return
+                except Exception as e:
+                    self._app.logger.warning(f'No se pudo escribir la auditoría (intento {intento + 1}): {e}')
+                    time.sleep(0.5 * 2 ** intento)
+            # Sin BD disponible: al menos queda en el log de la aplicación
+            with self._lock:
+                self.fallidas += len(lote)
+            for modelo, fila in lote:
+                self._app.logger.error(f'Auditoría no guardada en {modelo.__tablename__}: {fila}')
+        finally:
+            self._en_vuelo = []
+
+    def _ensure_worker(self):
+        """Arranca el hilo de escritura una vez por proceso (también tras un fork)"""
+        if self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid():
+                return
+            if self._worker_pid is not None:
+                # Tras un fork la cola heredada pertenece al proceso padre
+                self._queue = queue.Queue(maxsize=self._queue_max)
+            self._worker_pid = os.getpid()
+        threading.Thread(target=self._worker_loop, name='audit-writer', daemon=True).start()
+        atexit.register(self.flush)
+
+    def _worker_loop(self):
+        while True:
+            try:
+                primero = self._queue.get(timeout=self._flush_seconds)
+            except queue.Empty:
+                continue
+
+            # Visible para pendientes() desde que sale de la cola
+            lote = self._en_vuelo = [primero]
+            limite = time.monotonic() + self._flush_seconds
+            while len(lote) < self._batch_size:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(self._queue.get(timeout=restante))
+                except queue.Empty:
+                    break
+
+            self._escribir_con_reintentos(lote)
+
+
+audit_writer = AuditWriter()
@@ -0,0 +1,331 @@
+import json
+import os
+import random
+import smtplib
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import make_msgid
+
+
+class EmailWorker:
+    """
+    Envío en segundo plano de los emails de la outbox (email_outbox)
+
+    ¿Por qué existe?
+    - El envío SMTP (conexión, TLS, login, DATA) tardaba cientos de ms y a
+      veces fallaba dentro del request de registro, login o superadmin
+    - Ahora EmailService solo inserta la fila y avisa a este hilo
+
+    ¿Cómo funciona?
+    1. Un hilo por proceso despierta al encolarse un email (o cada
+       EMAIL_POLL_SECONDS) y toma hasta EMAIL_BATCH_SIZE filas pendientes.
+       Tomarlas es un UPDATE condicionado a estado = 'pendiente', así que
+       varios procesos no envían el mismo email
+    2. Todas se envían por una misma conexión SMTP, que se mantiene abierta
+       entre lotes (se verifica con NOOP si estuvo inactiva y se cierra tras
+       EMAIL_SMTP_IDLE_SECONDS sin uso)
+    3. Un error reprograma el email con backoff exponencial
+       (EMAIL_BACKOFF_SECONDS * 2^intentos, con jitter); tras
+       EMAIL_MAX_INTENTOS queda 'fallido'. Un destinatario rechazado no se
+       reintenta
+    4. Las filas tomadas por un worker que murió se liberan pasados
+       EMAIL_CLAIM_TIMEOUT_SECONDS
+
+    Con EMAIL_WORKER_ENABLED = False (tests) no arranca ningún hilo: los
+    emails quedan pendientes y se envían con procesar_lote() o
+    `flask emails enviar`. El servidor SMTP sale de MAIL_SERVER/MAIL_PORT,
+    así que sirve cualquier servidor local de pruebas (p. ej. aiosmtpd).
+    """
+
+    def __init__(self):
+        self._app = None
+        self._enabled = False
+        self._poll_seconds = 5
+        self._batch_size = 50
+        self._max_intentos = 5
+        self._backoff = 30
+        self._backoff_max = 3600
+        self._claim_timeout = 300
+        self._idle_seconds = 60
+        self._smtp = None
+        self._smtp_usado = 0
+        self._despertador = threading.Event()
+        self._worker_pid = None
+        self._lock = threading.Lock()
+        self._envio_lock = threading.Lock()
+        self.enviados = 0
+        self.reintentos = 0
+        self.fallidos = 0
+        self.conexiones = 0
+
+    def init_app(self, app):
+        self._app = app
+        self._enabled = app.config.get('EMAIL_WORKER_ENABLED', True)
+        self._poll_seconds = app.config.get('EMAIL_POLL_SECONDS', 5)
+        self._batch_size = app.config.get('EMAIL_BATCH_SIZE', 50)
+        self._max_intentos = app.config.get('EMAIL_MAX_INTENTOS', 5)
+        self._backoff = app.config.get('EMAIL_BACKOFF_SECONDS', 30)
+        self._backoff_max = app.config.get('EMAIL_BACKOFF_MAX_SECONDS', 3600)
+        self._claim_timeout = app.config.get('EMAIL_CLAIM_TIMEOUT_SECONDS', 300)
+        self._idle_seconds = app.config.get('EMAIL_SMTP_IDLE_SECONDS', 60)
+        app.extensions['email_worker'] = self
+
+        if self._enabled:
+            # Emails que quedaron pendientes de antes se envían sin esperar a uno nuevo
+            app.before_request(self._ensure_worker)
+
+    def despertar(self):
+        """Avisa que hay emails nuevos en la outbox"""
+        if not self._enabled:
+            return
+        self._ensure_worker()
+        self._despertador.set()
+
+    def stats(self):
+        return {
+            'enviados': self.enviados,
+            'reintentos': self.reintentos,
+            'fallidos': self.fallidos,
+            'conexiones_smtp': self.conexiones,
+            'conexion_abierta': self._smtp is not None,
+            'pid': os.getpid()
+        }
+
+    # ============================================
+    # LOTE
+    # ============================================
+
+    def procesar_lote(self):
+        """
+        Toma y envía un lote de emails pendientes (llamar dentro de un app_context)
+
+        Returns:
+            int: emails tomados en este lote (enviados o reprogramados)
+        """
+        from app.extensions import db
+        from app.security.email_service import EmailService
+
+        with self._envio_lock:
+            filas = self._reclamar()
+            if not filas:
+                return 0
+
+            renderizados = {}
+            conexion_caida = None
+
+            for fila in filas:
+                if conexion_caida:
+                    self._reprogramar(fila, conexion_caida)
+                    continue
+
+                try:
+                    # Mismo email para varios destinatarios (o reintentos): se renderiza una vez
+                    clave = (fila.plantilla, json.dumps(fila.contexto, sort_keys=True, default=str))
+                    if clave not in renderizados:
+                        renderizados[clave] = EmailService.renderizar(fila.plantilla, fila.contexto)
+                    mensaje = self._mensaje(fila, renderizados[clave])
+                except Exception as e:
+                    # Plantilla o datos inválidos: reintentar no lo arregla
+                    self._marcar_fallido(fila, f'Error renderizando: {e}')
+                    continue
+
+                try:
+                    conexion = self._conexion()
+                except (smtplib.SMTPException, OSError) as e:
+                    # Sin servidor: el resto del lote también se reprograma
+                    conexion_caida = f'No se pudo conectar al SMTP: {e}'
+                    self._reprogramar(fila, conexion_caida)
+                    continue
+
+                try:
+                    conexion.send_message(mensaje)
+                    self._smtp_usado = time.monotonic()
+                    fila.estado = 'enviado'
+                    fila.sent_at = datetime.utcnow()
+                    fila.ultimo_error = None
+                    fila.intentos += 1
+                    # Códigos, enlaces y contraseñas temporales no quedan guardados
+                    fila.contexto = {}
+                    self.enviados += 1
+                except smtplib.SMTPRecipientsRefused as e:
+                    self._marcar_fallido(fila, f'Destinatario rechazado: {e.recipients}')
+                except smtplib.SMTPResponseException as e:
+                    # 5xx es definitivo; 4xx (p. ej. límite de envío) se reintenta
+                    if e.smtp_code >= 500:
+                        self._marcar_fallido(fila, f'{e.smtp_code} {e.smtp_error!r}')
+                    else:
+                        self._reprogramar(fila, f'{e.smtp_code} {e.smtp_error!r}')
+                except (smtplib.SMTPServerDisconnected, OSError) as e:
+                    # SMTPException hereda de OSError: este caso va después
+                    self._cerrar()
+                    self._reprogramar(fila, f'Conexión SMTP perdida: {e}')
+
+            db.session.commit()
+            return len(filas)
+
+    def _reclamar(self):
+        """Marca como 'enviando' hasta EMAIL_BATCH_SIZE filas vencidas y las devuelve"""
+        from app.extensions import db
+        from app.models.email_outbox import EmailOutbox
+
+        now = datetime.utcnow()
+
+        # Filas de un worker que murió a mitad de un lote
+        db.session.execute(
+            db.update(EmailOutbox)
+            .where(
+                EmailOutbox.estado == 'enviando',
+                EmailOutbox.reclamado_at < now - timedelta(seconds=self._claim_timeout)
+            )
+            .values(estado='pendiente', reclamado_por=None)
+            .execution_options(synchronize_session=False)
+        )
+
+        ids = db.session.execute(
+            db.select(EmailOutbox.id)
+            .where(EmailOutbox.estado == 'pendiente', EmailOutbox.proximo_intento <= now)
+            .order_by(EmailOutbox.id)
+            .limit(self._batch_size)
+        ).scalars().all()
+        if not ids:
+            db.session.commit()
+            return []
+
+        reclamo = uuid.uuid4().hex
+        db.session.execute(
+            db.update(EmailOutbox)
+            .where(EmailOutbox.id.in_(ids), EmailOutbox.estado == 'pendiente')
+            .values(estado='enviando', reclamado_por=reclamo, reclamado_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+        return EmailOutbox.query.filter_by(reclamado_por=reclamo, estado='enviando').order_by(EmailOutbox.id).all()
+
+    def _mensaje(self, fila, render):
+        asunto, html, texto = render
+        config = self._app.config
+
+        mensaje = EmailMessage()
+        mensaje['Subject'] = asunto
+        mensaje['From'] = config.get('MAIL_DEFAULT_SENDER') or config.get('MAIL_USERNAME') or 'no-reply@localhost'
+        mensaje['To'] = fila.destinatario
+        mensaje['Message-ID'] = make_msgid(idstring=f'outbox-{fila.id}')
+        mensaje.set_content(texto)
+        mensaje.add_alternative(html, subtype='html')
+        return mensaje
+
+    def _reprogramar(self, fila, error):
+        fila.intentos += 1
+        fila.ultimo_error = error
+        fila.reclamado_por = None
+        if fila.intentos >= self._max_intentos:
+            self._marcar_fallido(fila, error)
+            return
+        espera = min(self._backoff * 2 ** (fila.intentos - 1), self._backoff_max)
+        espera *= random.uniform(0.9, 1.1)
+        fila.estado = 'pendiente'
+        fila.proximo_intento = datetime.utcnow() + timedelta(seconds=espera)
+        self.reintentos += 1
+        self._app.logger.warning(
+            f'Email {fila.id} ({fila.plantilla}) reprogramado en {espera:.0f}s: {error}'
+        )
+
+    def _marcar_fallido(self, fila, error):
+        fila.estado = 'fallido'
+        fila.contexto = {}
+        fila.ultimo_error = error
+        fila.reclamado_por = None
+        self.fallidos += 1
+        self._app.logger.error(f'Email {fila.id} ({fila.plantilla}) a {fila.destinatario} descartado: {error}')
+
+    # ============================================
+    # CONEXIÓN SMTP
+    # ============================================
+
+    def _conexion(self):
+        """Conexión SMTP abierta (la reutiliza si sigue viva)"""
+        if self._smtp is not None and time.monotonic() - self._smtp_usado > 5:
+            # Estuvo un rato sin uso: el servidor pudo haberla cerrado
+            try:
+                if self._smtp.noop()[0] != 250:
+                    self._cerrar()
+            except (smtplib.SMTPException, OSError):
+                self._cerrar()
+
+        if self._smtp is None:
+            config = self._app.config
+            host = config.get('MAIL_SERVER', 'localhost')
+            port = config.get('MAIL_PORT', 25)
+            timeout = config.get('EMAIL_SMTP_TIMEOUT_SECONDS', 10)
+
+            if config.get('MAIL_USE_SSL'):
+                smtp = smtplib.SMTP_SSL(host, port, timeout=timeout)
+            else:
+                smtp = smtplib.SMTP(host, port, timeout=timeout)
+                if config.get('MAIL_USE_TLS'):
+                    smtp.starttls()
+            if config.get('MAIL_USERNAME') and config.get('MAIL_PASSWORD'):
+                smtp.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
+
+            self._smtp = smtp
+            self._smtp_usado = time.monotonic()
+            self.conexiones += 1
+
+        return self._smtp
+
+    def _cerrar(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._smtp = None
+
+    def _cerrar_si_inactiva(self):
+        with self._envio_lock:
+            if self._smtp is not None and time.monotonic() - self._smtp_usado > self._idle_seconds:
+                self._cerrar()
+
+    # ============================================
+    # HILO
+    # ============================================
+
+    def _ensure_worker(self):
+        """Arranca el hilo de envío una vez por proceso (también tras un fork)"""
+        if self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid():
+                return
+            # Tras un fork la conexión heredada es del proceso padre
+            self._smtp = None
+            self._worker_pid = os.getpid()
+        threading.Thread(target=self._worker_loop, name='email-worker', daemon=True).start()
+
+    def _worker_loop(self):
+        from app.extensions import db
+
+        while True:
+            self._despertador.wait(self._poll_seconds)
+            self._despertador.clear()
+            with self._app.app_context():
+                try:
+                    # Lotes llenos: probablemente quedan más
+                    while self.procesar_lote() >= self._batch_size:
+                        pass
+                    self._cerrar_si_inactiva()
+                except Exception as e:
+                    db.session.rollback()
+                    self._app.logger.error(f'Error en el envío de emails: {e}')
+                    with self._envio_lock:
+                        self._cerrar()
+                finally:
+                    db.session.remove()
+
+
+email_worker = EmailWorker()
@@ -0,0 +1,184 @@
+import time
+from datetime import datetime, timezone
+
+
+def _epoch(dt):
+    """datetime UTC naive (como los guarda la BD) → segundos epoch"""
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _datetime(ts):
+    """segundos epoch → datetime UTC naive"""
+    return datetime.utcfromtimestamp(ts)
+
+
+class LoginGuard:
+    """
+    Contadores de logins fallidos y bloqueos activos, sin consultas a la BD
+
+    ¿Por qué existe?
+    - check_and_lock_account e is_account_locked consultaban usuarios,
+      login_attempts y account_lockouts en cada intento de login
+    - En un ataque de credential stuffing eso son varias consultas por intento
+
+    ¿Cómo funciona?
+    - Dos claves por intento fallido: una por email y otra por IP. Cada una
+      guarda los instantes de los fallos en una ventana deslizante
+      (LOGIN_FAILURE_WINDOW_MINUTES) y, si corresponde, hasta cuándo está bloqueada
+    - El estado vive en el mismo almacén que el rate limiting
+      (RATE_LIMIT_STORAGE): en memoria para un worker, SQLite local para
+      compartirlo entre los workers de la máquina
+    - La BD (AccountLockout) solo se toca cuando cambia el estado: al
+      bloquear una cuenta y al desbloquearla con el código
+    - Al arrancar se cargan los bloqueos activos de account_lockouts
+
+    Los bloqueos por IP son solo en memoria: no hay cuenta a la que asociarlos.
+    """
+
+    PREFIJO = 'login'
+    # Instantes guardados por clave como máximo (memoria acotada en un ataque)
+    MAX_FALLOS = 100
+
+    def __init__(self):
+        self._app = None
+        self.window = 30 * 60
+        self.max_por_ip = 20
+        self.duracion_bloqueo_ip = 15 * 60
+
+    def init_app(self, app):
+        """Carga los bloqueos activos (llamar dentro de un app_context)"""
+        self._app = app
+        self.window = app.config.get('LOGIN_FAILURE_WINDOW_MINUTES', 30) * 60
+        self.max_por_ip = app.config.get('MAX_LOGIN_ATTEMPTS_PER_IP', 20)
+        self.duracion_bloqueo_ip = app.config.get('IP_LOCKOUT_DURATION_MINUTES', 15) * 60
+        app.extensions['login_guard'] = self
+        self.warm()
+
+    @property
+    def store(self):
+        from app.security.rate_limit_engine import rate_limit_engine
+        return rate_limit_engine.store
+
+    def _clave(self, tipo, valor):
+        # El separador final evita que limpiar 'a@b.com' borre también 'a@b.com.ar'
+        return f'{self.PREFIJO}|{tipo}|{valor}|'
+
+    # ============================================
+    # ACTUALIZACIONES (atómicas por clave)
+    # ============================================
+
+    def _registrar(self, state, now, limite, duracion):
+        """Suma un fallo; bloquea si se alcanzó el límite (limite=None: solo contar)"""
+        fallos, bloqueado_hasta = state or ([], 0)
+        desde = now - self.window
+        fallos = [t for t in fallos if t > desde]
+        fallos.append(now)
+        fallos = fallos[-(limite or self.MAX_FALLOS):]
+        if limite:
+            if len(fallos) >= limite and bloqueado_hasta <= now:
+                bloqueado_hasta = now + duracion
+        return [fallos, bloqueado_hasta], (len(fallos), bloqueado_hasta), max(now + self.window, bloqueado_hasta)
+
+    def registrar_fallo(self, email, ip_address=None):
+        """
+        Cuenta un intento fallido para el email y para la IP
+
+        Returns:
+            int: fallos del email dentro de la ventana
+        """
+        now = time.time()
+        fallos, _ = self.store.update(
+            self._clave('email', email), lambda s: self._registrar(s, now, None, 0), now
+        )
+        if ip_address:
+            self.store.update(
+                self._clave('ip', ip_address),
+                lambda s: self._registrar(s, now, self.max_por_ip, self.duracion_bloqueo_ip),
+                now
+            )
+        return fallos
+
+    def intentar_bloqueo(self, email, max_intentos, minutos):
+        """
+        Bloquea el email si llegó a max_intentos (solo un llamador gana la transición)
+
+        Returns:
+            tuple: (fallos, nuevo_bloqueo, bloqueado_hasta datetime o None)
+        """
+        now = time.time()
+
+        def fn(state):
+            fallos, bloqueado_hasta = state or ([], 0)
+            fallos = [t for t in fallos if t > now - self.window]
+            nuevo = False
+            if bloqueado_hasta <= now and len(fallos) >= max_intentos:
+                bloqueado_hasta = now + minutos * 60
+                nuevo = True
+            expira = max(now + self.window, bloqueado_hasta)
+            return [fallos, bloqueado_hasta], (len(fallos), nuevo, bloqueado_hasta), expira
+
+        fallos, nuevo, bloqueado_hasta = self.store.update(self._clave('email', email), fn, now)
+        return fallos, nuevo, _datetime(bloqueado_hasta) if bloqueado_hasta > now else None
+
+    def fijar_bloqueo(self, email, locked_until):
+        """Marca el email como bloqueado hasta locked_until (carga desde la BD)"""
+        now = time.time()
+        hasta = _epoch(locked_until)
+
+        def fn(state):
+            fallos, bloqueado_hasta = state or ([], 0)
+            bloqueado_hasta = max(bloqueado_hasta, hasta)
+            return [fallos, bloqueado_hasta], None, max(now + self.window, bloqueado_hasta)
+
+        self.store.update(self._clave('email', email), fn, now)
+
+    def limpiar(self, email):
+        """Borra fallos y bloqueo del email (login exitoso o desbloqueo con código)"""
+        self.store.delete(self._clave('email', email))
+
+    # ============================================
+    # CONSULTAS
+    # ============================================
+
+    def _bloqueado_hasta(self, clave):
+        now = time.time()
+
+        def fn(state):
+            state = state or [[], 0]
+            return state, state[1], max(now + self.window, state[1])
+
+        hasta = self.store.update(clave, fn, now)
+        return _datetime(hasta) if hasta > now else None
+
+    def bloqueo_email(self, email):
+        """datetime hasta el que está bloqueado el email, o None"""
+        return self._bloqueado_hasta(self._clave('email', email))
+
+    def bloqueo_ip(self, ip_address):
+        """datetime hasta el que está bloqueada la IP, o None"""
+        return self._bloqueado_hasta(self._clave('ip', ip_address))
+
+    # ============================================
+    # CARGA INICIAL
+    # ============================================
+
+    def warm(self):
+        """Carga en el almacén los bloqueos activos de account_lockouts"""
+        from app.extensions import db
+        from app.models.account_lockout import AccountLockout
+        from app.models.usuario import Usuario
+
+        filas = db.session.query(Usuario.email, AccountLockout.locked_until).join(
+            AccountLockout, AccountLockout.user_id == Usuario.id_usuario
+        ).filter(
+            AccountLockout.is_active == True,
+            AccountLockout.locked_until > datetime.utcnow()
+        ).all()
+
+        for email, locked_until in filas:
+            self.fijar_bloqueo(email, locked_until)
+        db.session.remove()
+        return len(filas)
+
+
+login_guard = LoginGuard()
@@ -3,6 +3,8 @@ from app.models.usuario import Usuario
 from app.models.login_attempt import LoginAttempt
 from app.models.account_lockout import AccountLockout
 from app.security.email_service import EmailService
+from app.security.audit_writer import audit_writer
+from app.security.login_guard import login_guard
 from flask import current_app, request
 from datetime import datetime, timedelta
 import secrets
@@ -39,22 +41,23 @@ class LoginTracker:
             if user_agent is None:
                 user_agent = request.headers.get('User-Agent', 'unknown') if request else 'unknown'
             
-            # Crear registro
-            attempt = LoginAttempt(
-                email=email,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                success=success,
-                failure_reason=failure_reason
-            )
-            
-            db.session.add(attempt)
-            db.session.commit()
-            
+            # Encolar (se escribe en lote, fuera del request)
+            audit_writer.registrar(LoginAttempt, {
+                'email': email,
+                'ip_address': ip_address,
+                'user_agent': user_agent,
+                'success': success,
+                'failure_reason': failure_reason,
+                'attempted_at': datetime.utcnow()
+            })
+
+            # Contadores en memoria para los bloqueos (sin consultas)
+            if not success:
+                login_guard.registrar_fallo(email, ip_address)
+
             print(f"{'✅' if success else '❌'} Login attempt registrado: {email} desde {ip_address}")
-            
+
         except Exception as e:
-            db.session.rollback()
             print(f"⚠️ Error registrando intento de login: {str(e)}")
     
     
@@ -63,6 +66,9 @@ class LoginTracker:
         """
         Verifica intentos fallidos y bloquea cuenta si es necesario
         
+        Los fallos se cuentan en LoginGuard (record_attempt); la BD solo se
+        toca cuando este intento es el que bloquea la cuenta.
+        
         Args:
             email: Email del usuario a verificar
         
@@ -75,103 +81,100 @@ class LoginTracker:
             }
         """
         try:
-            # Buscar usuario
-            usuario = Usuario.query.filter_by(email=email).first()
-            if not usuario:
-                return {'locked': False, 'attempts': 0}
-            
             # Configuración
             max_attempts = current_app.config.get('MAX_LOGIN_ATTEMPTS', 5)
             lockout_minutes = current_app.config.get('LOCKOUT_DURATION_MINUTES', 10)
             
-            # Contar intentos fallidos recientes (últimos 30 minutos)
-            time_window = datetime.utcnow() - timedelta(minutes=30)
-            failed_attempts = LoginAttempt.query.filter(
-                LoginAttempt.email == email,
-                LoginAttempt.success == False,
-                LoginAttempt.attempted_at >= time_window
-            ).count()
+            failed_attempts, nuevo_bloqueo, locked_until = login_guard.intentar_bloqueo(
+                email, max_attempts, lockout_minutes
+            )
             
             print(f"🔍 {email} tiene {failed_attempts}/{max_attempts} intentos fallidos")
             
-            # Si alcanzó el límite, bloquear
-            if failed_attempts >= max_attempts:
-                # ✅ VERIFICAR SI YA TIENE UN BLOQUEO ACTIVO
-                now = datetime.utcnow()
-                existing_lockout = AccountLockout.query.filter(
-                    AccountLockout.user_id == usuario.id_usuario,
-                    AccountLockout.is_active == True,
-                    AccountLockout.locked_until > now
-                ).first()
-                
-                # Si ya está bloqueado, retornar el bloqueo existente (NO crear uno nuevo)
-                if existing_lockout:
-                    print(f"🔒 Cuenta YA bloqueada: {email} (usando bloqueo existente)")
+            if not nuevo_bloqueo:
+                if locked_until:
+                    # Ya estaba bloqueada: el código se envió al bloquear
                     return {
                         'locked': True,
                         'attempts': failed_attempts,
-                        'locked_until': existing_lockout.locked_until,
-                        'unlock_code': existing_lockout.unlock_code
+                        'locked_until': locked_until,
+                        'unlock_code': None
                     }
-                
-                # ✅ CREAR NUEVO BLOQUEO (solo si no existe uno activo)
-                locked_until = datetime.utcnow() + timedelta(minutes=lockout_minutes)
-                
-                # Generar código de desbloqueo
-                unlock_code = LoginTracker._generate_unlock_code()
-                code_expires = datetime.utcnow() + timedelta(
-                    minutes=current_app.config.get('UNLOCK_CODE_EXPIRES_MINUTES', 15)
-                )
-                
-                # Crear registro de bloqueo
-                lockout = AccountLockout(
-                    user_id=usuario.id_usuario,
-                    locked_until=locked_until,
-                    reason='intentos_fallidos',
-                    unlock_code=unlock_code,
-                    unlock_code_expires=code_expires
-                )
-                
-                # Actualizar usuario
-                usuario.failed_login_attempts = failed_attempts
-                usuario.locked_until = locked_until
-                
-                db.session.add(lockout)
-                db.session.commit()
-                
-                print(f"🔒 Cuenta bloqueada: {email} hasta {locked_until} - Código: {unlock_code}")
-                
-                # Enviar email de desbloqueo (si está habilitado)
-                try:
-                    if current_app.config.get('SEND_LOCKOUT_EMAIL', True):
-                        email_sent = EmailService.send_unlock_code(
-                            email=email,
-                            nombre=usuario.nombre,
-                            unlock_code=unlock_code,
-                            locked_until=locked_until.strftime('%H:%M:%S'),
-                            attempts=failed_attempts
-                        )
-                        
-                        if email_sent:
-                            print(f"✅ Código de desbloqueo enviado exitosamente a {email}")
-                        else:
-                            print(f"⚠️ EmailService retornó False - No se pudo enviar email a {email}")
-                except Exception as email_error:
-                    print(f"❌ EXCEPCIÓN enviando email de desbloqueo: {email_error}")
-                    import traceback
-                    traceback.print_exc()
-                
+                return {'locked': False, 'attempts': failed_attempts}
+            
+            # ✅ CAMBIO DE ESTADO: persistir el bloqueo
+            usuario = Usuario.query.filter_by(email=email).first()
+            if not usuario:
+                login_guard.limpiar(email)
+                return {'locked': False, 'attempts': 0}
+            
+            # Otro worker (almacén en memoria) pudo haber creado ya el bloqueo
+            now = datetime.utcnow()
+            existing_lockout = AccountLockout.query.filter(
+                AccountLockout.user_id == usuario.id_usuario,
+                AccountLockout.is_active == True,
+                AccountLockout.locked_until > now
+            ).first()
+            
+            if existing_lockout:
+                print(f"🔒 Cuenta YA bloqueada: {email} (usando bloqueo existente)")
+                login_guard.fijar_bloqueo(email, existing_lockout.locked_until)
                 return {
                     'locked': True,
                     'attempts': failed_attempts,
-                    'locked_until': locked_until,
-                    'unlock_code': unlock_code
+                    'locked_until': existing_lockout.locked_until,
+                    'unlock_code': existing_lockout.unlock_code
                 }
             
-            # No se alcanzó el límite
+            # Generar código de desbloqueo
+            unlock_code = LoginTracker._generate_unlock_code()
+            code_expires = datetime.utcnow() + timedelta(
+                minutes=current_app.config.get('UNLOCK_CODE_EXPIRES_MINUTES', 15)
+            )
+            
+            # Crear registro de bloqueo
+            lockout = AccountLockout(
+                user_id=usuario.id_usuario,
+                locked_until=locked_until,
+                reason='intentos_fallidos',
+                unlock_code=unlock_code,
+                unlock_code_expires=code_expires
+            )
+            
+            # Actualizar usuario
+            usuario.failed_login_attempts = failed_attempts
+            usuario.locked_until = locked_until
+            
+            db.session.add(lockout)
+            db.session.commit()
+            
+            print(f"🔒 Cuenta bloqueada: {email} hasta {locked_until} - Código: {unlock_code}")
+            
+            # Enviar email de desbloqueo (si está habilitado)
+            try:
+                if current_app.config.get('SEND_LOCKOUT_EMAIL', True):
+                    email_sent = EmailService.send_unlock_code(
+                        email=email,
+                        nombre=usuario.nombre,
+                        unlock_code=unlock_code,
+                        locked_until=locked_until.strftime('%H:%M:%S'),
+                        attempts=failed_attempts
+                    )
+                    
+                    if email_sent:
+                        print(f"✅ Código de desbloqueo enviado exitosamente a {email}")
+                    else:
+                        print(f"⚠️ EmailService retornó False - No se pudo enviar email a {email}")
+            except Exception as email_error:
+                print(f"❌ EXCEPCIÓN enviando email de desbloqueo: {email_error}")
+                import traceback
+                traceback.print_exc()
+            
             return {
-                'locked': False,
-                'attempts': failed_attempts
+                'locked': True,
+                'attempts': failed_attempts,
+                'locked_until': locked_until,
+                'unlock_code': unlock_code
             }
             
         except Exception as e:
@@ -183,7 +186,7 @@ class LoginTracker:
     @staticmethod
     def is_account_locked(email: str) -> dict:
         """
-        Verifica si una cuenta está actualmente bloqueada
+        Verifica si una cuenta está actualmente bloqueada (sin consultas a la BD)
         
         Args:
             email: Email del usuario
@@ -196,33 +199,13 @@ class LoginTracker:
             }
         """
         try:
-            usuario = Usuario.query.filter_by(email=email).first()
-            if not usuario:
-                return {'locked': False}
-            
-            # Verificar si tiene bloqueo activo en BD
-            now = datetime.utcnow()
-            active_lockout = AccountLockout.query.filter(
-                AccountLockout.user_id == usuario.id_usuario,
-                AccountLockout.is_active == True,
-                AccountLockout.locked_until > now
-            ).first()
-            
-            if active_lockout:
+            locked_until = login_guard.bloqueo_email(email)
+            if locked_until:
                 return {
                     'locked': True,
-                    'locked_until': active_lockout.locked_until,
-                    'reason': active_lockout.reason
-                }
-            
-            # Verificar campo locked_until en usuario (fallback)
-            if usuario.locked_until and usuario.locked_until > now:
-                return {
-                    'locked': True,
-                    'locked_until': usuario.locked_until,
+                    'locked_until': locked_until,
                     'reason': 'intentos_fallidos'
                 }
-            
             return {'locked': False}
             
         except Exception as e:
@@ -230,6 +213,25 @@ class LoginTracker:
             return {'locked': False, 'error': str(e)}
     
     
+    @staticmethod
+    def is_ip_blocked(ip_address: str) -> dict:
+        """
+        Verifica si la IP superó MAX_LOGIN_ATTEMPTS_PER_IP fallos en la ventana
+        
+        Returns:
+            dict: {'locked': bool, 'locked_until': datetime (si está bloqueada)}
+        """
+        try:
+            locked_until = login_guard.bloqueo_ip(ip_address) if ip_address else None
+            if locked_until:
+                return {'locked': True, 'locked_until': locked_until}
+            return {'locked': False}
+            
+        except Exception as e:
+            print(f"❌ Error verificando bloqueo de IP: {str(e)}")
+            return {'locked': False, 'error': str(e)}
+    
+    
     @staticmethod
     def unlock_account_with_code(email: str, unlock_code: str) -> dict:
         """
@@ -269,6 +271,7 @@ class LoginTracker:
             usuario.failed_login_attempts = 0
             
             db.session.commit()
+            login_guard.limpiar(email)
             
             print(f"🔓 Cuenta desbloqueada con código: {email}")
             
@@ -281,19 +284,23 @@ class LoginTracker:
     
     
     @staticmethod
-    def reset_failed_attempts(email: str):
+    def reset_failed_attempts(email: str, usuario=None, commit: bool = True):
         """
         Resetea el contador de intentos fallidos (cuando login es exitoso)
         
         Args:
             email: Email del usuario
+            usuario: Usuario ya cargado (evita volver a buscarlo)
+            commit: False para dejar el cambio en la transacción del login
         """
         try:
-            usuario = Usuario.query.filter_by(email=email).first()
+            login_guard.limpiar(email)
+            usuario = usuario or Usuario.query.filter_by(email=email).first()
             if usuario:
                 usuario.failed_login_attempts = 0
                 usuario.locked_until = None
-                db.session.commit()
+                if commit:
+                    db.session.commit()
                 print(f"✅ Intentos fallidos reseteados: {email}")
                 
         except Exception as e:
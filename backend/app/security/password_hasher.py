@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+
+class HasherSaturado(Exception):
+    """Hay más hashes pendientes que PASSWORD_HASH_MAX_QUEUE: el llamador debe responder 503"""
+
+
+class PasswordHasher:
+    """
+    Hash y verificación de contraseñas (bcrypt) en un pool acotado de hilos
+
+    ¿Por qué existe?
+    - bcrypt es caro a propósito (~100-300 ms); hecho en el hilo del request,
+      una ráfaga de logins ocupaba todos los workers
+    - bcrypt libera el GIL mientras calcula, así que un pool de hilos
+      aprovecha varios núcleos sin procesos extra
+
+    ¿Cómo funciona?
+    1. Como mucho PASSWORD_HASH_WORKERS hashes en paralelo y
+       PASSWORD_HASH_MAX_QUEUE esperando; pasado ese límite se lanza
+       HasherSaturado en vez de encolar sin fin
+    2. El costo (rounds) se calibra al arrancar: el mayor entre
+       PASSWORD_HASH_MIN_ROUNDS y PASSWORD_HASH_MAX_ROUNDS cuyo tiempo
+       medido entra en PASSWORD_HASH_TARGET_MS. PASSWORD_HASH_ROUNDS lo fija
+       a mano (los tests usan 4)
+    3. needs_rehash() detecta hashes con menos rounds que el objetivo (o de
+       otro algoritmo); el login los rehashea con la contraseña ya verificada
+
+    También verifica hashes de werkzeug (pbkdf2/scrypt) que quedaron de
+    versiones anteriores; needs_rehash() los marca para pasarlos a bcrypt.
+    """
+
+    def __init__(self):
+        self.rounds = 12
+        self._workers = 4
+        self._max_queue = 64
+        self._timeout = 10
+        self._executor = None
+        self._executor_pid = None
+        self._slots = threading.BoundedSemaphore(self._workers + self._max_queue)
+        self._lock = threading.Lock()
+        self.rechazados = 0
+
+    def init_app(self, app):
+        self._workers = app.config.get('PASSWORD_HASH_WORKERS') or min(4, os.cpu_count() or 1)
+        self._max_queue = app.config.get('PASSWORD_HASH_MAX_QUEUE', 64)
+        self._timeout = app.config.get('PASSWORD_HASH_TIMEOUT_SECONDS', 10)
+        self._slots = threading.BoundedSemaphore(self._workers + self._max_queue)
+        self._executor = None
+        self._executor_pid = None
+
+        rounds = app.config.get('PASSWORD_HASH_ROUNDS')
+        if rounds:
+            self.rounds = rounds
+        else:
+            self.rounds = self.calibrar(
+                app.config.get('PASSWORD_HASH_TARGET_MS', 250),
+                app.config.get('PASSWORD_HASH_MIN_ROUNDS', 10),
+                app.config.get('PASSWORD_HASH_MAX_ROUNDS', 14)
+            )
+        app.extensions['password_hasher'] = self
+
+    @staticmethod
+    def calibrar(target_ms, min_rounds=10, max_rounds=14):
+        """
+        Mayor costo cuyo hash entra en target_ms en esta máquina
+
+        Se mide una vez el costo mínimo y se extrapola (cada round duplica el
+        tiempo); nunca baja de min_rounds aunque la máquina sea lenta.
+        """
+        inicio = time.perf_counter()
+        bcrypt.hashpw(b'calibracion', bcrypt.gensalt(min_rounds))
+        ms = (time.perf_counter() - inicio) * 1000
+
+        rounds = min_rounds
+        while rounds < max_rounds and ms * 2 <= target_ms:
+            rounds += 1
+            ms *= 2
+        return rounds
+
+    # ============================================
+    # API
+    # ============================================
+
+    def hash(self, password):
+        """Devuelve el hash bcrypt (str) con el costo objetivo"""
+        rounds = self.rounds
+        return self._ejecutar(
+            lambda: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+        )
+
+    def verify(self, password, hashed):
+        """True si la contraseña corresponde al hash"""
+        if not hashed:
+            return False
+        if not hashed.startswith('$2'):
+            from werkzeug.security import check_password_hash
+            return self._ejecutar(lambda: check_password_hash(hashed, password))
+        return self._ejecutar(
+            lambda: bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+        )
+
+    def needs_rehash(self, hashed):
+        """True si el hash no es bcrypt o tiene menos rounds que el objetivo"""
+        if not hashed or not hashed.startswith('$2'):
+            return True
+        try:
+            return int(hashed.split('$')[2]) < self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def stats(self):
+        return {
+            'rounds': self.rounds,
+            'workers': self._workers,
+            'max_queue': self._max_queue,
+            'rechazados': self.rechazados
+        }
+
+    # ============================================
+    # POOL
+    # ============================================
+
+    def _ejecutar(self, fn):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rechazados += 1
+            raise HasherSaturado('Demasiadas verificaciones de contraseña en curso')
+        try:
+            return self._pool().submit(fn).result(timeout=self._timeout)
+        finally:
+            self._slots.release()
+
+    def _pool(self):
+        """Un pool por proceso (también tras un fork)"""
+        if self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor_pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._workers, thread_name_prefix='password-hash'
+                    )
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+
+password_hasher = PasswordHasher()
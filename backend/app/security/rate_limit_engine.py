@@ -0,0 +1,420 @@
+"""
+Motor de rate limiting en memoria
+
+Reemplaza el SELECT + INSERT/UPDATE + COMMIT sobre rate_limits que se hacía
+en cada petición limitada.
+
+Piezas:
+- Algoritmos: TokenBucket y SlidingWindowLog (deciden si se permite la petición)
+- Almacenes: ShardedMemoryStore (un proceso) y SQLiteStore (varios workers
+  en la misma máquina); ambos aplican la actualización de forma atómica
+- AuditBuffer: acumula los contadores y los escribe en rate_limits por lotes,
+  fuera de la petición, para auditoría y RateLimiter.get_user_stats()
+"""
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+RateLimitResult = namedtuple('RateLimitResult', 'allowed limit remaining reset_at retry_after blocked_until')
+
+
+# ============================================
+# ALGORITMOS
+# ============================================
+
+class TokenBucket:
+    """
+    Balde de fichas: capacidad `limit`, se rellena a limit/window fichas por segundo
+
+    Permite ráfagas cortas hasta la capacidad y luego un ritmo sostenido.
+    Estado: [fichas, ultima_actualizacion, bloqueado_hasta]
+    """
+    name = 'token_bucket'
+
+    def hit(self, state, now, limit, window, ban):
+        rate = limit / window
+        if state is None:
+            tokens, last, blocked_until = float(limit), now, 0
+        else:
+            tokens, last, blocked_until = state
+            tokens = min(float(limit), tokens + (now - last) * rate)
+
+        if blocked_until > now:
+            result = RateLimitResult(False, limit, 0, blocked_until, blocked_until - now, blocked_until)
+        elif tokens >= 1:
+            tokens -= 1
+            reset_at = now + (limit - tokens) / rate
+            result = RateLimitResult(True, limit, int(tokens), reset_at, 0, None)
+        else:
+            if ban:
+                blocked_until = now + ban
+                retry_after = ban
+            else:
+                retry_after = (1 - tokens) / rate
+            result = RateLimitResult(False, limit, 0, now + retry_after, retry_after, blocked_until or None)
+
+        expires_at = max(now + window, blocked_until)
+        return [tokens, now, blocked_until], result, expires_at
+
+
+class SlidingWindowLog:
+    """
+    Registro de ventana deslizante: guarda el instante de cada petición permitida
+    y cuenta las de los últimos `window` segundos
+
+    Es exacto (sin el doble de ráfaga en el borde de una ventana fija).
+    Estado: [[instantes...], bloqueado_hasta]; como mucho `limit` instantes por clave.
+    """
+    name = 'sliding_window'
+
+    def hit(self, state, now, limit, window, ban):
+        if state is None:
+            log, blocked_until = [], 0
+        else:
+            log, blocked_until = state
+            desde = now - window
+            if log and log[0] <= desde:
+                log = [t for t in log if t > desde]
+
+        if blocked_until > now:
+            result = RateLimitResult(False, limit, 0, blocked_until, blocked_until - now, blocked_until)
+        elif len(log) < limit:
+            log.append(now)
+            reset_at = log[0] + window
+            result = RateLimitResult(True, limit, limit - len(log), reset_at, 0, None)
+        else:
+            if ban:
+                blocked_until = now + ban
+                retry_after = ban
+            else:
+                retry_after = log[0] + window - now
+            result = RateLimitResult(False, limit, 0, now + retry_after, retry_after, blocked_until or None)
+
+        expires_at = max(now + window, blocked_until)
+        return [log, blocked_until], result, expires_at
+
+
+ALGORITHMS = {
+    TokenBucket.name: TokenBucket(),
+    SlidingWindowLog.name: SlidingWindowLog()
+}
+
+
+# ============================================
+# ALMACENES
+# ============================================
+
+class ShardedMemoryStore:
+    """
+    Estado en memoria del proceso, repartido en N shards con su propio lock
+
+    Peticiones de claves distintas casi nunca compiten por el mismo lock.
+    Las claves vencidas se eliminan de a poco al escribir en cada shard.
+    """
+
+    SWEEP_EVERY = 1000
+
+    def __init__(self, shards=16):
+        self._shards = [({}, threading.Lock()) for _ in range(shards)]
+        self._ops = [0] * shards
+
+    def _shard(self, key):
+        return zlib.crc32(key.encode()) % len(self._shards)
+
+    def update(self, key, fn, now):
+        idx = self._shard(key)
+        data, lock = self._shards[idx]
+        with lock:
+            entry = data.get(key)
+            state = entry[0] if entry and entry[1] > now else None
+            new_state, result, expires_at = fn(state)
+            data[key] = (new_state, expires_at)
+
+            self._ops[idx] += 1
+            if self._ops[idx] >= self.SWEEP_EVERY:
+                self._ops[idx] = 0
+                for k in [k for k, (_, exp) in data.items() if exp <= now]:
+                    del data[k]
+        return result
+
+    def delete(self, prefix):
+        removed = 0
+        for data, lock in self._shards:
+            with lock:
+                for k in [k for k in data if k.startswith(prefix)]:
+                    del data[k]
+                    removed += 1
+        return removed
+
+    def size(self):
+        return sum(len(data) for data, _ in self._shards)
+
+
+class SQLiteStore:
+    """
+    Estado compartido por todos los workers de la máquina en un archivo SQLite
+
+    Cada actualización es un BEGIN IMMEDIATE → leer → escribir, así dos
+    workers no pueden contar la misma petición dos veces. El archivo debería
+    estar en disco local (o /dev/shm) para que sea rápido.
+    """
+
+    SWEEP_EVERY = 1000
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._ops = 0
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn().executescript("""
+            CREATE TABLE IF NOT EXISTS rate_limit_state (
+                key TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_rate_limit_state_expires ON rate_limit_state (expires_at);
+        """)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def update(self, key, fn, now):
+        conn = self._conn()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                'SELECT state FROM rate_limit_state WHERE key = ? AND expires_at > ?', (key, now)
+            ).fetchone()
+            new_state, result, expires_at = fn(json.loads(row[0]) if row else None)
+            conn.execute(
+                'INSERT OR REPLACE INTO rate_limit_state (key, state, expires_at) VALUES (?, ?, ?)',
+                (key, json.dumps(new_state), expires_at)
+            )
+
+            self._ops += 1
+            if self._ops >= self.SWEEP_EVERY:
+                self._ops = 0
+                conn.execute('DELETE FROM rate_limit_state WHERE expires_at <= ?', (now,))
+        return result
+
+    def delete(self, prefix):
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                "DELETE FROM rate_limit_state WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+            )
+        return cur.rowcount
+
+    def size(self):
+        return self._conn().execute('SELECT COUNT(*) FROM rate_limit_state').fetchone()[0]
+
+
+# ============================================
+# AUDITORÍA POR LOTES
+# ============================================
+
+class AuditBuffer:
+    """
+    Acumula peticiones por (identificador, endpoint) y las escribe en
+    rate_limits con un INSERT de varias filas
+
+    - Las filas se agrupan por minuto (window_start); si otro worker ya
+      escribió la misma fila, los contadores se suman (upsert)
+    - Memoria acotada: pasado max_keys se descartan claves nuevas y se cuentan
+      en 'dropped'
+    """
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.flushed = 0
+
+    def record(self, identifier, endpoint, window, blocked_until):
+        key = (identifier, endpoint)
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                if len(self._pending) >= self.max_keys:
+                    self.dropped += 1
+                    return False
+                entry = self._pending[key] = [0, window, None]
+            entry[0] += 1
+            if blocked_until:
+                entry[2] = max(entry[2] or 0, blocked_until)
+            return len(self._pending) >= self.max_keys // 2
+
+    def __len__(self):
+        return len(self._pending)
+
+    def flush(self):
+        """Escribe lo acumulado (llamar dentro de un app_context)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        from app.extensions import db
+        from app.models.rate_limit import RateLimit
+
+        minuto = datetime.utcnow().replace(second=0, microsecond=0)
+        rows = [{
+            'identifier': identifier[:100],
+            'endpoint': endpoint[:255],
+            'requests_count': count,
+            'window_start': minuto,
+            'window_end': minuto + timedelta(seconds=window),
+            'blocked_until': datetime.utcfromtimestamp(blocked_until) if blocked_until else None
+        } for (identifier, endpoint), (count, window, blocked_until) in pending.items()]
+
+        dialect = db.engine.dialect.name
+        if dialect == 'mysql':
+            from sqlalchemy.dialects.mysql import insert
+            stmt = insert(RateLimit)
+            stmt = stmt.on_duplicate_key_update(
+                requests_count=RateLimit.requests_count + stmt.inserted.requests_count,
+                blocked_until=db.func.coalesce(stmt.inserted.blocked_until, RateLimit.blocked_until)
+            )
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(RateLimit)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['identifier', 'endpoint', 'window_start'],
+                set_={
+                    'requests_count': RateLimit.requests_count + stmt.excluded.requests_count,
+                    'blocked_until': db.func.coalesce(stmt.excluded.blocked_until, RateLimit.blocked_until)
+                }
+            )
+        else:
+            stmt = db.insert(RateLimit)
+
+        try:
+            db.session.execute(stmt, rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        self.flushed += len(rows)
+        return len(rows)
+
+
+# ============================================
+# MOTOR
+# ============================================
+
+class RateLimitEngine:
+    """
+    Punto de entrada: elige algoritmo y almacén según la configuración
+
+    Config:
+    - RATE_LIMIT_ALGORITHM: 'sliding_window' (default) o 'token_bucket'
+    - RATE_LIMIT_STORAGE: 'memory' (default) o 'sqlite' (RATE_LIMIT_SQLITE_PATH)
+    - RATE_LIMIT_FLUSH_SECONDS: cada cuánto se escribe la auditoría (0 = solo manual)
+    """
+
+    def __init__(self):
+        self._app = None
+        self.store = ShardedMemoryStore()
+        self.algorithm = ALGORITHMS[SlidingWindowLog.name]
+        self.audit = AuditBuffer()
+        self._flush_seconds = 0
+        self._flusher_pid = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self._app = app
+        self.algorithm = ALGORITHMS[app.config.get('RATE_LIMIT_ALGORITHM', SlidingWindowLog.name)]
+
+        if app.config.get('RATE_LIMIT_STORAGE', 'memory') == 'sqlite':
+            self.store = SQLiteStore(app.config['RATE_LIMIT_SQLITE_PATH'])
+        else:
+            self.store = ShardedMemoryStore(shards=app.config.get('RATE_LIMIT_SHARDS', 16))
+
+        self.audit = AuditBuffer(max_keys=app.config.get('RATE_LIMIT_AUDIT_MAX_KEYS', 10000))
+        self._flush_seconds = app.config.get('RATE_LIMIT_FLUSH_SECONDS', 10)
+        app.extensions['rate_limit_engine'] = self
+
+    def hit(self, identifier, endpoint, limit, window_seconds, ban_seconds=0, algorithm=None):
+        """
+        Cuenta una petición y decide si se permite
+
+        Returns:
+            RateLimitResult(allowed, limit, remaining, reset_at, retry_after, blocked_until)
+            reset_at / blocked_until en segundos epoch
+        """
+        algo = ALGORITHMS[algorithm] if algorithm else self.algorithm
+        now = time.time()
+        key = f'{identifier}|{endpoint}'
+        result = self.store.update(
+            key, lambda state: algo.hit(state, now, limit, window_seconds, ban_seconds), now
+        )
+
+        if self.audit.record(identifier, endpoint, window_seconds, result.blocked_until):
+            self._wake.set()
+        self._ensure_flusher()
+        return result
+
+    def reset(self, identifier, endpoint=None):
+        prefix = f'{identifier}|{endpoint}' if endpoint else f'{identifier}|'
+        return self.store.delete(prefix)
+
+    def flush(self):
+        return self.audit.flush()
+
+    def stats(self):
+        return {
+            'algorithm': self.algorithm.name,
+            'store': type(self.store).__name__,
+            'keys': self.store.size(),
+            'audit_pending': len(self.audit),
+            'audit_flushed': self.audit.flushed,
+            'audit_dropped': self.audit.dropped
+        }
+
+    # ============================================
+    # ESCRITURA EN SEGUNDO PLANO
+    # ============================================
+
+    def _ensure_flusher(self):
+        """Arranca el hilo de escritura una vez por proceso (también tras un fork)"""
+        if self._flusher_pid == os.getpid() or not self._flush_seconds or self._app is None:
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name='rate-limit-flush', daemon=True).start()
+        atexit.register(self._flush_safe)
+
+    def _flush_loop(self):
+        while True:
+            self._wake.wait(self._flush_seconds)
+            self._wake.clear()
+            self._flush_safe()
+
+    def _flush_safe(self):
+        from app.extensions import db
+        with self._app.app_context():
+            try:
+                self.audit.flush()
+            except Exception as e:
+                self._app.logger.warning(f'No se pudo guardar la auditoría de rate limiting: {e}')
+            finally:
+                db.session.remove()
+
+
+rate_limit_engine = RateLimitEngine()
@@ -1,7 +1,9 @@
 from app.extensions import db
 from app.models.rate_limit import RateLimit
 from flask import request, current_app
+from app.security.rate_limit_engine import rate_limit_engine
 from datetime import datetime, timedelta
+import math
 
 class RateLimiter:
     """
@@ -15,20 +17,29 @@ class RateLimiter:
     """
     
     @staticmethod
-    def check_rate_limit(identifier: str, endpoint: str) -> dict:
+    def check_rate_limit(identifier: str, endpoint: str, max_requests: int = None,
+                         window_minutes: int = None, algorithm: str = None) -> dict:
         """
         Verifica si un usuario/IP puede hacer una petición
         
         Args:
             identifier: IP o user_id (ejemplo: "192.168.1.1" o "user_123")
             endpoint: Ruta del endpoint (ejemplo: "/api/auth/login")
+            max_requests: Límite del endpoint (default RATE_LIMIT_REQUESTS)
+            window_minutes: Ventana del endpoint (default RATE_LIMIT_WINDOW_MINUTES)
+            algorithm: 'sliding_window' o 'token_bucket' (default RATE_LIMIT_ALGORITHM)
         
         Returns:
             dict: {
                 'allowed': bool,
+                'limit': int,
                 'remaining': int,
-                'reset_at': datetime (si está bloqueado)
+                'reset_at': datetime (cuándo se libera el límite),
+                'retry_after': int (segundos, solo si no se permite)
             }
+        
+        La decisión se toma en memoria (rate_limit_engine); la tabla
+        rate_limits solo recibe la auditoría por lotes.
         """
         try:
             # Verificar si rate limiting está habilitado
@@ -36,81 +47,37 @@ class RateLimiter:
                 return {'allowed': True, 'remaining': 999}
             
             # Configuración
-            max_requests = current_app.config.get('RATE_LIMIT_REQUESTS', 100)
-            window_minutes = current_app.config.get('RATE_LIMIT_WINDOW_MINUTES', 15)
+            max_requests = max_requests or current_app.config.get('RATE_LIMIT_REQUESTS', 100)
+            window_minutes = window_minutes or current_app.config.get('RATE_LIMIT_WINDOW_MINUTES', 15)
             ban_minutes = current_app.config.get('RATE_LIMIT_BAN_DURATION_MINUTES', 30)
             
-            now = datetime.utcnow()
-            window_start = now - timedelta(minutes=window_minutes)
-            
-            # Buscar registro existente en la ventana actual
-            rate_limit = RateLimit.query.filter(
-                RateLimit.identifier == identifier,
-                RateLimit.endpoint == endpoint,
-                RateLimit.window_end > now
-            ).first()
-            
-            # Si está bloqueado
-            if rate_limit and rate_limit.blocked_until and rate_limit.blocked_until > now:
-                return {
-                    'allowed': False,
-                    'remaining': 0,
-                    'reset_at': rate_limit.blocked_until,
-                    'message': f'Demasiadas peticiones. Bloqueado hasta {rate_limit.blocked_until.strftime("%H:%M:%S")}'
-                }
-            
-            # Si no existe registro, crear uno nuevo
-            if not rate_limit:
-                window_end = now + timedelta(minutes=window_minutes)
-                rate_limit = RateLimit(
-                    identifier=identifier,
-                    endpoint=endpoint,
-                    requests_count=1,
-                    window_start=now,
-                    window_end=window_end
-                )
-                db.session.add(rate_limit)
-                db.session.commit()
-                
-                print(f"📊 Rate limit iniciado: {identifier} en {endpoint} (1/{max_requests})")
-                
-                return {
-                    'allowed': True,
-                    'remaining': max_requests - 1
-                }
-            
-            # Si existe, incrementar contador
-            rate_limit.requests_count += 1
-            
-            # Verificar si excedió el límite
-            if rate_limit.requests_count > max_requests:
-                # Bloquear temporalmente
-                rate_limit.blocked_until = now + timedelta(minutes=ban_minutes)
-                db.session.commit()
-                
-                print(f"🚫 Rate limit excedido: {identifier} en {endpoint} bloqueado por {ban_minutes} minutos")
-                
-                return {
-                    'allowed': False,
-                    'remaining': 0,
-                    'reset_at': rate_limit.blocked_until,
-                    'message': f'Límite excedido. Bloqueado por {ban_minutes} minutos'
-                }
+            result = rate_limit_engine.hit(
+                identifier,
+                endpoint,
+                limit=max_requests,
+                window_seconds=window_minutes * 60,
+                ban_seconds=ban_minutes * 60,
+                algorithm=algorithm
+            )
+            
+            data = {
+                'allowed': result.allowed,
+                'limit': result.limit,
+                'remaining': result.remaining,
+                'reset_at': datetime.utcfromtimestamp(result.reset_at)
+            }
             
-            # Petición permitida
-            db.session.commit()
+            if not result.allowed:
+                data['retry_after'] = max(1, math.ceil(result.retry_after))
+                if result.blocked_until:
+                    data['message'] = f'Demasiadas peticiones. Bloqueado hasta {data["reset_at"].strftime("%H:%M:%S")}'
+                else:
+                    data['message'] = f'Límite de {max_requests} peticiones cada {window_minutes} minutos excedido'
             
-            remaining = max_requests - rate_limit.requests_count
-            print(f"✅ Rate limit OK: {identifier} en {endpoint} ({rate_limit.requests_count}/{max_requests})")
-            
-            return {
-                'allowed': True,
-                'remaining': remaining
-            }
+            return data
             
         except Exception as e:
-            db.session.rollback()
-            print(f"❌ Error verificando rate limit: {str(e)}")
+            current_app.logger.error(f"Error verificando rate limit: {str(e)}")
             # En caso de error, permitir la petición (fail-open)
             return {'allowed': True, 'remaining': 999, 'error': str(e)}
     
@@ -177,8 +144,13 @@ class RateLimiter:
         Args:
             identifier: IP o user_id
             endpoint: Si se especifica, solo resetea ese endpoint
+        
+        Con RATE_LIMIT_STORAGE='memory' el contador solo se limpia en el
+        worker que atiende esta llamada; con 'sqlite' en todos.
         """
         try:
+            rate_limit_engine.reset(identifier, endpoint)
+            
             query = RateLimit.query.filter(RateLimit.identifier == identifier)
             
             if endpoint:
@@ -0,0 +1,65 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class RefreshCache:
+    """
+    Cache corta de renovaciones recientes (hash del refresh token → respuesta)
+
+    ¿Por qué existe?
+    - Una app móvil que vuelve del segundo plano dispara varios requests a la
+      vez; todos reciben 401 y todos renuevan con el mismo refresh token
+    - Con rotación, el segundo uso de un token ya rotado parece un robo
+    - Durante REFRESH_REUSE_GRACE_SECONDS las repeticiones reciben la misma
+      respuesta (mismo access y refresh token nuevos) sin tocar la tabla
+
+    Es por proceso y acotada a REFRESH_CACHE_MAX_ENTRIES (LRU). Si la
+    repetición cae en otro worker, TokenManager la reconoce por rotated_at y
+    responde 401 sin revocar la familia.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()   # token_hash → (expira_en, user_id, resultado)
+        self._lock = threading.Lock()
+        self.grace_seconds = 10
+        self._max_entries = 10000
+        self.hits = 0
+
+    def init_app(self, app):
+        self.grace_seconds = app.config.get('REFRESH_REUSE_GRACE_SECONDS', 10)
+        self._max_entries = app.config.get('REFRESH_CACHE_MAX_ENTRIES', 10000)
+        app.extensions['refresh_cache'] = self
+
+    def get(self, token_hash):
+        """Respuesta de la renovación reciente de este token, o None"""
+        with self._lock:
+            entrada = self._entries.get(token_hash)
+            if entrada is None:
+                return None
+            if entrada[0] <= time.monotonic():
+                del self._entries[token_hash]
+                return None
+            self.hits += 1
+            return entrada[2]
+
+    def put(self, token_hash, user_id, resultado):
+        if not self.grace_seconds:
+            return
+        with self._lock:
+            self._entries[token_hash] = (time.monotonic() + self.grace_seconds, user_id, resultado)
+            self._entries.move_to_end(token_hash)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidar_usuario(self, user_id):
+        """Olvida las renovaciones del usuario (al revocar sus sesiones)"""
+        with self._lock:
+            for token_hash in [h for h, e in self._entries.items() if e[1] == user_id]:
+                del self._entries[token_hash]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+refresh_cache = RefreshCache()
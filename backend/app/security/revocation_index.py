@@ -0,0 +1,168 @@
+import heapq
+import os
+import threading
+import time
+from datetime import timezone
+
+
+def _epoch(dt):
+    """Convierte un datetime UTC naive (como los guarda la BD) a segundos epoch"""
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+
+class RevocationIndex:
+    """
+    Índice en memoria de tokens revocados (jti → expira_en)
+
+    ¿Por qué existe?
+    - @jwt_required() consulta la blacklist en CADA petición autenticada
+    - Casi todas esas consultas son negativas (el token no está revocado)
+    - Con el índice, la verificación es un lookup en un dict: sin ir a la BD
+
+    ¿Cómo se mantiene al día?
+    1. Al arrancar se carga desde token_blacklist (solo los que no expiraron)
+    2. El proceso que revoca un token lo agrega al instante (add)
+    3. Un hilo por proceso consulta cada REVOCATION_SYNC_SECONDS las filas con
+       id mayor a la marca de agua (high-water mark); así los demás workers
+       ven las revocaciones hechas en otro proceso
+    4. Las entradas se eliminan cuando pasa su expires_at (un token expirado
+       ya lo rechaza la verificación de 'exp' del JWT)
+    """
+
+    # Filas que se vuelven a leer por debajo de la marca de agua: en MySQL un
+    # id autoincremental menor puede confirmarse después de uno mayor
+    OVERLAP_IDS = 100
+
+    def __init__(self):
+        self._app = None
+        self._entries = {}      # jti → expira_en (epoch)
+        self._expiry = []       # heap (expira_en, jti) para purgar en orden
+        self._high_water = 0
+        self._lock = threading.Lock()
+        self._sync_seconds = 5
+        self._poller_pid = None
+        self._last_sync = None
+
+    def init_app(self, app):
+        """Carga el índice desde la BD (llamar dentro de un app_context)"""
+        self._app = app
+        self._sync_seconds = app.config.get('REVOCATION_SYNC_SECONDS', 5)
+        self.warm()
+        app.extensions['revocation_index'] = self
+
+    # ============================================
+    # CONSULTA
+    # ============================================
+
+    def is_revoked(self, jti):
+        """True si el jti está revocado y aún no expiró (sin consultas a la BD)"""
+        self._ensure_poller()
+        expira_en = self._entries.get(jti)
+        if expira_en is None:
+            return False
+        if expira_en <= time.time():
+            with self._lock:
+                self._entries.pop(jti, None)
+            return False
+        return True
+
+    def add(self, jti, expires_at):
+        """Registra una revocación hecha en este proceso"""
+        with self._lock:
+            self._put(jti, _epoch(expires_at))
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ============================================
+    # SINCRONIZACIÓN CON LA BD
+    # ============================================
+
+    def warm(self):
+        """Reconstruye el índice con los tokens revocados que no expiraron"""
+        from datetime import datetime
+        from app.extensions import db
+        from app.models.token_blacklist import TokenBlacklist
+
+        filas = db.session.query(
+            TokenBlacklist.id, TokenBlacklist.jti, TokenBlacklist.expires_at
+        ).filter(TokenBlacklist.expires_at > datetime.utcnow()).all()
+        high_water = db.session.query(db.func.max(TokenBlacklist.id)).scalar() or 0
+
+        with self._lock:
+            self._entries.clear()
+            self._expiry = []
+            for _, jti, expires_at in filas:
+                self._put(jti, _epoch(expires_at))
+            self._high_water = high_water
+            self._last_sync = time.time()
+        db.session.remove()
+
+    def sync(self):
+        """Trae las revocaciones nuevas (id > marca de agua) y purga las expiradas"""
+        from app.extensions import db
+        from app.models.token_blacklist import TokenBlacklist
+
+        desde = max(self._high_water - self.OVERLAP_IDS, 0)
+        filas = db.session.query(
+            TokenBlacklist.id, TokenBlacklist.jti, TokenBlacklist.expires_at
+        ).filter(TokenBlacklist.id > desde).order_by(TokenBlacklist.id).all()
+
+        ahora = time.time()
+        with self._lock:
+            for id_, jti, expires_at in filas:
+                expira_en = _epoch(expires_at)
+                if expira_en > ahora:
+                    self._put(jti, expira_en)
+                self._high_water = max(self._high_water, id_)
+            self._purge(ahora)
+            self._last_sync = ahora
+        return len(filas)
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'high_water': self._high_water,
+            'last_sync': self._last_sync,
+            'pid': os.getpid()
+        }
+
+    # ============================================
+    # INTERNOS
+    # ============================================
+
+    def _put(self, jti, expira_en):
+        self._entries[jti] = expira_en
+        heapq.heappush(self._expiry, (expira_en, jti))
+
+    def _purge(self, ahora):
+        while self._expiry and self._expiry[0][0] <= ahora:
+            expira_en, jti = heapq.heappop(self._expiry)
+            if self._entries.get(jti) == expira_en:
+                del self._entries[jti]
+
+    def _ensure_poller(self):
+        """Arranca el hilo de sincronización una vez por proceso (también tras un fork)"""
+        if self._poller_pid == os.getpid() or not self._sync_seconds or self._app is None:
+            return
+        with self._lock:
+            if self._poller_pid == os.getpid():
+                return
+            self._poller_pid = os.getpid()
+        hilo = threading.Thread(target=self._poll_loop, name='revocation-sync', daemon=True)
+        hilo.start()
+
+    def _poll_loop(self):
+        while True:
+            time.sleep(self._sync_seconds)
+            with self._app.app_context():
+                try:
+                    self.sync()
+                except Exception as e:
+                    self._app.logger.warning(f'No se pudo sincronizar el índice de revocación: {e}')
+                finally:
+                    from app.extensions import db
+                    db.session.remove()
+
+
+revocation_index = RevocationIndex()
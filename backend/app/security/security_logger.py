@@ -1,5 +1,6 @@
 from app.extensions import db
 from app.models.security_log import SecurityLog
+from app.security.audit_writer import audit_writer
 from flask import request
 from datetime import datetime, timedelta
 import json
@@ -46,18 +47,16 @@ class SecurityLogger:
             # Convertir details a JSON
             details_json = json.dumps(details) if details else None
             
-            # Crear log
-            log = SecurityLog(
-                event_type=event_type,
-                user_id=user_id,
-                email=email,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                details=details_json
-            )
-            
-            db.session.add(log)
-            db.session.commit()
+            # Encolar (se escribe en lote, fuera del request)
+            audit_writer.registrar(SecurityLog, {
+                'event_type': event_type,
+                'user_id': user_id,
+                'email': email,
+                'ip_address': ip_address,
+                'user_agent': user_agent,
+                'details': details_json,
+                'created_at': datetime.utcnow()
+            })
             
             # Emoji según tipo de evento
             emoji = {
@@ -74,7 +73,6 @@ class SecurityLogger:
             print(f"{emoji} Security Log: {event_type} | {email or 'N/A'} | {ip_address}")
             
         except Exception as e:
-            db.session.rollback()
             print(f"❌ Error logging security event: {str(e)}")
     
     
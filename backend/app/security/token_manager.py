@@ -4,6 +4,8 @@ from app.extensions import db
 from app.models.token_blacklist import TokenBlacklist
 from app.models.refresh_token import RefreshToken
 from app.models.security_log import SecurityLog
+from app.security.revocation_index import revocation_index
+from app.security.refresh_cache import refresh_cache
 
 class TokenManager:
     """
@@ -67,8 +69,8 @@ class TokenManager:
             expires_delta=TokenManager.ACCESS_TOKEN_EXPIRES
         )
         
-        # 2. Crear refresh token en la BD
-        refresh_token_obj = RefreshToken.create_refresh_token(
+        # 2. Crear refresh token en la BD (solo su hash)
+        refresh_token_obj, refresh_token_str = RefreshToken.create_refresh_token(
             user_id=user_id,
             ip_address=ip_address,
             user_agent=user_agent,
@@ -93,7 +95,7 @@ class TokenManager:
         
         return {
             'access_token': access_token,
-            'refresh_token': refresh_token_obj.token,
+            'refresh_token': refresh_token_str,
             'expires_in': int(TokenManager.ACCESS_TOKEN_EXPIRES.total_seconds()),
             'refresh_expires_in': int(TokenManager.REFRESH_TOKEN_EXPIRES.total_seconds())
         }
@@ -112,9 +114,11 @@ class TokenManager:
         ¿Cuándo se llama esto?
         - Automáticamente en cada petición por el decorador @jwt_required()
         - Flask-JWT-Extended verifica la blacklist antes de permitir acceso
+        
+        Se resuelve con el índice en memoria (RevocationIndex), sin consultar
+        la BD; el índice se sincroniza con token_blacklist en segundo plano.
         """
-        token = TokenBlacklist.query.filter_by(jti=jti).first()
-        return token is not None
+        return revocation_index.is_revoked(jti)
     
     @staticmethod
     def revoke_token(jti, token_type, user_id, reason='logout'):
@@ -161,6 +165,7 @@ class TokenManager:
         
         db.session.add(blacklisted_token)
         db.session.commit()
+        revocation_index.add(jti, expires_at)
         
         # Log del evento
         SecurityLog.log_event(
@@ -176,13 +181,14 @@ class TokenManager:
         return blacklisted_token
     
     @staticmethod
-    def revoke_all_user_tokens(user_id, reason='password_change'):
+    def revoke_all_user_tokens(user_id, reason='password_change', commit=True):
         """
         Revoca TODOS los tokens de un usuario
         
         Args:
             user_id: ID del usuario
             reason: Razón de revocación
+            commit: False para dejar el cambio en la transacción del llamador
         
         ¿Cuándo usar esto?
         - Usuario cambia su contraseña
@@ -193,14 +199,14 @@ class TokenManager:
         Esto cierra TODAS las sesiones en TODOS los dispositivos
         """
         
-        # 1. Revocar todos los refresh tokens activos
-        refresh_tokens = RefreshToken.query.filter_by(
-            user_id=user_id,
-            is_revoked=False
-        ).all()
-        
-        for rt in refresh_tokens:
-            rt.is_revoked = True
+        # 1. Revocar todos los refresh tokens activos (un solo UPDATE)
+        revocados = db.session.execute(
+            db.update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.is_revoked == False)
+            .values(is_revoked=True, revoked_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        refresh_cache.invalidar_usuario(user_id)
         
         # 2. Log del evento
         SecurityLog.log_event(
@@ -208,19 +214,66 @@ class TokenManager:
             user_id=user_id,
             details={
                 'reason': reason,
-                'tokens_revoked': len(refresh_tokens),
+                'tokens_revoked': revocados,
                 'action': 'revoke_all'
             }
         )
         
-        db.session.commit()
+        if commit:
+            db.session.commit()
+        
+        return revocados
+    
+    @staticmethod
+    def revoke_refresh_family(family_id, user_id, reason='logout'):
+        """
+        Revoca todos los refresh tokens de una familia (una sesión/dispositivo)
+        
+        Returns:
+            int: tokens revocados
+        """
+        revocados = db.session.execute(
+            db.update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.is_revoked == False)
+            .values(is_revoked=True, revoked_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        refresh_cache.invalidar_usuario(user_id)
+        
+        SecurityLog.log_event(
+            event_type='token_revoked',
+            user_id=user_id,
+            details={
+                'reason': reason,
+                'tokens_revoked': revocados,
+                'action': 'revoke_family'
+            }
+        )
+        return revocados
+    
+    @staticmethod
+    def revoke_refresh_token(refresh_token_str, user_id, reason='logout'):
+        """
+        Revoca la sesión (familia) a la que pertenece un refresh token del usuario
+        
+        Returns:
+            int: tokens revocados (0 si el token no existe o es de otro usuario)
+        """
+        refresh_token = RefreshToken.query.filter_by(
+            token_hash=RefreshToken.hash_token(refresh_token_str),
+            user_id=user_id
+        ).first()
+        if not refresh_token:
+            return 0
         
-        return len(refresh_tokens)
+        revocados = TokenManager.revoke_refresh_family(refresh_token.family_id, user_id, reason)
+        db.session.commit()
+        return revocados
     
     @staticmethod
     def refresh_access_token(refresh_token_str, ip_address=None, user_agent=None):
         """
-        Crea un nuevo access token usando un refresh token
+        Crea un nuevo access token usando un refresh token, y rota el refresh token
         
         Args:
             refresh_token_str: String del refresh token
@@ -230,33 +283,42 @@ class TokenManager:
         Returns:
             dict o None: {
                 'access_token': 'nuevo_token...',
-                'expires_in': 900
+                'refresh_token': 'nuevo_refresh...',
+                'expires_in': 900,
+                'refresh_expires_in': ...
             }
         
         ¿Cómo funciona?
         1. Cliente detecta que access token expiró (401)
         2. Cliente envía refresh token a endpoint /auth/refresh
-        3. Backend verifica refresh token
-        4. Si es válido, genera nuevo access token
-        5. Cliente usa nuevo access token
+        3. Backend verifica refresh token (por su hash)
+        4. Si es válido, lo marca como usado y entrega access + refresh nuevos
+        5. Cliente guarda ambos (el refresh anterior ya no sirve)
         
         Flujo de seguridad:
-        - Verifica que el refresh token exista en BD
-        - Verifica que no esté revocado
-        - Verifica que no haya expirado
+        - Repetir el mismo token dentro de REFRESH_REUSE_GRACE_SECONDS devuelve
+          la misma respuesta (ráfagas de un mismo cliente, ver RefreshCache)
+        - Presentar un token ya rotado fuera de ese margen es reuso: se revoca
+          toda la familia y el usuario debe volver a hacer login
+        - Verifica que no esté revocado ni expirado
         - (Opcional) Verifica que la IP/User-Agent coincidan
         """
+        token_hash = RefreshToken.hash_token(refresh_token_str)
         
-        # 1. Buscar refresh token en BD
-        refresh_token = RefreshToken.query.filter_by(
-            token=refresh_token_str
-        ).first()
+        # 0. Renovación repetida hace instantes en este proceso
+        cached = refresh_cache.get(token_hash)
+        if cached:
+            return cached
         
-        if not refresh_token:
+        # 1. Buscar refresh token en BD (índice único por hash)
+        refresh_token = RefreshToken.query.filter_by(token_hash=token_hash).first()
+        
+        if not refresh_token or refresh_token.is_expired():
             return None
         
-        # 2. Verificar que sea válido
-        if not refresh_token.is_valid():
+        # 2. Ya rotado o revocado
+        if refresh_token.is_revoked:
+            TokenManager._token_reusado(refresh_token, ip_address)
             return None
         
         # 3. (Opcional) Verificar IP/User-Agent para detectar robo
@@ -273,19 +335,45 @@ class TokenManager:
                         'current_ip': ip_address
                     }
                 )
-                # Opción: revocar el token automáticamente
-                # refresh_token.is_revoked = True
-                # db.session.commit()
-                # return None
         
         # 4. Obtener datos del usuario
         from app.models.usuario import Usuario
-        usuario = Usuario.query.get(refresh_token.user_id)
+        usuario = db.session.get(Usuario, refresh_token.user_id)
         
         if not usuario or not usuario.activo:
             return None
         
-        # 5. Crear nuevo access token
+        # 5. Rotar: solo un request gana el UPDATE condicionado
+        now = datetime.utcnow()
+        rotado = db.session.execute(
+            db.update(RefreshToken)
+            .where(RefreshToken.id == refresh_token.id, RefreshToken.is_revoked == False)
+            .values(is_revoked=True, revoked_at=now, rotated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not rotado:
+            # Otro worker lo rotó entre la lectura y el UPDATE
+            db.session.rollback()
+            return None
+        
+        nuevo, nuevo_str = RefreshToken.create_refresh_token(
+            user_id=usuario.id_usuario,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            family_id=refresh_token.family_id,
+            expires_at=refresh_token.expires_at
+        )
+        db.session.add(nuevo)
+        db.session.flush()
+        db.session.execute(
+            db.update(RefreshToken)
+            .where(RefreshToken.id == refresh_token.id)
+            .values(replaced_by_id=nuevo.id)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        
+        # 6. Crear nuevo access token
         access_token = create_access_token(
             identity=str(usuario.id_usuario),
             additional_claims={
@@ -297,7 +385,7 @@ class TokenManager:
             expires_delta=TokenManager.ACCESS_TOKEN_EXPIRES
         )
         
-        # 6. Log del evento
+        # 7. Log del evento
         SecurityLog.log_event(
             event_type='login_success',
             user_id=usuario.id_usuario,
@@ -306,14 +394,47 @@ class TokenManager:
             user_agent=user_agent,
             details={
                 'action': 'token_refreshed',
-                'refresh_token_id': refresh_token.id
+                'refresh_token_id': refresh_token.id,
+                'new_refresh_token_id': nuevo.id
             }
         )
         
-        return {
+        resultado = {
             'access_token': access_token,
-            'expires_in': int(TokenManager.ACCESS_TOKEN_EXPIRES.total_seconds())
+            'refresh_token': nuevo_str,
+            'expires_in': int(TokenManager.ACCESS_TOKEN_EXPIRES.total_seconds()),
+            'refresh_expires_in': max(int((nuevo.expires_at - now).total_seconds()), 0)
         }
+        refresh_cache.put(token_hash, usuario.id_usuario, resultado)
+        return resultado
+    
+    @staticmethod
+    def _token_reusado(refresh_token, ip_address):
+        """Un token revocado volvió a presentarse: ¿repetición inocente o robo?"""
+        if refresh_token.rotated_at is None:
+            # Revocado por logout / cambio de contraseña: simplemente inválido
+            return
+        
+        margen = timedelta(seconds=refresh_cache.grace_seconds)
+        if datetime.utcnow() - refresh_token.rotated_at <= margen:
+            # Ráfaga del mismo cliente atendida por otro worker
+            return
+        
+        revocados = TokenManager.revoke_refresh_family(
+            refresh_token.family_id, refresh_token.user_id, reason='refresh_token_reuse'
+        )
+        db.session.commit()
+        
+        SecurityLog.log_event(
+            event_type='suspicious_activity',
+            user_id=refresh_token.user_id,
+            ip_address=ip_address,
+            details={
+                'reason': 'refresh_token_reuse',
+                'refresh_token_id': refresh_token.id,
+                'family_tokens_revoked': revocados
+            }
+        )
     
     @staticmethod
     def cleanup_expired_tokens():
@@ -335,19 +456,83 @@ class TokenManager:
         """
         
         # Eliminar tokens de blacklist que ya expiraron
-        deleted = TokenBlacklist.query.filter(
-            TokenBlacklist.expires_at < datetime.utcnow()
-        ).delete()
+        deleted = TokenManager.purge_expired_blacklist()
         
-        # Eliminar refresh tokens expirados y revocados
-        deleted_refresh = RefreshToken.query.filter(
-            RefreshToken.expires_at < datetime.utcnow(),
-            RefreshToken.is_revoked == True
-        ).delete()
-        
-        db.session.commit()
+        # Eliminar refresh tokens expirados
+        deleted_refresh = TokenManager.purge_expired_refresh_tokens()
         
         return {
             'blacklist_cleaned': deleted,
             'refresh_tokens_cleaned': deleted_refresh
         }
+    
+    @staticmethod
+    def purge_expired_blacklist(batch_size=5000):
+        """
+        Elimina de token_blacklist las filas expiradas, por lotes
+        
+        Args:
+            batch_size: filas por DELETE
+        
+        Returns:
+            int: total de filas eliminadas
+        
+        ¿Por qué por lotes?
+        - Un DELETE enorme bloquea la tabla mientras otros workers revocan tokens
+        - Cada lote es un DELETE ... WHERE id IN (...) confirmado por separado
+        """
+        total = 0
+        ahora = datetime.utcnow()
+        
+        while True:
+            ids = [row.id for row in db.session.query(TokenBlacklist.id).filter(
+                TokenBlacklist.expires_at < ahora
+            ).limit(batch_size).all()]
+            
+            if not ids:
+                break
+            
+            db.session.query(TokenBlacklist).filter(
+                TokenBlacklist.id.in_(ids)
+            ).delete(synchronize_session=False)
+            db.session.commit()
+            total += len(ids)
+            
+            if len(ids) < batch_size:
+                break
+        
+        return total
+    
+    @staticmethod
+    def purge_expired_refresh_tokens(batch_size=5000):
+        """
+        Elimina de refresh_tokens las filas expiradas, por lotes
+        
+        Los tokens rotados o revocados se conservan hasta que expiran: sirven
+        para detectar el reuso de un token viejo. Como una rotación hereda el
+        vencimiento, una familia entera expira a la vez.
+        
+        Returns:
+            int: total de filas eliminadas
+        """
+        total = 0
+        ahora = datetime.utcnow()
+        
+        while True:
+            ids = [row.id for row in db.session.query(RefreshToken.id).filter(
+                RefreshToken.expires_at < ahora
+            ).limit(batch_size).all()]
+            
+            if not ids:
+                break
+            
+            db.session.query(RefreshToken).filter(
+                RefreshToken.id.in_(ids)
+            ).delete(synchronize_session=False)
+            db.session.commit()
+            total += len(ids)
+            
+            if len(ids) < batch_size:
+                break
+        
+        return total
@@ -0,0 +1,41 @@
+from app.services.http_client import ClienteHTTP
+
+
+class AlineacionesClient(ClienteHTTP):
+    """
+    Conexiones al microservicio de alineaciones (alineaciones-service)
+
+    Un solo pool keep-alive por proceso en lugar de un requests.get por
+    llamada; plazos, reintentos, circuit breaker y métricas vienen de
+    ClienteHTTP. Las métricas se ven en /health/alineaciones.
+    """
+
+    def __init__(self):
+        super().__init__('alineaciones-service')
+
+    def init_app(self, app):
+        config = app.config
+        self.configurar(
+            config.get('ALINEACIONES_SERVICE_URL', 'http://localhost:5001'),
+            deadline=config.get('ALINEACIONES_SERVICE_DEADLINE', 10.0),
+            connect_timeout=config.get('ALINEACIONES_SERVICE_CONNECT_TIMEOUT', 2.0),
+            reintentos=config.get('ALINEACIONES_SERVICE_REINTENTOS', 2),
+            backoff_base=config.get('ALINEACIONES_SERVICE_BACKOFF_BASE', 0.1),
+            backoff_max=config.get('ALINEACIONES_SERVICE_BACKOFF_MAX', 1.0),
+            fallos_para_abrir=config.get('ALINEACIONES_SERVICE_FALLOS_CIRCUITO', 5),
+            espera_circuito=config.get('ALINEACIONES_SERVICE_ESPERA_CIRCUITO', 30.0),
+            pool=config.get('ALINEACIONES_SERVICE_POOL', 10)
+        )
+        app.extensions['alineaciones_client'] = self
+
+    def alineaciones(self, id_partido, id_equipo, deadline=None):
+        """GET /alineaciones de un equipo en un partido (devuelve el Response)"""
+        return self.get(
+            '/alineaciones',
+            endpoint='GET /alineaciones',
+            params={'id_partido': id_partido, 'id_equipo': id_equipo},
+            deadline=deadline
+        )
+
+
+alineaciones_client = AlineacionesClient()
@@ -0,0 +1,371 @@
+import mimetypes
+import os
+import re
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import case, event, inspect
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.archivo_blob import ArchivoBlob
+from app.utils.subidas import SubidaEnStreaming
+
+
+# URL de un blob: .../uploads/blobs/ab/cd/<sha256>.<ext>
+_URL_BLOB = re.compile(r'/uploads/blobs/[0-9a-f]{2}/[0-9a-f]{2}/(?P<sha>[0-9a-f]{64})\.\w+$')
+
+_listener_registrado = False
+
+
+def _columnas():
+    """Columnas que apuntan a blobs (las que cuentan como referencia)"""
+    from app.models.campeonato import Campeonato
+    from app.models.equipo import Equipo
+    from app.models.jugador import Jugador
+    return (
+        (Campeonato, ('logo_url',)),
+        (Equipo, ('logo_url',)),
+        (Jugador, ('foto_url', 'documento_pdf')),
+    )
+
+
+class AlmacenService:
+    """
+    Almacenamiento de archivos subidos por contenido, con deduplicación
+
+    - El cuerpo del request llega ya hasheado y en disco (ver
+      app/utils/subidas.py): guardar solo mueve el temporal a
+      uploads/blobs/<sha[:2]>/<sha[2:4]>/<sha>.<ext>, o lo descarta si ese
+      contenido ya estaba
+    - Cada blob tiene una fila en archivos_blob con su contador de
+      referencias, que se actualiza en cada flush según cambien logo_url,
+      foto_url y documento_pdf (ver register_referencias)
+    - `flask archivos gc` borra los blobs sin referencias pasado el período
+      de gracia, revisando antes las columnas (el contador no se mantiene
+      en borrados masivos con db.delete); `flask archivos recontar` lo corrige
+
+    Como los servicios del resto de la app, no hace commit.
+    """
+
+    # ============================================
+    # GUARDAR
+    # ============================================
+
+    @staticmethod
+    def guardar(file, validar=None, extension=None):
+        """
+        Guarda un archivo de request.files
+
+        Args:
+            file: FileStorage (su stream es SubidaEnStreaming si vino por multipart)
+            validar: función(path) que lanza ValueError si el contenido no sirve
+            extension: por defecto, la del nombre del archivo
+
+        Returns:
+            str: ruta relativa a uploads (blobs/ab/cd/<sha>.<ext>)
+        """
+        ext = (extension or file.filename.rsplit('.', 1)[1]).lower()
+        stream = file.stream
+        if not isinstance(stream, SubidaEnStreaming):
+            # Request construido a mano (sin RequestConSubidas): se copia hasheando
+            stream = AlmacenService._copiar(file.stream)
+        return AlmacenService._registrar(stream, ext, file.mimetype, validar)
+
+    @staticmethod
+    def importar(path, extension=None):
+        """Copia al almacén un archivo existente en disco (para migrar subidas viejas)"""
+        ext = (extension or path.rsplit('.', 1)[1]).lower()
+        with open(path, 'rb') as f:
+            stream = AlmacenService._copiar(f)
+        return AlmacenService._registrar(stream, ext, None, None)
+
+    @staticmethod
+    def adoptar(path, extension, validar=None, sha256_esperado=None):
+        """
+        Registra un archivo ya armado dentro de uploads (p. ej. una subida
+        reanudable) moviéndolo al almacén, sin copiarlo
+
+        Si el contenido ya estaba, o no es válido, el archivo se borra.
+
+        Raises:
+            ValueError: si no pasa `validar` o el hash no es el esperado
+        """
+        stream = SubidaEnStreaming.desde_archivo(path)
+        if sha256_esperado and stream.sha256 != sha256_esperado.lower():
+            stream.close()
+            raise ValueError('El contenido recibido no coincide con el SHA-256 declarado')
+        return AlmacenService._registrar(stream, extension.lower(), None, validar)
+
+    @staticmethod
+    def _copiar(origen):
+        stream = SubidaEnStreaming(AlmacenService._directorio_temporal())
+        try:
+            for bloque in iter(lambda: origen.read(256 * 1024), b''):
+                stream.write(bloque)
+        except Exception:
+            stream.close()
+            raise
+        return stream
+
+    @staticmethod
+    def _registrar(stream, ext, content_type, validar):
+        sha = stream.sha256
+        try:
+            existente = db.session.get(ArchivoBlob, sha)
+            if existente:
+                return existente.ruta
+
+            if validar:
+                stream.flush()
+                validar(stream.path)
+
+            ruta = ArchivoBlob.ruta_para(sha, ext)
+            destino = os.path.join(AlmacenService.base(), ruta)
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            stream.adoptar(destino)
+        finally:
+            stream.close()
+
+        try:
+            with db.session.begin_nested():
+                db.session.add(ArchivoBlob(
+                    sha256=sha,
+                    extension=ext,
+                    tamanio=stream.tamanio,
+                    content_type=content_type or mimetypes.guess_type(ruta)[0]
+                ))
+        except IntegrityError:
+            # Otro request subió el mismo contenido a la vez: el archivo es idéntico
+            existente = db.session.get(ArchivoBlob, sha)
+            return existente.ruta if existente else ruta
+        return ruta
+
+    @staticmethod
+    def validar_pdf(path):
+        with open(path, 'rb') as f:
+            if f.read(5) != b'%PDF-':
+                raise ValueError('El archivo no es un PDF válido')
+
+    # ============================================
+    # REFERENCIAS
+    # ============================================
+
+    @staticmethod
+    def sha_de_url(url):
+        if not url:
+            return None
+        m = _URL_BLOB.search(url)
+        return m.group('sha') if m else None
+
+    @staticmethod
+    def referencias_reales():
+        """Cuenta, leyendo las columnas, cuántas veces se usa cada blob"""
+        conteo = Counter()
+        for modelo, atributos in _columnas():
+            for atributo in atributos:
+                columna = getattr(modelo, atributo)
+                for (url,) in db.session.query(columna).filter(columna.like('%/uploads/blobs/%')):
+                    sha = AlmacenService.sha_de_url(url)
+                    if sha:
+                        conteo[sha] += 1
+        return conteo
+
+    @staticmethod
+    def recontar():
+        """
+        Recalcula referencias desde las columnas
+
+        Returns:
+            int: blobs cuyo contador cambió
+        """
+        en_uso = AlmacenService.referencias_reales()
+        ahora = datetime.utcnow()
+        actuales = dict(db.session.query(ArchivoBlob.sha256, ArchivoBlob.referencias))
+
+        corregir = [
+            {'sha256': sha, 'referencias': en_uso.get(sha, 0),
+             'sin_referencias_desde': None if en_uso.get(sha) else ahora}
+            for sha, referencias in actuales.items()
+            if referencias != en_uso.get(sha, 0)
+        ]
+        if corregir:
+            db.session.execute(db.update(ArchivoBlob), corregir)
+        return len(corregir)
+
+    @staticmethod
+    def _aplicar_deltas(connection, deltas):
+        ahora = datetime.utcnow()
+        for sha, delta in deltas.items():
+            if not delta:
+                continue
+            # sin_referencias_desde va primero: MySQL evalúa el SET de izquierda a derecha
+            connection.execute(
+                db.update(ArchivoBlob)
+                .where(ArchivoBlob.sha256 == sha)
+                .ordered_values(
+                    (ArchivoBlob.sin_referencias_desde, case(
+                        (ArchivoBlob.referencias + delta <= 0, db.func.coalesce(ArchivoBlob.sin_referencias_desde, ahora)),
+                        else_=None
+                    )),
+                    (ArchivoBlob.referencias, ArchivoBlob.referencias + delta),
+                )
+            )
+
+    # ============================================
+    # RECOLECCIÓN
+    # ============================================
+
+    @staticmethod
+    def recolectar(gracia_horas=None, lote=500, simular=False):
+        """
+        Borra los blobs sin referencias más viejos que el período de gracia
+
+        Returns:
+            dict: {'borrados', 'bytes', 'corregidos', 'temporales'}
+        """
+        if gracia_horas is None:
+            gracia_horas = current_app.config.get('UPLOADS_GC_GRACIA_HORAS', 24)
+        limite = datetime.utcnow() - timedelta(hours=gracia_horas)
+        en_uso = AlmacenService.referencias_reales()
+        resultado = {'borrados': 0, 'bytes': 0, 'corregidos': 0, 'temporales': 0}
+
+        ultimo = ''
+        while True:
+            candidatos = (
+                ArchivoBlob.query
+                .filter(ArchivoBlob.referencias <= 0,
+                        ArchivoBlob.sin_referencias_desde < limite,
+                        ArchivoBlob.sha256 > ultimo)
+                .order_by(ArchivoBlob.sha256)
+                .limit(lote)
+                .all()
+            )
+            if not candidatos:
+                break
+            ultimo = candidatos[-1].sha256
+
+            a_borrar = []
+            for blob in candidatos:
+                if blob.sha256 in en_uso:
+                    # El contador se desincronizó (p. ej. un borrado masivo): se corrige, no se borra
+                    blob.referencias = en_uso[blob.sha256]
+                    blob.sin_referencias_desde = None
+                    resultado['corregidos'] += 1
+                    continue
+                resultado['borrados'] += 1
+                resultado['bytes'] += blob.tamanio
+                if simular:
+                    continue
+                borradas = db.session.execute(
+                    db.delete(ArchivoBlob)
+                    .where(ArchivoBlob.sha256 == blob.sha256, ArchivoBlob.referencias <= 0)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                if borradas:
+                    a_borrar.append(blob.ruta)
+
+            if simular:
+                db.session.rollback()
+                continue
+            db.session.commit()
+            # Los archivos se borran recién confirmada la transacción
+            for ruta in a_borrar:
+                AlmacenService._borrar_archivos(ruta)
+
+        if not simular:
+            resultado['temporales'] = AlmacenService._limpiar_temporales()
+        return resultado
+
+    @staticmethod
+    def _borrar_archivos(ruta):
+        base = AlmacenService.base()
+        sha = os.path.basename(ruta).rsplit('.', 1)[0]
+        rutas = [os.path.join(base, ruta)]
+        derivados = os.path.join(base, 'derivados', sha[:2])
+        if os.path.isdir(derivados):
+            rutas += [os.path.join(derivados, n) for n in os.listdir(derivados) if n.startswith(f'{sha}_')]
+        for path in rutas:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _limpiar_temporales(max_edad=3600):
+        """Temporales de subidas interrumpidas (proceso caído a mitad de un request)"""
+        directorio = AlmacenService._directorio_temporal()
+        if not os.path.isdir(directorio):
+            return 0
+        limite = time.time() - max_edad
+        borrados = 0
+        for nombre in os.listdir(directorio):
+            path = os.path.join(directorio, nombre)
+            try:
+                if os.path.getmtime(path) < limite:
+                    os.remove(path)
+                    borrados += 1
+            except FileNotFoundError:
+                pass
+        return borrados
+
+    # ============================================
+    # AUXILIARES
+    # ============================================
+
+    @staticmethod
+    def base():
+        return current_app.config['UPLOADS_BASE']
+
+    @staticmethod
+    def _directorio_temporal():
+        return os.path.join(AlmacenService.base(), 'blobs', '.tmp')
+
+
+def register_referencias(session):
+    """
+    Mantiene archivos_blob.referencias según cambien las columnas de _columnas()
+
+    En after_flush el historial de los atributos sigue disponible y los
+    UPDATE van en la misma transacción: un rollback también deshace el conteo.
+    """
+    global _listener_registrado
+    if _listener_registrado:
+        return
+    _listener_registrado = True
+
+    @event.listens_for(session, 'after_flush')
+    def _contar(sess, flush_context):
+        columnas = _columnas()
+        deltas = Counter()
+
+        def sumar(url, n):
+            sha = AlmacenService.sha_de_url(url)
+            if sha:
+                deltas[sha] += n
+
+        for obj in sess.new:
+            for modelo, atributos in columnas:
+                if isinstance(obj, modelo):
+                    for atributo in atributos:
+                        sumar(inspect(obj).dict.get(atributo), 1)
+        for obj in sess.deleted:
+            for modelo, atributos in columnas:
+                if isinstance(obj, modelo):
+                    for atributo in atributos:
+                        sumar(inspect(obj).dict.get(atributo), -1)
+        for obj in sess.dirty:
+            for modelo, atributos in columnas:
+                if isinstance(obj, modelo):
+                    estado = inspect(obj)
+                    for atributo in atributos:
+                        historial = estado.attrs[atributo].history
+                        for url in historial.added:
+                            sumar(url, 1)
+                        for url in historial.deleted:
+                            sumar(url, -1)
+
+        if deltas:
+            AlmacenService._aplicar_deltas(sess.connection(), deltas)
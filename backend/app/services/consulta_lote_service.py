@@ -0,0 +1,109 @@
+from sqlalchemy.orm import aliased
+
+from app.extensions import db
+from app.models.equipo import Equipo
+from app.models.jugador import Jugador
+from app.models.partido import Partido
+
+
+class ConsultaLoteService:
+    """
+    Planteles y partidos de muchos equipos/partidos en una sola consulta
+
+    ¿Por qué existe?
+    - alineaciones-service pedía el plantel de cada equipo y cada partido
+      por separado: auto-generar alineaciones de una temporada de 380
+      partidos eran 760 llamadas HTTP
+    - Aquí cada pedido es una consulta con WHERE ... IN (...) que lee solo
+      las columnas necesarias (sin to_dict, que resuelve miniaturas y el
+      nombre del equipo fila por fila)
+
+    Los ids se limitan por llamada (parsear_ids); el cliente parte las
+    listas largas en lotes.
+    """
+
+    @staticmethod
+    def planteles(ids_equipo, solo_activos=False):
+        """
+        Returns:
+            dict: {id_equipo: [jugador, ...]} con todos los ids pedidos
+            (lista vacía si el equipo no tiene jugadores o no existe)
+        """
+        resultado = {id_equipo: [] for id_equipo in ids_equipo}
+        if not ids_equipo:
+            return resultado
+
+        consulta = (
+            db.session.query(
+                Jugador.id_jugador, Jugador.id_equipo, Jugador.nombre, Jugador.apellido,
+                Jugador.dorsal, Jugador.posicion, Jugador.activo
+            )
+            .filter(Jugador.id_equipo.in_(ids_equipo))
+            .order_by(Jugador.id_equipo, Jugador.dorsal)
+        )
+        if solo_activos:
+            consulta = consulta.filter(Jugador.activo == True)
+
+        for fila in consulta:
+            resultado[fila.id_equipo].append({
+                'id_jugador': fila.id_jugador,
+                'id_equipo': fila.id_equipo,
+                'nombre': fila.nombre,
+                'apellido': fila.apellido,
+                'nombre_completo': f'{fila.nombre} {fila.apellido}',
+                'dorsal': fila.dorsal,
+                'posicion': fila.posicion,
+                'activo': fila.activo
+            })
+        return resultado
+
+    @staticmethod
+    def partidos(ids_partido=None, id_campeonato=None):
+        """
+        Partidos con el nombre y logo de sus dos equipos (mismas claves que
+        Partido.to_dict para lo que comparten)
+
+        Args:
+            ids_partido: lista de ids (None = no filtrar por id)
+            id_campeonato: todos los partidos del campeonato
+
+        Returns:
+            list: ordenados por jornada y fecha
+        """
+        local = aliased(Equipo)
+        visitante = aliased(Equipo)
+        consulta = (
+            db.session.query(
+                Partido.id_partido, Partido.id_campeonato, Partido.id_equipo_local,
+                Partido.id_equipo_visitante, Partido.fecha_partido, Partido.jornada,
+                Partido.estado,
+                local.nombre.label('nombre_local'), local.logo_url.label('logo_local'),
+                visitante.nombre.label('nombre_visitante'), visitante.logo_url.label('logo_visitante')
+            )
+            .join(local, local.id_equipo == Partido.id_equipo_local)
+            .join(visitante, visitante.id_equipo == Partido.id_equipo_visitante)
+            .order_by(Partido.jornada, Partido.fecha_partido, Partido.id_partido)
+        )
+        if ids_partido is not None:
+            if not ids_partido:
+                return []
+            consulta = consulta.filter(Partido.id_partido.in_(ids_partido))
+        if id_campeonato is not None:
+            consulta = consulta.filter(Partido.id_campeonato == id_campeonato)
+
+        return [
+            {
+                'id_partido': fila.id_partido,
+                'id_campeonato': fila.id_campeonato,
+                'id_equipo_local': fila.id_equipo_local,
+                'id_equipo_visitante': fila.id_equipo_visitante,
+                'fecha_partido': fila.fecha_partido.isoformat() if fila.fecha_partido else None,
+                'jornada': fila.jornada,
+                'estado': fila.estado,
+                'equipo_local': fila.nombre_local,
+                'equipo_visitante': fila.nombre_visitante,
+                'logo_local': fila.logo_local,
+                'logo_visitante': fila.logo_visitante
+            }
+            for fila in consulta
+        ]
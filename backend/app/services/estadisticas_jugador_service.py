@@ -0,0 +1,246 @@
+from app.extensions import db
+from app.enums.gol_enum import TipoGol
+from app.models.estadistica_jugador import EstadisticaJugador
+from app.models.gol import Gol
+from app.models.partido import Partido
+
+class EstadisticasJugadorService:
+    """
+    Mantiene los totales por jugador y campeonato (estadisticas_jugador)
+
+    ¿Cómo funciona?
+    - Cada gol (goles) o evento de gol (eventos_partido) aporta un "delta" a
+      la fila del autor y, si hubo asistencia, a la del asistidor
+    - Al registrar se SUMA el delta; al eliminar se RESTA
+    - partidos_jugados sube cuando el jugador tiene su primera participación
+      en un partido y baja cuando se elimina la última
+
+    Las actualizaciones usan UPDATE columna = columna + delta, igual que la
+    tabla de posiciones, así dos goles simultáneos no se pisan.
+
+    IMPORTANTE: ninguno de estos métodos hace commit, y los de registro se
+    llaman DESPUÉS de agregar o eliminar la fila y hacer flush (así el conteo
+    de participaciones ya incluye, o ya excluye, el cambio).
+    """
+
+    @staticmethod
+    def delta_gol(tipo, signo=1):
+        """
+        Aporte de un gol de la tabla goles a la fila de su autor
+
+        Returns:
+            dict: columnas → incremento
+        """
+        if tipo == TipoGol.AUTOGOL:
+            return {'autogoles': signo}
+        return {
+            'goles': signo,
+            'penales': signo if tipo == TipoGol.PENAL else 0,
+            'tiros_libres': signo if tipo == TipoGol.TIRO_LIBRE else 0
+        }
+
+    @staticmethod
+    def _aplicar_delta(id_campeonato, id_jugador, id_equipo, delta):
+        """Aplica un delta a la fila (campeonato, jugador), creándola si no existe"""
+        delta = {col: valor for col, valor in delta.items() if valor}
+        if not delta:
+            return
+
+        actualizadas = EstadisticaJugador.query.filter_by(
+            id_campeonato=id_campeonato,
+            id_jugador=id_jugador
+        ).update(
+            {getattr(EstadisticaJugador, col): getattr(EstadisticaJugador, col) + valor for col, valor in delta.items()},
+            synchronize_session=False
+        )
+
+        if actualizadas == 0:
+            db.session.add(EstadisticaJugador(
+                id_campeonato=id_campeonato,
+                id_jugador=id_jugador,
+                id_equipo=id_equipo,
+                **delta
+            ))
+            db.session.flush()
+
+    @staticmethod
+    def _participaciones(id_partido, id_jugador):
+        """Goles y asistencias registrados del jugador en el partido"""
+        from app.routes.eventos_routes import EventoPartido
+
+        goles = db.session.query(db.func.count(Gol.id_gol)).filter(
+            Gol.id_partido == id_partido,
+            Gol.id_jugador == id_jugador
+        ).scalar()
+        eventos = db.session.query(db.func.count(EventoPartido.id_evento)).filter(
+            EventoPartido.id_partido == id_partido,
+            EventoPartido.tipo == 'gol',
+            db.or_(EventoPartido.id_jugador == id_jugador, EventoPartido.id_asistidor == id_jugador)
+        ).scalar()
+        return goles + eventos
+
+    @staticmethod
+    def _aplicar_participacion(partido, id_jugador, id_equipo, delta, signo):
+        """Suma el delta y ajusta partidos_jugados si era la primera (o última) participación"""
+        restantes = EstadisticasJugadorService._participaciones(partido.id_partido, id_jugador)
+        if (signo > 0 and restantes == 1) or (signo < 0 and restantes == 0):
+            delta = {**delta, 'partidos_jugados': signo}
+        EstadisticasJugadorService._aplicar_delta(partido.id_campeonato, id_jugador, id_equipo, delta)
+
+    @staticmethod
+    def registrar_gol(gol, partido, id_equipo, signo=1):
+        """
+        Gol de la tabla goles (gol_routes)
+
+        Args:
+            gol: Gol agregado (signo=1) o eliminado (signo=-1), ya con flush
+            partido: Partido del gol
+            id_equipo: equipo del autor
+        """
+        EstadisticasJugadorService._aplicar_participacion(
+            partido, gol.id_jugador, id_equipo,
+            EstadisticasJugadorService.delta_gol(gol.tipo, signo), signo
+        )
+
+    @staticmethod
+    def registrar_evento(evento, partido, signo=1):
+        """
+        Evento de partido (eventos_routes); solo los goles aportan
+
+        Args:
+            evento: EventoPartido agregado (signo=1) o eliminado (signo=-1), ya con flush
+            partido: Partido del evento
+        """
+        if evento.tipo != 'gol':
+            return
+        EstadisticasJugadorService._aplicar_participacion(
+            partido, evento.id_jugador, evento.id_equipo, {'goles': signo}, signo
+        )
+        if evento.id_asistidor:
+            EstadisticasJugadorService._aplicar_participacion(
+                partido, evento.id_asistidor, evento.id_equipo, {'asistencias': signo}, signo
+            )
+
+    @staticmethod
+    def retirar_partido(partido):
+        """
+        Resta todo el aporte de un partido (antes de eliminarlo)
+
+        Agrega los goles y eventos del partido por jugador y descuenta una
+        vez por fila, incluido el partido jugado.
+        """
+        totales = EstadisticasJugadorService._agregar(Partido.id_partido == partido.id_partido)
+        for (id_jugador, _), fila in totales.items():
+            EstadisticasJugadorService._aplicar_delta(
+                partido.id_campeonato, id_jugador, fila['id_equipo'],
+                {col: -valor for col, valor in fila.items() if col != 'id_equipo'}
+            )
+
+    # ============================================
+    # LECTURA
+    # ============================================
+
+    @staticmethod
+    def top(id_campeonato, columna='goles', limit=None):
+        """
+        Top N por goles o asistencias (lectura en orden del índice)
+
+        Returns:
+            list[EstadisticaJugador]: solo jugadores con al menos uno
+        """
+        orden = getattr(EstadisticaJugador, columna)
+        query = EstadisticaJugador.query.filter(
+            EstadisticaJugador.id_campeonato == id_campeonato,
+            orden > 0
+        ).order_by(
+            orden.desc(),
+            EstadisticaJugador.partidos_jugados.asc(),
+            EstadisticaJugador.id_jugador.asc()
+        )
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+    # ============================================
+    # RECONSTRUCCIÓN
+    # ============================================
+
+    @staticmethod
+    def _agregar(condicion):
+        """
+        Suma goles y eventos por (jugador, campeonato) desde cero
+
+        Args:
+            condicion: filtro sobre Partido (un campeonato o un partido)
+
+        Returns:
+            dict: (id_jugador, id_campeonato) → columnas (incluye id_equipo)
+        """
+        from app.models.jugador import Jugador
+        from app.routes.eventos_routes import EventoPartido
+
+        totales = {}
+        partidos = {}   # (id_jugador, id_campeonato) → {id_partido}
+
+        def fila(id_jugador, id_campeonato, id_equipo):
+            return totales.setdefault((id_jugador, id_campeonato), {
+                'id_equipo': id_equipo, 'goles': 0, 'penales': 0, 'tiros_libres': 0,
+                'autogoles': 0, 'asistencias': 0, 'partidos_jugados': 0
+            })
+
+        goles = db.session.query(
+            Gol.id_jugador, Partido.id_campeonato, Gol.id_partido, Jugador.id_equipo, Gol.tipo,
+            db.func.count(Gol.id_gol)
+        ).join(
+            Partido, Partido.id_partido == Gol.id_partido
+        ).join(
+            Jugador, Jugador.id_jugador == Gol.id_jugador
+        ).filter(condicion).group_by(
+            Gol.id_jugador, Partido.id_campeonato, Gol.id_partido, Jugador.id_equipo, Gol.tipo
+        )
+        for id_jugador, id_campeonato, id_partido, id_equipo, tipo, cantidad in goles:
+            total = fila(id_jugador, id_campeonato, id_equipo)
+            for col, valor in EstadisticasJugadorService.delta_gol(tipo, cantidad).items():
+                total[col] += valor
+            partidos.setdefault((id_jugador, id_campeonato), set()).add(id_partido)
+
+        for autor, columna in ((EventoPartido.id_jugador, 'goles'), (EventoPartido.id_asistidor, 'asistencias')):
+            eventos = db.session.query(
+                autor, Partido.id_campeonato, EventoPartido.id_partido, EventoPartido.id_equipo,
+                db.func.count(EventoPartido.id_evento)
+            ).join(
+                Partido, Partido.id_partido == EventoPartido.id_partido
+            ).filter(
+                condicion, EventoPartido.tipo == 'gol', autor.isnot(None)
+            ).group_by(
+                autor, Partido.id_campeonato, EventoPartido.id_partido, EventoPartido.id_equipo
+            )
+            for id_jugador, id_campeonato, id_partido, id_equipo, cantidad in eventos:
+                fila(id_jugador, id_campeonato, id_equipo)[columna] += cantidad
+                partidos.setdefault((id_jugador, id_campeonato), set()).add(id_partido)
+
+        for clave, ids in partidos.items():
+            totales[clave]['partidos_jugados'] = len(ids)
+        return totales
+
+    @staticmethod
+    def reconstruir(id_campeonato):
+        """
+        Recalcula desde cero los totales de un campeonato (reparar desincronización)
+
+        Returns:
+            int: Cantidad de filas generadas
+        """
+        totales = EstadisticasJugadorService._agregar(Partido.id_campeonato == id_campeonato)
+
+        EstadisticaJugador.query.filter_by(id_campeonato=id_campeonato).delete(synchronize_session=False)
+
+        filas = [
+            {'id_campeonato': id_campeonato, 'id_jugador': id_jugador, **fila}
+            for (id_jugador, _), fila in totales.items()
+        ]
+
+        if filas:
+            db.session.execute(db.insert(EstadisticaJugador), filas)
+
+        return len(filas)
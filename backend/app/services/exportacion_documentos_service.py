@@ -0,0 +1,187 @@
+import csv
+import io
+import os
+import time
+import zipfile
+
+from werkzeug.security import safe_join
+from werkzeug.utils import secure_filename
+
+from app.extensions import db
+from app.models.campeonato_equipo import CampeonatoEquipo
+from app.models.equipo import Equipo
+from app.models.jugador import Jugador
+from app.services.almacen_service import AlmacenService
+
+
+class _SalidaZip(io.RawIOBase):
+    """
+    Destino de zipfile que solo acumula lo escrito hasta que el generador lo entrega
+
+    No es seekable: zipfile escribe cada entrada con data descriptor (CRC y
+    tamaños después de los datos) y nunca vuelve atrás.
+    """
+
+    def __init__(self):
+        self._partes = []
+        self._pendiente = 0
+        self._posicion = 0
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        datos = bytes(datos)
+        self._partes.append(datos)
+        self._pendiente += len(datos)
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self._posicion
+
+    def pendiente(self):
+        return self._pendiente
+
+    def vaciar(self):
+        datos = b''.join(self._partes)
+        self._partes.clear()
+        self._pendiente = 0
+        return datos
+
+
+class ExportacionDocumentosService:
+    """
+    ZIP con los documentos PDF y fotos de los jugadores, generado al vuelo
+
+    ¿Por qué existe?
+    - /jugadores/equipo/<id>/documentos solo devuelve metadatos: para
+      verificar un plantel el organizador descargaba cada PDF y foto a mano
+    - El ZIP se arma mientras se envía: cada archivo se lee por bloques y
+      los bytes comprimidos se entregan apenas salen, así que la memoria no
+      depende del tamaño ni de la cantidad de archivos
+
+    Las consultas se hacen antes de empezar a responder (entradas_*): el
+    generador solo lee disco y no necesita la sesión de la base de datos.
+    Al final va manifest.csv, con una fila por archivo (incluido, faltante
+    o sin archivo).
+    """
+
+    BLOQUE = 64 * 1024
+    COLUMNAS_MANIFEST = [
+        'equipo', 'id_jugador', 'apellido', 'nombre', 'documento', 'dorsal', 'activo',
+        'tipo', 'archivo', 'tamanio', 'sha256', 'estado'
+    ]
+
+    # ============================================
+    # ENTRADAS
+    # ============================================
+
+    @staticmethod
+    def entradas_equipo(id_equipo):
+        return ExportacionDocumentosService._entradas(
+            ExportacionDocumentosService._consulta().filter(Jugador.id_equipo == id_equipo)
+        )
+
+    @staticmethod
+    def entradas_campeonato(id_campeonato):
+        """Jugadores de los equipos con inscripción aprobada en el campeonato"""
+        consulta = (
+            ExportacionDocumentosService._consulta()
+            .join(CampeonatoEquipo, CampeonatoEquipo.id_equipo == Equipo.id_equipo)
+            .filter(
+                CampeonatoEquipo.id_campeonato == id_campeonato,
+                CampeonatoEquipo.estado_inscripcion == 'aprobado'
+            )
+        )
+        return ExportacionDocumentosService._entradas(consulta)
+
+    @staticmethod
+    def _consulta():
+        return (
+            db.session.query(
+                Equipo.id_equipo, Equipo.nombre.label('equipo'),
+                Jugador.id_jugador, Jugador.nombre, Jugador.apellido, Jugador.documento,
+                Jugador.dorsal, Jugador.activo, Jugador.documento_pdf, Jugador.foto_url
+            )
+            .join(Equipo, Jugador.id_equipo == Equipo.id_equipo)
+            .order_by(Equipo.nombre, Equipo.id_equipo, Jugador.dorsal)
+        )
+
+    @staticmethod
+    def _entradas(consulta):
+        base = AlmacenService.base()
+        entradas = []
+        for fila in consulta:
+            carpeta = secure_filename(f'{fila.id_equipo}_{fila.equipo}') or str(fila.id_equipo)
+            prefijo = secure_filename(f'{fila.dorsal}_{fila.apellido}_{fila.nombre}_{fila.id_jugador}')
+            for tipo, url in (('documento', fila.documento_pdf), ('foto', fila.foto_url)):
+                entrada = {
+                    'equipo': fila.equipo,
+                    'id_jugador': fila.id_jugador,
+                    'apellido': fila.apellido,
+                    'nombre': fila.nombre,
+                    'documento': fila.documento,
+                    'dorsal': fila.dorsal,
+                    'activo': 'si' if fila.activo else 'no',
+                    'tipo': tipo,
+                    'archivo': '',
+                    'tamanio': '',
+                    'sha256': AlmacenService.sha_de_url(url) or '',
+                    'estado': 'sin archivo',
+                    'path': None
+                }
+                if url and '/uploads/' in url:
+                    ruta = url.split('/uploads/', 1)[1]
+                    ext = ruta.rsplit('.', 1)[-1].lower() if '.' in ruta else 'bin'
+                    entrada['path'] = safe_join(base, ruta)
+                    entrada['archivo'] = f'{carpeta}/{prefijo}_{tipo}.{ext}'
+                    entrada['estado'] = 'faltante'
+                elif url:
+                    entrada['estado'] = 'externo'
+                    entrada['archivo'] = url
+                entradas.append(entrada)
+        return entradas
+
+    # ============================================
+    # ZIP
+    # ============================================
+
+    @staticmethod
+    def generar_zip(entradas):
+        """Generador de los bytes del ZIP (para Response(..., mimetype='application/zip'))"""
+        bloque = ExportacionDocumentosService.BLOQUE
+        salida = _SalidaZip()
+
+        with zipfile.ZipFile(salida, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+            for entrada in entradas:
+                if not entrada['path']:
+                    continue
+                try:
+                    st = os.stat(entrada['path'])
+                except OSError:
+                    continue    # queda como 'faltante' en el manifest
+
+                info = zipfile.ZipInfo(entrada['archivo'], date_time=time.localtime(max(st.st_mtime, 315619200))[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.file_size = st.st_size     # zipfile decide con esto si necesita ZIP64
+                with open(entrada['path'], 'rb') as origen, zf.open(info, 'w') as destino:
+                    for datos in iter(lambda: origen.read(bloque), b''):
+                        destino.write(datos)
+                        if salida.pendiente() >= bloque:
+                            yield salida.vaciar()
+                entrada['estado'] = 'incluido'
+                entrada['tamanio'] = st.st_size
+                yield salida.vaciar()
+
+            zf.writestr('manifest.csv', ExportacionDocumentosService.manifest(entradas))
+        yield salida.vaciar()
+
+    @staticmethod
+    def manifest(entradas):
+        texto = io.StringIO()
+        writer = csv.DictWriter(texto, fieldnames=ExportacionDocumentosService.COLUMNAS_MANIFEST, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(entradas)
+        # BOM para que Excel lo abra como UTF-8
+        return texto.getvalue().encode('utf-8-sig')
@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+# ok=False → `error` tiene el motivo (excepción o 'plazo agotado') y `valor` es None
+Resultado = namedtuple('Resultado', ['ok', 'valor', 'error'])
+
+
+class Lote:
+    """Sub-llamadas lanzadas juntas; esperar() las junta respetando el plazo total"""
+
+    def __init__(self, futuros, limite):
+        self._futuros = futuros
+        self._limite = limite
+
+    def esperar(self):
+        """
+        Returns:
+            dict: clave → Resultado. Las que no terminaron a tiempo quedan
+            con error 'plazo agotado' (su hilo termina solo: cada llamada
+            lleva su propio deadline)
+        """
+        restante = max(0.0, self._limite - time.monotonic())
+        wait(self._futuros.values(), timeout=restante)
+
+        resultados = {}
+        for clave, futuro in self._futuros.items():
+            if not futuro.done():
+                futuro.cancel()
+                resultados[clave] = Resultado(False, None, 'plazo agotado')
+            elif futuro.exception() is not None:
+                resultados[clave] = Resultado(False, None, str(futuro.exception()))
+            else:
+                resultados[clave] = Resultado(True, futuro.result(), None)
+        return resultados
+
+
+class FanOut:
+    """
+    Ejecuta en paralelo las sub-llamadas de un request a otros servicios
+
+    ¿Por qué existe?
+    - Los proxies de alineaciones pedían la del local y después la del
+      visitante: la latencia era la suma de ambas (hasta 2 × 10 s)
+    - Con un pool de hilos por proceso se lanzan a la vez; el request
+      espera al más lento, nunca más que el plazo total (FAN_OUT_DEADLINE)
+
+    Uso:
+        lote = fan_out.lanzar({'local': fn1, 'visitante': fn2})
+        ...consultas locales mientras tanto...
+        resultados = lote.esperar()
+
+    Las funciones corren fuera del contexto de la app: solo deben hacer
+    I/O hacia afuera (p. ej. alineaciones_client), no usar db.session.
+    Una falla queda en su Resultado y no afecta a las demás.
+    """
+
+    def __init__(self):
+        self.deadline = 10.0
+        self._workers = 8
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.deadline = app.config.get('FAN_OUT_DEADLINE', 10.0)
+        self._workers = app.config.get('FAN_OUT_WORKERS', 8)
+        self._executor = None
+        self._executor_pid = None
+        app.extensions['fan_out'] = self
+
+    def lanzar(self, tareas, deadline=None):
+        """
+        Args:
+            tareas: dict clave → función sin argumentos
+            deadline: segundos para todo el lote (default FAN_OUT_DEADLINE)
+        """
+        limite = time.monotonic() + (deadline if deadline is not None else self.deadline)
+        pool = self._pool()
+        return Lote({clave: pool.submit(fn) for clave, fn in tareas.items()}, limite)
+
+    def ejecutar(self, tareas, deadline=None):
+        return self.lanzar(tareas, deadline).esperar()
+
+    def _pool(self):
+        """Un pool por proceso (también tras un fork)"""
+        if self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor_pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._workers, thread_name_prefix='fan-out'
+                    )
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+
+fan_out = FanOut()
@@ -0,0 +1,216 @@
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models.partido import Partido
+from app.services.replica_service import ReplicaService
+
+class FixtureService:
+    """
+    Genera el fixture (calendario) de un campeonato todos contra todos
+
+    ¿Cómo funciona?
+    1. round_robin(): método del círculo. Un equipo queda fijo y los demás
+       rotan una posición por jornada; así cada equipo juega exactamente una
+       vez por jornada y enfrenta a todos los demás una sola vez
+    2. Con cantidad impar se agrega un "descanso" (None) como elemento fijo:
+       quien lo enfrenta libra esa jornada
+    3. La localía se alterna por jornada: cada equipo juega de local y de
+       visitante la misma cantidad de veces (±1 en solo ida con cantidad par)
+       y como mucho repite localía una vez seguida por rueda
+    4. La vuelta repite las jornadas con la localía invertida
+    5. programar(): asigna fecha, franja horaria y sede a cada partido sin que
+       una sede tenga dos partidos en la misma franja
+    6. insertar(): un solo INSERT de varias filas
+
+    IMPORTANTE: insertar() no hace commit; se llama dentro de la transacción
+    que marca el campeonato como generado.
+    """
+
+    DESCANSO = None
+
+    @staticmethod
+    def round_robin(ids_equipos, incluir_vuelta=True):
+        """
+        Arma las jornadas con el método del círculo
+
+        Args:
+            ids_equipos: lista de IDs (el orden define el sorteo)
+            incluir_vuelta: agregar la segunda rueda con localía invertida
+
+        Returns:
+            list: una entrada por jornada: {'partidos': [(local, visitante)],
+                  'descansan': [IDs de los equipos que libran]}
+        """
+        equipos = list(ids_equipos)
+        if len(equipos) < 2:
+            return []
+        if len(equipos) % 2:
+            # Con el descanso fijo todos los equipos rotan y la localía queda
+            # perfectamente alternada
+            equipos.insert(0, FixtureService.DESCANSO)
+
+        n = len(equipos)
+        fijo, rotan = equipos[0], equipos[1:]
+        ida = []
+
+        for ronda in range(n - 1):
+            orden = [fijo] + rotan
+            partidos = []
+            descansa = None
+
+            for i in range(n // 2):
+                a, b = orden[i], orden[n - 1 - i]
+                if a is FixtureService.DESCANSO or b is FixtureService.DESCANSO:
+                    descansa = b if a is FixtureService.DESCANSO else a
+                    continue
+                # El fijo alterna localía por ronda; en las demás parejas la
+                # localía depende de la posición, que cambia al rotar
+                if (i == 0 and ronda % 2 == 1) or (i > 0 and i % 2 == 1):
+                    a, b = b, a
+                partidos.append((a, b))
+
+            ida.append({'partidos': partidos, 'descansan': [descansa] if descansa is not None else []})
+            rotan = rotan[-1:] + rotan[:-1]
+
+        if not incluir_vuelta:
+            return ida
+        vuelta = [
+            {'partidos': [(v, l) for l, v in j['partidos']], 'descansan': j['descansan']}
+            for j in ida
+        ]
+        return ida + vuelta
+
+    @staticmethod
+    def round_robin_grupos(grupos, incluir_vuelta=True):
+        """
+        Todos contra todos dentro de cada grupo (fase de grupos)
+
+        Args:
+            grupos: {letra: [IDs]} según CampeonatoEquipo.grupo
+            incluir_vuelta: agregar la segunda rueda
+
+        Returns:
+            list: mismas jornadas que round_robin(); la jornada k junta la
+                  jornada k de todos los grupos (los grupos más chicos
+                  terminan antes)
+        """
+        jornadas = []
+        for letra in sorted(grupos):
+            for k, jornada in enumerate(FixtureService.round_robin(grupos[letra], incluir_vuelta)):
+                if k == len(jornadas):
+                    jornadas.append({'partidos': [], 'descansan': []})
+                jornadas[k]['partidos'].extend(jornada['partidos'])
+                jornadas[k]['descansan'].extend(jornada['descansan'])
+        return jornadas
+
+    @staticmethod
+    def programar(jornadas, fecha_inicio, franjas, dias_entre_jornadas=7,
+                  sedes_por_equipo=None, sedes=None, max_partidos_por_franja=None):
+        """
+        Asigna fecha, hora y sede a cada partido
+
+        Args:
+            jornadas: salida de round_robin()
+            fecha_inicio: date de la primera jornada
+            franjas: lista de datetime.time (horarios disponibles por día)
+            dias_entre_jornadas: separación entre jornadas
+            sedes_por_equipo: {id_equipo: estadio} (la sede del local)
+            sedes: sedes neutrales para locales sin estadio (se rotan)
+            max_partidos_por_franja: partidos simultáneos permitidos (None = sin límite)
+
+        Restricciones:
+        - Una sede no recibe dos partidos en la misma fecha y franja
+        - Si los partidos de una jornada no entran en las franjas del día,
+          siguen en el día siguiente con las mismas franjas
+
+        Returns:
+            tuple: (filas, descansos)
+                filas: una por partido (dict con las columnas de Partido)
+                descansos: {jornada: [IDs de los equipos que libran]}
+
+        Raises:
+            ValueError: max_partidos_por_franja menor que 1 (ninguna franja
+                tendría cupo y la búsqueda no terminaría)
+        """
+        if max_partidos_por_franja is not None and max_partidos_por_franja < 1:
+            raise ValueError('max_partidos_por_franja debe ser al menos 1')
+
+        sedes_por_equipo = sedes_por_equipo or {}
+        sedes = list(sedes or [])
+        filas = []
+        descansos = {}
+        sede_neutral = 0
+
+        for numero, jornada in enumerate(jornadas, start=1):
+            fecha_jornada = fecha_inicio + timedelta(days=(numero - 1) * dias_entre_jornadas)
+            ocupadas = {}    # (dia, franja) → {sedes}
+            usados = {}      # (dia, franja) → partidos asignados
+            siguiente = 0    # reparte los partidos entre franjas como antes (1°, 2°, 1°, ...)
+
+            if jornada['descansan']:
+                descansos[numero] = jornada['descansan']
+
+            for local, visitante in jornada['partidos']:
+                lugar = sedes_por_equipo.get(local)
+                if not lugar and sedes:
+                    lugar = sedes[sede_neutral % len(sedes)]
+                    sede_neutral += 1
+
+                dia, idx = 0, siguiente
+                intentos = 0
+                while True:
+                    slot = (dia, idx % len(franjas))
+                    libre_sede = not lugar or lugar not in ocupadas.get(slot, ())
+                    libre_cupo = not max_partidos_por_franja or usados.get(slot, 0) < max_partidos_por_franja
+                    if libre_sede and libre_cupo:
+                        break
+                    idx += 1
+                    intentos += 1
+                    if intentos % len(franjas) == 0:
+                        dia += 1
+
+                ocupadas.setdefault(slot, set()).add(lugar)
+                usados[slot] = usados.get(slot, 0) + 1
+                siguiente = idx + 1
+
+                filas.append({
+                    'id_equipo_local': local,
+                    'id_equipo_visitante': visitante,
+                    'fecha_partido': datetime.combine(fecha_jornada + timedelta(days=slot[0]), franjas[slot[1]]),
+                    'lugar': lugar,
+                    'jornada': numero
+                })
+
+        return filas, descansos
+
+    @staticmethod
+    def insertar(id_campeonato, filas):
+        """Inserta los partidos generados con un único INSERT de varias filas"""
+        if not filas:
+            return 0
+        ahora = datetime.utcnow()
+        db.session.execute(db.insert(Partido), [{
+            **fila,
+            'id_campeonato': id_campeonato,
+            'estado': 'programado',
+            'goles_local': 0,
+            'goles_visitante': 0,
+            'resultado_registrado': False,
+            'fecha_creacion': ahora
+        } for fila in filas])
+
+        # El INSERT de Core no pasa por register_cambios: se anotan para la
+        # réplica de alineaciones-service todos los partidos del campeonato
+        # (los que ya estaban no cambian nada en el feed)
+        ids = db.session.execute(
+            db.select(Partido.id_partido).where(Partido.id_campeonato == id_campeonato)
+        ).scalars().all()
+        ReplicaService.registrar('partidos', ids)
+        return len(filas)
+
+    @staticmethod
+    def parsear_franjas(horas):
+        """Convierte ['15:00', '17:00'] en datetime.time una sola vez"""
+        try:
+            return [datetime.strptime(h, '%H:%M').time() for h in horas]
+        except (TypeError, ValueError):
+            raise ValueError('Las franjas horarias deben tener formato HH:MM')
@@ -0,0 +1,193 @@
+import os
+import re
+import tempfile
+
+from flask import current_app
+
+
+# Originales guardados por contenido: blobs/ab/cd/<sha256>.<ext> (o <carpeta>/<sha256>.<ext>, anteriores al almacén)
+_ORIGINAL = re.compile(r'/uploads/(?P<ruta>(?:[\w-]+/)*(?P<sha>[0-9a-f]{64})\.(?P<ext>png|jpe?g|gif))$')
+
+EXTENSIONES_IMAGEN = {'png', 'jpg', 'jpeg', 'gif'}
+
+
+class ImagenService:
+    """
+    Miniaturas de logos y fotos (64/128/512 px, formato original + WebP)
+
+    ¿Por qué existe?
+    - Las listas (tablas, partidos, planteles) descargaban el original
+      completo de cada logo y foto, de hasta 5-16 MB
+    - Al subir una imagen el original queda en el almacén por contenido
+      (AlmacenService, nombre = SHA-256) y un hilo (ImagenWorker) genera las derivadas en
+      uploads/derivados/<sha[:2]>/<sha>_<tamaño>.<formato>
+    - Como todo queda direccionado por contenido, las URLs de las derivadas
+      se calculan a partir de la URL del original (sin consultas) y se
+      sirven con Cache-Control: immutable (ver StaticFileServer)
+
+    Las derivadas se escriben en un archivo temporal y se renombran; la
+    última en escribirse (la WebP más grande) marca que el juego está completo.
+    Para imágenes subidas antes de esto: flask archivos importar y luego
+    flask imagenes backfill
+    """
+
+    # Hashes con derivadas ya verificadas (evita un stat por respuesta)
+    _listas = set()
+    _MAX_LISTAS = 100000
+
+    # ============================================
+    # ORIGINALES
+    # ============================================
+
+    @staticmethod
+    def guardar_original(file):
+        """
+        Guarda una imagen subida en el almacén por contenido (AlmacenService)
+
+        Raises:
+            ValueError: si no es una imagen legible
+
+        Returns:
+            str: ruta relativa a uploads (blobs/ab/cd/<sha256>.<ext>)
+        """
+        from app.services.almacen_service import AlmacenService
+        return AlmacenService.guardar(file, validar=ImagenService.validar)
+
+    @staticmethod
+    def validar(path):
+        """ValueError si el archivo no es una imagen legible (sin Pillow no valida)"""
+        try:
+            from PIL import Image
+        except ImportError:
+            return
+        try:
+            with Image.open(path) as img:
+                img.verify()
+        except Exception:
+            raise ValueError('El archivo no es una imagen válida')
+
+    # ============================================
+    # URLS
+    # ============================================
+
+    @staticmethod
+    def variantes(url):
+        """
+        URLs de las derivadas de una imagen (para logo_urls / foto_urls)
+
+        Returns:
+            dict o None: {'original': url, '64': ..., '128': ..., '512': ...,
+                          'webp': {'64': ..., '128': ..., '512': ...}}
+            Solo 'original' si las derivadas aún no están (o el nombre no es
+            direccionado por contenido); None si no hay url.
+        """
+        if not url:
+            return None
+        m = _ORIGINAL.search(url)
+        if not m:
+            return {'original': url}
+
+        sha, ext = m.group('sha'), m.group('ext')
+        if not ImagenService.derivadas_listas(sha):
+            # Quizás el proceso que la subió murió antes de generarlas
+            from app.services.imagen_worker import imagen_worker
+            imagen_worker.encolar(m.group('ruta'))
+            return {'original': url}
+
+        prefijo = url[:m.start('ruta')]
+        formato = ImagenService.formato(ext)
+        urls = {'original': url, 'webp': {}}
+        for t in ImagenService.tamanios():
+            urls[str(t)] = f'{prefijo}{ImagenService.ruta_derivada(sha, t, formato)}'
+            urls['webp'][str(t)] = f'{prefijo}{ImagenService.ruta_derivada(sha, t, "webp")}'
+        return urls
+
+    @staticmethod
+    def derivadas_listas(sha):
+        if sha in ImagenService._listas:
+            return True
+        marca = os.path.join(ImagenService.base(), ImagenService.ruta_derivada(sha, max(ImagenService.tamanios()), 'webp'))
+        if not os.path.exists(marca):
+            return False
+        if len(ImagenService._listas) >= ImagenService._MAX_LISTAS:
+            ImagenService._listas.clear()
+        ImagenService._listas.add(sha)
+        return True
+
+    # ============================================
+    # DERIVADAS
+    # ============================================
+
+    @staticmethod
+    def generar(ruta):
+        """
+        Genera las derivadas de uploads/<ruta> (idempotente)
+
+        Returns:
+            int: archivos escritos (0 si ya estaban)
+        """
+        from PIL import Image, ImageOps
+
+        nombre = os.path.basename(ruta)
+        sha, ext = nombre.rsplit('.', 1)
+        ext = ext.lower()
+        if ImagenService.derivadas_listas(sha):
+            return 0
+
+        config = current_app.config
+        formato = ImagenService.formato(ext)
+        base = ImagenService.base()
+        escritos = 0
+
+        with Image.open(os.path.join(base, ruta)) as img:
+            img.seek(0)     # GIF animado: primer cuadro
+            img = ImageOps.exif_transpose(img)
+            img = img.convert('RGBA' if formato == 'png' else 'RGB')
+
+            # De menor a mayor: la WebP de 512 (la marca) queda para el final
+            for t in sorted(ImagenService.tamanios()):
+                mini = img.copy()
+                mini.thumbnail((t, t), Image.LANCZOS)
+                for fmt in (formato, 'webp'):
+                    destino = os.path.join(base, ImagenService.ruta_derivada(sha, t, fmt))
+                    os.makedirs(os.path.dirname(destino), exist_ok=True)
+                    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(destino), prefix='.derivada-')
+                    try:
+                        with os.fdopen(fd, 'wb') as out:
+                            if fmt == 'webp':
+                                mini.save(out, 'WEBP', quality=config.get('IMAGENES_CALIDAD_WEBP', 80), method=4)
+                            elif fmt == 'jpg':
+                                mini.save(out, 'JPEG', quality=config.get('IMAGENES_CALIDAD_JPEG', 85),
+                                          optimize=True, progressive=True)
+                            else:
+                                mini.save(out, 'PNG', optimize=True)
+                        os.replace(tmp, destino)
+                    except Exception:
+                        if os.path.exists(tmp):
+                            os.remove(tmp)
+                        raise
+                    escritos += 1
+
+        ImagenService._listas.add(sha)
+        return escritos
+
+    # ============================================
+    # AUXILIARES
+    # ============================================
+
+    @staticmethod
+    def base():
+        return current_app.config['UPLOADS_BASE']
+
+    @staticmethod
+    def tamanios():
+        return current_app.config.get('IMAGENES_TAMANIOS', (64, 128, 512))
+
+    @staticmethod
+    def formato(ext):
+        """Formato de la miniatura no WebP: PNG conserva transparencia, JPEG para fotos"""
+        return 'jpg' if ext in ('jpg', 'jpeg') else 'png'
+
+    @staticmethod
+    def ruta_derivada(sha, tamanio, formato):
+        return f'derivados/{sha[:2]}/{sha}_{tamanio}.{formato}'
@@ -0,0 +1,107 @@
+import os
+import queue
+import threading
+
+
+class ImagenWorker:
+    """
+    Genera las miniaturas (ImagenService.generar) fuera del request
+
+    - Un hilo por proceso, con una cola acotada (IMAGENES_QUEUE_MAX)
+    - Una misma imagen no se encola dos veces mientras está pendiente, y las
+      que fallaron (archivo corrupto) no se reintentan en este proceso
+    - Si la cola está llena la imagen se descarta: la próxima respuesta que
+      la incluya (ImagenService.variantes) o `flask imagenes backfill` la
+      vuelve a encolar
+
+    Con IMAGENES_ASYNC = False (tests) se generan en el momento.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._async = True
+        self._queue_max = 1000
+        self._queue = queue.Queue(maxsize=self._queue_max)
+        self._pendientes = set()
+        self._fallidas = set()
+        self._worker_pid = None
+        self._lock = threading.Lock()
+        self.generadas = 0
+        self.errores = 0
+
+    def init_app(self, app):
+        self._app = app
+        self._async = app.config.get('IMAGENES_ASYNC', True)
+        self._queue_max = app.config.get('IMAGENES_QUEUE_MAX', 1000)
+        self._queue = queue.Queue(maxsize=self._queue_max)
+        app.extensions['imagen_worker'] = self
+
+    def encolar(self, ruta):
+        """Pide las derivadas de uploads/<ruta>"""
+        if self._app is None:
+            return
+        with self._lock:
+            if ruta in self._pendientes or ruta in self._fallidas:
+                return
+            self._pendientes.add(ruta)
+
+        if not self._async:
+            self._procesar(ruta)
+            return
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(ruta)
+        except queue.Full:
+            with self._lock:
+                self._pendientes.discard(ruta)
+            self._app.logger.warning(f'Cola de imágenes llena: {ruta} queda para más tarde')
+
+    def stats(self):
+        return {
+            'pendientes': self._queue.qsize(),
+            'generadas': self.generadas,
+            'errores': self.errores,
+            'pid': os.getpid()
+        }
+
+    def _procesar(self, ruta):
+        from app.services.imagen_service import ImagenService
+
+        try:
+            with self._app.app_context():
+                if ImagenService.generar(ruta):
+                    self.generadas += 1
+        except ImportError:
+            # Sin Pillow no hay derivadas: se sirven los originales
+            with self._lock:
+                self._fallidas.add(ruta)
+        except Exception as e:
+            self.errores += 1
+            with self._lock:
+                self._fallidas.add(ruta)
+            self._app.logger.error(f'No se pudieron generar las miniaturas de {ruta}: {e}')
+        finally:
+            with self._lock:
+                self._pendientes.discard(ruta)
+
+    def _ensure_worker(self):
+        """Arranca el hilo una vez por proceso (también tras un fork)"""
+        if self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid():
+                return
+            if self._worker_pid is not None:
+                # Tras un fork la cola heredada pertenece al proceso padre
+                self._queue = queue.Queue(maxsize=self._queue_max)
+                self._pendientes = set()
+            self._worker_pid = os.getpid()
+        threading.Thread(target=self._worker_loop, name='imagen-worker', daemon=True).start()
+
+    def _worker_loop(self):
+        while True:
+            self._procesar(self._queue.get())
+
+
+imagen_worker = ImagenWorker()
@@ -0,0 +1,381 @@
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models.campeonato_equipo import CampeonatoEquipo
+from app.models.equipo import Equipo
+from app.models.llave import Llave
+from app.models.partido import Partido
+from app.services.tabla_posiciones_service import TablaPosicionesService
+
+class LlavesService:
+    """
+    Fase de grupos + fase eliminatoria (cuadro de llaves)
+
+    ¿Cómo funciona?
+    1. posiciones_por_grupo(): tabla de cada grupo (CampeonatoEquipo.grupo)
+       con los partidos de fase de grupos (los que no pertenecen a una llave)
+    2. semillas_desde_grupos() / semillas_desde_sorteo(): ordenan a los
+       clasificados del mejor al peor
+    3. generar_cuadro(): crea TODAS las llaves del cuadro (la final incluida)
+       con el orden clásico de cabezas de serie (1 vs 16, 8 vs 9, ...). Si la
+       cantidad no es potencia de 2, los mejores sembrados pasan con "bye"
+    4. registrar_resultado(): al finalizar (o corregir) un partido de una
+       llave se guarda el marcador y el ganador avanza a la llave siguiente;
+       cuando una llave tiene sus dos equipos se crea su partido
+
+    IMPORTANTE: ningún método hace commit (igual que TablaPosicionesService).
+    """
+
+    FASES = {2: 'final', 4: 'semifinal', 8: 'cuartos', 16: 'octavos', 32: 'dieciseisavos'}
+
+    @staticmethod
+    def nombre_fase(equipos_en_ronda):
+        return LlavesService.FASES.get(equipos_en_ronda, f'ronda de {equipos_en_ronda}')
+
+    @staticmethod
+    def orden_semillas(tamano):
+        """
+        Orden de las semillas en el cuadro para que 1 y 2 solo se crucen en la final
+
+        tamano=8 → [1, 8, 4, 5, 2, 7, 3, 6]
+        """
+        orden = [1]
+        while len(orden) < tamano:
+            total = len(orden) * 2 + 1
+            orden = [s for semilla in orden for s in (semilla, total - semilla)]
+        return orden
+
+    # ============================================
+    # FASE DE GRUPOS
+    # ============================================
+
+    @staticmethod
+    def _partidos_de_llaves():
+        return db.select(Llave.id_partido).where(Llave.id_partido.isnot(None))
+
+    @staticmethod
+    def posiciones_por_grupo(id_campeonato):
+        """
+        Tabla de posiciones de cada grupo
+
+        Returns:
+            dict: {letra: [filas ordenadas con 'posicion']}
+        """
+        inscritos = db.session.query(
+            CampeonatoEquipo.id_equipo, CampeonatoEquipo.grupo, Equipo.nombre
+        ).join(
+            Equipo, Equipo.id_equipo == CampeonatoEquipo.id_equipo
+        ).filter(
+            CampeonatoEquipo.id_campeonato == id_campeonato,
+            CampeonatoEquipo.estado_inscripcion == 'aprobado',
+            CampeonatoEquipo.grupo.isnot(None)
+        ).all()
+
+        grupo_de = {}
+        filas = {}
+        for id_equipo, grupo, nombre in inscritos:
+            grupo_de[id_equipo] = grupo
+            filas[id_equipo] = {
+                'id_equipo': id_equipo, 'nombre': nombre, 'grupo': grupo,
+                'partidos_jugados': 0, 'ganados': 0, 'empatados': 0, 'perdidos': 0,
+                'goles_favor': 0, 'goles_contra': 0, 'diferencia_goles': 0, 'puntos': 0
+            }
+
+        partidos = db.session.query(
+            Partido.id_equipo_local, Partido.id_equipo_visitante,
+            Partido.goles_local, Partido.goles_visitante
+        ).filter(
+            Partido.id_campeonato == id_campeonato,
+            Partido.estado == 'finalizado',
+            Partido.id_partido.notin_(LlavesService._partidos_de_llaves())
+        ).all()
+
+        for local, visitante, gl, gv in partidos:
+            # Solo cuentan los cruces dentro del mismo grupo
+            if grupo_de.get(local) is None or grupo_de.get(local) != grupo_de.get(visitante):
+                continue
+            for id_equipo, propios, rival in ((local, gl, gv), (visitante, gv, gl)):
+                for columna, valor in TablaPosicionesService.calcular_delta(propios, rival).items():
+                    filas[id_equipo][columna] += valor
+
+        grupos = {}
+        for fila in filas.values():
+            grupos.setdefault(fila['grupo'], []).append(fila)
+        for letra, tabla in grupos.items():
+            tabla.sort(key=lambda f: (-f['puntos'], -f['diferencia_goles'], -f['goles_favor'], f['id_equipo']))
+            for posicion, fila in enumerate(tabla, start=1):
+                fila['posicion'] = posicion
+        return dict(sorted(grupos.items()))
+
+    @staticmethod
+    def partidos_grupo_pendientes(id_campeonato):
+        """Partidos de fase de grupos que todavía no terminaron"""
+        return Partido.query.filter(
+            Partido.id_campeonato == id_campeonato,
+            Partido.estado.notin_(['finalizado', 'cancelado']),
+            Partido.id_partido.notin_(LlavesService._partidos_de_llaves())
+        ).count()
+
+    @staticmethod
+    def semillas_desde_grupos(id_campeonato, clasificados_por_grupo=2):
+        """
+        Clasificados de cada grupo ordenados como semillas
+
+        Primero todos los 1°, luego los 2°, ...; dentro de cada puesto, por
+        puntos, diferencia de gol y goles a favor.
+
+        Returns:
+            list: [(id_equipo, origen, grupo)]
+        """
+        grupos = LlavesService.posiciones_por_grupo(id_campeonato)
+        semillas = []
+        for puesto in range(clasificados_por_grupo):
+            filas = [tabla[puesto] for tabla in grupos.values() if len(tabla) > puesto]
+            filas.sort(key=lambda f: (-f['puntos'], -f['diferencia_goles'], -f['goles_favor'], f['grupo']))
+            semillas.extend((f['id_equipo'], f'{puesto + 1}° Grupo {f["grupo"]}', f['grupo']) for f in filas)
+        return semillas
+
+    @staticmethod
+    def semillas_desde_sorteo(id_campeonato):
+        """Equipos aprobados en el orden del sorteo (eliminación directa)"""
+        inscripciones = CampeonatoEquipo.query.filter_by(
+            id_campeonato=id_campeonato, estado_inscripcion='aprobado'
+        ).order_by(CampeonatoEquipo.numero_sorteo, CampeonatoEquipo.id).all()
+        return [(i.id_equipo, f'Sorteo {n}', None) for n, i in enumerate(inscripciones, start=1)]
+
+    # ============================================
+    # CUADRO ELIMINATORIO
+    # ============================================
+
+    @staticmethod
+    def generar_cuadro(id_campeonato, semillas, fecha_inicio, hora, dias_entre_rondas=7):
+        """
+        Crea las llaves de todas las rondas y los partidos de la primera
+
+        Args:
+            semillas: [(id_equipo, origen, grupo)] del mejor al peor
+            fecha_inicio: date de la primera ronda
+            hora: datetime.time de los partidos
+            dias_entre_rondas: separación entre rondas
+
+        Returns:
+            list: llaves de la primera ronda
+        """
+        if Llave.query.filter_by(id_campeonato=id_campeonato).first():
+            raise ValueError('El cuadro eliminatorio ya fue generado')
+        if len(semillas) < 2:
+            raise ValueError('Se necesitan al menos 2 equipos para la fase eliminatoria')
+
+        tamano = 1
+        while tamano < len(semillas):
+            tamano *= 2
+        rondas = tamano.bit_length() - 1
+
+        # De la final hacia atrás, para conocer el id de la llave siguiente
+        siguientes = {}
+        for ronda in range(rondas, 0, -1):
+            llaves_ronda = tamano >> ronda
+            fase = LlavesService.nombre_fase(llaves_ronda * 2)
+            fase_previa = LlavesService.nombre_fase(llaves_ronda * 4)
+            fecha = datetime.combine(fecha_inicio + timedelta(days=(ronda - 1) * dias_entre_rondas), hora)
+            actuales = {}
+            for posicion in range(llaves_ronda):
+                siguiente = siguientes.get(posicion // 2)
+                llave = Llave(
+                    id_campeonato=id_campeonato,
+                    ronda=ronda,
+                    posicion=posicion,
+                    fase=fase,
+                    fecha_programada=fecha,
+                    id_llave_siguiente=siguiente.id_llave if siguiente else None,
+                    lado_siguiente=('local' if posicion % 2 == 0 else 'visitante') if siguiente else None,
+                    origen_local=f'Ganador {fase_previa} {posicion * 2 + 1}' if ronda > 1 else None,
+                    origen_visitante=f'Ganador {fase_previa} {posicion * 2 + 2}' if ronda > 1 else None
+                )
+                db.session.add(llave)
+                actuales[posicion] = llave
+            db.session.flush()
+            siguientes = actuales
+
+        primera_ronda = [siguientes[p] for p in range(len(siguientes))]
+        orden = LlavesService.orden_semillas(tamano)
+        cruces = [
+            [semillas[orden[i] - 1] if orden[i] <= len(semillas) else None,
+             semillas[orden[i + 1] - 1] if orden[i + 1] <= len(semillas) else None]
+            for i in range(0, tamano, 2)
+        ]
+        LlavesService._evitar_mismo_grupo(cruces)
+
+        for llave, (local, visitante) in zip(primera_ronda, cruces):
+            if local:
+                llave.id_equipo_local, llave.origen_local = local[0], local[1]
+            if visitante:
+                llave.id_equipo_visitante, llave.origen_visitante = visitante[0], visitante[1]
+
+            if local and visitante:
+                LlavesService._crear_partido(llave)
+            else:
+                # Bye: el único equipo pasa directo a la ronda siguiente
+                llave.estado = 'bye'
+                llave.id_ganador = (local or visitante)[0]
+                LlavesService._avanzar(llave)
+
+        return primera_ronda
+
+    @staticmethod
+    def _evitar_mismo_grupo(cruces):
+        """Intercambia visitantes entre cruces para que nadie repita rival de grupo en la 1° ronda"""
+        def mismo_grupo(a, b):
+            return a and b and a[2] is not None and a[2] == b[2]
+
+        for i, cruce in enumerate(cruces):
+            if not mismo_grupo(*cruce):
+                continue
+            for j, otro in enumerate(cruces):
+                if j != i and not mismo_grupo(cruce[0], otro[1]) and not mismo_grupo(otro[0], cruce[1]) and otro[1]:
+                    cruce[1], otro[1] = otro[1], cruce[1]
+                    break
+
+    @staticmethod
+    def _jornada_eliminatoria(llave):
+        """Las rondas eliminatorias van después de la última jornada de grupos"""
+        ultima = db.session.query(db.func.max(Partido.jornada)).filter(
+            Partido.id_campeonato == llave.id_campeonato,
+            Partido.id_partido.notin_(LlavesService._partidos_de_llaves())
+        ).scalar() or 0
+        return ultima + llave.ronda
+
+    @staticmethod
+    def _crear_partido(llave):
+        local = db.session.get(Equipo, llave.id_equipo_local)
+        partido = Partido(
+            id_campeonato=llave.id_campeonato,
+            id_equipo_local=llave.id_equipo_local,
+            id_equipo_visitante=llave.id_equipo_visitante,
+            fecha_partido=llave.fecha_programada,
+            lugar=local.estadio if local else None,
+            jornada=LlavesService._jornada_eliminatoria(llave),
+            estado='programado'
+        )
+        db.session.add(partido)
+        db.session.flush()
+        llave.id_partido = partido.id_partido
+        llave.estado = 'programado'
+        return partido
+
+    @staticmethod
+    def _avanzar(llave):
+        """Ubica al ganador de la llave en la siguiente (y crea ese partido si ya está completa)"""
+        siguiente = llave.siguiente
+        if siguiente is None:
+            return None
+
+        if llave.lado_siguiente == 'local':
+            siguiente.id_equipo_local = llave.id_ganador
+        else:
+            siguiente.id_equipo_visitante = llave.id_ganador
+
+        if siguiente.id_equipo_local and siguiente.id_equipo_visitante:
+            if siguiente.id_partido is None:
+                LlavesService._crear_partido(siguiente)
+            else:
+                partido = db.session.get(Partido, siguiente.id_partido)
+                partido.id_equipo_local = siguiente.id_equipo_local
+                partido.id_equipo_visitante = siguiente.id_equipo_visitante
+        return siguiente
+
+    @staticmethod
+    def _retirar(llave):
+        """Saca al ganador anterior de la llave siguiente (resultado corregido)"""
+        siguiente = llave.siguiente
+        if siguiente is None:
+            return
+
+        if siguiente.id_partido:
+            partido = db.session.get(Partido, siguiente.id_partido)
+            if partido and partido.estado != 'programado':
+                raise ValueError('No se puede cambiar el ganador: la llave siguiente ya se está jugando')
+            siguiente.id_partido = None
+            siguiente.estado = 'pendiente'
+            # La llave deja de apuntar al partido antes de borrarlo (FK)
+            db.session.flush()
+            if partido:
+                db.session.delete(partido)
+
+        if llave.lado_siguiente == 'local':
+            siguiente.id_equipo_local = None
+        else:
+            siguiente.id_equipo_visitante = None
+
+    @staticmethod
+    def registrar_resultado(partido):
+        """
+        Punto de entrada para los endpoints que cambian estado o marcador de un partido
+
+        Si el partido pertenece a una llave, guarda el marcador y, si cambió el
+        ganador, lo hace avanzar. Un empate no define ganador hasta que se
+        indique el desempate (definir_desempate).
+
+        Returns:
+            Llave o None si el partido no es de fase eliminatoria
+        """
+        llave = Llave.query.filter_by(id_partido=partido.id_partido).first()
+        if llave is None:
+            return None
+
+        llave.goles_local = partido.goles_local
+        llave.goles_visitante = partido.goles_visitante
+        llave.estado = partido.estado
+
+        ganador = None
+        if partido.estado == 'finalizado':
+            if partido.goles_local > partido.goles_visitante:
+                ganador = partido.id_equipo_local
+            elif partido.goles_visitante > partido.goles_local:
+                ganador = partido.id_equipo_visitante
+            else:
+                ganador = llave.id_ganador_desempate
+        if partido.estado != 'finalizado' or partido.goles_local != partido.goles_visitante:
+            llave.id_ganador_desempate = None
+
+        if ganador != llave.id_ganador:
+            if llave.id_ganador:
+                LlavesService._retirar(llave)
+            llave.id_ganador = ganador
+            if ganador:
+                LlavesService._avanzar(llave)
+        return llave
+
+    @staticmethod
+    def definir_desempate(llave, id_equipo):
+        """Define el ganador de una llave que terminó empatada (penales, sorteo)"""
+        if llave.estado != 'finalizado' or llave.goles_local != llave.goles_visitante:
+            raise ValueError('Solo se define desempate en llaves finalizadas con empate')
+        if id_equipo not in (llave.id_equipo_local, llave.id_equipo_visitante):
+            raise ValueError('El equipo no juega esta llave')
+
+        llave.id_ganador_desempate = id_equipo
+        return LlavesService.registrar_resultado(db.session.get(Partido, llave.id_partido))
+
+    @staticmethod
+    def obtener_cuadro(id_campeonato):
+        """
+        Cuadro completo en UNA consulta (equipos con JOIN)
+
+        Returns:
+            dict: {'rondas': [{ronda, fase, llaves}], 'campeon': {...} o None}
+        """
+        llaves = Llave.query.filter_by(id_campeonato=id_campeonato).order_by(
+            Llave.ronda, Llave.posicion
+        ).all()
+
+        rondas = {}
+        for llave in llaves:
+            ronda = rondas.setdefault(llave.ronda, {'ronda': llave.ronda, 'fase': llave.fase, 'llaves': []})
+            ronda['llaves'].append(llave.to_dict())
+
+        final = llaves[-1] if llaves else None
+        campeon = None
+        if final and final.id_ganador:
+            campeon = {'id_equipo': final.id_ganador, 'nombre': final.ganador.nombre if final.ganador else None}
+
+        return {'rondas': list(rondas.values()), 'campeon': campeon}
@@ -0,0 +1,248 @@
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import event, inspect
+
+from app.extensions import db
+from app.models.cambio_replica import CambioReplica
+
+_listener_registrado = False
+
+
+def _entidades():
+    """entidad → (modelo, clave primaria, columnas replicadas)"""
+    from app.models.equipo import Equipo
+    from app.models.jugador import Jugador
+    from app.models.partido import Partido
+    return {
+        'jugadores': (Jugador, 'id_jugador', (
+            'id_jugador', 'id_equipo', 'nombre', 'apellido', 'dorsal', 'posicion', 'activo'
+        )),
+        'equipos': (Equipo, 'id_equipo', (
+            'id_equipo', 'nombre', 'logo_url', 'estado', 'id_lider'
+        )),
+        'partidos': (Partido, 'id_partido', (
+            'id_partido', 'id_campeonato', 'id_equipo_local', 'id_equipo_visitante',
+            'fecha_partido', 'jornada', 'estado'
+        )),
+    }
+
+
+class ReplicaSecuenciaVencida(Exception):
+    """El cursor pedido es anterior a los cambios que se conservan: hay que resincronizar"""
+
+
+class ReplicaService:
+    """
+    Feed de cambios de jugadores, equipos y partidos para la réplica de
+    alineaciones-service
+
+    ¿Por qué existe?
+    - alineaciones-service consultaba el partido y los planteles al backend
+      en cada validación de alineación
+    - Ahora guarda una copia de solo lectura de esas tablas y la mantiene al
+      día pidiendo /replica/cambios?desde=<seq> cada pocos segundos
+
+    ¿Por qué una secuencia y no un updated_since?
+    - Las tablas no tienen updated_at, y un timestamp no distingue dos
+      cambios del mismo segundo ni registra los borrados
+    - cambios_replica.seq crece siempre; register_cambios agrega una fila
+      por entidad tocada en cada flush, en la misma transacción
+
+    Lo que no pasa por el ORM no lo ve el listener: quien escribe con Core
+    (p. ej. FixtureService.insertar) debe llamar a registrar(). Lo que
+    tampoco pasa por ahí (ON DELETE CASCADE de la BD) solo lo corrige una
+    resincronización completa (/replica/snapshot, `flask replica resync`).
+    """
+
+    @staticmethod
+    def estado():
+        """Primera y última secuencia conservadas (None si no hay cambios)"""
+        minima, ultima = db.session.query(
+            db.func.min(CambioReplica.seq), db.func.max(CambioReplica.seq)
+        ).one()
+        return {'minima': minima, 'ultima': ultima or 0}
+
+    @staticmethod
+    def cambios(desde, limite=1000, releer=0):
+        """
+        Entidades que cambiaron con seq > desde, con su estado actual
+
+        Args:
+            desde: último seq que el cliente ya aplicó
+            limite: máximo de filas de cambios_replica por respuesta
+            releer: seqs anteriores a `desde` que se vuelven a incluir (en
+                MySQL un seq menor puede confirmarse después de uno mayor)
+
+        Returns:
+            dict: {'desde', 'hasta', 'ultima', 'hay_mas', 'cambios': {entidad:
+            {'upsert': [fila, ...], 'eliminados': [id, ...]}}}
+
+        Raises:
+            ReplicaSecuenciaVencida: `desde` es anterior al cambio más viejo
+                conservado (ya purgado) o posterior al último
+        """
+        estado = ReplicaService.estado()
+        if desde > estado['ultima'] or (
+            estado['minima'] is not None and desde < estado['minima'] - 1
+        ):
+            raise ReplicaSecuenciaVencida(
+                f"Secuencia {desde} fuera del rango conservado "
+                f"({estado['minima']}..{estado['ultima']})"
+            )
+
+        inicio = max(desde - releer, (estado['minima'] or 1) - 1, 0)
+        filas = db.session.query(
+            CambioReplica.seq, CambioReplica.entidad, CambioReplica.id_entidad
+        ).filter(CambioReplica.seq > inicio).order_by(CambioReplica.seq).limit(limite).all()
+
+        ids = {}
+        for fila in filas:
+            ids.setdefault(fila.entidad, set()).add(fila.id_entidad)
+
+        entidades = _entidades()
+        resultado = {}
+        for entidad, ids_entidad in ids.items():
+            if entidad not in entidades:
+                continue
+            actuales = ReplicaService._filas(entidad, ids=ids_entidad)
+            pk = entidades[entidad][1]
+            existentes = {fila[pk] for fila in actuales}
+            resultado[entidad] = {
+                'upsert': actuales,
+                'eliminados': sorted(ids_entidad - existentes)
+            }
+
+        return {
+            'desde': desde,
+            'hasta': max([desde] + [fila.seq for fila in filas]),
+            'ultima': estado['ultima'],
+            'hay_mas': len(filas) == limite,
+            'cambios': resultado
+        }
+
+    @staticmethod
+    def snapshot(entidad, despues_de=0, limite=1000):
+        """
+        Una página de la tabla completa, ordenada por clave primaria
+
+        Returns:
+            dict: {'entidad', 'filas', 'siguiente'}; siguiente es el
+            despues_de de la próxima página (None si no hay más)
+        """
+        filas = ReplicaService._filas(entidad, despues_de=despues_de, limite=limite)
+        pk = _entidades()[entidad][1]
+        return {
+            'entidad': entidad,
+            'filas': filas,
+            'siguiente': filas[-1][pk] if len(filas) == limite else None
+        }
+
+    @staticmethod
+    def purgar(retencion_dias=None):
+        """
+        Borra los cambios más viejos que la retención; siempre conserva el
+        último para que el rango de seqs válidos siga siendo conocido.
+        No hace commit.
+        """
+        if retencion_dias is None:
+            retencion_dias = current_app.config.get('REPLICA_CAMBIOS_RETENCION_DIAS', 7)
+        ultima = ReplicaService.estado()['ultima']
+        limite = datetime.utcnow() - timedelta(days=retencion_dias)
+        return db.session.execute(
+            db.delete(CambioReplica).where(
+                CambioReplica.seq < ultima,
+                CambioReplica.created_at < limite
+            )
+        ).rowcount
+
+    @staticmethod
+    def registrar(entidad, ids):
+        """
+        Anota cambios hechos sin pasar por el ORM (p. ej. un INSERT de Core,
+        que register_cambios no ve). Va en la transacción del que llama; no
+        hace commit. Registrar de más no afecta: el feed devuelve el estado
+        actual de cada fila.
+        """
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return 0
+        ahora = datetime.utcnow()
+        db.session.execute(db.insert(CambioReplica), [
+            {'entidad': entidad, 'id_entidad': id_entidad, 'created_at': ahora}
+            for id_entidad in ids
+        ])
+        return len(ids)
+
+    @staticmethod
+    def entidades():
+        return list(_entidades())
+
+    @staticmethod
+    def _filas(entidad, ids=None, despues_de=None, limite=None):
+        modelo, pk, columnas = _entidades()[entidad]
+        columna_pk = getattr(modelo, pk)
+        consulta = db.session.query(*[getattr(modelo, c) for c in columnas]).order_by(columna_pk)
+        if ids is not None:
+            consulta = consulta.filter(columna_pk.in_(ids))
+        if despues_de is not None:
+            consulta = consulta.filter(columna_pk > despues_de)
+        if limite is not None:
+            consulta = consulta.limit(limite)
+
+        filas = []
+        for fila in consulta:
+            datos = dict(zip(columnas, fila))
+            for columna, valor in datos.items():
+                if isinstance(valor, datetime):
+                    datos[columna] = valor.isoformat()
+            filas.append(datos)
+        return filas
+
+
+def register_cambios(session):
+    """
+    Agrega a cambios_replica las entidades replicadas que se crean, borran
+    o cambian (solo si cambió una columna replicada) en cada flush
+
+    Va en after_flush: los ids nuevos ya están asignados y el INSERT queda
+    en la misma transacción, así un rollback también descarta el cambio.
+    """
+    global _listener_registrado
+    if _listener_registrado:
+        return
+    _listener_registrado = True
+
+    @event.listens_for(session, 'after_flush')
+    def _registrar(sess, flush_context):
+        entidades = _entidades()
+        tocados = set()
+
+        def revisar(obj, solo_si_cambio):
+            for entidad, (modelo, pk, columnas) in entidades.items():
+                if not isinstance(obj, modelo):
+                    continue
+                estado = inspect(obj)
+                if solo_si_cambio and not any(estado.attrs[c].history.has_changes() for c in columnas):
+                    return
+                id_entidad = estado.dict.get(pk)
+                if id_entidad is not None:
+                    tocados.add((entidad, id_entidad))
+                return
+
+        for obj in sess.new:
+            revisar(obj, False)
+        for obj in sess.deleted:
+            revisar(obj, False)
+        for obj in sess.dirty:
+            revisar(obj, True)
+
+        if tocados:
+            ahora = datetime.utcnow()
+            sess.connection().execute(
+                db.insert(CambioReplica),
+                [
+                    {'entidad': entidad, 'id_entidad': id_entidad, 'created_at': ahora}
+                    for entidad, id_entidad in sorted(tocados)
+                ]
+            )
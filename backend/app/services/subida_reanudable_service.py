@@ -0,0 +1,290 @@
+import os
+import re
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import case
+
+from app.extensions import db
+from app.models.subida_reanudable import SubidaReanudable
+from app.services.almacen_service import AlmacenService
+
+
+_CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class OffsetInvalido(ValueError):
+    """La parte no empieza donde termina lo ya recibido (el cliente debe consultar el progreso)"""
+
+    def __init__(self, mensaje, recibido):
+        super().__init__(mensaje)
+        self.recibido = recibido
+
+
+class SubidaNoDisponible(Exception):
+    """La sesión ya se completó, se canceló o expiró"""
+
+
+class SubidaReanudableService:
+    """
+    Protocolo de subida en partes del documento PDF de un jugador
+
+    1. crear: el cliente declara el tamaño total (y opcionalmente el SHA-256)
+    2. escribir: PUT de cada parte con Content-Range: bytes <inicio>-<fin>/<total>.
+       La parte se escribe por bloques en su posición del archivo .part, sin
+       cargarla entera en memoria. Si la conexión se corta a mitad de una
+       parte, lo que llegó igual cuenta
+    3. progreso: cuántos bytes hay confirmados (para reanudar desde ahí)
+    4. finalizar: el archivo completo pasa al almacén por contenido y queda
+       como documento_pdf del jugador
+
+    Reenviar una parte ya recibida no es error (el cliente pudo perder la
+    respuesta); empezar más allá de lo recibido sí (409 con el offset correcto).
+    Como los servicios del resto de la app, no hace commit.
+    """
+
+    # ============================================
+    # SESIONES
+    # ============================================
+
+    @staticmethod
+    def crear(id_jugador, id_usuario, tamanio_total, nombre_archivo=None, sha256=None):
+        config = current_app.config
+        maximo = config.get('SUBIDAS_REANUDABLES_MAX_BYTES', 25 * 1024 * 1024)
+        if not isinstance(tamanio_total, int) or tamanio_total <= 0:
+            raise ValueError('tamanio debe ser un entero positivo')
+        if tamanio_total > maximo:
+            raise ValueError(f'El archivo no debe superar {maximo // (1024 * 1024)}MB')
+        if sha256 and not re.fullmatch(r'[0-9a-fA-F]{64}', sha256):
+            raise ValueError('sha256 debe tener 64 caracteres hexadecimales')
+
+        subida = SubidaReanudable(
+            id=uuid.uuid4().hex,
+            id_jugador=id_jugador,
+            id_usuario=id_usuario,
+            nombre_archivo=(nombre_archivo or '')[:255] or None,
+            tamanio_total=tamanio_total,
+            recibido=0,
+            sha256_esperado=sha256.lower() if sha256 else None,
+            expira_en=SubidaReanudableService._nueva_expiracion()
+        )
+        os.makedirs(SubidaReanudableService.directorio(), exist_ok=True)
+        open(SubidaReanudableService.path(subida.id), 'wb').close()
+        db.session.add(subida)
+        return subida
+
+    @staticmethod
+    def obtener_activa(id_subida, id_jugador):
+        """
+        Raises:
+            LookupError: si no existe para ese jugador
+            SubidaNoDisponible: si ya no admite partes
+        """
+        subida = db.session.get(SubidaReanudable, id_subida)
+        if not subida or subida.id_jugador != id_jugador:
+            raise LookupError('Subida no encontrada')
+        if subida.estado == 'activa' and subida.expira_en < datetime.utcnow():
+            raise SubidaNoDisponible('La subida expiró; crea una nueva')
+        if subida.estado != 'activa':
+            raise SubidaNoDisponible(f'La subida está {subida.estado}')
+        return subida
+
+    # ============================================
+    # PARTES
+    # ============================================
+
+    @staticmethod
+    def parsear_content_range(valor):
+        """'bytes 0-1048575/5242880' → (0, 1048575, 5242880)"""
+        m = _CONTENT_RANGE.match((valor or '').strip())
+        if not m:
+            raise ValueError('Content-Range debe tener la forma "bytes <inicio>-<fin>/<total>"')
+        inicio, fin, total = (int(x) for x in m.groups())
+        if fin < inicio:
+            raise ValueError('Content-Range inválido')
+        return inicio, fin, total
+
+    @staticmethod
+    def escribir(subida, inicio, fin, total, stream):
+        """
+        Escribe la parte [inicio, fin] leyendo `stream` por bloques
+
+        Returns:
+            int: bytes confirmados después de escribir
+        """
+        config = current_app.config
+        largo = fin - inicio + 1
+        if total != subida.tamanio_total:
+            raise ValueError(f'El total declarado ({total}) no coincide con el de la sesión ({subida.tamanio_total})')
+        if fin >= subida.tamanio_total:
+            raise ValueError('La parte excede el tamaño total')
+        if largo > config.get('SUBIDAS_REANUDABLES_CHUNK_MAX', 8 * 1024 * 1024):
+            raise ValueError('La parte es demasiado grande')
+        if inicio > subida.recibido:
+            raise OffsetInvalido(f'Se esperaba el offset {subida.recibido}', subida.recibido)
+
+        escritos = 0
+        with open(SubidaReanudableService.path(subida.id), 'r+b') as f:
+            f.seek(inicio)
+            try:
+                while escritos < largo:
+                    bloque = stream.read(min(256 * 1024, largo - escritos))
+                    if not bloque:
+                        break
+                    f.write(bloque)
+                    escritos += len(bloque)
+            finally:
+                # Lo que llegó queda en disco antes de confirmarlo
+                f.flush()
+                os.fsync(f.fileno())
+                SubidaReanudableService._confirmar(subida, inicio + escritos)
+
+        if escritos < largo:
+            raise ValueError(f'La parte llegó incompleta ({escritos} de {largo} bytes)')
+        if stream.read(1):
+            raise ValueError('El cuerpo es más largo que el rango declarado')
+        return subida.recibido
+
+    @staticmethod
+    def _confirmar(subida, nuevo):
+        # Condicional: dos PUT concurrentes nunca hacen retroceder el progreso
+        db.session.execute(
+            db.update(SubidaReanudable)
+            .where(SubidaReanudable.id == subida.id)
+            .values(
+                recibido=case((SubidaReanudable.recibido < nuevo, nuevo), else_=SubidaReanudable.recibido),
+                expira_en=SubidaReanudableService._nueva_expiracion(),
+                actualizado_at=datetime.utcnow()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.session.refresh(subida)
+
+    # ============================================
+    # FINALIZAR / CANCELAR
+    # ============================================
+
+    @staticmethod
+    def finalizar(subida, jugador):
+        """
+        Pasa el archivo al almacén y lo asigna como documento_pdf del jugador
+
+        Si el contenido no es un PDF o no coincide con el SHA-256 declarado,
+        la sesión vuelve a 0 para reenviar.
+
+        Returns:
+            str: ruta del blob
+        """
+        if subida.recibido < subida.tamanio_total:
+            raise OffsetInvalido(
+                f'Faltan {subida.tamanio_total - subida.recibido} bytes', subida.recibido
+            )
+
+        path = SubidaReanudableService.path(subida.id)
+        try:
+            ruta = AlmacenService.adoptar(
+                path, 'pdf',
+                validar=AlmacenService.validar_pdf,
+                sha256_esperado=subida.sha256_esperado
+            )
+        except ValueError:
+            # adoptar ya borró el archivo: se reinicia la sesión
+            open(path, 'wb').close()
+            subida.recibido = 0
+            raise
+
+        subida.estado = 'completada'
+        subida.ruta = ruta
+        jugador.documento_pdf = f'http://localhost:5000/uploads/{ruta}'
+        return ruta
+
+    @staticmethod
+    def cancelar(subida):
+        subida.estado = 'cancelada'
+        SubidaReanudableService._borrar_parte(subida.id)
+
+    # ============================================
+    # LIMPIEZA
+    # ============================================
+
+    @staticmethod
+    def limpiar_expiradas(retencion_dias=7):
+        """
+        Marca como expiradas las sesiones sin actividad, borra sus partes y
+        elimina las filas terminadas hace más de `retencion_dias`
+
+        Returns:
+            dict: {'expiradas', 'eliminadas', 'huerfanos'}
+        """
+        ahora = datetime.utcnow()
+        vencidas = [
+            s for (s,) in db.session.execute(
+                db.select(SubidaReanudable.id).where(
+                    SubidaReanudable.estado == 'activa',
+                    SubidaReanudable.expira_en < ahora
+                )
+            )
+        ]
+        if vencidas:
+            db.session.execute(
+                db.update(SubidaReanudable)
+                .where(SubidaReanudable.id.in_(vencidas), SubidaReanudable.estado == 'activa')
+                .values(estado='expirada')
+                .execution_options(synchronize_session=False)
+            )
+        for id_subida in vencidas:
+            SubidaReanudableService._borrar_parte(id_subida)
+
+        eliminadas = db.session.execute(
+            db.delete(SubidaReanudable)
+            .where(
+                SubidaReanudable.estado != 'activa',
+                SubidaReanudable.actualizado_at < ahora - timedelta(days=retencion_dias)
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        # Partes sin sesión activa (p. ej. el jugador se eliminó y la fila cayó en cascada).
+        # Solo las de más de una hora: una sesión recién creada puede no estar confirmada aún
+        activas = {s for (s,) in db.session.execute(
+            db.select(SubidaReanudable.id).where(SubidaReanudable.estado == 'activa')
+        )}
+        huerfanos = 0
+        directorio = SubidaReanudableService.directorio()
+        limite = time.time() - 3600
+        if os.path.isdir(directorio):
+            for nombre in os.listdir(directorio):
+                path = os.path.join(directorio, nombre)
+                if (nombre.endswith('.part') and nombre[:-5] not in activas
+                        and os.path.getmtime(path) < limite):
+                    SubidaReanudableService._borrar_parte(nombre[:-5])
+                    huerfanos += 1
+
+        return {'expiradas': len(vencidas), 'eliminadas': eliminadas, 'huerfanos': huerfanos}
+
+    # ============================================
+    # AUXILIARES
+    # ============================================
+
+    @staticmethod
+    def directorio():
+        # Mismo disco que el almacén: finalizar mueve el archivo sin copiarlo
+        return os.path.join(AlmacenService.base(), 'blobs', '.reanudables')
+
+    @staticmethod
+    def path(id_subida):
+        return os.path.join(SubidaReanudableService.directorio(), f'{id_subida}.part')
+
+    @staticmethod
+    def _borrar_parte(id_subida):
+        try:
+            os.remove(SubidaReanudableService.path(id_subida))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _nueva_expiracion():
+        horas = current_app.config.get('SUBIDAS_REANUDABLES_TTL_HORAS', 24)
+        return datetime.utcnow() + timedelta(hours=horas)
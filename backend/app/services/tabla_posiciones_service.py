@@ -0,0 +1,434 @@
+from app.extensions import db
+from app.models.llave import Llave
+from app.models.partido import Partido
+from app.models.tabla_posicion import TablaPosicion
+from app.models.tabla_posicion_jornada import TablaPosicionJornada
+
+
+def _es_de_liga():
+    """Criterio SQL: el partido no es el de un cruce eliminatorio (llaves)"""
+    return ~db.session.query(Llave.id_llave).filter(Llave.id_partido == Partido.id_partido).exists()
+
+
+class TablaPosicionesService:
+    """
+    Mantiene la tabla de posiciones persistida (tabla_posiciones)
+
+    ¿Cómo funciona?
+    - Cada partido finalizado aporta un "delta" a dos filas (local y visitante)
+    - Al finalizar un partido se SUMA su delta
+    - Al corregir un resultado se RESTA el delta viejo y se SUMA el nuevo
+    - Al eliminar (o sacar de 'finalizado') un partido se RESTA su delta
+    - Los partidos de la fase eliminatoria (los que tienen una llave) no
+      cuentan para la tabla ni para las fotos por jornada
+
+    Las actualizaciones usan UPDATE columna = columna + delta, así dos
+    resultados que se registran a la vez no se pisan entre sí.
+
+    IMPORTANTE: ninguno de estos métodos hace commit. Se llaman dentro de la
+    misma transacción que modifica el partido, para que ambos cambios se
+    guarden (o se descarten) juntos.
+    """
+
+    @staticmethod
+    def calcular_delta(goles_propios, goles_rival, signo=1):
+        """
+        Calcula el aporte de un partido a la fila de UN equipo
+
+        Args:
+            goles_propios: Goles que marcó el equipo
+            goles_rival: Goles que recibió
+            signo: 1 para sumar, -1 para restar
+
+        Returns:
+            dict: columnas → incremento
+        """
+        goles_propios = goles_propios or 0
+        goles_rival = goles_rival or 0
+
+        ganado = 1 if goles_propios > goles_rival else 0
+        empatado = 1 if goles_propios == goles_rival else 0
+        perdido = 1 if goles_propios < goles_rival else 0
+
+        return {
+            'partidos_jugados': signo,
+            'ganados': signo * ganado,
+            'empatados': signo * empatado,
+            'perdidos': signo * perdido,
+            'goles_favor': signo * goles_propios,
+            'goles_contra': signo * goles_rival,
+            'diferencia_goles': signo * (goles_propios - goles_rival),
+            'puntos': signo * (3 * ganado + empatado)
+        }
+
+    @staticmethod
+    def _aplicar_delta_equipo(id_campeonato, id_equipo, delta):
+        """Aplica un delta a la fila (campeonato, equipo), creándola si no existe"""
+        actualizadas = TablaPosicion.query.filter_by(
+            id_campeonato=id_campeonato,
+            id_equipo=id_equipo
+        ).update(
+            {getattr(TablaPosicion, col): getattr(TablaPosicion, col) + valor for col, valor in delta.items()},
+            synchronize_session=False
+        )
+
+        if actualizadas == 0:
+            db.session.add(TablaPosicion(
+                id_campeonato=id_campeonato,
+                id_equipo=id_equipo,
+                **delta
+            ))
+            db.session.flush()
+
+    @staticmethod
+    def aplicar_partido(partido, signo=1, goles_local=None, goles_visitante=None):
+        """
+        Suma (signo=1) o resta (signo=-1) el aporte de un partido a la tabla
+
+        Args:
+            partido: Partido afectado
+            signo: 1 al finalizar, -1 al revertir
+            goles_local / goles_visitante: marcador a usar (por defecto el actual
+                del partido; para revertir una corrección se pasa el marcador viejo)
+        """
+        if goles_local is None:
+            goles_local = partido.goles_local
+        if goles_visitante is None:
+            goles_visitante = partido.goles_visitante
+
+        TablaPosicionesService._aplicar_delta_equipo(
+            partido.id_campeonato,
+            partido.id_equipo_local,
+            TablaPosicionesService.calcular_delta(goles_local, goles_visitante, signo)
+        )
+        TablaPosicionesService._aplicar_delta_equipo(
+            partido.id_campeonato,
+            partido.id_equipo_visitante,
+            TablaPosicionesService.calcular_delta(goles_visitante, goles_local, signo)
+        )
+
+    @staticmethod
+    def registrar_finalizacion(partido, estado_anterior, goles_local_anterior=0, goles_visitante_anterior=0):
+        """
+        Punto de entrada para los endpoints que cambian estado o marcador
+
+        Cubre los tres casos:
+        - No estaba finalizado y ahora sí → suma el nuevo resultado
+        - Estaba finalizado y ya no → resta el resultado anterior
+        - Sigue finalizado pero cambió el marcador → resta el viejo, suma el nuevo
+        """
+        if TablaPosicionesService.es_eliminatoria(partido):
+            return
+
+        estaba_finalizado = estado_anterior == 'finalizado'
+        esta_finalizado = partido.estado == 'finalizado'
+
+        if (estaba_finalizado or esta_finalizado) and not TablaPosicionesService._tiene_filas(partido.id_campeonato):
+            # Tabla nunca construida (partidos de antes de persistirla): sumar o
+            # restar un delta sobre nada la dejaría incompleta. Se arma entera
+            # con el estado actual, que ya incluye este partido
+            TablaPosicionesService.reconstruir(partido.id_campeonato)
+            return
+
+        if estaba_finalizado:
+            if esta_finalizado and (goles_local_anterior, goles_visitante_anterior) == (partido.goles_local, partido.goles_visitante):
+                return
+            TablaPosicionesService.aplicar_partido(
+                partido, -1,
+                goles_local=goles_local_anterior,
+                goles_visitante=goles_visitante_anterior
+            )
+
+        if esta_finalizado:
+            TablaPosicionesService.aplicar_partido(partido, 1)
+
+        # Las fotos desde esta jornada pueden haber quedado obsoletas y
+        # puede que la jornada (o una posterior) se haya completado
+        if estaba_finalizado or esta_finalizado or partido.estado == 'cancelado':
+            TablaPosicionesService.invalidar_snapshots(partido.id_campeonato, partido.jornada)
+            TablaPosicionesService.generar_snapshots(partido.id_campeonato)
+
+    @staticmethod
+    def filtro_liga():
+        """Criterio para Partido.query.filter(): excluye los partidos de la fase eliminatoria"""
+        return _es_de_liga()
+
+    @staticmethod
+    def es_eliminatoria(partido):
+        """True si el partido es el de un cruce de la fase eliminatoria"""
+        return db.session.query(Llave.id_llave).filter(
+            Llave.id_partido == partido.id_partido
+        ).first() is not None
+
+    @staticmethod
+    def inicializar_si_falta(id_campeonato):
+        """
+        Reconstruye la tabla (y sus fotos) de un campeonato con partidos
+        finalizados pero sin filas en tabla_posiciones: los que ya existían
+        antes de persistir la tabla no esperan a `flask tabla-posiciones
+        reconstruir`. Llamar antes de leer; si devuelve True, quien llama
+        hace commit.
+        """
+        if TablaPosicionesService._tiene_filas(id_campeonato):
+            return False
+        finalizado = db.session.query(Partido.id_partido).filter(
+            Partido.id_campeonato == id_campeonato,
+            Partido.estado == 'finalizado',
+            _es_de_liga()
+        ).first()
+        if finalizado is None:
+            return False
+        TablaPosicionesService.reconstruir(id_campeonato)
+        return True
+
+    @staticmethod
+    def _tiene_filas(id_campeonato):
+        return db.session.query(TablaPosicion.id_campeonato).filter(
+            TablaPosicion.id_campeonato == id_campeonato
+        ).first() is not None
+
+    @staticmethod
+    def obtener_tabla(id_campeonato):
+        """
+        Lee la tabla ya ordenada (puntos, diferencia, goles a favor)
+
+        Returns:
+            list[TablaPosicion]: solo equipos con al menos un partido jugado
+        """
+        return TablaPosicion.query.filter(
+            TablaPosicion.id_campeonato == id_campeonato,
+            TablaPosicion.partidos_jugados > 0
+        ).order_by(
+            TablaPosicion.puntos.desc(),
+            TablaPosicion.diferencia_goles.desc(),
+            TablaPosicion.goles_favor.desc(),
+            TablaPosicion.id_equipo.asc()
+        ).all()
+
+    @staticmethod
+    def _agregar_resultados(id_campeonato, desde_jornada=None):
+        """
+        Totales de partidos de liga finalizados agrupados por (jornada, equipo)
+
+        Son dos consultas agrupadas (como local y como visitante); nunca se
+        recorren los partidos uno por uno.
+
+        Returns:
+            dict: {(jornada, id_equipo): {partidos_jugados, ganados, ...}}
+        """
+        totales = {}
+
+        for propios, rival, equipo in (
+            (Partido.goles_local, Partido.goles_visitante, Partido.id_equipo_local),
+            (Partido.goles_visitante, Partido.goles_local, Partido.id_equipo_visitante),
+        ):
+            query = db.session.query(
+                Partido.jornada,
+                equipo,
+                db.func.count(Partido.id_partido),
+                db.func.sum(db.case((propios > rival, 1), else_=0)),
+                db.func.sum(db.case((propios == rival, 1), else_=0)),
+                db.func.sum(db.case((propios < rival, 1), else_=0)),
+                db.func.sum(propios),
+                db.func.sum(rival)
+            ).filter(
+                Partido.id_campeonato == id_campeonato,
+                Partido.estado == 'finalizado',
+                _es_de_liga()
+            )
+
+            if desde_jornada is not None:
+                query = query.filter(Partido.jornada >= desde_jornada)
+
+            for jornada, id_equipo, jugados, ganados, empatados, perdidos, favor, contra in query.group_by(Partido.jornada, equipo).all():
+                fila = totales.setdefault((jornada, id_equipo), {
+                    'partidos_jugados': 0, 'ganados': 0, 'empatados': 0, 'perdidos': 0,
+                    'goles_favor': 0, 'goles_contra': 0
+                })
+                fila['partidos_jugados'] += int(jugados or 0)
+                fila['ganados'] += int(ganados or 0)
+                fila['empatados'] += int(empatados or 0)
+                fila['perdidos'] += int(perdidos or 0)
+                fila['goles_favor'] += int(favor or 0)
+                fila['goles_contra'] += int(contra or 0)
+
+        return totales
+
+    @staticmethod
+    def _sumar_fila(destino, origen):
+        """Suma una fila de totales sobre otra y recalcula diferencia y puntos"""
+        for col in ('partidos_jugados', 'ganados', 'empatados', 'perdidos', 'goles_favor', 'goles_contra'):
+            destino[col] = destino.get(col, 0) + origen.get(col, 0)
+        destino['diferencia_goles'] = destino['goles_favor'] - destino['goles_contra']
+        destino['puntos'] = 3 * destino['ganados'] + destino['empatados']
+        return destino
+
+    @staticmethod
+    def reconstruir(id_campeonato):
+        """
+        Recalcula desde cero la tabla de un campeonato (reparar desincronización)
+
+        También regenera las fotos por jornada, que dependen de los mismos datos.
+
+        Returns:
+            int: Cantidad de filas generadas
+        """
+        totales = {}
+        for (_, id_equipo), fila in TablaPosicionesService._agregar_resultados(id_campeonato).items():
+            TablaPosicionesService._sumar_fila(totales.setdefault(id_equipo, {}), fila)
+
+        TablaPosicion.query.filter_by(id_campeonato=id_campeonato).delete(synchronize_session=False)
+
+        filas = [
+            {'id_campeonato': id_campeonato, 'id_equipo': id_equipo, **fila}
+            for id_equipo, fila in totales.items()
+        ]
+
+        if filas:
+            db.session.execute(db.insert(TablaPosicion), filas)
+
+        TablaPosicionJornada.query.filter_by(id_campeonato=id_campeonato).delete(synchronize_session=False)
+        TablaPosicionesService.generar_snapshots(id_campeonato)
+
+        return len(filas)
+
+    # ============================================
+    # FOTOS (SNAPSHOTS) POR JORNADA
+    # ============================================
+
+    @staticmethod
+    def jornadas_completas(id_campeonato):
+        """
+        Jornadas en las que todos los partidos de liga (salvo cancelados) están finalizados
+
+        Returns:
+            list[int]: Números de jornada, ordenados
+        """
+        filas = db.session.query(
+            Partido.jornada,
+            db.func.sum(db.case((Partido.estado == 'finalizado', 1), else_=0)),
+            db.func.sum(db.case((Partido.estado.notin_(['finalizado', 'cancelado']), 1), else_=0))
+        ).filter(
+            Partido.id_campeonato == id_campeonato,
+            _es_de_liga()
+        ).group_by(Partido.jornada).order_by(Partido.jornada).all()
+
+        return [
+            jornada for jornada, finalizados, pendientes in filas
+            if jornada is not None and finalizados and not pendientes
+        ]
+
+    @staticmethod
+    def generar_snapshots(id_campeonato):
+        """
+        Crea las fotos de las jornadas completas que todavía no tienen una
+
+        Cada foto es acumulada (incluye todo lo jugado hasta esa jornada) y
+        guarda la posición de cada equipo. Se parte de la última foto anterior
+        y se suman los resultados agrupados por jornada, así que el costo no
+        depende de cuántas jornadas ya estaban guardadas.
+
+        Returns:
+            int: Cantidad de jornadas generadas
+        """
+        existentes = {
+            j for (j,) in db.session.query(TablaPosicionJornada.jornada).filter_by(
+                id_campeonato=id_campeonato
+            ).distinct().all()
+        }
+        faltantes = [j for j in TablaPosicionesService.jornadas_completas(id_campeonato) if j not in existentes]
+        if not faltantes:
+            return 0
+
+        # Punto de partida: la última foto anterior a la primera jornada faltante
+        base_jornada = max([j for j in existentes if j < faltantes[0]], default=None)
+        acumulado = {}
+        if base_jornada is not None:
+            for fila in TablaPosicionJornada.query.filter_by(id_campeonato=id_campeonato, jornada=base_jornada).all():
+                acumulado[fila.id_equipo] = fila.totales()
+
+        por_jornada = {}
+        for (jornada, id_equipo), fila in TablaPosicionesService._agregar_resultados(
+            id_campeonato,
+            desde_jornada=base_jornada + 1 if base_jornada is not None else None
+        ).items():
+            if jornada is not None:
+                por_jornada.setdefault(jornada, []).append((id_equipo, fila))
+
+        nuevas = []
+        pendientes = set(faltantes)
+        for jornada in sorted(set(por_jornada) | pendientes):
+            if jornada > faltantes[-1]:
+                break
+            for id_equipo, fila in por_jornada.get(jornada, []):
+                TablaPosicionesService._sumar_fila(acumulado.setdefault(id_equipo, {}), fila)
+
+            if jornada in pendientes:
+                ordenados = sorted(
+                    acumulado.items(),
+                    key=lambda item: (-item[1]['puntos'], -item[1]['diferencia_goles'], -item[1]['goles_favor'], item[0])
+                )
+                for posicion, (id_equipo, fila) in enumerate(ordenados, start=1):
+                    nuevas.append({
+                        'id_campeonato': id_campeonato,
+                        'jornada': jornada,
+                        'id_equipo': id_equipo,
+                        'posicion': posicion,
+                        **fila
+                    })
+
+        if nuevas:
+            db.session.execute(db.insert(TablaPosicionJornada), nuevas)
+
+        return len(faltantes)
+
+    @staticmethod
+    def invalidar_snapshots(id_campeonato, desde_jornada):
+        """
+        Descarta las fotos desde una jornada (un resultado ya contado cambió)
+
+        Las fotos nunca se editan: si quedan obsoletas se borran y se vuelven
+        a generar con generar_snapshots().
+        """
+        return TablaPosicionJornada.query.filter(
+            TablaPosicionJornada.id_campeonato == id_campeonato,
+            TablaPosicionJornada.jornada >= desde_jornada
+        ).delete(synchronize_session=False)
+
+    @staticmethod
+    def obtener_snapshot(id_campeonato, jornada):
+        """Lee la foto de una jornada, ordenada por posición (lista vacía si no existe)"""
+        return TablaPosicionJornada.query.filter_by(
+            id_campeonato=id_campeonato,
+            jornada=jornada
+        ).order_by(TablaPosicionJornada.posicion).all()
+
+    @staticmethod
+    def obtener_evolucion(id_campeonato):
+        """
+        Posición de cada equipo en todas las jornadas con foto (una sola consulta)
+
+        Returns:
+            tuple: (lista de jornadas, lista de equipos con su serie de posiciones)
+        """
+        filas = TablaPosicionJornada.query.filter_by(
+            id_campeonato=id_campeonato
+        ).order_by(TablaPosicionJornada.jornada, TablaPosicionJornada.posicion).all()
+
+        jornadas = []
+        equipos = {}
+        for fila in filas:
+            if not jornadas or jornadas[-1] != fila.jornada:
+                jornadas.append(fila.jornada)
+            equipo = equipos.setdefault(fila.id_equipo, {
+                'id_equipo': fila.id_equipo,
+                'nombre': fila.equipo.nombre if fila.equipo else None,
+                'posiciones': []
+            })
+            equipo['posiciones'].append({
+                'jornada': fila.jornada,
+                'posicion': fila.posicion,
+                'puntos': fila.puntos
+            })
+
+        return jornadas, list(equipos.values())
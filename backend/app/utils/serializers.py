@@ -0,0 +1,106 @@
+"""
+Serialización en lote para listados
+
+¿Por qué existe?
+- Campeonato.to_dict() hace 3 COUNT, Partido.to_dict() 2 y Equipo.to_dict() 1
+- En un listado eso se repite por cada fila (problema N+1)
+
+Estas funciones calculan los mismos conteos para TODA la lista con una
+consulta agrupada por relación (GROUP BY ... WHERE id IN (...)) y se los
+pasan a to_dict(), que devuelve exactamente el mismo diccionario.
+La cantidad de consultas por petición queda constante, sin importar
+cuántas filas tenga la página.
+"""
+from app.extensions import db
+from app.models.campeonato import Campeonato
+from app.models.campeonato_equipo import CampeonatoEquipo
+from app.models.equipo import Equipo
+from app.models.gol import Gol
+from app.models.jugador import Jugador
+from app.models.partido import Partido
+from app.models.tarjeta import Tarjeta
+
+
+def _contar_por(columna_grupo, ids, *filtros):
+    """Ejecuta un COUNT agrupado y devuelve {id: total}"""
+    if not ids:
+        return {}
+    filas = db.session.query(columna_grupo, db.func.count()).filter(
+        columna_grupo.in_(ids), *filtros
+    ).group_by(columna_grupo).all()
+    return {id_: total for id_, total in filas}
+
+
+def contar_jugadores_activos(ids_equipos):
+    """Jugadores activos por equipo: {id_equipo: total}"""
+    return _contar_por(Jugador.id_equipo, ids_equipos, Jugador.activo == True)
+
+
+def serializar_campeonatos(campeonatos, **kwargs):
+    """Equivale a [c.to_dict(**kwargs) for c in campeonatos] con 2 consultas en total"""
+    ids = list({c.id_campeonato for c in campeonatos})
+    partidos = _contar_por(Partido.id_campeonato, ids)
+
+    inscripciones = {}
+    if ids:
+        filas = db.session.query(
+            CampeonatoEquipo.id_campeonato,
+            CampeonatoEquipo.estado_inscripcion,
+            db.func.count()
+        ).filter(
+            CampeonatoEquipo.id_campeonato.in_(ids)
+        ).group_by(CampeonatoEquipo.id_campeonato, CampeonatoEquipo.estado_inscripcion).all()
+        for id_campeonato, estado, total in filas:
+            inscripciones[(id_campeonato, estado)] = total
+
+    return [
+        c.to_dict(conteos={
+            'total_partidos': partidos.get(c.id_campeonato, 0),
+            'total_equipos_inscritos': inscripciones.get((c.id_campeonato, 'aprobado'), 0),
+            'total_equipos_pendientes': inscripciones.get((c.id_campeonato, 'pendiente'), 0)
+        }, **kwargs)
+        for c in campeonatos
+    ]
+
+
+def serializar_partidos(partidos):
+    """Equivale a [p.to_dict() for p in partidos] con un número fijo de consultas"""
+    ids = list({p.id_partido for p in partidos})
+    goles = _contar_por(Gol.id_partido, ids)
+    tarjetas = _contar_por(Tarjeta.id_partido, ids)
+
+    # Cargar equipos y campeonatos de una vez: las relaciones many-to-one de
+    # cada partido se resuelven luego desde el identity map, sin ir a la BD.
+    # Las listas se mantienen referenciadas mientras se serializa.
+    ids_equipos = {p.id_equipo_local for p in partidos} | {p.id_equipo_visitante for p in partidos}
+    ids_campeonatos = {p.id_campeonato for p in partidos}
+    equipos = Equipo.query.filter(Equipo.id_equipo.in_(ids_equipos)).all() if ids_equipos else []
+    campeonatos = Campeonato.query.filter(Campeonato.id_campeonato.in_(ids_campeonatos)).all() if ids_campeonatos else []
+
+    resultado = [
+        p.to_dict(conteos={
+            'total_goles': goles.get(p.id_partido, 0),
+            'total_tarjetas': tarjetas.get(p.id_partido, 0)
+        })
+        for p in partidos
+    ]
+    del equipos, campeonatos
+    return resultado
+
+
+def serializar_equipos(equipos, **kwargs):
+    """Equivale a [e.to_dict(**kwargs) for e in equipos] con 1 consulta de conteo"""
+    activos = contar_jugadores_activos(list({e.id_equipo for e in equipos}))
+    return [
+        e.to_dict(total_jugadores=activos.get(e.id_equipo, 0), **kwargs)
+        for e in equipos
+    ]
+
+
+def serializar_inscripciones(inscripciones, **kwargs):
+    """Equivale a [i.to_dict(**kwargs) for i in inscripciones] con 1 consulta de conteo"""
+    activos = contar_jugadores_activos(list({i.id_equipo for i in inscripciones}))
+    return [
+        i.to_dict(total_jugadores=activos.get(i.id_equipo, 0), **kwargs)
+        for i in inscripciones
+    ]
@@ -0,0 +1,169 @@
+import hashlib
+import mimetypes
+import os
+import re
+import stat
+import threading
+from collections import OrderedDict
+
+from flask import abort, current_app, request, send_file
+from werkzeug.security import safe_join
+
+
+# Nombres direccionados por contenido: <sha256>.<ext> o <sha256>_<variante>.<ext>
+# (el nombre cambia si cambian los bytes, así que se pueden cachear para siempre)
+_CONTENT_ADDRESSED = re.compile(r'^([0-9a-f]{64})(?:_[\w-]+)?\.[\w]+$')
+
+UN_ANIO = 365 * 24 * 3600
+
+
+class StaticFileServer:
+    """
+    Sirve /uploads/<path> (logos, fotos y documentos) con cache HTTP
+
+    ¿Por qué existe?
+    - Los logos aparecen en cada tabla y lista de partidos del frontend
+    - La ruta anterior hacía os.path.exists + send_from_directory sin ningún
+      header de cache: el navegador los volvía a descargar siempre
+
+    ¿Cómo funciona?
+    - ETag por contenido. Si el nombre ya es un hash (ver _CONTENT_ADDRESSED)
+      el ETag es el propio nombre y la respuesta lleva
+      Cache-Control: immutable por un año. Para los nombres viejos (uuid o
+      jugador_<id>_<doc>, que se sobreescriben) el hash del archivo se calcula
+      una vez por versión (mtime + tamaño) y se guarda en un LRU; esos se
+      revalidan con If-None-Match pasados UPLOADS_MAX_AGE segundos
+    - If-None-Match se resuelve antes de abrir el archivo: 304 sin leer disco
+    - Range (206) y If-Modified-Since los resuelve send_file
+
+    UPLOADS_SENDFILE elige quién envía los bytes:
+    - 'none': Python (send_file, con wsgi.file_wrapper si el servidor lo tiene)
+    - 'x-sendfile': Apache/lighttpd con mod_xsendfile (USE_X_SENDFILE)
+    - 'x-accel': nginx. La respuesta solo lleva headers y
+      X-Accel-Redirect: <UPLOADS_ACCEL_PREFIX>/<path>; nginx necesita:
+          location /_uploads/ { internal; alias /ruta/backend/uploads/; }
+      En este modo nginx también resuelve Range.
+    """
+
+    def __init__(self):
+        self._base = None
+        self._modo = 'none'
+        self._accel_prefix = '/_uploads'
+        self._max_age = 3600
+        self._etags = OrderedDict()     # ruta → (mtime_ns, tamaño, etag)
+        self._etags_max = 4096
+        self._lock = threading.Lock()
+        self.hashes_calculados = 0
+
+    def init_app(self, app, base):
+        """Registra la ruta /uploads/<path:filename> sobre el directorio base"""
+        self._base = base
+        self._modo = app.config.get('UPLOADS_SENDFILE', 'none')
+        self._accel_prefix = app.config.get('UPLOADS_ACCEL_PREFIX', '/_uploads').rstrip('/')
+        self._max_age = app.config.get('UPLOADS_MAX_AGE', 3600)
+        self._etags_max = app.config.get('UPLOADS_ETAG_CACHE_MAX', 4096)
+        if self._modo == 'x-sendfile':
+            app.config['USE_X_SENDFILE'] = True
+        app.add_url_rule('/uploads/<path:filename>', 'uploaded_file', self.servir)
+        app.extensions['static_files'] = self
+
+    # ============================================
+    # RUTA
+    # ============================================
+
+    def servir(self, filename):
+        """Servir archivos subidos (logos, documentos, fotos)"""
+        path = safe_join(self._base, filename)
+        if path is None:
+            abort(404)
+
+        nombre = os.path.basename(path)
+        direccionado = _CONTENT_ADDRESSED.match(nombre) is not None
+
+        if direccionado:
+            # Sin tocar el disco: el nombre es el hash del contenido
+            etag = nombre.rsplit('.', 1)[0]
+            if request.if_none_match.contains(etag):
+                return self._no_modificado(etag, inmutable=True)
+            if self._modo == 'x-accel':
+                return self._accel(filename, etag, inmutable=True)
+            if not os.path.isfile(path):
+                abort(404)
+        else:
+            try:
+                st = os.stat(path)
+            except OSError:
+                current_app.logger.error(f"Archivo no encontrado: {path}")
+                abort(404)
+            if not stat.S_ISREG(st.st_mode):
+                abort(404)
+            etag = self._etag(path, st)
+            if request.if_none_match.contains(etag):
+                return self._no_modificado(etag, inmutable=False)
+            if self._modo == 'x-accel':
+                return self._accel(filename, etag, inmutable=False)
+
+        response = send_file(
+            path,
+            etag=etag,
+            conditional=True,
+            max_age=UN_ANIO if direccionado else self._max_age
+        )
+        response.cache_control.public = True
+        if direccionado:
+            response.cache_control.immutable = True
+        return response
+
+    # ============================================
+    # RESPUESTAS
+    # ============================================
+
+    def _no_modificado(self, etag, inmutable):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        self._cache_headers(response, inmutable)
+        return response
+
+    def _accel(self, filename, etag, inmutable):
+        """Solo headers: nginx envía el archivo desde la location interna"""
+        response = current_app.response_class()
+        response.headers['X-Accel-Redirect'] = f'{self._accel_prefix}/{filename}'
+        response.mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response.set_etag(etag)
+        self._cache_headers(response, inmutable)
+        return response
+
+    def _cache_headers(self, response, inmutable):
+        response.cache_control.public = True
+        response.cache_control.max_age = UN_ANIO if inmutable else self._max_age
+        if inmutable:
+            response.cache_control.immutable = True
+
+    # ============================================
+    # ETAG DE ARCHIVOS CON NOMBRE NO DIRECCIONADO
+    # ============================================
+
+    def _etag(self, path, st):
+        version = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cacheado = self._etags.get(path)
+            if cacheado and cacheado[:2] == version:
+                self._etags.move_to_end(path)
+                return cacheado[2]
+
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for bloque in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(bloque)
+        etag = h.hexdigest()[:32]
+
+        with self._lock:
+            self.hashes_calculados += 1
+            self._etags[path] = (*version, etag)
+            self._etags.move_to_end(path)
+            while len(self._etags) > self._etags_max:
+                self._etags.popitem(last=False)
+        return etag
+
+
+static_files = StaticFileServer()
@@ -0,0 +1,117 @@
+import hashlib
+import os
+import tempfile
+from functools import wraps
+
+from flask import Request, current_app, g
+from werkzeug.exceptions import RequestEntityTooLarge
+
+
+class SubidaDemasiadoGrande(RequestEntityTooLarge):
+    """El archivo superó el límite de la ruta mientras se recibía"""
+
+    def __init__(self, limite):
+        super().__init__(f'El archivo supera el máximo de {limite // (1024 * 1024) or 1}MB')
+        self.limite = limite
+
+
+class SubidaEnStreaming:
+    """
+    Destino de un archivo de un multipart mientras Werkzeug lo va parseando
+
+    - Escribe cada bloque directo a un temporal en uploads/blobs/.tmp (mismo
+      disco que el destino final: AlmacenService lo mueve con os.replace)
+    - Calcula el SHA-256 y el tamaño en la misma pasada
+    - Corta con SubidaDemasiadoGrande apenas se pasa del límite, sin
+      terminar de recibir ni guardar el resto
+
+    Si nadie adopta el temporal (la ruta falló antes de guardar) se borra al
+    cerrarse: Flask cierra los archivos del request al terminar.
+    """
+
+    def __init__(self, directorio, limite=None):
+        os.makedirs(directorio, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(dir=directorio, prefix='subida-')
+        self._f = os.fdopen(fd, 'w+b')
+        self._hash = hashlib.sha256()
+        self.tamanio = 0
+        self.limite = limite
+        self.adoptado = False
+
+    @classmethod
+    def desde_archivo(cls, path):
+        """Envuelve un archivo ya armado en disco (lo hashea leyéndolo por bloques)"""
+        stream = cls.__new__(cls)
+        stream.path = path
+        stream._f = open(path, 'r+b')
+        stream._hash = hashlib.sha256()
+        stream.tamanio = 0
+        stream.limite = None
+        stream.adoptado = False
+        for bloque in iter(lambda: stream._f.read(1024 * 1024), b''):
+            stream._hash.update(bloque)
+            stream.tamanio += len(bloque)
+        return stream
+
+    def write(self, data):
+        self.tamanio += len(data)
+        if self.limite and self.tamanio > self.limite:
+            self.close()
+            raise SubidaDemasiadoGrande(self.limite)
+        self._hash.update(data)
+        return self._f.write(data)
+
+    @property
+    def sha256(self):
+        return self._hash.hexdigest()
+
+    def adoptar(self, destino):
+        """Mueve el temporal a su ruta definitiva"""
+        self._f.close()
+        os.replace(self.path, destino)
+        self.adoptado = True
+
+    def close(self):
+        if not self._f.closed:
+            self._f.close()
+        if not self.adoptado:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    @property
+    def closed(self):
+        return self._f.closed
+
+    def __getattr__(self, name):
+        # read, readline, seek, tell... los usa FileStorage
+        return getattr(self._f, name)
+
+    def __iter__(self):
+        return iter(self._f)
+
+
+class RequestConSubidas(Request):
+    """Request de la app: los archivos de multipart/form-data van a SubidaEnStreaming"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        base = current_app.config['UPLOADS_BASE']
+        limite = g.get('limite_subida') or current_app.config.get('MAX_CONTENT_LENGTH')
+        return SubidaEnStreaming(os.path.join(base, 'blobs', '.tmp'), limite)
+
+
+def limite_subida(max_bytes):
+    """
+    Límite de tamaño por archivo para la ruta, aplicado mientras se recibe
+
+    Debe quedar debajo de los decoradores de autenticación: el cuerpo se
+    parsea recién cuando la ruta accede a request.files.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            g.limite_subida = max_bytes
+            return f(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -27,3 +27,23 @@ def validar_jugador(data):
     if 'id_equipo' not in data:
         errores.append('El ID del equipo es requerido')
     return errores
+
+def parsear_ids(valor, maximo=500):
+    """
+    '1,2,3' → [1, 2, 3] (sin repetidos, en el orden recibido)
+
+    Raises:
+        ValueError: si hay algo que no es un entero positivo o más de `maximo` ids
+    """
+    ids = []
+    for parte in (valor or '').split(','):
+        parte = parte.strip()
+        if not parte:
+            continue
+        if not parte.isdigit() or int(parte) <= 0:
+            raise ValueError(f'"{parte}" no es un id válido')
+        ids.append(int(parte))
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > maximo:
+        raise ValueError(f'Máximo {maximo} ids por consulta')
+    return ids
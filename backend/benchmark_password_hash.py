@@ -0,0 +1,90 @@
+"""
+Benchmark: logins por segundo según la cantidad de workers del PasswordHasher
+
+Simula N logins concurrentes (cada uno un verify de bcrypt) con distintos
+tamaños de pool y muestra throughput, latencia p50/p95 y rechazos (503).
+
+Uso:
+    python benchmark_password_hash.py
+    python benchmark_password_hash.py --rounds 10 --logins 200 --workers 1 2 4 8
+"""
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from app.security.password_hasher import PasswordHasher, HasherSaturado
+
+
+class _AppFalsa:
+    """Lo mínimo que PasswordHasher.init_app necesita"""
+
+    def __init__(self, config):
+        self.config = config
+        self.extensions = {}
+
+
+def medir(workers, rounds, logins, concurrencia, max_queue):
+    hasher = PasswordHasher()
+    hasher.init_app(_AppFalsa({
+        'PASSWORD_HASH_WORKERS': workers,
+        'PASSWORD_HASH_MAX_QUEUE': max_queue,
+        'PASSWORD_HASH_ROUNDS': rounds,
+        'PASSWORD_HASH_TIMEOUT_SECONDS': 120
+    }))
+    hashed = bcrypt.hashpw(b'benchmark', bcrypt.gensalt(rounds)).decode('utf-8')
+
+    def login(_):
+        inicio = time.perf_counter()
+        try:
+            ok = hasher.verify('benchmark', hashed)
+        except HasherSaturado:
+            return None
+        assert ok
+        return (time.perf_counter() - inicio) * 1000
+
+    # Los hilos de "request" esperan al pool, como los workers de gunicorn
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as requests:
+        latencias = list(requests.map(login, range(logins)))
+    total = time.perf_counter() - inicio
+
+    ok = [l for l in latencias if l is not None]
+    return {
+        'workers': workers,
+        'logins_s': len(ok) / total,
+        'p50': statistics.median(ok) if ok else 0,
+        'p95': statistics.quantiles(ok, n=20)[18] if len(ok) >= 2 else 0,
+        'rechazados': len(latencias) - len(ok)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=None, help='Costo bcrypt (default: calibrado a 250 ms)')
+    parser.add_argument('--logins', type=int, default=100)
+    parser.add_argument('--concurrencia', type=int, default=32, help='Requests simultáneos')
+    parser.add_argument('--max-queue', type=int, default=64)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    rounds = args.rounds or PasswordHasher.calibrar(250)
+
+    print("🔐 Benchmark de hash de contraseñas")
+    print(f"   Núcleos: {os.cpu_count()}")
+    print(f"   Rounds: {rounds}")
+    print(f"   Logins: {args.logins} ({args.concurrencia} concurrentes, cola máx. {args.max_queue})\n")
+    print(f"{'workers':>8} {'logins/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'503':>6}")
+
+    for workers in args.workers:
+        r = medir(workers, rounds, args.logins, args.concurrencia, args.max_queue)
+        print(f"{r['workers']:>8} {r['logins_s']:>10.1f} {r['p50']:>10.1f} {r['p95']:>10.1f} {r['rechazados']:>6}")
+
+    print("\n✅ Listo (el throughput deja de crecer cuando los workers superan los núcleos)")
+
+
+if __name__ == '__main__':
+    main()
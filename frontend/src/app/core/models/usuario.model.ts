@@ -69,5 +69,6 @@ export interface ErrorResponse {
 export interface RefreshResponse {
   mensaje: string;
   access_token: string;
+  refresh_token: string;
   expires_in: number;
 }
\ No newline at end of file
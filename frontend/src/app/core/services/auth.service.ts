@@ -121,7 +121,8 @@ logout(): void {
     const request: RefreshRequest = { refresh_token: refreshToken };
     return this.http.post<RefreshResponse>(`${this.API_URL}/refresh`, request).pipe(
       tap(response => {
-        localStorage.setItem(environment.tokenKey, response.access_token);
+        // El refresh token se rota en cada renovación: el anterior ya no sirve
+        this.storeTokens(response.access_token, response.refresh_token);
       }),
       catchError(error => {
         this.forceLogout();
@@ -131,9 +131,9 @@ export class JugadoresComponent implements OnInit, OnDestroy {
         return;
       }
 
-      // Validar tamaño (máximo 5MB)
-      if (file.size > 5 * 1024 * 1024) {
-        this.mostrarToast('warning', 'Archivo muy grande', 'El archivo no debe superar 5MB.');
+      // Validar tamaño (máximo 25MB: se sube en partes)
+      if (file.size > 25 * 1024 * 1024) {
+        this.mostrarToast('warning', 'Archivo muy grande', 'El archivo no debe superar 25MB.');
         input.value = '';
         return;
       }
@@ -432,10 +432,7 @@ export class JugadoresComponent implements OnInit, OnDestroy {
   subirDocumentoJugador(idJugador: number): void {
     if (!this.documentoFile) return;
 
-    const formData = new FormData();
-    formData.append('documento', this.documentoFile);
-
-    this.liderService.subirDocumentoJugador(idJugador, formData).subscribe({
+    this.liderService.subirDocumentoJugador(idJugador, this.documentoFile).subscribe({
       next: () => {
         // Feedback opcional: no spamear, pero sí dejarlo consistente
         this.mostrarToast('success', 'Documento subido', 'El documento se subió correctamente.');
@@ -505,18 +502,15 @@ export class JugadoresComponent implements OnInit, OnDestroy {
         return;
       }
 
-      // Validar tamaño (máximo 5MB)
-      if (file.size > 5 * 1024 * 1024) {
-        this.mostrarToast('warning', 'Archivo muy grande', 'El archivo no debe superar 5MB.');
+      // Validar tamaño (máximo 25MB: se sube en partes)
+      if (file.size > 25 * 1024 * 1024) {
+        this.mostrarToast('warning', 'Archivo muy grande', 'El archivo no debe superar 25MB.');
         return;
       }
 
       this.uploadingDocument.set(true);
 
-      const formData = new FormData();
-      formData.append('documento', file);
-
-      this.liderService.subirDocumentoJugador(jugador.id_jugador, formData).subscribe({
+      this.liderService.subirDocumentoJugador(jugador.id_jugador, file).subscribe({
         next: () => {
           this.uploadingDocument.set(false);
           this.cargarJugadores(this.equipoSeleccionado()!, this.paginaActual());
@@ -1,6 +1,6 @@
 import { Injectable } from '@angular/core';
 import { HttpClient, HttpParams } from '@angular/common/http';
-import { Observable, of, forkJoin } from 'rxjs';
+import { Observable, of, forkJoin, from, firstValueFrom } from 'rxjs';
 import { switchMap } from 'rxjs/operators';
 import {
   Equipo,
@@ -92,8 +92,53 @@ export class LiderEquipoService {
     return this.http.delete(`${this.baseUrl}/jugadores/${idJugador}`);
   }
 
-  subirDocumentoJugador(idJugador: number, formData: FormData): Observable<any> {
-    return this.http.post(`${this.baseUrl}/jugadores/${idJugador}/upload-documento`, formData);
+  /**
+   * Sube el PDF en partes: si la conexión se corta, pregunta al servidor
+   * cuánto llegó y sigue desde ahí en vez de empezar de cero.
+   */
+  subirDocumentoJugador(idJugador: number, archivo: File): Observable<any> {
+    return from(this.subirDocumentoEnPartes(idJugador, archivo));
+  }
+
+  private async subirDocumentoEnPartes(idJugador: number, archivo: File): Promise<any> {
+    const url = `${this.baseUrl}/jugadores/${idJugador}/documento/subidas`;
+    const subida = await firstValueFrom(
+      this.http.post<any>(url, { tamanio: archivo.size, nombre_archivo: archivo.name })
+    );
+    const urlSubida = `${url}/${subida.id_subida}`;
+    const tamanioParte = Math.min(subida.chunk_max, 1024 * 1024);
+
+    let offset = 0;
+    let fallos = 0;
+    while (offset < archivo.size) {
+      const fin = Math.min(offset + tamanioParte, archivo.size) - 1;
+      try {
+        const respuesta = await firstValueFrom(
+          this.http.put<any>(urlSubida, archivo.slice(offset, fin + 1), {
+            headers: {
+              'Content-Range': `bytes ${offset}-${fin}/${archivo.size}`,
+              'Content-Type': 'application/octet-stream'
+            }
+          })
+        );
+        offset = respuesta.recibido;
+        fallos = 0;
+      } catch (error: any) {
+        fallos++;
+        if (fallos > 5 || [403, 404, 410].includes(error?.status)) {
+          throw error;
+        }
+        await new Promise(resolve => setTimeout(resolve, 1000 * 2 ** (fallos - 1)));
+        try {
+          const progreso = await firstValueFrom(this.http.get<any>(urlSubida));
+          offset = progreso.recibido;
+        } catch {
+          // Sin conexión todavía: se reintenta la misma parte
+        }
+      }
+    }
+
+    return firstValueFrom(this.http.post(`${urlSubida}/finalizar`, {}));
   }
   
   subirFotoJugador(idJugador: number, formData: FormData): Observable<any> {